@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the whole discovery pipeline, replayed against local stand-ins.
+
+Replays a pump.fun token stream (synthetic, or recorded with --record)
+through the real CombinedRunner - PumpFunSignal -> MomentumScanner -> retry
+queue -> EventLoop -> TradeOrchestrator -> Jupiter/RPC - with every upstream
+served by tests/standins from a child process, and reports as JSON:
+
+- throughput: frames/s read off the socket, signals/s reaching a final state
+- latency (ms, p50/p95/p99/max): delivery lag (frame sent -> read by the
+  scanner), screening (the scanner callback: momentum, rugcheck, enqueue),
+  end to end (frame sent -> final trade state) for fresh snipes and for
+  retry-queue promotions
+- drops: frames never read, signals enqueued but never finished (other than
+  those the EventLoop shed as expired), tokens left in the retry queue,
+  webhook embeds and telemetry records dropped
+- admission: signals the EventLoop admitted and shed, by reason
+- memory: RSS before the stream, peak, at the end and the growth
+
+The stand-ins decide per mint (seeded) whether DEX Screener passes it, rejects
+it or has no pairs for --pending-seconds, so two runs see the same workload.
+--baseline compares with an earlier report and exits 1 on regressions.
+
+Usage:
+    python bench_pipeline.py [--tokens 500] [--rate 20] [--speed 1|10|max] [--replay stream.jsonl]
+                             [--latency dexscreener=80] [--errors rpc=0.01] [--throttle dexscreener=0.1]
+                             [--drain 60] [--dry-run] [--out report.json] [--baseline previous.json]
+    python bench_pipeline.py --record stream.jsonl --seconds 300    # capture the live pumpportal stream
+
+Rugcheck has no stand-in and is disabled for the run (SCAN_RUGCHECK_ENABLED=false).
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ORCHESTRATOR_SRC = os.path.join(ROOT, "hughs-forge", "services", "trade-orchestrator", "src")
+for path in (ORCHESTRATOR_SRC, ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from tests.standins import Scenario, StandinProcess, load_frames, parse_per_upstream, synthetic_frames  # noqa: E402
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+FINAL_STATES = {"EXECUTED", "FAILED", "AWAITING_APPROVAL"}
+
+# (report path, +1 if a higher value is worse / -1 if lower is worse, absolute slack)
+REGRESSION_CHECKS = [
+    ("throughput.frames_per_s", -1, 0.5),
+    ("throughput.signals_per_s", -1, 0.5),
+    ("latency_ms.delivery_lag.p95", +1, 5.0),
+    ("latency_ms.screen.p95", +1, 5.0),
+    ("latency_ms.e2e_fresh.p50", +1, 5.0),
+    ("latency_ms.e2e_fresh.p99", +1, 10.0),
+    ("drops.total", +1, 0),
+    ("memory_mb.growth", +1, 5.0),
+]
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def distribution(values_ms: List[float]) -> Dict[str, float]:
+    values = sorted(values_ms)
+    return {"count": len(values), "p50": round(percentile(values, 50), 3), "p95": round(percentile(values, 95), 3),
+            "p99": round(percentile(values, 99), 3), "max": round(values[-1], 3) if values else 0.0}
+
+
+def rss_mb() -> Optional[float]:
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 2 ** 20
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return None
+
+
+class PipelineProbe:
+    """
+    Timestamps each token at the scanner callback, at enqueue and at its final
+    trade state; tokens the EventLoop drops as expired count as settled.
+    """
+    def __init__(self, retry_queue):
+        self.retry_queue = retry_queue
+        self.lock = threading.Lock()
+        self.sent_ns: Dict[str, int] = {}
+        self.received_ns: Dict[str, int] = {}
+        self.screen_ms: List[float] = []
+        self.retried = set()
+        self.enqueued_ns: Dict[str, int] = {}
+        self.finished: Dict[str, tuple] = {}
+        self.expired = set()
+
+    def wrap_callback(self, callback):
+        async def on_token(mint: str, metadata: dict):
+            started = time.perf_counter()
+            try:
+                await callback(mint, metadata)
+            finally:
+                with self.lock:
+                    self.sent_ns[mint] = metadata.get("sent_at_ns") or metadata.get("received_at_ns")
+                    self.received_ns[mint] = metadata.get("received_at_ns") or time.time_ns()
+                    self.screen_ms.append((time.perf_counter() - started) * 1000)
+                    if mint in self.retry_queue:
+                        self.retried.add(mint)
+        return on_token
+
+    def wrap_enqueue(self, enqueue):
+        def enqueue_signal(signal: Dict[str, Any]):
+            with self.lock:
+                self.enqueued_ns.setdefault(signal.get("token_address"), time.time_ns())
+            enqueue(signal)
+        return enqueue_signal
+
+    def wrap_shed(self, on_shed):
+        def on_signal_shed(signal: Dict[str, Any], reason: str):
+            from core.event_loop import SHED_EXPIRED
+            if reason == SHED_EXPIRED:
+                with self.lock:
+                    self.expired.add(signal.get("token_address"))
+            on_shed(signal, reason)
+        return on_signal_shed
+
+    def on_trade_event(self, event: Dict[str, Any]):
+        if event.get("state") in FINAL_STATES:
+            with self.lock:
+                self.finished.setdefault(event.get("token_address"), (time.time_ns(), event["state"]))
+
+    def settled(self) -> bool:
+        with self.lock:
+            return len(self.finished.keys() | self.expired) >= len(self.enqueued_ns) and not self.retry_queue
+
+
+def build_runner(dry_run: bool, rpc_url: str):
+    from combined_runner import CombinedRunner
+
+    class BenchRunner(CombinedRunner):
+        # Retry checks compressed from minutes to about a second so promotions land within the run
+        RETRY_POLL_S = 0.25
+
+        @staticmethod
+        def _get_retry_interval(age_seconds: float) -> int:
+            return 1
+
+    return BenchRunner(dry_run=dry_run, rpc_url=rpc_url, health_port=0)
+
+
+def run(args) -> Dict[str, Any]:
+    frames = load_frames(args.replay) if args.replay else synthetic_frames(args.tokens, args.rate, args.seed)
+    speed = 0.0 if args.speed == "max" else float(args.speed)
+    scenario = Scenario(seed=args.seed, pending_seconds=args.pending_seconds, latency_ms=args.latency,
+                        jitter_ms=args.jitter, error_rate=args.errors, throttle_rate=args.throttle)
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    standins = StandinProcess(frames, speed=speed, scenario=scenario)
+    try:
+        from solders.keypair import Keypair
+        wallet_path = os.path.join(workdir, "wallet.json")
+        with open(wallet_path, "w") as f:
+            json.dump(list(bytes(Keypair())), f)
+        os.environ.update(standins.env())
+        os.environ.update({
+            "TRADING_WALLET_PATH": wallet_path,
+            "SCAN_RUGCHECK_ENABLED": "false",
+            "TRACE_EXPORT_PATH": os.environ.get("TRACE_EXPORT_PATH", ""),
+        })
+        os.chdir(workdir)
+        log_path = os.path.join(workdir, "pipeline.log")
+        with open(log_path, "a") as log_file:
+            quiet = contextlib.ExitStack()
+            if not args.verbose:
+                logging.basicConfig(level=logging.INFO, stream=log_file,
+                                    format="%(asctime)s [%(name)s] %(levelname)s: %(message)s")
+                quiet.enter_context(contextlib.redirect_stdout(log_file))
+                quiet.enter_context(contextlib.redirect_stderr(log_file))
+            with quiet:
+                report = measure(args, frames, scenario, standins)
+        report["config"]["workdir"] = workdir
+        return report
+    finally:
+        standins.close()
+
+
+def measure(args, frames, scenario, standins) -> Dict[str, Any]:
+    runner = build_runner(args.dry_run, standins.rpc_url)
+    runner.start(block=False)
+    probe = PipelineProbe(runner._retry_queue)
+    runner.pump_scanner.on_token_received = probe.wrap_callback(runner.pump_scanner.on_token_received)
+    runner.event_loop.enqueue_signal = probe.wrap_enqueue(runner.event_loop.enqueue_signal)
+    runner.event_loop.on_shed = probe.wrap_shed(runner.event_loop.on_shed)
+    runner.orchestrator.state_manager.subscribe(probe.on_trade_event)
+
+    memory = []
+    stop_sampling = threading.Event()
+
+    def sample_memory():
+        while not stop_sampling.wait(0.5):
+            memory.append(rss_mb())
+
+    rss_start = rss_mb()
+    sampler = threading.Thread(target=sample_memory, daemon=True, name="Bench-RSS")
+    sampler.start()
+
+    started = time.time()
+    standins.start_stream()
+    deadline = None
+    stats = standins.stats()
+    while True:
+        time.sleep(0.25)
+        stats = standins.stats()
+        streamed = stats["pumpportal"]["finished_at"] is not None
+        if streamed and deadline is None:
+            deadline = time.time() + args.drain
+        if streamed and len(probe.received_ns) >= stats["pumpportal"]["sent"] and probe.settled():
+            break
+        if deadline is not None and time.time() >= deadline:
+            break
+    wall = time.time() - started
+
+    stop_sampling.set()
+    sampler.join()
+    rss_end = rss_mb()
+    memory.append(rss_end)
+
+    dispatcher = runner.broadcaster.dispatcher
+    telemetry_handlers = logging.getLogger("TradeOrchestrator").handlers
+    retry_left = len(runner._retry_queue)
+    runner.stop()
+    # Let the scanner thread see the stand-ins go away (and log it) while output is still redirected
+    runner.pump_scanner.retry_delay = 0
+    standins.close()
+    runner.pump_thread.join(timeout=5)
+
+    with probe.lock:
+        received = dict(probe.received_ns)
+        sent = {mint: probe.sent_ns[mint] for mint in received}
+        finished = dict(probe.finished)
+        enqueued = dict(probe.enqueued_ns)
+        retried = set(probe.retried)
+        screen_ms = list(probe.screen_ms)
+        expired = set(probe.expired)
+
+    e2e_fresh = [(finished[m][0] - sent[m]) / 1e6 for m in finished if m in sent and m not in retried]
+    e2e_retry = [(finished[m][0] - sent[m]) / 1e6 for m in finished if m in sent and m in retried]
+    states: Dict[str, int] = {}
+    for _, state in finished.values():
+        states[state] = states.get(state, 0) + 1
+    first_sent = min(sent.values()) if sent else 0
+    last_finished = max((ns for ns, _ in finished.values()), default=first_sent)
+    receive_span = (max(received.values()) - min(received.values())) / 1e9 if len(received) > 1 else 0.0
+    pipeline_span = (last_finished - first_sent) / 1e9
+
+    drops = {
+        "frames_unread": stats["pumpportal"]["sent"] - len(received),
+        "signals_unfinished": len(set(enqueued) - set(finished) - expired),
+        "retry_queue_left": retry_left,
+        "webhook_embeds": sum(dispatcher.stats["dropped"]) if dispatcher else 0,
+        "telemetry_records": sum(getattr(h, "dropped", 0) for h in telemetry_handlers),
+    }
+    drops["total"] = sum(drops.values())
+    samples = [m for m in memory if m is not None]
+    return {
+        "config": {"frames": len(frames), "speed": args.speed, "replay": args.replay, "rate": args.rate,
+                   "dry_run": args.dry_run, "drain_s": args.drain, "scenario": scenario.to_dict()},
+        "throughput": {
+            "wall_s": round(wall, 3),
+            "frames_per_s": round(len(received) / receive_span, 2) if receive_span else 0.0,
+            "signals_per_s": round(len(finished) / pipeline_span, 2) if pipeline_span > 0 else 0.0,
+        },
+        "latency_ms": {
+            "delivery_lag": distribution([(received[m] - sent[m]) / 1e6 for m in received]),
+            "screen": distribution(screen_ms),
+            "e2e_fresh": distribution(e2e_fresh),
+            "e2e_retry": distribution(e2e_retry),
+        },
+        "counts": {
+            "frames_sent": stats["pumpportal"]["sent"],
+            "frames_received": len(received),
+            "queued_for_retry": len(retried),
+            "promoted": len(retried & set(enqueued)),
+            "rejected": len(received) - len(retried) - len(set(enqueued) - retried),
+            "enqueued": len(enqueued),
+            "final_states": states,
+            "admission": runner.event_loop.admission_counts(),
+        },
+        "drops": drops,
+        "memory_mb": {
+            "start": round(rss_start or 0.0, 1),
+            "peak": round(max(samples), 1) if samples else 0.0,
+            "end": round(rss_end or 0.0, 1),
+            "growth": round((rss_end or 0.0) - (rss_start or 0.0), 1),
+        },
+        "upstream_requests": stats["requests"],
+        "upstream_faults": stats["faults"],
+    }
+
+
+def _lookup(report: Dict[str, Any], path: str):
+    value: Any = report
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Metrics worse than the baseline by more than `tolerance` (relative) and the check's slack."""
+    regressions = []
+    for path, direction, slack in REGRESSION_CHECKS:
+        current, previous = _lookup(report, path), _lookup(baseline, path)
+        if current is None or previous is None:
+            continue
+        worse_by = (current - previous) * direction
+        if worse_by > slack and worse_by > abs(previous) * tolerance:
+            regressions.append(f"{path}: {previous} -> {current}")
+    return regressions
+
+
+def record(path: str, seconds: float):
+    """Writes the live pumpportal create frames, with their receive stamps, to `path`."""
+    from src.signals.pump_fun_stream import PumpFunSignal
+
+    async def main():
+        count = 0
+        with open(path, "w", encoding="utf-8") as out:
+            async def on_token(mint: str, data: dict):
+                nonlocal count
+                out.write(json.dumps(data) + "\n")
+                count += 1
+
+            scanner = PumpFunSignal(on_token_received=on_token)
+            task = asyncio.create_task(scanner.run())
+            await asyncio.sleep(seconds)
+            scanner.stop()
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        print(f"Recorded {count} frames to {path}")
+
+    asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=500, help="Synthetic stream length")
+    parser.add_argument("--rate", type=float, default=20.0, help="Synthetic stream tokens/s at speed 1")
+    parser.add_argument("--speed", default="1", help="Replay speed: 1, 10, ... or max")
+    parser.add_argument("--replay", default=None, help="Recorded stream (JSONL) instead of a synthetic one")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--pending-seconds", type=float, default=5.0,
+                        help="How long retry-path tokens have no DEX pairs")
+    parser.add_argument("--latency", type=parse_per_upstream, default={},
+                        help="Stand-in latency (ms) per upstream, e.g. dexscreener=80,jupiter=60")
+    parser.add_argument("--jitter", type=parse_per_upstream, default={}, help="Mean extra latency tail (ms)")
+    parser.add_argument("--errors", type=parse_per_upstream, default={}, help="Fraction answered 503")
+    parser.add_argument("--throttle", type=parse_per_upstream, default={}, help="Fraction answered 429")
+    parser.add_argument("--drain", type=float, default=60.0, help="Seconds to wait for stragglers after the stream")
+    parser.add_argument("--dry-run", action="store_true", help="Skip Jupiter/RPC (orchestrator dry-run mode)")
+    parser.add_argument("--verbose", action="store_true", help="Leave pipeline logs on the console")
+    parser.add_argument("--out", default=None, help="Write the JSON report here")
+    parser.add_argument("--baseline", default=None, help="Earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative slack before a change is a regression")
+    parser.add_argument("--record", default=None, metavar="PATH", help="Record the live stream instead of benchmarking")
+    parser.add_argument("--seconds", type=float, default=300.0, help="Recording length")
+    args = parser.parse_args()
+    # The run happens in a scratch directory
+    for name in ("replay", "out", "baseline", "record"):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+
+    if args.record:
+        record(args.record, args.seconds)
+        return
+
+    report = run(args)
+    rendered = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(rendered + "\n")
+    print(rendered)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -43,17 +43,31 @@ g_momentum_scanner = None
 _callback_count = 0
 _callback_drop_count = 0
 
+
+class DisabledRugcheckScanner:
+    """Stands in for RugcheckScanner when src.signals.rugcheck is not installed: every token is skipped."""
+    enabled = False
+
+    async def check_token(self, mint: str, dex_liquidity: float = 0) -> dict:
+        return {"safe": True, "skipped": True, "reason": "rugcheck unavailable"}
+
+
 # ============ RUNNER CLASS ============
 class CombinedRunner:
     # Retry queue config
     RETRY_INTERVAL_S = int(os.getenv("SNIPER_RETRY_INTERVAL_S", "30"))
     RETRY_MAX_AGE_S = int(os.getenv("SNIPER_RETRY_MAX_AGE_S", "86400"))  # 24 hours
     SNIPE_AMOUNT_SOL = float(os.getenv("SNIPE_AMOUNT_SOL", "0.01"))
+    RETRY_POLL_S = 10  # base poll of the retry loop; per-token intervals decide the actual check rate
+    # Signal deadline: from discovery for fresh snipes, from the momentum pass for retry promotions
+    SIGNAL_DEADLINE_S = float(os.getenv("SNIPER_SIGNAL_DEADLINE_S", "20"))
 
-    def __init__(self, dry_run: bool = False, rpc_url: str = None, health_port: int = 8002, meteora: bool = False):
+    def __init__(self, dry_run: bool = False, rpc_url: str = None, health_port: int = 8002, meteora: bool = False,
+                 pump_endpoint: str = None):
         self.dry_run = dry_run
         self.rpc_url = rpc_url or "https://api.devnet.solana.com"
         self.health_port = health_port
+        self.pump_endpoint = pump_endpoint or os.getenv("PUMPPORTAL_WS_URL", "wss://pumpportal.fun/api/data")
         self.enable_meteora = meteora or os.getenv("METEORA_ENABLED", "").lower() == "true"
         self.orchestrator = None
         self.event_loop = None
@@ -72,7 +86,8 @@ class CombinedRunner:
         self._retry_queue = OrderedDict()
         self._retry_lock = threading.Lock()
 
-    def start(self):
+    def start(self, block: bool = True):
+        """Starts all components; with block=False returns once they are running (stop() shuts them down)."""
         global g_event_loop, g_momentum_scanner
 
         # Set environment for RPC
@@ -86,6 +101,8 @@ class CombinedRunner:
         from core.orchestrator import TradeOrchestrator
         from core.event_loop import EventLoop
         from telemetry.logger import setup_telemetry_logger
+        from telemetry.metrics import REGISTRY
+        from telemetry.tracing import configure_tracing, span
         from health_server import start_orchestrator_health_server
         from feed.discord_broadcaster import DiscordBroadcaster
         from feed.stats_tracker import StatsTracker
@@ -93,6 +110,10 @@ class CombinedRunner:
         # Initialize Telemetry
         logger_telemetry = setup_telemetry_logger(log_file="logs/orchestrator.jsonl")
         logger_telemetry.info("CombinedRunner starting", extra={"version": "0.2.0"})
+        retry_gauge = REGISTRY.gauge("scanner_retry_queue_size", "Tokens waiting for DEX data in the retry queue")
+        retry_gauge.set_function(self._retry_queue_size)
+        # Per-signal spans (pump.fun frame -> tx signature); TRACE_EXPORT_PATH="" disables
+        configure_tracing(os.getenv("TRACE_EXPORT_PATH", "logs/traces.jsonl"))
 
         # Initialize Assassins Ledger components
         self.broadcaster = DiscordBroadcaster()
@@ -110,8 +131,10 @@ class CombinedRunner:
         # Inject broadcaster into orchestrator so it can broadcast trade events
         self.orchestrator.discord_broadcaster = self.broadcaster
         logger.info("Broadcaster injected into orchestrator")
+        # Rolling stats are fed by committed trade transitions instead of re-reading the DB
+        self.orchestrator.state_manager.subscribe(self.stats_tracker.on_trade_event)
 
-        self.event_loop = EventLoop(self.orchestrator)
+        self.event_loop = EventLoop(self.orchestrator, on_shed=self._on_signal_shed)
         g_event_loop = self.event_loop
 
         # Start orchestrator event loop in daemon thread
@@ -123,25 +146,32 @@ class CombinedRunner:
         self.loop_thread.start()
         logger.info("Orchestrator EventLoop started")
 
-        # Start health server in daemon thread
-        self.health_thread = threading.Thread(
-            target=start_orchestrator_health_server,
-            args=(self.health_port,),
-            daemon=True,
-            name="HealthServer"
-        )
-        self.health_thread.start()
-        logger.info(f"Health server started on port {self.health_port}")
+        # Start health server in daemon thread (health_port=0 disables it)
+        if self.health_port:
+            self.health_thread = threading.Thread(
+                target=start_orchestrator_health_server,
+                args=(self.health_port,),
+                daemon=True,
+                name="HealthServer"
+            )
+            self.health_thread.start()
+            logger.info(f"Health server started on port {self.health_port}")
 
         # Initialize Scanner components
         from src.signals.dex_screener import MomentumScanner
         from src.signals.pump_fun_stream import PumpFunSignal
         from src.signals.meteora_dlmm_scanner import MeteoraDLMMScanner
-        from src.signals.rugcheck import RugcheckScanner
 
         self.momentum_scanner = MomentumScanner()
         g_momentum_scanner = self.momentum_scanner
-        self.rugcheck_scanner = RugcheckScanner()
+        rugcheck_wanted = os.environ.get("SCAN_RUGCHECK_ENABLED", "true").lower() != "false"
+        try:
+            from src.signals.rugcheck import RugcheckScanner
+            self.rugcheck_scanner = RugcheckScanner()
+        except ImportError as e:
+            log = logger.warning if rugcheck_wanted else logger.debug
+            log(f"Rugcheck scanner unavailable ({e}); tokens are not rugchecked")
+            self.rugcheck_scanner = DisabledRugcheckScanner()
         if self.rugcheck_scanner.enabled:
             logger.info("Rugcheck scanner enabled (max_score=%d, min_liq=$%s)",
                         self.rugcheck_scanner.max_score, self.rugcheck_scanner.min_liquidity_usd)
@@ -153,12 +183,19 @@ class CombinedRunner:
         # Define Pump.fun token callback
         async def on_token_discovered_local(mint: str, metadata: dict):
             """Callback for Pump.fun scanner: validates momentum then enqueues to orchestrator."""
+            # Root span of the signal's trace, backdated to the websocket frame's arrival
+            with span("signal", {"mint": mint, "symbol": metadata.get("symbol", "UNKNOWN"), "source": "pump.fun"},
+                      start_ns=metadata.get("received_at_ns")):
+                await screen_discovered_token(mint, metadata)
+
+        async def screen_discovered_token(mint: str, metadata: dict):
             global _callback_count, _callback_drop_count
             _callback_count += 1
             symbol = metadata.get('symbol', 'UNKNOWN')
 
             try:
-                intel = await self.momentum_scanner.validate_momentum(mint)
+                with span("momentum"):
+                    intel = await self.momentum_scanner.validate_momentum(mint)
             except Exception as e:
                 logger.warning(f"Validation error for {symbol}: {e}")
                 return
@@ -184,7 +221,7 @@ class CombinedRunner:
                 return
 
             # Token has data AND passed momentum — run full pipeline
-            await self._process_validated_token(mint, symbol, intel)
+            await self._process_validated_token(mint, symbol, intel, metadata)
 
         async def process_retry_token(mint: str, entry: dict, scanner=None):
             """Re-check a queued token. Called from retry loop."""
@@ -212,7 +249,7 @@ class CombinedRunner:
                 return False  # keep watching — momentum may develop
 
             # Passed — buy it
-            await self._process_validated_token(mint, symbol, intel)
+            await self._process_validated_token(mint, symbol, intel, entry["metadata"], retried=True)
             return True  # remove from queue
 
         # Store callback ref for retry loop
@@ -220,7 +257,7 @@ class CombinedRunner:
 
         # Scanner start/stop functions
         def start_pump_scanner():
-            self.pump_scanner = PumpFunSignal(on_token_received=on_token_discovered_local)
+            self.pump_scanner = PumpFunSignal(on_token_received=on_token_discovered_local, endpoint=self.pump_endpoint)
             def run_pump():
                 try:
                     asyncio.run(self.pump_scanner.run())
@@ -230,15 +267,11 @@ class CombinedRunner:
             self.pump_thread.start()
             logger.info("Pump.fun scanner started")
 
-        def stop_pump_scanner():
-            if self.pump_scanner:
-                self.pump_scanner.stop()
-                logger.info("Pump.fun scanner stopped")
-
         def start_meteora_scanner():
             # Derive devnet from RPC URL to ensure scanner matches network
             devnet = "devnet" in self.rpc_url.lower() or "testnet" in self.rpc_url.lower()
-            self.meteora_scanner = MeteoraDLMMScanner(orchestrator=self.orchestrator, devnet=devnet)
+            self.meteora_scanner = MeteoraDLMMScanner(orchestrator=self.orchestrator, devnet=devnet,
+                                                      event_loop=self.event_loop)
             def run_meteora():
                 try:
                     asyncio.run(self.meteora_scanner.run())
@@ -248,11 +281,6 @@ class CombinedRunner:
             self.meteora_thread.start()
             logger.info("Meteora DLMM scanner started")
 
-        def stop_meteora_scanner():
-            if self.meteora_scanner:
-                self.meteora_scanner.stop()
-                logger.info("Meteora DLMM scanner stopped")
-
         # Start scanners
         start_pump_scanner()
         if self.enable_meteora:
@@ -267,26 +295,41 @@ class CombinedRunner:
         if not self.dry_run:
             self._start_balance_monitor()
 
+        if not block:
+            return
+
         # Graceful shutdown
         try:
             logger.info("All components running. Press Ctrl+C to stop.")
             while True:
                 time.sleep(30)
         except KeyboardInterrupt:
-            logger.info("Shutting down...")
-            stop_pump_scanner()
-            if self.enable_meteora:
-                stop_meteora_scanner()
-            self.stats_tracker.stop()
-            self.orchestrator.stop()
-            logger.info("Shutdown complete")
-
-    async def _process_validated_token(self, mint: str, symbol: str, intel: dict):
+            self.stop()
+
+    def stop(self):
+        logger.info("Shutting down...")
+        if self.pump_scanner:
+            self.pump_scanner.stop()
+            logger.info("Pump.fun scanner stopped")
+        if self.meteora_scanner:
+            self.meteora_scanner.stop()
+            logger.info("Meteora DLMM scanner stopped")
+        self.event_loop.stop()
+        self.stats_tracker.stop()
+        self.orchestrator.stop()
+        self.broadcaster.close()
+        logger.info("Shutdown complete")
+
+    async def _process_validated_token(self, mint: str, symbol: str, intel: dict, metadata: dict,
+                                       retried: bool = False):
         """Run rugcheck + enqueue buy for a token that passed momentum validation."""
+        from core.signal_queue import LANE_RETRY, LANE_SNIPE
+        from telemetry.tracing import span
         # Rugcheck security filter
         try:
             dex_liq = intel.get("metrics", {}).get("liquidity", 0)
-            safety = await self.rugcheck_scanner.check_token(mint, dex_liquidity=dex_liq)
+            with span("rugcheck"):
+                safety = await self.rugcheck_scanner.check_token(mint, dex_liquidity=dex_liq)
             if not safety["safe"]:
                 logger.info(f"Token {symbol} failed rugcheck: {safety['reason']}")
                 self.broadcaster.broadcast_scanner_rejected({
@@ -304,17 +347,44 @@ class CombinedRunner:
 
         # Enqueue signal to orchestrator
         amount = self.SNIPE_AMOUNT_SOL
+        discovered_at = metadata.get("received_at_ns", 0) / 1e9 or time.time()
         signal = {
             "token_address": mint,
             "amount": amount,
-            "trade_id": f"snipe-{mint[:8]}"
+            "trade_id": f"snipe-{mint[:8]}",
+            "symbol": symbol,
+            "source": "retry_queue" if retried else "pump.fun",
+            "lane": LANE_RETRY if retried else LANE_SNIPE,
+            "discovered_at": discovered_at,
+            "deadline": (time.time() if retried else discovered_at) + self.SIGNAL_DEADLINE_S,
         }
         try:
-            self.event_loop.enqueue_signal(signal)
+            with span("enqueue"):
+                self.event_loop.enqueue_signal(signal)
             logger.info(f"Signal enqueued for {symbol} ({amount} SOL)")
         except Exception as e:
             logger.error(f"Failed to enqueue signal for {symbol}: {e}")
 
+    def _on_signal_shed(self, signal: dict, reason: str):
+        """EventLoop shed a stale signal: demote it to the retry queue if it is still in date, else report it."""
+        from core.event_loop import SHED_QUEUE_WAIT
+        mint = signal["token_address"]
+        symbol = signal.get("symbol", "UNKNOWN")
+        if reason == SHED_QUEUE_WAIT:
+            # Re-checked by the retry loop, which re-enqueues it with a fresh deadline if momentum holds
+            self._enqueue_retry(mint, {"symbol": symbol, "received_at_ns": int(signal.get("discovered_at", 0) * 1e9)})
+            return
+        self.broadcaster.broadcast_scanner_rejected({
+            "mint": mint,
+            "symbol": symbol,
+            "reason": f"Stale signal: {reason}",
+            "reasons": [f"Stale signal: {reason}"],
+            "metrics": {},
+        })
+
+    def _retry_queue_size(self) -> int:
+        return len(self._retry_queue)
+
     def _enqueue_retry(self, mint: str, metadata: dict):
         """Add a token to the retry queue for periodic re-checking."""
         with self._retry_lock:
@@ -361,7 +431,7 @@ class CombinedRunner:
             logger.info(f"Retry queue active (max_age={self.RETRY_MAX_AGE_S}s, adaptive intervals)")
             try:
                 while True:
-                    time.sleep(10)  # base poll — per-token intervals decide actual check rate
+                    time.sleep(self.RETRY_POLL_S)
                     with self._retry_lock:
                         if not self._retry_queue:
                             continue
@@ -24,6 +24,8 @@ async def ghost_run_mock():
     executor = TradeStateMachine()
     # Inject Mock Service to bypass transient API issues
     executor.jupiter = MockJupiterService()
+    # The service owns the fee estimator: started once here, stopped on the way out
+    executor.start()
     
     # 1. Test Small Opportunity (Within $250)
     print("\n[TEST 1] Small Opportunity (0.1 SOL -> $15)")
@@ -50,6 +52,7 @@ async def ghost_run_mock():
     executor.jupiter.get_quote = lambda i, o, a: f
     
     await executor.process_opportunity(large_op)
+    await executor.stop()
     
     print("\n--- MOCKED GHOST TEST COMPLETE ---")
 
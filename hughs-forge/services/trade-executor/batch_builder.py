@@ -0,0 +1,311 @@
+# batch_builder.py for the Trade Executor service
+#
+# Packs several Meteora DLMM instructions (claimFees, depositLiquidity, ...)
+# into as few v0 transactions as the 1232-byte packet limit allows, using
+# Address Lookup Tables to shrink the account list, and sizes the compute
+# budget of every transaction from a simulation instead of a flat guess.
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+from solana.rpc.async_api import AsyncClient
+from solders.account_decoder import UiAccountEncoding
+from solders.address_lookup_table_account import AddressLookupTable, AddressLookupTableAccount
+from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+from solders.hash import Hash
+from solders.instruction import Instruction
+from solders.keypair import Keypair
+from solders.message import MessageV0
+from solders.pubkey import Pubkey
+from solders.rpc.config import RpcSimulateTransactionAccountsConfig, RpcSimulateTransactionConfig
+from solders.rpc.requests import SimulateVersionedTransaction
+from solders.rpc.responses import SimulateTransactionResp
+from solders.transaction import VersionedTransaction
+
+logger = logging.getLogger(__name__)
+
+PACKET_DATA_SIZE = 1232          # Max serialized transaction size accepted by validators
+MAX_COMPUTE_UNITS = 1_400_000    # Per-transaction CU ceiling; used for the sizing simulation
+DEFAULT_CU_PER_IX = 60_000       # Fallback when simulation is unavailable
+SIGNATURE_SIZE = 64
+LAMPORTS_PER_SIGNATURE = 5_000
+SPL_TOKEN_AMOUNT_OFFSET = 64     # u64 amount after the mint and owner in an SPL token account
+
+
+class BatchTooLargeError(ValueError):
+    """Raised when a single instruction (or an atomic group) cannot fit in one transaction."""
+
+
+def parse_lookup_tables(value: str) -> List[Pubkey]:
+    """Comma-separated ALT addresses; malformed entries are logged and skipped."""
+    tables = []
+    for entry in (a.strip() for a in value.split(",")):
+        if not entry:
+            continue
+        try:
+            tables.append(Pubkey.from_string(entry))
+        except ValueError as e:
+            logger.error(f"--> [BATCH] Ignoring invalid lookup table address {entry!r}: {e}")
+    return tables
+
+
+class BatchTransactionBuilder:
+    def __init__(
+        self,
+        client: AsyncClient,
+        lookup_table_addresses: Optional[Sequence[Pubkey]] = None,
+        compute_unit_price: int = 10_000,
+        cu_margin: float = 1.15,
+        rpc_url: Optional[str] = None,
+    ):
+        self.client = client
+        self.rpc_url = rpc_url  # plain JSON-RPC endpoint for calls AsyncClient has no public form of
+        self.lookup_table_addresses = list(lookup_table_addresses or [])
+        self.compute_unit_price = compute_unit_price  # micro-lamports per CU
+        self.cu_margin = cu_margin
+        self._lookup_tables: Optional[List[AddressLookupTableAccount]] = None
+
+    async def load_lookup_tables(self, refresh: bool = False) -> List[AddressLookupTableAccount]:
+        """Fetches and caches the configured ALTs. Unreadable tables are skipped, not fatal."""
+        if self._lookup_tables is not None and not refresh:
+            return self._lookup_tables
+
+        tables: List[AddressLookupTableAccount] = []
+        for address in self.lookup_table_addresses:
+            try:
+                resp = await self.client.get_account_info(address)
+                if not resp.value:
+                    logger.warning(f"--> [BATCH] Lookup table {address} not found, skipping.")
+                    continue
+                table = AddressLookupTable.deserialize(bytes(resp.value.data))
+                tables.append(AddressLookupTableAccount(key=address, addresses=list(table.addresses)))
+            except Exception as e:
+                logger.warning(f"--> [BATCH] Failed to load lookup table {address}: {e}")
+        self._lookup_tables = tables
+        return tables
+
+    def _budget_ixs(self, cu_limit: int) -> List[Instruction]:
+        ixs = [set_compute_unit_limit(cu_limit)]
+        if self.compute_unit_price > 0:
+            ixs.append(set_compute_unit_price(self.compute_unit_price))
+        return ixs
+
+    def compile(
+        self,
+        payer: Pubkey,
+        instructions: Sequence[Instruction],
+        blockhash: Hash,
+        cu_limit: int = MAX_COMPUTE_UNITS,
+        lookup_tables: Optional[Sequence[AddressLookupTableAccount]] = None,
+    ) -> MessageV0:
+        """Compiles a v0 message with compute-budget instructions prepended."""
+        return MessageV0.try_compile(
+            payer,
+            self._budget_ixs(cu_limit) + list(instructions),
+            list(lookup_tables or []),
+            blockhash,
+        )
+
+    @staticmethod
+    def serialized_size(message: MessageV0) -> int:
+        """Wire size of the signed transaction: sig count + signatures + versioned message."""
+        num_signatures = message.header.num_required_signatures
+        # shortvec length prefix is one byte for < 128 signatures
+        return 1 + num_signatures * SIGNATURE_SIZE + 1 + len(bytes(message))
+
+    def fits(self, message: MessageV0) -> bool:
+        return self.serialized_size(message) <= PACKET_DATA_SIZE
+
+    def estimate_fee_lamports(self, message: MessageV0, cu_limit: int) -> int:
+        """Base signature fee plus the priority fee for the requested CU limit."""
+        priority = -(-cu_limit * self.compute_unit_price // 1_000_000)  # ceil
+        return message.header.num_required_signatures * LAMPORTS_PER_SIGNATURE + priority
+
+    def pack(
+        self,
+        payer: Pubkey,
+        instructions: Sequence[Instruction],
+        blockhash: Hash,
+        lookup_tables: Optional[Sequence[AddressLookupTableAccount]] = None,
+    ) -> List[List[Instruction]]:
+        """
+        Greedily splits instructions into groups that each compile to a transaction
+        under the packet limit. Order is preserved.
+        """
+        batches: List[List[Instruction]] = []
+        current: List[Instruction] = []
+        for ix in instructions:
+            candidate = current + [ix]
+            try:
+                ok = self.fits(self.compile(payer, candidate, blockhash, lookup_tables=lookup_tables))
+            except Exception:
+                # try_compile rejects messages with too many account keys
+                ok = False
+            if ok:
+                current = candidate
+                continue
+            if not current:
+                raise BatchTooLargeError(f"Instruction for program {ix.program_id} does not fit in a single transaction.")
+            batches.append(current)
+            current = [ix]
+            if not self.fits(self.compile(payer, current, blockhash, lookup_tables=lookup_tables)):
+                raise BatchTooLargeError(f"Instruction for program {ix.program_id} does not fit in a single transaction.")
+        if current:
+            batches.append(current)
+        return batches
+
+    async def simulate_units(self, signers: Sequence[Keypair], message: MessageV0) -> Optional[Dict]:
+        """
+        Simulates a compiled message and returns {"units": int, "err": ..., "logs": [...]},
+        or None when the RPC call itself fails.
+        """
+        try:
+            tx = VersionedTransaction(message, list(signers))
+            resp = await self.client.simulate_transaction(tx, sig_verify=False)
+            value = resp.value
+            return {
+                "units": value.units_consumed or 0,
+                "err": value.err,
+                "logs": list(value.logs or []),
+            }
+        except Exception as e:
+            logger.warning(f"--> [BATCH] Simulation request failed: {e}")
+            return None
+
+    async def simulate_token_balances(
+        self,
+        signers: Sequence[Keypair],
+        instructions: Sequence[Instruction],
+        token_accounts: Sequence[Pubkey],
+        blockhash: Optional[Hash] = None,
+    ) -> Dict:
+        """
+        Simulates `instructions` and reads back the raw SPL balances of `token_accounts`
+        afterwards: {"balances": [int, ...] or None, "err": ...}. Accounts that do not
+        exist read as 0; balances is None when the simulation fails or errors.
+        """
+        if blockhash is None:
+            blockhash = (await self.client.get_latest_blockhash()).value.blockhash
+        message = self.compile(signers[0].pubkey(), instructions, blockhash, MAX_COMPUTE_UNITS)
+        config = RpcSimulateTransactionConfig(
+            accounts=RpcSimulateTransactionAccountsConfig(list(token_accounts), UiAccountEncoding.Base64),
+        )
+        body = SimulateVersionedTransaction(VersionedTransaction(message, list(signers)), config)
+        try:
+            # AsyncClient.simulate_transaction cannot ask for post-simulation account state
+            resp = SimulateTransactionResp.from_json(await self._post_rpc(body.to_json()))
+            if not isinstance(resp, SimulateTransactionResp):
+                raise RuntimeError(f"RPC error: {resp}")
+            value = resp.value
+        except Exception as e:
+            logger.warning(f"--> [BATCH] Balance simulation request failed: {e}")
+            return {"balances": None, "err": f"simulation unavailable: {e}"}
+        if value.err is not None:
+            return {"balances": None, "err": value.err}
+        if value.accounts is None or len(value.accounts) != len(token_accounts):
+            return {"balances": None, "err": "no account state in simulation result"}
+        balances = []
+        for account in value.accounts:
+            data = bytes(account.data) if account is not None else b""
+            if len(data) < SPL_TOKEN_AMOUNT_OFFSET + 8:
+                balances.append(0)
+            else:
+                balances.append(int.from_bytes(data[SPL_TOKEN_AMOUNT_OFFSET:SPL_TOKEN_AMOUNT_OFFSET + 8], "little"))
+        return {"balances": balances, "err": None}
+
+    async def _post_rpc(self, body: str) -> str:
+        """POSTs one JSON-RPC request to `rpc_url` and returns the raw response body."""
+        if not self.rpc_url:
+            raise RuntimeError("no rpc_url configured")
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.post(self.rpc_url, content=body, headers={"Content-Type": "application/json"})
+            response.raise_for_status()
+            return response.text
+
+    async def size_compute_limit(
+        self,
+        signers: Sequence[Keypair],
+        instructions: Sequence[Instruction],
+        blockhash: Hash,
+        lookup_tables: Optional[Sequence[AddressLookupTableAccount]] = None,
+    ) -> Dict:
+        """
+        Simulates the group at the CU ceiling and returns the limit to request
+        (consumed units plus margin), along with the raw simulation result.
+        """
+        payer = signers[0].pubkey()
+        probe = self.compile(payer, instructions, blockhash, MAX_COMPUTE_UNITS, lookup_tables)
+        sim = await self.simulate_units(signers, probe)
+        if sim and sim["units"] > 0:
+            limit = min(MAX_COMPUTE_UNITS, int(sim["units"] * self.cu_margin))
+        else:
+            limit = min(MAX_COMPUTE_UNITS, DEFAULT_CU_PER_IX * len(instructions))
+        return {"cu_limit": limit, "simulation": sim}
+
+    async def build(
+        self,
+        signers: Sequence[Keypair],
+        instructions: Sequence[Instruction],
+        blockhash: Optional[Hash] = None,
+    ) -> List[Dict]:
+        """
+        Packs instructions into signed v0 transactions sharing one blockhash.
+        The first signer pays. Each entry carries the transaction, the number of
+        instructions it covers, its CU limit and the sizing simulation.
+        """
+        if not instructions:
+            return []
+        payer = signers[0].pubkey()
+        lookup_tables = await self.load_lookup_tables()
+        if blockhash is None:
+            blockhash = (await self.client.get_latest_blockhash()).value.blockhash
+
+        built = []
+        for group in self.pack(payer, instructions, blockhash, lookup_tables):
+            built.append(await self._finalize(signers, group, blockhash, lookup_tables))
+        logger.info(f"--> [BATCH] Packed {len(instructions)} instructions into {len(built)} transaction(s).")
+        return built
+
+    async def build_atomic(
+        self,
+        signers: Sequence[Keypair],
+        instructions: Sequence[Instruction],
+        blockhash: Optional[Hash] = None,
+    ) -> Dict:
+        """
+        Builds all instructions into exactly one transaction (all-or-nothing) and
+        runs the sizing simulation as a preflight. Raises BatchTooLargeError if
+        they do not fit together.
+        """
+        payer = signers[0].pubkey()
+        lookup_tables = await self.load_lookup_tables()
+        if blockhash is None:
+            blockhash = (await self.client.get_latest_blockhash()).value.blockhash
+
+        try:
+            probe = self.compile(payer, instructions, blockhash, lookup_tables=lookup_tables)
+        except Exception as e:
+            raise BatchTooLargeError(f"Atomic group does not compile into one transaction: {e}") from e
+        if not self.fits(probe):
+            raise BatchTooLargeError(
+                f"Atomic group needs {self.serialized_size(probe)} bytes, limit is {PACKET_DATA_SIZE}."
+            )
+        return await self._finalize(signers, instructions, blockhash, lookup_tables)
+
+    async def _finalize(
+        self,
+        signers: Sequence[Keypair],
+        instructions: Sequence[Instruction],
+        blockhash: Hash,
+        lookup_tables: Sequence[AddressLookupTableAccount],
+    ) -> Dict:
+        sizing = await self.size_compute_limit(signers, instructions, blockhash, lookup_tables)
+        message = self.compile(signers[0].pubkey(), instructions, blockhash, sizing["cu_limit"], lookup_tables)
+        return {
+            "transaction": VersionedTransaction(message, list(signers)),
+            "ix_count": len(instructions),
+            "cu_limit": sizing["cu_limit"],
+            "simulation": sizing["simulation"],
+            "size": self.serialized_size(message),
+            "fee_lamports": self.estimate_fee_lamports(message, sizing["cu_limit"]),
+        }
@@ -4,6 +4,8 @@ import json
 import logging
 import datetime
 
+from metrics import CONTENT_TYPE, REGISTRY
+
 logger = logging.getLogger(__name__)
 
 # Standard version for the fleet
@@ -32,6 +34,13 @@ class HealthHandler(http.server.BaseHTTPRequestHandler):
             }
             self.wfile.write(json.dumps(response).encode('utf-8'))
             logger.info(f"Health check from {self.client_address[0]}. Status: {response['status']}")
+        elif self.path == '/metrics':
+            body = REGISTRY.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
         else:
             self.send_response(404)
             self.send_header('Content-type', 'application/json')
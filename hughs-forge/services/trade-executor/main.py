@@ -8,9 +8,10 @@ from solana.rpc.api import Client
 from jupiter_solana import Jupiter
 from typing import Optional, List, Dict, Any
 import asyncio
-from anchorpy import Program, Provider, Wallet, Idl
+from anchorpy import Program, Provider, Wallet, Idl, Context
 # from anchorpy.program.core import get_idl_account_address # Removed this import
 from solders.system_program import ID as SYSTEM_PROGRAM_ID
+from solders.sysvar import RENT
 from solders.instruction import Instruction
 from solders.transaction import Transaction
 # from solana.rpc.api import CommitmentConfig # Removed this import
@@ -19,17 +20,21 @@ from solders.transaction import Transaction
 import requests
 import httpx
 import os
-from pathlib import Path
 import json
 import logging
 import datetime
 import threading
-from collections import deque
-import math
+import time
 import health_server
 from health_server import start_health_server, stop_health_server
 from models.keys import KeyManager
 from models.ledger import TradeLedger
+from batch_builder import BatchTransactionBuilder, BatchTooLargeError, parse_lookup_tables
+from volatility import VolatilityScryer
+from price_bus import PythPriceBus, normalize_feed_id
+from telemetry import EventFormatter, parse_sample_policy, setup_telemetry_logger
+from metrics import REGISTRY, observe_upstream
+from control_plane import ControlPlane, get_control_plane
 
 # Configure logging
 logging.basicConfig(
@@ -43,6 +48,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+AUDIT_PHASE_SECONDS = REGISTRY.histogram("executor_audit_phase_seconds",
+                                         "Per-position autonomous audit phase timings", ["phase"])
+AUDIT_POSITION_SECONDS = REGISTRY.histogram("executor_audit_position_seconds",
+                                            "End-to-end audit time per position by outcome", ["status"])
+
 # Discord Alerting (Telemetry Phase 48)
 DISCORD_WEBHOOK_URL = os.environ.get("DISCORD_TRADE_ALERTS_WEBHOOK")
 
@@ -59,27 +69,30 @@ def send_discord_alert(content: str, color: int = 3447003):
             "timestamp": datetime.datetime.utcnow().isoformat()
         }]
     }
+    started = time.perf_counter()
     try:
-        requests.post(DISCORD_WEBHOOK_URL, json=payload, timeout=10)
+        resp = requests.post(DISCORD_WEBHOOK_URL, json=payload, timeout=10)
+        observe_upstream(DISCORD_WEBHOOK_URL, started, resp.status_code)
     except Exception as e:
+        observe_upstream(DISCORD_WEBHOOK_URL, started, error=True)
         logger.error(f"Failed to send Discord alert: {e}")
 
+async def send_discord_alert_async(content: str, color: int = 3447003):
+    """send_discord_alert on a worker thread, so a slow webhook never stalls the event loop."""
+    await asyncio.to_thread(send_discord_alert, content, color)
+
 # Telemetry Logger for Phase 4
-telemetry_logger = logging.getLogger("telemetry")
-telemetry_logger.setLevel(logging.INFO)
-telemetry_handler = logging.FileHandler("trade_telemetry.jsonl")
-telemetry_handler.setFormatter(logging.Formatter('%(message)s'))
+# Queued: encoding, writes and rotation run on the listener thread (see telemetry.py).
+# e.g. TELEMETRY_SAMPLE_EVERY="STRATEGY_SIGNAL=10" keeps 1 in 10 strategy signals
+telemetry_logger = setup_telemetry_logger(
+    "TradeTelemetry", "trade_telemetry.jsonl", console=False, formatter=EventFormatter(),
+    sample_every=parse_sample_policy(os.environ.get("TELEMETRY_SAMPLE_EVERY", "")))
 # Prevent telemetry from propagating up and flooding the root logger
 telemetry_logger.propagate = False
-telemetry_logger.addHandler(telemetry_handler)
 
 def log_telemetry(event_type: str, data: dict):
-    entry = {
-        "timestamp": datetime.datetime.utcnow().isoformat() + "Z",
-        "event_type": event_type,
-        "data": data
-    }
-    telemetry_logger.info(json.dumps(entry))
+    # Shallow copy: callers may keep mutating their dict after this returns
+    telemetry_logger.info(event_type, extra={"payload": {"data": dict(data)}})
 
 # This would be loaded securely, not hardcoded
 RPC_ENDPOINT = "https://api.mainnet-beta.solana.com"
@@ -93,8 +106,13 @@ METEORA_DLMM_PROGRAM_ID = Pubkey.from_string("LBUZKhRxPF3XUpBCjp4YzTKgLccjZhTSDM
 TOKEN_PROGRAM_ID = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
 ASSOCIATED_TOKEN_PROGRAM_ID = Pubkey.from_string("ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL")
 
-# Pyth Hermes REST API Endpoint
-PYTH_HERMES_ENDPOINT = "https://hermes.pyth.network/v2/updates/price/latest"
+# Jupiter API base URL (quotes live under /swap/v1/)
+JUPITER_BASE_URL = os.environ.get("JUPITER_BASE_URL", "https://api.jup.ag")
+
+# Pyth Hermes base URL (SSE stream + REST fallback live under /v2/updates/price/)
+PYTH_HERMES_BASE_URL = os.environ.get("PYTH_HERMES_BASE_URL", "https://hermes.pyth.network")
+# Prices older than this (by Pyth publish_time) are refetched over HTTP
+PRICE_BUS_MAX_AGE_S = float(os.environ.get("PRICE_BUS_MAX_AGE_S", "30"))
 
 # Pyth Price Feed IDs for volatility calculation
 SOL_USD_FEED_ID = "0xe62df6c8b4a85fe1a67db44dc12de5db330f7ac66b72dc658afedf0f4a415b43"
@@ -105,10 +123,19 @@ VOLATILITY_THRESHOLDS = {
     "NORMAL": 0.05,  # 2-5%
     "HIGH": 0.10     # 5-10%
 }
+# Which estimator horizon (5m, 1h, 24h) drives the LOW/NORMAL/HIGH regime
+VOLATILITY_REGIME_HORIZON = os.environ.get("VOLATILITY_REGIME_HORIZON", "1h")
 
 # Circuit breaker status
 CIRCUIT_BREAKER_ACTIVE = False
-FORCE_STOP_FILE = "/data/openclaw/trade_stop.lock"
+
+# Autonomous audit fan-out: how many positions are worked at once, and how long each may take
+AUDIT_MAX_CONCURRENCY = int(os.environ.get("AUDIT_MAX_CONCURRENCY", "4"))
+AUDIT_POSITION_DEADLINE_S = float(os.environ.get("AUDIT_POSITION_DEADLINE_S", "120"))
+
+# Batched claim/compound: comma-separated ALT addresses and priority fee (micro-lamports per CU)
+METEORA_LOOKUP_TABLES = os.environ.get("METEORA_LOOKUP_TABLES", "")
+BATCH_CU_PRICE_MICRO_LAMPORTS = int(os.environ.get("BATCH_CU_PRICE_MICRO_LAMPORTS", "10000"))
 
 # Placeholder for Meteora IDL - in a real scenario, this would be loaded from a file or fetched
 # This IDL is a *simplified assumption* for demonstration purposes and may not precisely
@@ -225,11 +252,19 @@ METEORA_IDL = Idl.from_json(json.dumps(METEORA_IDL_DICT))
 
 class RiskManager:
     """Manages trading risk, including limits, strategy scoring, and circuit breaker functionality."""
-    def __init__(self, daily_loss_limit: float = -1000.0, max_trade_size: float = 100.0, mode: str = "SAFE"):
+    def __init__(self, daily_loss_limit: float = -1000.0, max_trade_size: float = 100.0, mode: str = "SAFE",
+                 control_plane: Optional[ControlPlane] = None):
         self.daily_loss_limit = daily_loss_limit
         self.max_trade_size = max_trade_size
         self.current_daily_loss = 0.0
-        self.circuit_breaker_active = CIRCUIT_BREAKER_ACTIVE
+        # Halt and circuit-breaker flags are shared with every process on the host
+        self.control_plane = get_control_plane() if control_plane is None else control_plane
+        self.control_plane.start()
+        # A new map starts with the breaker off, so this only ever trips it: startup never clears a
+        # breaker tripped by another live process (or an earlier run); an operator resets it
+        # (deactivate_circuit_breaker / control_plane.py --reset-circuit-breaker)
+        if CIRCUIT_BREAKER_ACTIVE and self.control_plane.created:
+            self.circuit_breaker_active = True
         self.mode = mode # DEGEN or SAFE
         self.strategy_risk_scores = {
             "Spot": 1,    # Conservative
@@ -241,6 +276,14 @@ class RiskManager:
         logger.info(f"-> Max Trade Size: {self.max_trade_size}")
         logger.info(f"-> Strategy Risk Scores: {self.strategy_risk_scores}")
 
+    @property
+    def circuit_breaker_active(self) -> bool:
+        return self.control_plane.circuit_breaker_active()
+
+    @circuit_breaker_active.setter
+    def circuit_breaker_active(self, active: bool):
+        self.control_plane.set_circuit_breaker(active)
+
     def check_strategy_risk(self, strategy: str, market_volatility: str) -> bool:
         """Vetoes aggressive strategies during high volatility."""
         score = self.strategy_risk_scores.get(strategy, 5)
@@ -252,7 +295,7 @@ class RiskManager:
     def check_trade(self, proposed_trade_amount: float) -> bool:
         """Checks if a proposed trade adheres to risk parameters."""
         # 1. Check for manual override kill-switch
-        if Path(FORCE_STOP_FILE).exists():
+        if self.control_plane.is_halted():
             logger.critical("🚨 TRADE VETOED: Force-stop lock file detected!")
             return False
 
@@ -337,7 +380,9 @@ class RebalanceStrategy:
         return {"lower": new_lower, "upper": new_upper}
 
 class TradeExecutor:
-    def __init__(self, rpc_endpoint: str, private_key: str = None, paper_trading_mode: bool = True):
+    def __init__(self, rpc_endpoint: str, private_key: str = None, paper_trading_mode: bool = True,
+                 audit_concurrency: int = AUDIT_MAX_CONCURRENCY, position_deadline_s: float = AUDIT_POSITION_DEADLINE_S,
+                 control_plane: Optional[ControlPlane] = None):
         self.paper_trading_mode = paper_trading_mode
         self.wallet: Optional[Keypair] = Keypair.from_base58_string(private_key) if private_key else None
         self.client = AsyncClient(rpc_endpoint)
@@ -352,16 +397,37 @@ class TradeExecutor:
             METEORA_DLMM_PROGRAM_ID,
             self.provider
         )
-        self.risk_manager = RiskManager()
+        self.risk_manager = RiskManager(control_plane=control_plane)
+        self.control_plane = self.risk_manager.control_plane
         self.rebalance_strategy = RebalanceStrategy()
         self.key_manager = KeyManager(key_dir="hughs-forge/services/trade-executor/keys")
         self.ledger = TradeLedger()
         self.health_update_lock = threading.Lock()
         self.rebalance_locks: Dict[str, asyncio.Lock] = {}
+        # On-chain operations that outlive a timed-out audit, by position pubkey
+        self.position_operations: Dict[str, asyncio.Task] = {}
+        # Bounds how many positions the autonomous audit works on at once
+        self.audit_concurrency = max(1, audit_concurrency)
+        self.audit_semaphore = asyncio.Semaphore(self.audit_concurrency)
+        self.position_deadline_s = position_deadline_s
+        self.batch_builder = BatchTransactionBuilder(
+            self.client,
+            lookup_table_addresses=parse_lookup_tables(METEORA_LOOKUP_TABLES),
+            compute_unit_price=BATCH_CU_PRICE_MICRO_LAMPORTS,
+            rpc_url=rpc_endpoint,
+        )
         
-        # Volatility scryer state
-        self.price_history = deque(maxlen=100)  # store last 100 SOL prices
-        self.price_history_lock = threading.Lock()
+        # Volatility scryer state: incremental multi-horizon estimator per price feed
+        self.volatility_scryer = VolatilityScryer(VOLATILITY_THRESHOLDS, regime_horizon=VOLATILITY_REGIME_HORIZON)
+
+        # Pyth price bus: one Hermes stream for all feeds; every tick feeds the scryer
+        self.price_bus = PythPriceBus(
+            [SOL_USD_FEED_ID],
+            base_url=PYTH_HERMES_BASE_URL,
+            max_age_s=PRICE_BUS_MAX_AGE_S,
+            on_status=self._set_pyth_health,
+        )
+        self.price_bus.subscribe(self._on_price_tick)
         
         # Load live wallet if not in paper trading mode
         if not self.paper_trading_mode:
@@ -419,12 +485,18 @@ class TradeExecutor:
         # TODO: Implement re-entry and profit-taking logic
         pass
 
-    async def simulate_rebalance(self, position_data: Dict[str, Any], new_range: Dict[str, int], current_volatility: str = "NORMAL", dynamic_fees: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Simulates a rebalance to provide a structured Flight Record."""
+    async def simulate_rebalance(self, position_data: Dict[str, Any], new_range: Dict[str, int], current_volatility: str = "NORMAL", dynamic_fees: Dict[str, Any] = None, preflight: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Simulates a rebalance to provide a structured Flight Record.
+        When `preflight` (from build_atomic_rebalance) is given, the tx fee comes from the
+        simulated atomic transaction instead of the flat estimate.
+        """
         logger.info(f"--- [FLIGHT RECORDER: SIMULATED REBALANCE] ---")
         
         current_val = float(position_data.get("liquidity", 0))
         est_tx_fee = 0.005 # Total SOL for remove + add txs
+        if preflight:
+            est_tx_fee = preflight["fee_lamports"] / 1e9
         
         est_dust_loss = current_val * 0.0005
         est_slippage = current_val * 0.001
@@ -448,12 +520,19 @@ class TradeExecutor:
             "DUST_RESIDUE_ESTIMATE": f"{est_dust_loss:.6f} units",
             "RISK_MANAGER_STATUS": "APPROVED" if is_profitable else "VETOED"
         }
+        if preflight:
+            report["PREFLIGHT_STATUS"] = "OK" if preflight["preflight_ok"] else f"FAILED: {preflight['preflight_err']}"
+            report["COMPUTE_UNITS"] = f"{preflight['units_consumed']} used / {preflight['cu_limit']} requested"
+            report["TX_SIZE"] = f"{preflight['size']} bytes"
         log_telemetry("SIMULATED_REBALANCE", {
             "cost": (est_tx_fee + est_dust_loss + est_slippage),
             "expected_yield": expected_fee_capture,
             "projected_fee_increase": fee_capture_increase,
             "dust_estimate": est_dust_loss,
-            "status": "APPROVED" if is_profitable else "VETOED"
+            "status": "APPROVED" if is_profitable else "VETOED",
+            "tx_fee": est_tx_fee,
+            "preflight_ok": preflight["preflight_ok"] if preflight else None,
+            "units_consumed": preflight["units_consumed"] if preflight else None,
         })
         
         return report, is_profitable
@@ -469,7 +548,8 @@ class TradeExecutor:
     async def _determine_market_volatility(self) -> str:
         """
         Determines the current market volatility using Pyth SOL/USD price feed.
-        Calculates rolling standard deviation of log returns over recent price history.
+        Price bus ticks update the streaming estimator in O(1); the regime is
+        then read from its published snapshot.
         Returns volatility level: LOW, NORMAL, or HIGH.
         """
         logger.info("Scrying market for current volatility via Pyth Oracle...")
@@ -478,60 +558,40 @@ class TradeExecutor:
         price_data = await self.get_pyth_price(SOL_USD_FEED_ID)
         if not price_data:
             logger.warning("Failed to fetch Pyth price, defaulting to NORMAL volatility.")
-            return "NORMAL"
-        
-        # Extract price and confidence
-        price_val = float(price_data.get("price", 0)) * (10 ** price_data.get("expo", 0))
-        confidence = float(price_data.get("conf", 0)) * (10 ** price_data.get("expo", 0))
-        
-        # Update price history with lock
-        with self.price_history_lock:
-            self.price_history.append(price_val)
-            
-            # Need at least 2 prices to calculate volatility
-            if len(self.price_history) < 2:
-                logger.info("Insufficient price history for volatility calculation, defaulting to NORMAL.")
-                return "NORMAL"
-            
-            # Calculate log returns
-            returns = []
-            prev_price = self.price_history[0]
-            for current_price in list(self.price_history)[1:]:
-                if prev_price > 0 and current_price > 0:
-                    log_return = math.log(current_price / prev_price)
-                    returns.append(log_return)
-                prev_price = current_price
-            
-            if len(returns) < 2:
-                logger.info("Insufficient returns for volatility calculation, defaulting to NORMAL.")
-                return "NORMAL"
-            
-            # Calculate standard deviation of returns (sample std)
-            mean_return = sum(returns) / len(returns)
-            variance = sum((r - mean_return) ** 2 for r in returns) / (len(returns) - 1)
-            std_dev = math.sqrt(variance)
-            
-            # Convert to daily volatility assuming 15-minute intervals (96 per day)
-            # Each price update is approximately every audit interval (default 900s)
-            daily_volatility = std_dev * math.sqrt(96)
-            
-            logger.info(f"Volatility metrics: Daily volatility = {daily_volatility:.4f} ({daily_volatility*100:.2f}%)")
-        
-        # Determine volatility level based on thresholds
-        if daily_volatility < VOLATILITY_THRESHOLDS["LOW"]:
-            volatility_level = "LOW"
-        elif daily_volatility < VOLATILITY_THRESHOLDS["NORMAL"]:
-            volatility_level = "NORMAL"
-        else:
-            volatility_level = "HIGH"
+            return self.current_volatility()
         
-        logger.info(f"Market volatility determined: {volatility_level} (thresholds: {VOLATILITY_THRESHOLDS})")
+        # The price bus subscription has already fed every tick into the scryer
+        snapshot = self.volatility_scryer.snapshot(normalize_feed_id(SOL_USD_FEED_ID))
+        if snapshot:
+            vols = ", ".join(
+                f"{name}={vol*100:.2f}%" if vol is not None else f"{name}=n/a"
+                for name, vol in snapshot["volatility"].items()
+            )
+            logger.info(f"Volatility metrics (daily): {vols} over {snapshot['samples']} returns")
+
+        volatility_level = self.current_volatility()
+        logger.info(f"Market volatility determined: {volatility_level} (horizon: {VOLATILITY_REGIME_HORIZON}, thresholds: {VOLATILITY_THRESHOLDS})")
         return volatility_level
 
-    async def run_autonomous_audit(self):
-        """Single pass audit for autonomous loop."""
+    def current_volatility(self, feed_id: str = SOL_USD_FEED_ID) -> str:
+        """Non-blocking read of the latest LOW/NORMAL/HIGH regime for a feed."""
+        return self.volatility_scryer.regime(normalize_feed_id(feed_id))
+
+    def _on_price_tick(self, feed_id: str, entry: Dict[str, Any]):
+        self.volatility_scryer.update(feed_id, PythPriceBus.to_float(entry), entry["publish_time"])
+
+    def _set_pyth_health(self, healthy: bool):
+        with self.health_update_lock:
+            health_server.HealthHandler.pyth_healthy = healthy
+
+    async def run_autonomous_audit(self) -> Optional[Dict[str, Any]]:
+        """
+        Single pass audit for autonomous loop.
+        Positions are audited concurrently (bounded by `audit_concurrency`), each under
+        its own deadline, and a per-position / per-phase timing summary is returned.
+        """
         # 0. Check global safety lock
-        if Path(FORCE_STOP_FILE).exists():
+        if self.control_plane.is_halted():
             logger.warning("⚠️ Autonomous audit halted: Force-stop lock file present.")
             return
 
@@ -556,52 +616,140 @@ class TradeExecutor:
             logger.info("    -> No active positions found. All is quiet.")
             return
 
-        # 3. Process Decisions & Rebalancing
-        for pos in lp_positions:
-            active_id = pos.get("activeId")
-            if active_id is None: continue
+        # 3. Process Decisions & Rebalancing (fan out, bounded by the audit semaphore)
+        audit_started = time.perf_counter()
+        results = await asyncio.gather(*[
+            self._audit_position_with_deadline(pos, current_volatility)
+            for pos in lp_positions if pos.get("activeId") is not None
+        ])
+        summary = self._summarize_audit(results, time.perf_counter() - audit_started)
+        return summary
+
+    async def _audit_position_with_deadline(self, pos: Dict[str, Any], current_volatility: str) -> Dict[str, Any]:
+        """Runs one position's audit under the concurrency semaphore and the per-position deadline."""
+        pubkey_str = str(pos['pubkey'])
+        record = {"position": pubkey_str, "action": None, "status": "PENDING", "phases": {}, "elapsed_s": 0.0}
+        started = time.perf_counter()
+        async with self.audit_semaphore:
+            record["phases"]["queue_wait"] = round(time.perf_counter() - started, 4)
+            try:
+                await asyncio.wait_for(self._audit_position(pos, current_volatility, record), timeout=self.position_deadline_s)
+            except asyncio.TimeoutError:
+                record["status"] = "TIMEOUT"
+                logger.error(f"⏱️ Audit for {pubkey_str} exceeded its {self.position_deadline_s}s deadline. Abandoning this pass.")
+            except Exception as e:
+                record["status"] = "ERROR"
+                logger.error(f"--> Audit for {pubkey_str} failed: {e}")
+        record["elapsed_s"] = round(time.perf_counter() - started, 4)
+        for phase, seconds in record["phases"].items():
+            AUDIT_PHASE_SECONDS.labels(phase).observe(seconds)
+        AUDIT_POSITION_SECONDS.labels(record["status"]).observe(record["elapsed_s"])
+        return record
+
+    async def _audit_position(self, pos: Dict[str, Any], current_volatility: str, record: Dict[str, Any]):
+        """Decides and acts on a single LP position. Fills `record` with action, status and phase timings."""
+        active_id = pos["activeId"]
+        pubkey_str = str(pos['pubkey'])
+        lock = self.rebalance_locks.setdefault(pubkey_str, asyncio.Lock())
+        in_flight = self.position_operations.get(pubkey_str)
+        if lock.locked() or (in_flight is not None and not in_flight.done()):
+            logger.info(f"Skipping audit for {pubkey_str}: Operation already in progress.")
+            record["status"] = "SKIPPED_LOCKED"
+            return
 
-            pubkey_str = str(pos['pubkey'])
-            lock = self.rebalance_locks.setdefault(pubkey_str, asyncio.Lock())
-            if lock.locked():
-                logger.info(f"Skipping audit for {pubkey_str}: Operation already in progress.")
-                continue
+        async with lock:
+            phase_started = time.perf_counter()
+            # All rebalance strategy calls now correctly pass current_volatility
+            action = self.rebalance_strategy.should_rebalance(active_id, pos['lowerBinId'], pos['upperBinId'], current_volatility)
+            record["action"] = action
+            record["phases"]["decide"] = round(time.perf_counter() - phase_started, 4)
+
+            if action == "REBALANCE":
+                new_range = self.rebalance_strategy.calculate_new_range(active_id, current_volatility)
+
+                if self.risk_manager.circuit_breaker_active:
+                    logger.warning(f"Rebalance skipped for {pos['pubkey']}: Circuit breaker active.")
+                    record["status"] = "SKIPPED_CIRCUIT_BREAKER"
+                    return
+
+                logger.warning(f"🚨 [REBALANCE TRIGGERED] Price drifted UP for {pos['pubkey']}. Re-centering...")
+                await send_discord_alert_async(f"🔄 **REBALANCE TRIGGERED (UPWARD)**\n**Position**: `{pos['pubkey']}`\n**New Target Range**: {new_range['lower']} to {new_range['upper']}\n**Volatility**: {current_volatility}", color=16776960)
+
+                phase_started = time.perf_counter()
+                result = await self._run_position_operation(pubkey_str, self.rebalance_meteora_lp_position(
+                    pos, new_range, self.wallet if self.wallet else Keypair(), current_volatility))
+                record["phases"]["rebalance"] = round(time.perf_counter() - phase_started, 4)
+                record["status"] = result["status"]
+                if result["status"] == "OK":
+                    logger.info(f"✅ Rebalance sequence successful for {pos['pool']}")
+
+            elif action == "STOP_LOSS":
+                if self.risk_manager.mode == "DEGEN":
+                    logger.info(f"💔 [HEART ATTACK STRATEGY] Price drifted DOWN for {pos['pubkey']}. Holding positions as per DEGEN mode.")
+                    await send_discord_alert_async(f"💔 **HEART ATTACK STRATEGY ACTIVE**\n**Position**: `{pos['pubkey']}`\n**Action**: HOLDING through downward drift (DEGEN mode).\n**Volatility**: {current_volatility}", color=10181046)
+                    record["status"] = "HELD"
+                else:
+                    logger.warning(f"🚨 [STOP LOSS TRIGGERED] Price drifted DOWN for {pos['pubkey']}. Closing position as per SAFE mode.")
+                    await send_discord_alert_async(f"🛑 **STOP LOSS TRIGGERED**\n**Position**: `{pos['pubkey']}`\n**Action**: CLOSING POSITION to SOL.\n**Volatility**: {current_volatility}", color=15158332)
+                    phase_started = time.perf_counter()
+                    close_tx = await self._run_position_operation(pubkey_str, self.close_meteora_lp_position(
+                        pos['pubkey'], pos['pool'], self.wallet if self.wallet else Keypair()))
+                    record["phases"]["close"] = round(time.perf_counter() - phase_started, 4)
+                    record["status"] = "OK" if close_tx else "CLOSE_FAILED"
+                    # In SAFE mode, would follow with a swap back to SOL via Jupiter here.
 
-            async with lock:
-                # All rebalance strategy calls now correctly pass current_volatility
-                action = self.rebalance_strategy.should_rebalance(active_id, pos['lowerBinId'], pos['upperBinId'], current_volatility)
-                
-                if action == "REBALANCE":
-                    new_range = self.rebalance_strategy.calculate_new_range(active_id, current_volatility)
-                    
-                    if self.risk_manager.circuit_breaker_active:
-                        logger.warning(f"Rebalance skipped for {pos['pubkey']}: Circuit breaker active.")
-                        continue
+            else:
+                logger.info(f"    -> Position {pos['pubkey']} is stable. Holding. (Vol: {current_volatility})")
+                record["status"] = "HELD"
 
-                    logger.warning(f"🚨 [REBALANCE TRIGGERED] Price drifted UP for {pos['pubkey']}. Re-centering...")
-                    send_discord_alert(f"🔄 **REBALANCE TRIGGERED (UPWARD)**\n**Position**: `{pos['pubkey']}`\n**New Target Range**: {new_range['lower']} to {new_range['upper']}\n**Volatility**: {current_volatility}", color=16776960)
+    async def _run_position_operation(self, pubkey_str: str, operation):
+        """
+        Runs an on-chain operation shielded from the audit deadline: a timeout abandons the
+        wait, not the close/open sequence. Later audits skip the position until it finishes.
+        """
+        task = asyncio.ensure_future(operation)
+        self.position_operations[pubkey_str] = task
+
+        def finished(t: asyncio.Task):
+            if self.position_operations.get(pubkey_str) is t:
+                del self.position_operations[pubkey_str]
+            if not t.cancelled() and t.exception() is not None:
+                logger.error(f"--> Operation for {pubkey_str} failed: {t.exception()}")
+
+        task.add_done_callback(finished)
+        return await asyncio.shield(task)
+
+    def _summarize_audit(self, results: List[Dict[str, Any]], wall_clock_s: float) -> Dict[str, Any]:
+        """Logs and emits telemetry for per-position and per-phase audit timings."""
+        phase_totals: Dict[str, float] = {}
+        phase_max: Dict[str, float] = {}
+        for record in results:
+            for phase, seconds in record["phases"].items():
+                phase_totals[phase] = round(phase_totals.get(phase, 0.0) + seconds, 4)
+                phase_max[phase] = max(phase_max.get(phase, 0.0), seconds)
+
+        summary = {
+            "positions": len(results),
+            "concurrency": self.audit_concurrency,
+            "deadline_s": self.position_deadline_s,
+            "wall_clock_s": round(wall_clock_s, 4),
+            "serial_equivalent_s": round(sum(r["elapsed_s"] for r in results), 4),
+            "phase_totals_s": phase_totals,
+            "phase_max_s": phase_max,
+            "per_position": results,
+        }
 
-                    close_tx = await self.close_meteora_lp_position(pos['pubkey'], pos['pool'], self.wallet if self.wallet else Keypair())
-                    if close_tx:
-                        open_tx = await self.open_meteora_lp_position(pos['pool'], new_range['lower'], new_range['upper'], int(pos['liquidity']), self.wallet if self.wallet else Keypair())
-                        if open_tx: logger.info(f"✅ Rebalance sequence successful for {pos['pool']}")
-                
-                elif action == "STOP_LOSS":
-                    if self.risk_manager.mode == "DEGEN":
-                        logger.info(f"💔 [HEART ATTACK STRATEGY] Price drifted DOWN for {pos['pubkey']}. Holding positions as per DEGEN mode.")
-                        send_discord_alert(f"💔 **HEART ATTACK STRATEGY ACTIVE**\n**Position**: `{pos['pubkey']}`\n**Action**: HOLDING through downward drift (DEGEN mode).\n**Volatility**: {current_volatility}", color=10181046)
-                    else:
-                        logger.warning(f"🚨 [STOP LOSS TRIGGERED] Price drifted DOWN for {pos['pubkey']}. Closing position as per SAFE mode.")
-                        send_discord_alert(f"🛑 **STOP LOSS TRIGGERED**\n**Position**: `{pos['pubkey']}`\n**Action**: CLOSING POSITION to SOL.\n**Volatility**: {current_volatility}", color=15158332)
-                        await self.close_meteora_lp_position(pos['pubkey'], pos['pool'], self.wallet if self.wallet else Keypair())
-                        # In SAFE mode, would follow with a swap back to SOL via Jupiter here.
-                
-                else:
-                    logger.info(f"    -> Position {pos['pubkey']} is stable. Holding. (Vol: {current_volatility})")
+        logger.info(f"--- [AUDIT SUMMARY] {len(results)} positions in {summary['wall_clock_s']:.2f}s (serial equivalent {summary['serial_equivalent_s']:.2f}s, concurrency {self.audit_concurrency}) ---")
+        for record in results:
+            phases = ", ".join(f"{k}={v:.2f}s" for k, v in record["phases"].items())
+            logger.info(f"    - {record['position']}: {record['action']} -> {record['status']} in {record['elapsed_s']:.2f}s ({phases})")
+        log_telemetry("AUTONOMOUS_AUDIT_SUMMARY", summary)
+        return summary
 
     async def start_autonomous_loop(self, interval_seconds: int = 900):
         """Starts the persistent heartbeat of the executor."""
         logger.info(f"Starting Autonomous Heartbeat (Interval: {interval_seconds}s)")
+        self.price_bus.start()
         while True:
             try:
                 await self.run_autonomous_audit()
@@ -660,7 +808,7 @@ class TradeExecutor:
         """Fetches a quote from Jupiter v6 API for a given swap."""
         logger.info(f"Scrying market whispers for: {amount} of {input_mint} to {output_mint} via Jupiter v6")
         try:
-            url = "https://api.jup.ag/swap/v1/quote"
+            url = f"{JUPITER_BASE_URL}/swap/v1/quote"
             params = {
                 "inputMint": input_mint,
                 "outputMint": output_mint,
@@ -668,7 +816,13 @@ class TradeExecutor:
                 "slippageBps": 50,
             }
             async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params)
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url, params=params)
+                except httpx.HTTPError:
+                    observe_upstream(url, started, error=True)
+                    raise
+                observe_upstream(url, started, response.status_code)
                 response.raise_for_status()
                 quote_data = response.json()
                 
@@ -772,11 +926,11 @@ class TradeExecutor:
                     token_y_decimals = await self.get_mint_decimals(token_y_mint)
 
                     owner_token_x_ata = Pubkey.find_program_address(
-                        [owner_pubkey.to_bytes(), TOKEN_PROGRAM_ID.to_bytes(), token_x_mint.to_bytes()],
+                        [bytes(owner_pubkey), bytes(TOKEN_PROGRAM_ID), bytes(token_x_mint)],
                         ASSOCIATED_TOKEN_PROGRAM_ID
                     )[0]
                     owner_token_y_ata = Pubkey.find_program_address(
-                        [owner_pubkey.to_bytes(), TOKEN_PROGRAM_ID.to_bytes(), token_y_mint.to_bytes()],
+                        [bytes(owner_pubkey), bytes(TOKEN_PROGRAM_ID), bytes(token_y_mint)],
                         ASSOCIATED_TOKEN_PROGRAM_ID
                     )[0]
 
@@ -842,7 +996,7 @@ class TradeExecutor:
             tx_hash = f"sim_tx_open_{int(datetime.datetime.now().timestamp())}"
             logger.info(f"--> [PAPER TRADING] Simulated Opened LP Position. Tx Hash: {tx_hash}")
             log_telemetry("PAPER_TRADE_EXECUTED", {"action": "open_meteora_lp_position", "tx_hash": tx_hash, "pool": str(pool_pubkey)})
-            send_discord_alert(f"📝 **PAPER LP OPENED**\n**Pool**: `{pool_pubkey}`\n**Bins**: {lower_bin_id} to {upper_bin_id}\n**Hash**: `{tx_hash}`", color=3447003)
+            await send_discord_alert_async(f"📝 **PAPER LP OPENED**\n**Pool**: `{pool_pubkey}`\n**Bins**: {lower_bin_id} to {upper_bin_id}\n**Hash**: `{tx_hash}`", color=3447003)
             
             # Record in Ledger
             self.ledger.record_entry(
@@ -860,7 +1014,7 @@ class TradeExecutor:
             return None
 
         # Failsafe Check
-        if Path(FORCE_STOP_FILE).exists():
+        if self.control_plane.is_halted():
             logger.critical("🚨 EXECUTION VETOED: Force-stop lock file detected!")
             return None
 
@@ -868,19 +1022,8 @@ class TradeExecutor:
         new_position_keypair = Keypair()
 
         try:
-            ix = await self.meteora_dlmm_program.instruction["initializePosition"].build(
-                {
-                    "lowerBinId": lower_bin_id,
-                    "upperBinId": upper_bin_id,
-                    "liquidity": liquidity,
-                },
-                {
-                    "position": new_position_keypair.pubkey(),
-                    "owner": payer.pubkey(),
-                    "pool": pool_pubkey,
-                    "rent": Pubkey.from_string("SysvarRent1111111111111111111111111111111"),
-                    "systemProgram": SYSTEM_PROGRAM_ID,
-                },
+            ix = await self._build_initialize_position_ix(
+                new_position_keypair.pubkey(), pool_pubkey, lower_bin_id, upper_bin_id, liquidity, payer.pubkey()
             )
             
             recent_blockhash = (await self.client.get_latest_blockhash()).value.blockhash
@@ -890,7 +1033,7 @@ class TradeExecutor:
             tx_hash = str(response.value)
             logger.info(f"--> [LIVE] Opened LP Position. Tx Hash: {tx_hash}")
             log_telemetry("LIVE_TRADE_EXECUTED", {"action": "open_meteora_lp_position", "tx_hash": tx_hash, "pool": str(pool_pubkey)})
-            send_discord_alert(f"🚀 **LIVE LP OPENED**\n**Pool**: `{pool_pubkey}`\n**Bins**: {lower_bin_id} to {upper_bin_id}\n**Hash**: `{tx_hash}`", color=3066993)
+            await send_discord_alert_async(f"🚀 **LIVE LP OPENED**\n**Pool**: `{pool_pubkey}`\n**Bins**: {lower_bin_id} to {upper_bin_id}\n**Hash**: `{tx_hash}`", color=3066993)
             
             # Record in Ledger
             self.ledger.record_entry(
@@ -904,9 +1047,208 @@ class TradeExecutor:
             return tx_hash
         except Exception as e:
             logger.error(f"--> Error opening LP position: {e}")
-            send_discord_alert(f"❌ **LP OPEN FAILURE**\n**Error**: `{str(e)}`", color=15158332)
+            await send_discord_alert_async(f"❌ **LP OPEN FAILURE**\n**Error**: `{str(e)}`", color=15158332)
             return None
 
+    async def _build_initialize_position_ix(
+        self,
+        position_pubkey: Pubkey,
+        pool_pubkey: Pubkey,
+        lower_bin_id: int,
+        upper_bin_id: int,
+        liquidity: int,
+        owner_pubkey: Pubkey,
+    ) -> Instruction:
+        return self.meteora_dlmm_program.instruction["initialize_position"](
+            lower_bin_id, upper_bin_id, liquidity,
+            ctx=Context(accounts={
+                "position": position_pubkey,
+                "owner": owner_pubkey,
+                "pool": pool_pubkey,
+                "rent": RENT,
+                "system_program": SYSTEM_PROGRAM_ID,
+            }),
+        )
+
+    async def _build_close_position_ix(self, position_pubkey: Pubkey, pool_pubkey: Pubkey, owner_pubkey: Pubkey) -> Instruction:
+        return self.meteora_dlmm_program.instruction["close_position"](
+            ctx=Context(accounts={
+                "position": position_pubkey,
+                "owner": owner_pubkey,
+                "pool": pool_pubkey,
+            }),
+        )
+
+    async def _build_remove_liquidity_ix(
+        self,
+        position_pubkey: Pubkey,
+        pool_pubkey: Pubkey,
+        token_x_mint: Pubkey,
+        token_y_mint: Pubkey,
+        liquidity: int,
+        bin_ids: List[int],
+        owner_pubkey: Pubkey,
+        token_vaults: Optional[tuple[Pubkey, Pubkey]] = None,
+    ) -> Instruction:
+        owner_token_x_account, owner_token_y_account = self._owner_token_accounts(owner_pubkey, token_x_mint, token_y_mint)
+        token_x_vault, token_y_vault = token_vaults or self._pool_reserves(pool_pubkey, token_x_mint, token_y_mint)
+        return self.meteora_dlmm_program.instruction["remove_liquidity"](
+            liquidity, bin_ids,
+            ctx=Context(accounts={
+                "position": position_pubkey,
+                "owner": owner_pubkey,
+                "pool": pool_pubkey,
+                "token_x_destination": owner_token_x_account,
+                "token_y_destination": owner_token_y_account,
+                "token_x_vault": token_x_vault,
+                "token_y_vault": token_y_vault,
+                "token_program": TOKEN_PROGRAM_ID,
+            }),
+        )
+
+    async def build_atomic_rebalance(self, pos: Dict[str, Any], new_range: Dict[str, int], owner: Keypair) -> Dict[str, Any]:
+        """
+        Builds remove-liquidity + close + initialize + add-liquidity for one position as a
+        single v0 transaction (compute budget sized from a simulation preflight).
+        The add-liquidity re-deposits only what the withdrawal returns: the owner's token
+        balances simulated after the remove-liquidity instruction minus the same balances
+        simulated without it. Idle wallet funds stay put, so concurrent rebalances of
+        positions sharing a mint do not compete for them.
+        Raises BatchTooLargeError when the instructions cannot share one transaction.
+        """
+        new_position = Keypair()
+        vaults = self._pool_reserves(pos['pool'], pos['tokenXMint'], pos['tokenYMint'])
+        liquidity = int(pos['liquidity'])
+        blockhash = (await self.batch_builder.client.get_latest_blockhash()).value.blockhash
+
+        remove_ix = await self._build_remove_liquidity_ix(
+            pos['pubkey'], pos['pool'], pos['tokenXMint'], pos['tokenYMint'], liquidity,
+            list(range(pos['lowerBinId'], pos['upperBinId'] + 1)), owner.pubkey(), vaults
+        )
+        owner_accounts = self._owner_token_accounts(owner.pubkey(), pos['tokenXMint'], pos['tokenYMint'])
+        before, after = await asyncio.gather(
+            self.batch_builder.simulate_token_balances([owner], [], owner_accounts, blockhash),
+            self.batch_builder.simulate_token_balances([owner], [remove_ix], owner_accounts, blockhash),
+        )
+        preview = before if before["balances"] is None else after
+        if preview["balances"] is not None:
+            amount_x, amount_y = (max(0, post - pre) for post, pre in zip(after["balances"], before["balances"]))
+        else:
+            # Withdrawn amounts unknown: deposit nothing; the preflight is reported as failed below,
+            # so live mode will not send
+            amount_x = amount_y = 0
+
+        instructions = [
+            remove_ix,
+            await self._build_close_position_ix(pos['pubkey'], pos['pool'], owner.pubkey()),
+            await self._build_initialize_position_ix(
+                new_position.pubkey(), pos['pool'], new_range['lower'], new_range['upper'], liquidity, owner.pubkey()
+            ),
+        ]
+        if amount_x or amount_y:
+            instructions.append(await self._build_compound_ix(
+                new_position.pubkey(), pos['pool'], pos['tokenXMint'], pos['tokenYMint'],
+                amount_x, amount_y, new_range['lower'], new_range['upper'], owner.pubkey(), vaults
+            ))
+
+        built = await self.batch_builder.build_atomic([owner, new_position], instructions, blockhash)
+        sim = built["simulation"]
+        if preview["err"] is not None:
+            preflight_err = f"withdrawal preview failed: {preview['err']}"
+        elif sim is None:
+            preflight_err = "simulation unavailable"
+        else:
+            preflight_err = None if sim["err"] is None else str(sim["err"])
+        built.update({
+            "new_position": new_position.pubkey(),
+            "deposit_amounts": (amount_x, amount_y),
+            "units_consumed": sim["units"] if sim else None,
+            "preflight_ok": preflight_err is None,
+            "preflight_err": preflight_err,
+            "logs": sim["logs"][-10:] if sim else [],
+        })
+        return built
+
+    async def rebalance_meteora_lp_position(
+        self,
+        pos: Dict[str, Any],
+        new_range: Dict[str, int],
+        owner: Keypair,
+        current_volatility: str = "NORMAL",
+    ) -> Dict[str, Any]:
+        """
+        Re-centers a position in one atomic transaction so it never sits out of the market
+        between a close and an open. The simulation preflight feeds simulate_rebalance, which
+        can veto. Falls back to sequential close + open when the atomic tx does not fit.
+        """
+        if not self.paper_trading_mode and (not self.wallet or self.wallet.pubkey() != owner.pubkey()):
+            logger.error("❌ Cannot rebalance LP position: Wallet private key not loaded or not matching owner.")
+            return {"status": "FAILED", "tx_hash": None}
+
+        # Failsafe Check
+        if self.control_plane.is_halted():
+            logger.critical("🚨 EXECUTION VETOED: Force-stop lock file detected!")
+            return {"status": "VETOED", "tx_hash": None}
+
+        try:
+            plan = await self.build_atomic_rebalance(pos, new_range, owner)
+        except BatchTooLargeError as e:
+            logger.warning(f"--> Atomic rebalance does not fit ({e}). Falling back to close + open.")
+            return await self._rebalance_sequential(pos, new_range, owner)
+        except Exception as e:
+            logger.error(f"--> Error building atomic rebalance for {pos['pubkey']}: {e}")
+            return {"status": "BUILD_FAILED", "tx_hash": None}
+
+        report, is_profitable = await self.simulate_rebalance(pos, new_range, current_volatility, preflight=plan)
+        if not is_profitable:
+            logger.warning(f"Rebalance vetoed for {pos['pubkey']} by profitability check.")
+            return {"status": "VETOED", "tx_hash": None, "report": report}
+
+        if self.paper_trading_mode:
+            # Accounts do not exist on-chain in paper mode, so a failed preflight is informational only
+            tx_hash = f"sim_tx_rebalance_{int(datetime.datetime.now().timestamp())}"
+            logger.info(f"--> [PAPER TRADING] Simulated atomic rebalance. Tx Hash: {tx_hash}")
+            log_telemetry("PAPER_TRADE_EXECUTED", {"action": "rebalance_meteora_lp_position", "tx_hash": tx_hash, "position": str(pos['pubkey'])})
+        else:
+            if not plan["preflight_ok"]:
+                logger.error(f"--> Atomic rebalance preflight failed for {pos['pubkey']}: {plan['preflight_err']}")
+                return {"status": "PREFLIGHT_FAILED", "tx_hash": None, "report": report}
+            try:
+                response = await self.client.send_raw_transaction(bytes(plan["transaction"]))
+                tx_hash = str(response.value)
+            except Exception as e:
+                logger.error(f"--> Error sending atomic rebalance: {e}")
+                await send_discord_alert_async(f"❌ **LP REBALANCE FAILURE**\n**Error**: `{str(e)}`", color=15158332)
+                return {"status": "SEND_FAILED", "tx_hash": None, "report": report}
+            logger.info(f"--> [LIVE] Atomic rebalance sent. Tx Hash: {tx_hash}")
+            log_telemetry("LIVE_TRADE_EXECUTED", {"action": "rebalance_meteora_lp_position", "tx_hash": tx_hash, "position": str(pos['pubkey']), "cu_limit": plan["cu_limit"]})
+            await send_discord_alert_async(f"🚀 **LIVE LP REBALANCED**\n**Position**: `{pos['pubkey']}`\n**Bins**: {new_range['lower']} to {new_range['upper']}\n**Hash**: `{tx_hash}`", color=3066993)
+
+        # Record in Ledger
+        self.ledger.record_entry(
+            symbol=f"LP-{str(pos['pool'])[:8]}",
+            mint=str(pos['pool']),
+            price=0.0,
+            amount=float(pos['liquidity']),
+            metadata={
+                "tx_hash": tx_hash,
+                "paper": self.paper_trading_mode,
+                "position_pubkey": str(plan["new_position"]),
+                "rebalanced_from": str(pos['pubkey']),
+            }
+        )
+        return {"status": "OK", "tx_hash": tx_hash, "report": report}
+
+    async def _rebalance_sequential(self, pos: Dict[str, Any], new_range: Dict[str, int], owner: Keypair) -> Dict[str, Any]:
+        """Legacy two-transaction rebalance: close, then open at the new range."""
+        close_tx = await self.close_meteora_lp_position(pos['pubkey'], pos['pool'], owner)
+        if not close_tx:
+            return {"status": "CLOSE_FAILED", "tx_hash": None}
+        open_tx = await self.open_meteora_lp_position(pos['pool'], new_range['lower'], new_range['upper'], int(pos['liquidity']), owner)
+        if not open_tx:
+            return {"status": "OPEN_FAILED", "tx_hash": close_tx}
+        return {"status": "OK", "tx_hash": open_tx}
+
     async def close_meteora_lp_position(
         self, 
         position_pubkey: Pubkey, 
@@ -919,7 +1261,7 @@ class TradeExecutor:
             tx_hash = f"sim_tx_close_{int(datetime.datetime.now().timestamp())}"
             logger.info(f"--> [PAPER TRADING] Simulated Closed LP Position. Tx Hash: {tx_hash}")
             log_telemetry("PAPER_TRADE_EXECUTED", {"action": "close_meteora_lp_position", "tx_hash": tx_hash, "position": str(position_pubkey)})
-            send_discord_alert(f"📝 **PAPER LP CLOSED**\n**Position**: `{position_pubkey}`\n**Hash**: `{tx_hash}`", color=3447003)
+            await send_discord_alert_async(f"📝 **PAPER LP CLOSED**\n**Position**: `{position_pubkey}`\n**Hash**: `{tx_hash}`", color=3447003)
             return tx_hash
 
         # 2. Live Execution Path
@@ -928,20 +1270,13 @@ class TradeExecutor:
             return None
 
         # Failsafe Check
-        if Path(FORCE_STOP_FILE).exists():
+        if self.control_plane.is_halted():
             logger.critical("🚨 EXECUTION VETOED: Force-stop lock file detected!")
             return None
 
         logger.info(f"Closing Meteora DLMM LP position {position_pubkey} for Pool {pool_pubkey}...")
         try:
-            ix = await self.meteora_dlmm_program.instruction["closePosition"].build(
-                {},
-                {
-                    "position": position_pubkey,
-                    "owner": owner.pubkey(),
-                    "pool": pool_pubkey,
-                },
-            )
+            ix = await self._build_close_position_ix(position_pubkey, pool_pubkey, owner.pubkey())
             
             recent_blockhash = (await self.client.get_latest_blockhash()).value.blockhash
             transaction = Transaction.populate(recent_blockhash, [ix], [owner])
@@ -950,7 +1285,7 @@ class TradeExecutor:
             tx_hash = str(response.value)
             logger.info(f"--> [LIVE] Closed LP Position. Tx Hash: {tx_hash}")
             log_telemetry("LIVE_TRADE_EXECUTED", {"action": "close_meteora_lp_position", "tx_hash": tx_hash, "position": str(position_pubkey)})
-            send_discord_alert(f"🚀 **LIVE LP CLOSED**\n**Position**: `{position_pubkey}`\n**Hash**: `{tx_hash}`", color=3066993)
+            await send_discord_alert_async(f"🚀 **LIVE LP CLOSED**\n**Position**: `{position_pubkey}`\n**Hash**: `{tx_hash}`", color=3066993)
             
             return tx_hash
         except Exception as e:
@@ -958,6 +1293,123 @@ class TradeExecutor:
             # send_discord_alert(f"❌ **LP CLOSE FAILURE**\n**Error**: `{str(e)}`", color=15158332)
             return None
 
+    def _owner_token_accounts(self, owner_pubkey: Pubkey, token_x_mint: Pubkey, token_y_mint: Pubkey) -> tuple[Pubkey, Pubkey]:
+        """Derives the owner's associated token accounts for both pool mints."""
+        owner_token_x_account = Pubkey.find_program_address(
+            [bytes(owner_pubkey), bytes(TOKEN_PROGRAM_ID), bytes(token_x_mint)],
+            ASSOCIATED_TOKEN_PROGRAM_ID
+        )[0]
+        owner_token_y_account = Pubkey.find_program_address(
+            [bytes(owner_pubkey), bytes(TOKEN_PROGRAM_ID), bytes(token_y_mint)],
+            ASSOCIATED_TOKEN_PROGRAM_ID
+        )[0]
+        return owner_token_x_account, owner_token_y_account
+
+    def _pool_reserves(self, pool_pubkey: Pubkey, token_x_mint: Pubkey, token_y_mint: Pubkey) -> tuple[Pubkey, Pubkey]:
+        """Derives the pool's token reserve vaults (DLMM PDAs seeded by pool and mint)."""
+        reserve_x = Pubkey.find_program_address([bytes(pool_pubkey), bytes(token_x_mint)], METEORA_DLMM_PROGRAM_ID)[0]
+        reserve_y = Pubkey.find_program_address([bytes(pool_pubkey), bytes(token_y_mint)], METEORA_DLMM_PROGRAM_ID)[0]
+        return reserve_x, reserve_y
+
+    async def _build_claim_fees_ix(
+        self,
+        position_pubkey: Pubkey,
+        pool_pubkey: Pubkey,
+        token_x_mint: Pubkey,
+        token_y_mint: Pubkey,
+        owner_pubkey: Pubkey,
+    ) -> Instruction:
+        owner_token_x_account, owner_token_y_account = self._owner_token_accounts(owner_pubkey, token_x_mint, token_y_mint)
+        return self.meteora_dlmm_program.instruction["claim_fees"](
+            ctx=Context(accounts={
+                "position": position_pubkey,
+                "owner": owner_pubkey,
+                "pool": pool_pubkey,
+                "token_x_mint": token_x_mint,
+                "token_y_mint": token_y_mint,
+                "token_x_account": owner_token_x_account,
+                "token_y_account": owner_token_y_account,
+                "token_program": TOKEN_PROGRAM_ID,
+            }),
+        )
+
+    async def _build_compound_ix(
+        self,
+        position_pubkey: Pubkey,
+        pool_pubkey: Pubkey,
+        token_x_mint: Pubkey,
+        token_y_mint: Pubkey,
+        amount_x: int,
+        amount_y: int,
+        lower_bin_id: int,
+        upper_bin_id: int,
+        owner_pubkey: Pubkey,
+        token_vaults: Optional[tuple[Pubkey, Pubkey]] = None,
+    ) -> Instruction:
+        owner_token_x_account, owner_token_y_account = self._owner_token_accounts(owner_pubkey, token_x_mint, token_y_mint)
+        token_x_vault, token_y_vault = token_vaults or self._pool_reserves(pool_pubkey, token_x_mint, token_y_mint)
+        return self.meteora_dlmm_program.instruction["deposit_liquidity"](
+            amount_x, amount_y, lower_bin_id, upper_bin_id,
+            ctx=Context(accounts={
+                "position": position_pubkey,
+                "owner": owner_pubkey,
+                "pool": pool_pubkey,
+                "token_x_source": owner_token_x_account,
+                "token_y_source": owner_token_y_account,
+                "token_x_vault": token_x_vault,
+                "token_y_vault": token_y_vault,
+                "token_program": TOKEN_PROGRAM_ID,
+            }),
+        )
+
+    async def _send_batched(self, action: str, owner: Keypair, instructions: List[Instruction]) -> List[Dict[str, Any]]:
+        """
+        Packs instructions into as few v0 transactions as fit (ALTs + simulated CU limit)
+        and sends them. Returns one result per transaction with the number of
+        instructions it covered and its hash (None on failure).
+        """
+        if self.control_plane.is_halted():
+            logger.critical("🚨 EXECUTION VETOED: Force-stop lock file detected!")
+            return []
+
+        try:
+            batches = await self.batch_builder.build([owner], instructions)
+        except Exception as e:
+            logger.error(f"--> Error building batched {action} transactions: {e}")
+            return []
+
+        results = []
+        for i, batch in enumerate(batches):
+            sim = batch["simulation"]
+            if sim is None or sim["err"] is not None:
+                reason = "simulation unavailable" if sim is None else sim["err"]
+                logger.error(f"--> [BATCH] {action} batch {i} not sent, failed simulation: {reason}")
+                results.append({"ix_count": batch["ix_count"], "tx_hash": None})
+                continue
+
+            if self.paper_trading_mode:
+                tx_hash = f"sim_tx_{action}_batch{i}_{int(datetime.datetime.now().timestamp())}"
+                logger.info(f"--> [PAPER TRADING] Simulated batched {action} ({batch['ix_count']} ix). Tx Hash: {tx_hash}")
+            else:
+                try:
+                    response = await self.client.send_raw_transaction(bytes(batch["transaction"]))
+                    tx_hash = str(response.value)
+                    logger.info(f"--> [LIVE] Sent batched {action} ({batch['ix_count']} ix). Tx Hash: {tx_hash}")
+                except Exception as e:
+                    logger.error(f"--> Error sending batched {action} transaction {i}: {e}")
+                    tx_hash = None
+
+            log_telemetry("BATCH_TX_EXECUTED" if tx_hash else "BATCH_TX_FAILED", {
+                "action": action,
+                "tx_hash": tx_hash,
+                "ix_count": batch["ix_count"],
+                "cu_limit": batch["cu_limit"],
+                "size_bytes": batch["size"],
+                "paper": self.paper_trading_mode,
+            })
+            results.append({"ix_count": batch["ix_count"], "tx_hash": tx_hash})
+        return results
+
     async def claim_meteora_fees(
         self, 
         position_pubkey: Pubkey,
@@ -973,28 +1425,7 @@ class TradeExecutor:
         
         logger.info(f"Claiming fees for LP position {position_pubkey} in Pool {pool_pubkey}...")
         try:
-            owner_token_x_account = Pubkey.find_program_address(
-                [owner.pubkey().to_bytes(), TOKEN_PROGRAM_ID.to_bytes(), token_x_mint.to_bytes()],
-                ASSOCIATED_TOKEN_PROGRAM_ID
-            )[0]
-            owner_token_y_account = Pubkey.find_program_address(
-                [owner.pubkey().to_bytes(), TOKEN_PROGRAM_ID.to_bytes(), token_y_mint.to_bytes()],
-                ASSOCIATED_TOKEN_PROGRAM_ID
-            )[0]
-
-            ix = await self.meteora_dlmm_program.instruction["claimFees"].build(
-                {},
-                {
-                    "position": position_pubkey,
-                    "owner": owner.pubkey(),
-                    "pool": pool_pubkey,
-                    "tokenXMint": token_x_mint,
-                    "tokenYMint": token_y_mint,
-                    "tokenXAccount": owner_token_x_account,
-                    "tokenYAccount": owner_token_y_account,
-                    "tokenProgram": TOKEN_PROGRAM_ID,
-                },
-            )
+            ix = await self._build_claim_fees_ix(position_pubkey, pool_pubkey, token_x_mint, token_y_mint, owner.pubkey())
 
             recent_blockhash = (await self.client.get_latest_blockhash()).value.blockhash
             transaction = Transaction.populate(recent_blockhash, [ix], [owner])
@@ -1015,8 +1446,13 @@ class TradeExecutor:
     async def claim_all_rewards_for_all_positions(self, owner: Keypair):
         """
         Orchestrator to claim fees from all of a user's Meteora DLMM positions.
+        claimFees instructions are packed into as few transactions as fit.
         """
         logger.info(f"Initiating claim for all rewards for owner {owner.pubkey()}...")
+        # Paper trading only simulates, so it runs for any owner; live sends must be signed by our wallet
+        if not self.paper_trading_mode and (not self.wallet or self.wallet.pubkey() != owner.pubkey()):
+            logger.error("❌ Cannot claim fees: Wallet private key not loaded or not matching owner.")
+            return
         
         # 1. Get all LP positions for the owner
         lp_positions = await self.get_meteora_lp_positions(owner.pubkey())
@@ -1025,31 +1461,32 @@ class TradeExecutor:
             logger.info("No active LP positions found to claim fees from.")
             return
             
-        # 2. Iterate and claim for each position
-        claimed_count = 0
+        # 2. Build one claim instruction per position
+        instructions = []
         for position in lp_positions:
-            logger.info(f"Attempting to claim fees for position {position['pubkey']}...")
-            tx_hash = await self.claim_meteora_fees(
-                position_pubkey=position['pubkey'],
-                pool_pubkey=position['pool'],
-                token_x_mint=position['tokenXMint'],
-                token_y_mint=position['tokenYMint'],
-                owner=owner
-            )
-            if tx_hash:
-                claimed_count += 1
-                logger.info(f"Successfully sent claim transaction for position {position['pubkey']}: {tx_hash}")
-            else:
-                logger.error(f"Failed to claim fees for position {position['pubkey']}.")
-                
-        logger.info(f"Completed fee claiming process. Successfully initiated claims for {claimed_count}/{len(lp_positions)} positions.")
+            try:
+                instructions.append(await self._build_claim_fees_ix(
+                    position['pubkey'], position['pool'], position['tokenXMint'], position['tokenYMint'], owner.pubkey()
+                ))
+            except Exception as e:
+                logger.error(f"Failed to build claim instruction for position {position['pubkey']}: {e}")
+
+        # 3. Send them batched
+        results = await self._send_batched("claim", owner, instructions)
+        claimed_count = sum(r["ix_count"] for r in results if r["tx_hash"])
+        logger.info(f"Completed fee claiming process. Successfully initiated claims for {claimed_count}/{len(lp_positions)} positions in {len(results)} transaction(s).")
 
     async def reinvest_all_claimed_fees(self, owner: Keypair):
         """
         Orchestrator to reinvest all available balances from a user's token accounts
         back into their corresponding Meteora DLMM positions.
+        depositLiquidity instructions are packed into as few transactions as fit.
         """
         logger.info(f"Initiating reinvestment for all positions for owner {owner.pubkey()}...")
+        # Paper trading only simulates, so it runs for any owner; live sends must be signed by our wallet
+        if not self.paper_trading_mode and (not self.wallet or self.wallet.pubkey() != owner.pubkey()):
+            logger.error("❌ Cannot compound fees: Wallet private key not loaded or not matching owner.")
+            return
         
         # 1. Get all LP positions for the owner (now with decimal info)
         lp_positions = await self.get_meteora_lp_positions(owner.pubkey())
@@ -1058,10 +1495,8 @@ class TradeExecutor:
             logger.info("No active LP positions found to reinvest into.")
             return
 
-        reinvested_count = 0
+        instructions = []
         for position in lp_positions:
-            logger.info(f"Attempting to reinvest fees for position {position['pubkey']}...")
-
             # 2. Convert UI token balances back to base units using the fetched decimals
             amount_x = int(position['ownerTokenXBalance'] * (10**position['tokenXDecimals']))
             amount_y = int(position['ownerTokenYBalance'] * (10**position['tokenYDecimals']))
@@ -1070,26 +1505,19 @@ class TradeExecutor:
                 logger.info(f"Skipping reinvestment for {position['pubkey']}: No token balance to reinvest.")
                 continue
 
-            # 3. Call the compounding function
-            tx_hash = await self.compound_meteora_fees(
-                position_pubkey=position['pubkey'],
-                pool_pubkey=position['pool'],
-                token_x_mint=position['tokenXMint'],
-                token_y_mint=position['tokenYMint'],
-                amount_x=amount_x,
-                amount_y=amount_y,
-                lower_bin_id=position['lowerBinId'],
-                upper_bin_id=position['upperBinId'],
-                owner=owner
-            )
-            
-            if tx_hash:
-                reinvested_count += 1
-                logger.info(f"Successfully sent reinvestment transaction for position {position['pubkey']}: {tx_hash}")
-            else:
-                logger.error(f"Failed to reinvest fees for position {position['pubkey']}.")
+            # 3. Build the compounding instruction
+            try:
+                instructions.append(await self._build_compound_ix(
+                    position['pubkey'], position['pool'], position['tokenXMint'], position['tokenYMint'],
+                    amount_x, amount_y, position['lowerBinId'], position['upperBinId'], owner.pubkey()
+                ))
+            except Exception as e:
+                logger.error(f"Failed to build reinvestment instruction for position {position['pubkey']}: {e}")
 
-        logger.info(f"Completed reinvestment process. Successfully initiated compounding for {reinvested_count}/{len(lp_positions)} positions.")
+        # 4. Send them batched
+        results = await self._send_batched("compound", owner, instructions)
+        reinvested_count = sum(r["ix_count"] for r in results if r["tx_hash"])
+        logger.info(f"Completed reinvestment process. Successfully initiated compounding for {reinvested_count}/{len(lp_positions)} positions in {len(results)} transaction(s).")
 
     async def compound_meteora_fees(
         self, 
@@ -1110,32 +1538,9 @@ class TradeExecutor:
         
         logger.info(f"Compounding fees into LP position {position_pubkey} in Pool {pool_pubkey}...")
         try:
-            owner_token_x_account = Pubkey.find_program_address(
-                [owner.pubkey().to_bytes(), TOKEN_PROGRAM_ID.to_bytes(), token_x_mint.to_bytes()],
-                ASSOCIATED_TOKEN_PROGRAM_ID
-            )[0]
-            owner_token_y_account = Pubkey.find_program_address(
-                [owner.pubkey().to_bytes(), TOKEN_PROGRAM_ID.to_bytes(), token_y_mint.to_bytes()],
-                ASSOCIATED_TOKEN_PROGRAM_ID
-            )[0]
-
-            ix = await self.meteora_dlmm_program.instruction["depositLiquidity"].build(
-                {
-                    "amountX": amount_x,
-                    "amountY": amount_y,
-                    "lowerBinId": lower_bin_id,
-                    "upperBinId": upper_bin_id,
-                },
-                {
-                    "position": position_pubkey,
-                    "owner": owner.pubkey(),
-                    "pool": pool_pubkey,
-                    "tokenXSource": owner_token_x_account,
-                    "tokenYSource": owner_token_y_account,
-                    "tokenXVault": Pubkey.new_unique(),
-                    "tokenYVault": Pubkey.new_unique(),
-                    "tokenProgram": TOKEN_PROGRAM_ID,
-                },
+            ix = await self._build_compound_ix(
+                position_pubkey, pool_pubkey, token_x_mint, token_y_mint,
+                amount_x, amount_y, lower_bin_id, upper_bin_id, owner.pubkey()
             )
 
             recent_blockhash = (await self.client.get_latest_blockhash()).value.blockhash
@@ -1171,32 +1576,8 @@ class TradeExecutor:
 
         logger.info(f"Removing {liquidity} liquidity from {len(bin_ids)} bins in position {position_pubkey}...")
         try:
-            owner_token_x_account = Pubkey.find_program_address(
-                [owner.pubkey().to_bytes(), TOKEN_PROGRAM_ID.to_bytes(), token_x_mint.to_bytes()],
-                ASSOCIATED_TOKEN_PROGRAM_ID
-            )[0]
-            owner_token_y_account = Pubkey.find_program_address(
-                [owner.pubkey().to_bytes(), TOKEN_PROGRAM_ID.to_bytes(), token_y_mint.to_bytes()],
-                ASSOCIATED_TOKEN_PROGRAM_ID
-            )[0]
-
-            # In a real scenario, we would fetch the actual vault addresses from the pool state
-            # For this draft, we use placeholders
-            ix = await self.meteora_dlmm_program.instruction["removeLiquidity"].build(
-                {
-                    "liquidity": liquidity,
-                    "binIds": bin_ids,
-                },
-                {
-                    "position": position_pubkey,
-                    "owner": owner.pubkey(),
-                    "pool": pool_pubkey,
-                    "tokenXDestination": owner_token_x_account,
-                    "tokenYDestination": owner_token_y_account,
-                    "tokenXVault": Pubkey.new_unique(), # Placeholder
-                    "tokenYVault": Pubkey.new_unique(), # Placeholder
-                    "tokenProgram": TOKEN_PROGRAM_ID,
-                },
+            ix = await self._build_remove_liquidity_ix(
+                position_pubkey, pool_pubkey, token_x_mint, token_y_mint, liquidity, bin_ids, owner.pubkey()
             )
 
             recent_blockhash = (await self.client.get_latest_blockhash()).value.blockhash
@@ -1218,10 +1599,27 @@ class TradeExecutor:
     async def calculate_unrealized_pnl(
         self, 
         position_data: Dict[str, Any],
-        current_price_x_per_y: float
-    ) -> Dict[str, float]:
-        """Calculates unrealized P&L for a given LP position (simplified)."""
+        current_price_x_per_y: Optional[float] = None,
+        price_feed_ids: Optional[tuple[str, str]] = None,
+    ) -> Optional[Dict[str, float]]:
+        """
+        Calculates unrealized P&L for a given LP position (simplified).
+        Without an explicit price, X/Y is derived from the price bus using
+        `price_feed_ids` (X/USD, Y/USD) or the position's priceFeedX/priceFeedY.
+        """
         logger.info(f"Calculating unrealized P&L for position {position_data['pubkey']}...")
+        if current_price_x_per_y is None:
+            feed_x, feed_y = price_feed_ids or (position_data.get("priceFeedX"), position_data.get("priceFeedY"))
+            if not feed_x or not feed_y:
+                logger.warning("--> Cannot price position: no explicit price and no Pyth feeds configured.")
+                return None
+            price_x = await self.price_bus.get_price(feed_x)
+            price_y = await self.price_bus.get_price(feed_y)
+            if not price_x or not price_y or PythPriceBus.to_float(price_y) <= 0:
+                logger.warning(f"--> Cannot price position: no fresh Pyth price for {feed_x} / {feed_y}.")
+                return None
+            current_price_x_per_y = PythPriceBus.to_float(price_x) / PythPriceBus.to_float(price_y)
+
         current_value_x = position_data['liquidity'] * current_price_x_per_y
         current_value_y = position_data['liquidity']
         total_current_value = current_value_x + current_value_y
@@ -1236,67 +1634,30 @@ class TradeExecutor:
         }
 
     async def get_pyth_price(self, price_feed_id: str, radar_price: Optional[float] = None) -> Optional[Dict[str, Any]]:
-        """Fetches the latest Pyth price and compares it with internal Radar for sanity."""
-        logger.info(f"Consulting the oracle for Pyth price feed {price_feed_id}...")
-        
-        max_retries = 3
-        retry_delay = 2 # seconds
-        
-        for attempt in range(max_retries):
-            try:
-                url = f"{PYTH_HERMES_ENDPOINT}?ids[]={price_feed_id}"
-                
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(url, timeout=10.0)
-                    
-                    if response.status_code == 429:
-                        logger.warning(f"Pyth rate limit hit (429). Attempt {attempt + 1}/{max_retries}. Retrying in {retry_delay}s...")
-                        with self.health_update_lock:
-                            health_server.HealthHandler.pyth_healthy = False
-                        await asyncio.sleep(retry_delay)
-                        retry_delay *= 2
-                        continue
-                        
-                    response.raise_for_status()
-                    data = response.json()
-
-                if data and "parsed" in data and len(data["parsed"]) > 0:
-                    with self.health_update_lock:
-                        health_server.HealthHandler.pyth_healthy = True
-                    price_data = data["parsed"][0].get("price", {})
-                    price_val = float(price_data.get("price", 0)) * (10 ** price_data.get("expo", 0))
-                    logger.info(f"--> Oracle Sight (V2): {price_val:.4f} +/- {float(price_data.get('conf', 0)) * (10 ** price_data.get('expo', 0)):.4f}")
-                    
-                    # SIGHT MISMATCH LOGIC: Compare with internal Radar if provided
-                    if radar_price is not None and radar_price > 0:
-                        divergence = abs(price_val - radar_price) / radar_price
-                        logger.info(f"    -> Sight Mismatch Check: {divergence*100:.2f}% divergence (Oracle: {price_val:.4f}, Radar: {radar_price:.4f})")
-                        
-                        if divergence > 0.02: # 2% threshold as commanded
-                            logger.critical(f"🚨 [CRITICAL] SIGHT MISMATCH DETECTED: Oracle ({price_val:.4f}) vs Radar ({radar_price:.4f}) | AUDIT HALTED.")
-                    
-                    return price_data
-                else:
-                    logger.warning(f"--> No Pyth price data found for {price_feed_id} in V2 response.")
-                    return None
-                    
-            except httpx.HTTPStatusError as e:
-                logger.error(f"--> HTTP error fetching Pyth price: {e}")
-                with self.health_update_lock:
-                    health_server.HealthHandler.pyth_healthy = False
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay)
-                    retry_delay *= 2
-                else:
-                    return None
-            except Exception as e:
-                logger.error(f"--> Unexpected error fetching Pyth price via Hermes: {e}")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay)
-                    retry_delay *= 2
-                else:
-                    return None
-        return None
+        """
+        Reads the latest Pyth price from the price bus (HTTP poll only as fallback)
+        and compares it with internal Radar for sanity.
+        """
+        price_data = await self.price_bus.get_price(price_feed_id)
+        if not price_data:
+            logger.warning(f"--> No fresh Pyth price for {price_feed_id} (stream or fallback).")
+            self._set_pyth_health(False)
+            return None
+        self._set_pyth_health(True)
+
+        price_val = PythPriceBus.to_float(price_data)
+        conf_val = float(price_data.get("conf", 0)) * (10 ** price_data.get("expo", 0))
+        logger.info(f"--> Oracle Sight (V2): {price_val:.4f} +/- {conf_val:.4f}")
+
+        # SIGHT MISMATCH LOGIC: Compare with internal Radar if provided
+        if radar_price is not None and radar_price > 0:
+            divergence = abs(price_val - radar_price) / radar_price
+            logger.info(f"    -> Sight Mismatch Check: {divergence*100:.2f}% divergence (Oracle: {price_val:.4f}, Radar: {radar_price:.4f})")
+
+            if divergence > 0.02: # 2% threshold as commanded
+                logger.critical(f"🚨 [CRITICAL] SIGHT MISMATCH DETECTED: Oracle ({price_val:.4f}) vs Radar ({radar_price:.4f}) | AUDIT HALTED.")
+
+        return price_data
 
     def execute_trade(self, trade_details: dict) -> Dict[str, Any]:
         """
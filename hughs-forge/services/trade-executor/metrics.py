@@ -0,0 +1,270 @@
+"""
+In-process metrics registry for the trade executor, rendered in the
+Prometheus text format (/metrics on health_server.py).
+
+Updates take no lock: every metric keeps one shard (a small list) per
+writing thread, created on first use with an atomic dict.setdefault, and
+only that thread ever writes it. A scrape sums the shards. Histograms use
+fixed buckets chosen up front, so observe() is a bisect plus three adds.
+Gauges are either set directly or read from a callback at scrape time
+(queue depths, backlogs), held weakly so they never keep an object alive.
+
+A copy of trade-orchestrator/src/telemetry/metrics.py (only the docstring
+differs); change the two together.
+"""
+
+import bisect
+import math
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+# Seconds; covers sub-millisecond SQLite commits up to slow upstream timeouts
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Sharded:
+    """Per-thread accumulators; only the owning thread writes its shard."""
+    width = 1
+
+    def __init__(self):
+        self._shards: Dict[int, List[float]] = {}
+
+    def _shard(self) -> List[float]:
+        ident = threading.get_ident()
+        shard = self._shards.get(ident)
+        if shard is None:
+            shard = self._shards.setdefault(ident, [0.0] * self.width)
+        return shard
+
+    def _totals(self) -> List[float]:
+        totals = [0.0] * self.width
+        for shard in list(self._shards.values()):
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class _CounterChild(_Sharded):
+    def inc(self, amount: float = 1.0):
+        self._shard()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._totals()[0]
+
+
+class _HistogramChild(_Sharded):
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # One slot per bucket, +Inf, then sum and count
+        self.width = len(bounds) + 3
+        super().__init__()
+
+    def observe(self, value: float):
+        shard = self._shard()
+        shard[bisect.bisect_left(self.bounds, value)] += 1
+        shard[-2] += value
+        shard[-1] += 1
+
+    def observe_since(self, started: float):
+        """Observes time.perf_counter() - started."""
+        self.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        totals = self._totals()
+        return totals[:-2], totals[-2], totals[-1]
+
+
+class _GaugeChild:
+    def __init__(self):
+        self._value = 0.0
+        self._fn: Optional[Callable[[], Optional[float]]] = None
+
+    def set(self, value: float):
+        self._value = value
+
+    def set_function(self, fn: Callable[[], float]):
+        """Reads the value from `fn` at scrape time (a bound method is held weakly)."""
+        if hasattr(fn, "__self__"):
+            ref = weakref.WeakMethod(fn)
+
+            def read():
+                method = ref()
+                return method() if method is not None else None
+            self._fn = read
+        else:
+            self._fn = fn
+
+    @property
+    def value(self) -> Optional[float]:
+        if self._fn is None:
+            return self._value
+        try:
+            return self._fn()
+        except Exception:
+            return None
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwargs):
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield self.name + "_total", dict(zip(self.labelnames, values)), child.value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def set_function(self, fn: Callable[[], float]):
+        self._default.set_function(fn)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            value = child.value
+            if value is not None:
+                yield self.name, dict(zip(self.labelnames, values)), value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def observe_since(self, started: float):
+        self._default.observe_since(started)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            buckets, total, count = child.snapshot()
+            cumulative = 0.0
+            for bound, n in zip(self.bounds + (float("inf"),), buckets):
+                cumulative += n
+                yield self.name + "_bucket", dict(labels, le=_format_value(bound)), cumulative
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, count
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()  # registration only, never on the update path
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition format, version 0.0.4."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                    lines.append(f"{name}{{{rendered}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = MetricsRegistry()
+
+UPSTREAM_SECONDS = REGISTRY.histogram("upstream_request_duration_seconds",
+                                      "Latency of outbound HTTP requests by host", ["host"])
+UPSTREAM_REQUESTS = REGISTRY.counter("upstream_requests",
+                                     "Outbound HTTP requests by host and outcome (ok, http_error, error)",
+                                     ["host", "outcome"])
+
+
+def observe_upstream(url: str, started: float, status: Optional[int] = None, error: bool = False):
+    """Records one outbound request started at time.perf_counter() `started`."""
+    host = urlsplit(url).hostname or "unknown"
+    UPSTREAM_SECONDS.labels(host).observe_since(started)
+    outcome = "error" if error else ("http_error" if status is not None and status >= 400 else "ok")
+    UPSTREAM_REQUESTS.labels(host, outcome).inc()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
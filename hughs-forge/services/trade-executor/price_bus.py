@@ -0,0 +1,264 @@
+# price_bus.py for the Trade Executor service
+#
+# In-process Pyth price bus. Holds one Server-Sent Events connection to Hermes
+# /v2/updates/price/stream for every feed of interest and keeps the newest
+# price per feed in a table readers can hit without locking. The old
+# /v2/updates/price/latest poll is only used as a fallback when the stream
+# has nothing fresh for a feed.
+import asyncio
+import inspect
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import httpx
+
+from metrics import observe_upstream
+
+logger = logging.getLogger(__name__)
+
+PYTH_HERMES_BASE_URL = "https://hermes.pyth.network"
+
+PriceCallback = Callable[[str, Dict[str, Any]], Any]
+
+
+def normalize_feed_id(feed_id: str) -> str:
+    """Hermes returns ids without the 0x prefix; key the table the same way."""
+    feed_id = feed_id.lower()
+    return feed_id[2:] if feed_id.startswith("0x") else feed_id
+
+
+class PythPriceBus:
+    def __init__(
+        self,
+        feed_ids: Iterable[str] = (),
+        base_url: str = PYTH_HERMES_BASE_URL,
+        max_age_s: float = 30.0,
+        min_backoff_s: float = 1.0,
+        max_backoff_s: float = 30.0,
+        on_status: Optional[Callable[[bool], None]] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_age_s = max_age_s
+        self.min_backoff_s = min_backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.on_status = on_status
+        self._feed_ids: List[str] = []
+        # Single writer (the event loop); entries are replaced, never mutated
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._subscribers: List[tuple[Optional[frozenset], PriceCallback]] = []
+        self._run_task: Optional[asyncio.Task] = None
+        self._stream_task: Optional[asyncio.Task] = None
+        self._callback_tasks: Set[asyncio.Future] = set()
+        self.connected = False
+        self.add_feeds(feed_ids)
+
+    @property
+    def stream_url(self) -> str:
+        return f"{self.base_url}/v2/updates/price/stream"
+
+    @property
+    def latest_url(self) -> str:
+        return f"{self.base_url}/v2/updates/price/latest"
+
+    # --- Reads -----------------------------------------------------------------
+
+    def latest(self, feed_id: str, max_age_s: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Newest price entry for a feed, or None if missing or older than `max_age_s`
+        (defaults to the bus max age). Never blocks and never touches the network.
+        """
+        entry = self._latest.get(normalize_feed_id(feed_id))
+        if entry is None:
+            return None
+        max_age = self.max_age_s if max_age_s is None else max_age_s
+        if time.time() - entry["publish_time"] > max_age:
+            return None
+        return entry
+
+    async def get_price(self, feed_id: str, max_age_s: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Table read first; falls back to one HTTP poll when the stream has nothing fresh.
+        Feeds the bus has not seen yet are added to the stream, so the poll is a one-off.
+        """
+        entry = self.latest(feed_id, max_age_s)
+        if entry is not None:
+            return entry
+        self.add_feeds([feed_id])
+        await self.fetch_latest([feed_id])
+        return self.latest(feed_id, max_age_s)
+
+    @staticmethod
+    def to_float(entry: Dict[str, Any]) -> float:
+        return float(entry.get("price", 0)) * (10 ** entry.get("expo", 0))
+
+    # --- Subscriptions ---------------------------------------------------------
+
+    def subscribe(self, callback: PriceCallback, feed_ids: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """
+        Calls `callback(feed_id, entry)` for every new price (optionally only for `feed_ids`).
+        Coroutine callbacks are scheduled as tasks. Returns an unsubscribe function.
+        """
+        feeds = frozenset(normalize_feed_id(f) for f in feed_ids) if feed_ids else None
+        if feeds:
+            self.add_feeds(feeds)
+        subscription = (feeds, callback)
+        self._subscribers.append(subscription)
+
+        def unsubscribe():
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+        return unsubscribe
+
+    def add_feeds(self, feed_ids: Iterable[str]):
+        """Adds feeds to the stream. A running stream reconnects to pick them up."""
+        new = [f for f in (normalize_feed_id(f) for f in feed_ids) if f not in self._feed_ids]
+        if not new:
+            return
+        self._feed_ids.extend(new)
+        if self._stream_task and not self._stream_task.done():
+            self._stream_task.cancel()
+
+    # --- Publishing ------------------------------------------------------------
+
+    def publish(self, parsed: Dict[str, Any]) -> bool:
+        """
+        Stores one Hermes `parsed` item. Out-of-order or duplicate publish times are
+        dropped so the table only moves forward. Returns True if the entry was new.
+        """
+        feed_id = normalize_feed_id(parsed.get("id", ""))
+        price = parsed.get("price") or {}
+        if not feed_id or "price" not in price:
+            return False
+        publish_time = int(price.get("publish_time", 0))
+        current = self._latest.get(feed_id)
+        if current is not None and publish_time <= current["publish_time"]:
+            return False
+
+        entry = {
+            "id": feed_id,
+            "price": price["price"],
+            "conf": price.get("conf", "0"),
+            "expo": price.get("expo", 0),
+            "publish_time": publish_time,
+            "received_at": time.time(),
+        }
+        self._latest[feed_id] = entry
+        self._notify(feed_id, entry)
+        return True
+
+    def _notify(self, feed_id: str, entry: Dict[str, Any]):
+        for feeds, callback in list(self._subscribers):
+            if feeds is not None and feed_id not in feeds:
+                continue
+            try:
+                result = callback(feed_id, entry)
+                if inspect.isawaitable(result):
+                    task = asyncio.ensure_future(result)
+                    self._callback_tasks.add(task)
+                    task.add_done_callback(self._callback_tasks.discard)
+            except Exception as e:
+                logger.error(f"--> [PRICE BUS] Subscriber callback failed for {feed_id}: {e}")
+
+    def _handle_payload(self, payload: str) -> int:
+        try:
+            data = json.loads(payload)
+        except json.JSONDecodeError:
+            logger.warning("--> [PRICE BUS] Dropping malformed SSE payload.")
+            return 0
+        return sum(1 for item in data.get("parsed", []) if self.publish(item))
+
+    def _set_connected(self, connected: bool):
+        if connected == self.connected:
+            return
+        self.connected = connected
+        if self.on_status:
+            self.on_status(connected)
+
+    # --- Transport -------------------------------------------------------------
+
+    def _params(self, feed_ids: Iterable[str]) -> List[tuple[str, str]]:
+        return [("ids[]", f"0x{f}") for f in feed_ids] + [("parsed", "true")]
+
+    async def fetch_latest(self, feed_ids: Optional[Iterable[str]] = None, max_retries: int = 3) -> int:
+        """HTTP fallback: one /latest request for all given feeds, published into the table."""
+        ids = [normalize_feed_id(f) for f in (feed_ids or self._feed_ids)]
+        if not ids:
+            return 0
+        retry_delay = self.min_backoff_s
+        for attempt in range(max_retries):
+            try:
+                started = time.perf_counter()
+                async with httpx.AsyncClient(timeout=10.0) as client:
+                    try:
+                        response = await client.get(self.latest_url, params=self._params(ids))
+                    except httpx.HTTPError:
+                        observe_upstream(self.latest_url, started, error=True)
+                        raise
+                observe_upstream(self.latest_url, started, response.status_code)
+                if response.status_code == 429:
+                    logger.warning(f"Pyth rate limit hit (429). Attempt {attempt + 1}/{max_retries}. Retrying in {retry_delay}s...")
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 2
+                    continue
+                response.raise_for_status()
+                return sum(1 for item in response.json().get("parsed", []) if self.publish(item))
+            except Exception as e:
+                logger.error(f"--> [PRICE BUS] HTTP fallback failed: {e}")
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 2
+        return 0
+
+    async def _stream_once(self):
+        timeout = httpx.Timeout(10.0, read=None)
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            async with client.stream("GET", self.stream_url, params=self._params(self._feed_ids)) as response:
+                if response.status_code == 429:
+                    raise httpx.HTTPStatusError("Hermes stream rate limited (429)", request=response.request, response=response)
+                response.raise_for_status()
+                logger.info(f"--> [PRICE BUS] Streaming {len(self._feed_ids)} Pyth feed(s) from Hermes.")
+                self._set_connected(True)
+                async for line in response.aiter_lines():
+                    if line.startswith("data:"):
+                        self._handle_payload(line[5:].strip())
+
+    async def _run(self):
+        backoff = self.min_backoff_s
+        while True:
+            if not self._feed_ids:
+                await asyncio.sleep(self.min_backoff_s)
+                continue
+            self._stream_task = asyncio.create_task(self._stream_once())
+            try:
+                await self._stream_task
+                # Hermes closes streams periodically; reconnect straight away
+                backoff = self.min_backoff_s
+            except asyncio.CancelledError:
+                if self._run_task is None or self._run_task.cancelling():
+                    raise
+                # Feed set changed: reconnect immediately
+                continue
+            except Exception as e:
+                self._set_connected(False)
+                logger.warning(f"--> [PRICE BUS] Stream dropped ({e}). Reconnecting in {backoff:.0f}s.")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff_s)
+
+    def start(self):
+        """Starts the streaming task on the running loop (idempotent)."""
+        if self._run_task is None or self._run_task.done():
+            self._run_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        task, self._run_task = self._run_task, None
+        if task:
+            task.cancel()
+            if self._stream_task:
+                self._stream_task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._set_connected(False)
@@ -0,0 +1,303 @@
+"""
+JSONL telemetry for the trade executor (log_telemetry in main.py).
+
+Trading threads only pay for a sampling decision and a non-blocking queue
+put: JSON encoding, file writes, rotation and compression all happen on a
+QueueListener thread. The file is written through a large buffer that is
+flushed whenever the queue drains, so bursts become a few big writes
+instead of one write (and flush) per event.
+
+A copy of trade-orchestrator/src/telemetry/logger.py (only the docstring
+differs); change the two together.
+"""
+
+import atexit
+import copy
+import glob
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+try:
+    import orjson  # optional, ~5x faster encoding
+except ImportError:
+    orjson = None
+
+_ENCODER = json.JSONEncoder(default=str, separators=(",", ":"))
+
+
+def encode_json(obj) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str).decode()
+        except TypeError:
+            # e.g. non-str dict keys or ints over 64 bits
+            pass
+    return _ENCODER.encode(obj)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format logs as JSON lines for ingestion into ELK/Datadog or simple parsing.
+    """
+    def format(self, record):
+        log_entry = {
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        # We allow arbitrary dictionary payloads passed via extra={"payload": {...}}
+        if hasattr(record, 'payload') and isinstance(record.payload, dict):
+            log_entry.update(record.payload)
+
+        if record.exc_info:
+            log_entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_entry['exception'] = record.exc_text
+
+        return encode_json(log_entry)
+
+
+class EventFormatter(logging.Formatter):
+    """
+    Compact event line, {"timestamp": "...Z", "event_type": <message>, **payload},
+    as written to the trade executor's trade_telemetry.jsonl.
+    """
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat() + "Z",
+            "event_type": record.getMessage(),
+        }
+        if isinstance(getattr(record, "payload", None), dict):
+            entry.update(record.payload)
+        return encode_json(entry)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps 1 in N records per event. The event is payload["event"] if present,
+    otherwise the unformatted message. WARNING and above are never sampled.
+    Kept records carry "sample_rate": N in their payload so counts can be re-weighted.
+    """
+    def __init__(self, sample_every: Dict[str, int]):
+        super().__init__()
+        self.sample_every = {event: max(1, int(n)) for event, n in sample_every.items()}
+        self._seen: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.sample_every:
+            return True
+        payload = getattr(record, "payload", None)
+        event = payload.get("event") if isinstance(payload, dict) else None
+        event = event or str(record.msg)
+        n = self.sample_every.get(event)
+        if n is None or n == 1:
+            return True
+        with self._lock:
+            seen = self._seen.get(event, 0)
+            self._seen[event] = seen + 1
+        if seen % n:
+            self.dropped += 1
+            return False
+        record.payload = dict(payload or {}, sample_rate=n)
+        return True
+
+
+def parse_sample_policy(spec: str) -> Dict[str, int]:
+    """Parses "STRATEGY_SIGNAL=10,TRADE_SIGNAL_RECEIVED=2" into a SamplingFilter policy."""
+    policy = {}
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        event, _, n = part.partition("=")
+        try:
+            policy[event.strip()] = int(n)
+        except ValueError:
+            logging.getLogger(__name__).warning(f"Ignoring telemetry sampling rule {part!r}")
+    return policy
+
+
+class TelemetryQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that defers formatting to the listener and never blocks:
+    if the queue is full the record is dropped and counted.
+    """
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Only what must be captured now (args and payload may be mutated later); JSON encoding is the listener's job
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if isinstance(getattr(record, "payload", None), dict):
+            record.payload = dict(record.payload)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class TelemetryListener(logging.handlers.QueueListener):
+    """Flushes the (buffered) handlers each time the queue drains, batching writes under load."""
+    def handle(self, record):
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+
+
+class RotatingJsonlHandler(logging.handlers.BaseRotatingHandler):
+    """
+    Buffered JSONL file handler that rotates when the file reaches `max_bytes`
+    or every `rotate_seconds`, gzips the rotated file and keeps `backup_count` of them.
+    Writes are not flushed per record; call flush() (TelemetryListener does when idle).
+    """
+    def __init__(self, filename: str, max_bytes: int = 50 * 1024 * 1024, rotate_seconds: float = 86400,
+                 backup_count: int = 14, compress: bool = True, buffer_size: int = 64 * 1024):
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        self.compress = compress
+        self.buffer_size = buffer_size
+        super().__init__(filename, "a", encoding="utf-8", delay=False)
+        self._size = os.path.getsize(self.baseFilename)
+        self._rollover_at = time.time() + rotate_seconds if rotate_seconds else None
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, encoding=self.encoding, buffering=self.buffer_size)
+
+    def shouldRollover(self, record):
+        return False  # checked in emit, where the encoded size is known
+
+    def emit(self, record):
+        try:
+            line = self.format(record) + "\n"
+            size = len(line) if line.isascii() else len(line.encode("utf-8"))
+            if self._size and ((self.max_bytes and self._size + size > self.max_bytes)
+                               or (self._rollover_at and time.time() >= self._rollover_at)):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(line)
+            self._size += size
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+        rotated = self.rotation_filename(f"{self.baseFilename}.{stamp}")
+        suffix = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            rotated = self.rotation_filename(f"{self.baseFilename}.{stamp}.{suffix}")
+            suffix += 1
+        self.rotate(self.baseFilename, rotated)
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+        self._prune()
+        self.stream = self._open()
+        self._size = 0
+        if self.rotate_seconds:
+            self._rollover_at = time.time() + self.rotate_seconds
+
+    def _prune(self):
+        rotated = sorted(glob.glob(glob.escape(self.baseFilename) + ".*"), key=os.path.getmtime)
+        for path in rotated[:max(0, len(rotated) - self.backup_count)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+_listeners: Dict[str, TelemetryListener] = {}
+
+
+def setup_telemetry_logger(name="TradeOrchestrator", log_file="orchestrator.jsonl", level=logging.INFO,
+                           console: bool = True, sample_every: Optional[Dict[str, int]] = None,
+                           max_bytes: int = 50 * 1024 * 1024, rotate_seconds: float = 86400,
+                           backup_count: int = 14, queue_size: int = 10000,
+                           formatter: Optional[logging.Formatter] = None):
+    """
+    Configures and returns a logger that outputs JSON-formatted logs to a file and console.
+
+    The logger itself only has a TelemetryQueueHandler; the file and console
+    handlers run on a background TelemetryListener (stopped by shutdown_telemetry
+    or at exit). `sample_every` maps an event to N to keep 1 in N of its records.
+    `formatter` defaults to JsonFormatter.
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+
+    # Prevent duplicate handlers if called multiple times
+    shutdown_telemetry(name)
+    if logger.hasHandlers():
+        logger.handlers.clear()
+    logger.filters = [f for f in logger.filters if not isinstance(f, SamplingFilter)]
+
+    formatter = formatter or JsonFormatter()
+
+    # File Handler
+    log_dir = os.path.dirname(log_file)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+
+    file_handler = RotatingJsonlHandler(log_file, max_bytes=max_bytes, rotate_seconds=rotate_seconds,
+                                        backup_count=backup_count)
+    file_handler.setFormatter(formatter)
+    handlers = [file_handler]
+
+    # Console Handler
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    if sample_every:
+        logger.addFilter(SamplingFilter(sample_every))
+    logger.addHandler(TelemetryQueueHandler(queue.Queue(maxsize=queue_size)))
+    listener = TelemetryListener(logger.handlers[0].queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners[name] = listener
+
+    return logger
+
+
+def shutdown_telemetry(name: Optional[str] = None):
+    """Drains the queue, flushes and closes the handlers of one telemetry logger (or all)."""
+    names = [name] if name is not None else list(_listeners)
+    for n in names:
+        listener = _listeners.pop(n, None)
+        if listener is None:
+            continue
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(shutdown_telemetry)
+
+
+def get_telemetry_logger(name="TradeOrchestrator"):
+    return logging.getLogger(name)
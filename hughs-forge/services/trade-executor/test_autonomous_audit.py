@@ -0,0 +1,131 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from solders.pubkey import Pubkey
+
+import main
+from main import TradeExecutor, RPC_ENDPOINT
+from testutil import private_control_plane
+
+
+def make_position(active_id: int, lower: int = 0, upper: int = 20) -> dict:
+    return {
+        "pubkey": Pubkey.new_unique(),
+        "pool": Pubkey.new_unique(),
+        "activeId": active_id,
+        "lowerBinId": lower,
+        "upperBinId": upper,
+        "liquidity": 1000,
+    }
+
+
+class TestAutonomousAudit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        # Keep the executor off disk: no ledger DB, no key directory
+        with patch.object(main, "TradeLedger", MagicMock()), patch.object(main, "KeyManager", MagicMock()):
+            self.executor = TradeExecutor(RPC_ENDPOINT, audit_concurrency=4, position_deadline_s=1.0,
+                                          control_plane=private_control_plane(self))
+        self.executor.ledger.get_open_positions.return_value = []
+        self.executor._determine_market_volatility = AsyncMock(return_value="NORMAL")
+
+    async def _slow_tx(self, *args, **kwargs):
+        await asyncio.sleep(0.2)
+        return "sim_tx"
+
+    async def _slow_rebalance(self, *args, **kwargs):
+        await asyncio.sleep(0.2)
+        return {"status": "OK", "tx_hash": "sim_tx"}
+
+    async def test_rebalances_run_concurrently(self):
+        positions = [make_position(active_id=100) for _ in range(4)]
+        self.executor.get_meteora_lp_positions = AsyncMock(return_value=positions)
+        self.executor.rebalance_meteora_lp_position = AsyncMock(side_effect=self._slow_rebalance)
+
+        started = time.perf_counter()
+        summary = await self.executor.run_autonomous_audit()
+        elapsed = time.perf_counter() - started
+
+        # 4 positions x 0.2s = 0.8s serially; in parallel ~0.2s
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(summary["positions"], 4)
+        for record in summary["per_position"]:
+            self.assertEqual(record["action"], "REBALANCE")
+            self.assertEqual(record["status"], "OK")
+            self.assertIn("rebalance", record["phases"])
+        self.assertGreater(summary["serial_equivalent_s"], summary["wall_clock_s"])
+
+    async def test_concurrency_is_bounded_by_semaphore(self):
+        self.executor.audit_concurrency = 2
+        self.executor.audit_semaphore = asyncio.Semaphore(2)
+        in_flight = 0
+        peak = 0
+
+        async def tracked_close(*args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return "sim_tx"
+
+        positions = [make_position(active_id=-100) for _ in range(6)]
+        self.executor.get_meteora_lp_positions = AsyncMock(return_value=positions)
+        self.executor.close_meteora_lp_position = AsyncMock(side_effect=tracked_close)
+
+        summary = await self.executor.run_autonomous_audit()
+        self.assertEqual(peak, 2)
+        self.assertTrue(all(r["action"] == "STOP_LOSS" for r in summary["per_position"]))
+
+    async def test_position_deadline_marks_timeout_without_blocking_others(self):
+        async def hung_close(position_pubkey, *args, **kwargs):
+            if position_pubkey == positions[0]["pubkey"]:
+                await asyncio.sleep(10)
+            return "sim_tx"
+
+        positions = [make_position(active_id=-100), make_position(active_id=-100), make_position(active_id=10)]
+        self.executor.position_deadline_s = 0.2
+        self.executor.get_meteora_lp_positions = AsyncMock(return_value=positions)
+        self.executor.close_meteora_lp_position = AsyncMock(side_effect=hung_close)
+
+        summary = await self.executor.run_autonomous_audit()
+        statuses = [r["status"] for r in summary["per_position"]]
+        self.assertEqual(statuses, ["TIMEOUT", "OK", "HELD"])
+        self.assertFalse(self.executor.rebalance_locks[str(positions[0]["pubkey"])].locked())
+
+    async def test_blocking_alerts_do_not_serialize_positions(self):
+        positions = [make_position(active_id=100) for _ in range(4)]
+        self.executor.get_meteora_lp_positions = AsyncMock(return_value=positions)
+        self.executor.rebalance_meteora_lp_position = AsyncMock(side_effect=self._slow_rebalance)
+
+        started = time.perf_counter()
+        with patch.object(main, "send_discord_alert", side_effect=lambda *a, **k: time.sleep(0.2)):
+            await self.executor.run_autonomous_audit()
+        # 4 x (0.2s webhook + 0.2s rebalance) serially; overlapped ~0.4s
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+    async def test_deadline_does_not_cancel_an_operation_in_flight(self):
+        finished = asyncio.Event()
+
+        async def slow_close(*args, **kwargs):
+            await asyncio.sleep(0.3)
+            finished.set()
+            return "sim_tx"
+
+        positions = [make_position(active_id=-100)]
+        self.executor.position_deadline_s = 0.1
+        self.executor.get_meteora_lp_positions = AsyncMock(return_value=positions)
+        self.executor.close_meteora_lp_position = AsyncMock(side_effect=slow_close)
+
+        summary = await self.executor.run_autonomous_audit()
+        self.assertEqual(summary["per_position"][0]["status"], "TIMEOUT")
+        # The next pass leaves the position alone while the close is still running
+        summary = await self.executor.run_autonomous_audit()
+        self.assertEqual(summary["per_position"][0]["status"], "SKIPPED_LOCKED")
+        await asyncio.wait_for(finished.wait(), timeout=1.0)
+        self.assertEqual(self.executor.close_meteora_lp_position.await_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
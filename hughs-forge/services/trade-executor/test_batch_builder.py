@@ -0,0 +1,256 @@
+import base64
+import json
+import struct
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from solders.compute_budget import ID as COMPUTE_BUDGET_PROGRAM_ID
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from solders.transaction import VersionedTransaction
+
+import main
+from batch_builder import BatchTransactionBuilder, BatchTooLargeError, PACKET_DATA_SIZE, parse_lookup_tables
+from main import TradeExecutor, RPC_ENDPOINT
+from testutil import private_control_plane
+
+PROGRAM = Pubkey.new_unique()
+SHARED = [Pubkey.new_unique() for _ in range(4)]
+
+
+def claim_like_ix(owner: Pubkey) -> Instruction:
+    """Same shape as claimFees: 3 per-position accounts plus shared mints/programs."""
+    metas = [AccountMeta(owner, True, True)]
+    metas += [AccountMeta(Pubkey.new_unique(), False, True) for _ in range(3)]
+    metas += [AccountMeta(k, False, False) for k in SHARED]
+    return Instruction(PROGRAM, bytes(8), metas)
+
+
+def sim_response(units: int, err=None):
+    return SimpleNamespace(value=SimpleNamespace(units_consumed=units, err=err, logs=[]))
+
+
+def token_account(amount: int) -> dict:
+    """SPL token account as returned in a simulation's `accounts`: mint, owner, amount, ..."""
+    data = bytes(64) + amount.to_bytes(8, "little") + bytes(93)
+    return {"lamports": 2_039_280, "data": [base64.b64encode(data).decode(), "base64"], "owner": str(main.TOKEN_PROGRAM_ID),
+            "executable": False, "rentEpoch": 0, "space": len(data)}
+
+
+def simulation_reply(*amounts: int, err=None) -> str:
+    """simulateTransaction JSON-RPC reply carrying the token accounts' post-simulation state."""
+    accounts = [token_account(a) for a in amounts] if err is None else None
+    return json.dumps({"jsonrpc": "2.0", "id": 0, "result": {"context": {"slot": 1}, "value": {
+        "err": err, "logs": [], "accounts": accounts, "unitsConsumed": 50_000, "returnData": None}}})
+
+
+def cu_limit_of(message) -> int:
+    for ix in message.instructions:
+        if message.account_keys[ix.program_id_index] == COMPUTE_BUDGET_PROGRAM_ID and ix.data[0] == 2:
+            return struct.unpack("<I", bytes(ix.data[1:5]))[0]
+    raise AssertionError("no SetComputeUnitLimit instruction")
+
+
+class TestBatchTransactionBuilder(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.owner = Keypair()
+        self.client = MagicMock()
+        self.client.simulate_transaction = AsyncMock(return_value=sim_response(40_000))
+        self.client.get_latest_blockhash = AsyncMock(return_value=SimpleNamespace(value=SimpleNamespace(blockhash=Hash.default())))
+        self.builder = BatchTransactionBuilder(self.client)
+
+    def test_pack_respects_packet_limit_and_order(self):
+        ixs = [claim_like_ix(self.owner.pubkey()) for _ in range(30)]
+        batches = self.builder.pack(self.owner.pubkey(), ixs, Hash.default())
+
+        self.assertLess(len(batches), len(ixs))
+        self.assertEqual([ix for batch in batches for ix in batch], ixs)
+        for batch in batches:
+            message = self.builder.compile(self.owner.pubkey(), batch, Hash.default())
+            self.assertLessEqual(self.builder.serialized_size(message), PACKET_DATA_SIZE)
+
+    def test_oversized_instruction_raises(self):
+        huge = Instruction(PROGRAM, bytes(PACKET_DATA_SIZE), [AccountMeta(self.owner.pubkey(), True, True)])
+        with self.assertRaises(BatchTooLargeError):
+            self.builder.pack(self.owner.pubkey(), [huge], Hash.default())
+
+    def test_parse_lookup_tables_skips_bad_entries(self):
+        good = Pubkey.new_unique()
+        with self.assertLogs("batch_builder", level="ERROR"):
+            self.assertEqual(parse_lookup_tables(f" {good}, not-a-key,,"), [good])
+
+    async def test_build_sizes_cu_limit_from_simulation(self):
+        ixs = [claim_like_ix(self.owner.pubkey()) for _ in range(3)]
+        built = await self.builder.build([self.owner], ixs)
+
+        self.assertEqual(len(built), 1)
+        self.assertEqual(built[0]["ix_count"], 3)
+        self.assertEqual(built[0]["cu_limit"], int(40_000 * self.builder.cu_margin))
+        self.assertEqual(cu_limit_of(built[0]["transaction"].message), built[0]["cu_limit"])
+        self.assertEqual(len(bytes(built[0]["transaction"])), built[0]["size"])
+        self.client.get_latest_blockhash.assert_awaited_once()
+
+
+class TestBatchedClaim(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        with patch.object(main, "TradeLedger", MagicMock()), patch.object(main, "KeyManager", MagicMock()):
+            self.executor = TradeExecutor(RPC_ENDPOINT, control_plane=private_control_plane(self))
+        self.owner = Keypair()
+        self.executor.wallet = self.owner
+        self.executor.batch_builder.client = MagicMock()
+        self.executor.batch_builder.client.simulate_transaction = AsyncMock(return_value=sim_response(25_000))
+        self.executor.batch_builder.client.get_latest_blockhash = AsyncMock(
+            return_value=SimpleNamespace(value=SimpleNamespace(blockhash=Hash.default()))
+        )
+
+    async def test_claims_share_transactions(self):
+        positions = [{
+            "pubkey": Pubkey.new_unique(),
+            "pool": Pubkey.new_unique(),
+            "tokenXMint": SHARED[0],
+            "tokenYMint": SHARED[1],
+        } for _ in range(12)]
+        self.executor.get_meteora_lp_positions = AsyncMock(return_value=positions)
+        self.executor._send_batched = AsyncMock(wraps=self.executor._send_batched)
+
+        await self.executor.claim_all_rewards_for_all_positions(self.owner)
+
+        _, _, instructions = self.executor._send_batched.await_args.args
+        self.assertEqual(len(instructions), 12)
+        # Paper trading never sends; one blockhash for the whole run
+        self.executor.batch_builder.client.get_latest_blockhash.assert_awaited_once()
+        self.assertLess(self.executor.batch_builder.client.simulate_transaction.await_count, 12)
+
+    async def test_paper_mode_runs_without_matching_wallet(self):
+        self.executor.wallet = None
+        self.executor.get_meteora_lp_positions = AsyncMock(return_value=[{
+            "pubkey": Pubkey.new_unique(), "pool": Pubkey.new_unique(), "tokenXMint": SHARED[0], "tokenYMint": SHARED[1],
+        }])
+        await self.executor.claim_all_rewards_for_all_positions(self.owner)
+        self.executor.get_meteora_lp_positions.assert_awaited_once()
+
+        self.executor.paper_trading_mode = False
+        self.executor.get_meteora_lp_positions.reset_mock()
+        await self.executor.claim_all_rewards_for_all_positions(self.owner)
+        self.executor.get_meteora_lp_positions.assert_not_awaited()
+
+    async def test_batch_without_simulation_is_not_sent(self):
+        self.executor.paper_trading_mode = False
+        self.executor.batch_builder.client.simulate_transaction = AsyncMock(side_effect=RuntimeError("rpc down"))
+        self.executor.client.send_raw_transaction = AsyncMock()
+
+        results = await self.executor._send_batched("claim", self.owner, [claim_like_ix(self.owner.pubkey())])
+
+        self.assertEqual(results, [{"ix_count": 1, "tx_hash": None}])
+        self.executor.client.send_raw_transaction.assert_not_awaited()
+
+    async def test_compound_uses_pool_reserves(self):
+        pool = Pubkey.new_unique()
+        ix = await self.executor._build_compound_ix(
+            Pubkey.new_unique(), pool, SHARED[0], SHARED[1], 1, 1, 0, 10, self.owner.pubkey())
+        reserve_x = Pubkey.find_program_address([bytes(pool), bytes(SHARED[0])], main.METEORA_DLMM_PROGRAM_ID)[0]
+        self.assertEqual(ix.accounts[5].pubkey, reserve_x)
+
+
+class TestAtomicRebalance(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        with patch.object(main, "TradeLedger", MagicMock()), patch.object(main, "KeyManager", MagicMock()):
+            self.executor = TradeExecutor(RPC_ENDPOINT, control_plane=private_control_plane(self))
+        self.owner = Keypair()
+        client = MagicMock()
+        client.simulate_transaction = AsyncMock(return_value=sim_response(90_000))
+        client.get_latest_blockhash = AsyncMock(return_value=SimpleNamespace(value=SimpleNamespace(blockhash=Hash.default())))
+        # Withdrawal preview: the owner already holds 1.5 X idle and ends with 2.5 X / 0.04 Y once the
+        # liquidity is removed, so the withdrawal returns 1.0 X / 0.04 Y
+        self.executor.batch_builder.client = client
+        self.executor.batch_builder._post_rpc = AsyncMock(side_effect=self.balances(
+            before=(1_500_000, 0), after=(2_500_000, 40_000_000)))
+        self.pos = {
+            "pubkey": Pubkey.new_unique(),
+            "pool": Pubkey.new_unique(),
+            "tokenXMint": SHARED[0],
+            "tokenYMint": SHARED[1],
+            "lowerBinId": 90,
+            "upperBinId": 110,
+            "activeId": 115,
+            "liquidity": 1_000_000,
+            "ownerTokenXBalance": 1.5,
+            "ownerTokenYBalance": 0.0,
+            "tokenXDecimals": 6,
+            "tokenYDecimals": 9,
+        }
+
+    @staticmethod
+    def balances(before, after, err=None):
+        """_post_rpc stand-in: budget-only simulations see `before`, ones with the withdrawal see `after`."""
+        async def reply(body: str) -> str:
+            tx = VersionedTransaction.from_bytes(base64.b64decode(json.loads(body)["params"][0]))
+            withdraws = len(tx.message.instructions) > 2
+            return simulation_reply(*(after if withdraws else before), err=err if withdraws else None)
+        return reply
+
+    async def test_single_transaction_with_preflight(self):
+        plan = await self.executor.build_atomic_rebalance(self.pos, {"lower": 105, "upper": 125}, self.owner)
+
+        message = plan["transaction"].message
+        program_ids = [message.account_keys[ix.program_id_index] for ix in message.instructions]
+        # compute limit + price, then remove, close, initialize, deposit
+        self.assertEqual(program_ids[:2], [COMPUTE_BUDGET_PROGRAM_ID] * 2)
+        self.assertEqual(program_ids[2:], [main.METEORA_DLMM_PROGRAM_ID] * 4)
+        self.assertEqual(message.header.num_required_signatures, 2)
+        self.assertTrue(plan["preflight_ok"])
+        self.assertEqual(plan["units_consumed"], 90_000)
+        self.assertEqual(cu_limit_of(message), plan["cu_limit"])
+        self.assertLessEqual(plan["size"], PACKET_DATA_SIZE)
+
+    async def test_redeposits_only_withdrawn_amounts_into_pool_reserves(self):
+        plan = await self.executor.build_atomic_rebalance(self.pos, {"lower": 105, "upper": 125}, self.owner)
+
+        # The 1.5 X that was idle before the withdrawal is not swept into the new position
+        self.assertEqual(plan["deposit_amounts"], (1_000_000, 40_000_000))
+        message = plan["transaction"].message
+        reserves = self.executor._pool_reserves(self.pos["pool"], SHARED[0], SHARED[1])
+        self.assertTrue(set(reserves) <= set(message.account_keys))
+
+    async def test_failed_preview_fails_preflight(self):
+        self.executor.batch_builder._post_rpc = AsyncMock(side_effect=self.balances(
+            before=(1_500_000, 0), after=(), err="AccountNotFound"))
+        plan = await self.executor.build_atomic_rebalance(self.pos, {"lower": 105, "upper": 125}, self.owner)
+
+        self.assertFalse(plan["preflight_ok"])
+        self.assertIn("withdrawal preview failed", plan["preflight_err"])
+        self.assertEqual(plan["deposit_amounts"], (0, 0))
+
+    async def test_build_error_fails_rebalance_in_paper_mode(self):
+        self.executor.batch_builder.client.get_latest_blockhash = AsyncMock(side_effect=RuntimeError("rpc down"))
+        self.executor.ledger.record_entry = MagicMock()
+
+        result = await self.executor.rebalance_meteora_lp_position(self.pos, {"lower": 105, "upper": 125}, self.owner)
+
+        self.assertEqual(result["status"], "BUILD_FAILED")
+        self.executor.ledger.record_entry.assert_not_called()
+
+    async def test_preflight_feeds_simulate_rebalance(self):
+        plan = await self.executor.build_atomic_rebalance(self.pos, {"lower": 105, "upper": 125}, self.owner)
+        report, _ = await self.executor.simulate_rebalance(self.pos, {"lower": 105, "upper": 125}, preflight=plan)
+
+        self.assertEqual(report["PREFLIGHT_STATUS"], "OK")
+        self.assertIn("90000 used", report["COMPUTE_UNITS"])
+
+    async def test_wide_range_falls_back_to_sequential(self):
+        self.pos["lowerBinId"], self.pos["upperBinId"] = 0, 400
+        self.executor.close_meteora_lp_position = AsyncMock(return_value="sim_close")
+        self.executor.open_meteora_lp_position = AsyncMock(return_value="sim_open")
+
+        result = await self.executor.rebalance_meteora_lp_position(self.pos, {"lower": 390, "upper": 410}, self.owner)
+
+        self.assertEqual(result["status"], "OK")
+        self.executor.close_meteora_lp_position.assert_awaited_once()
+        self.executor.open_meteora_lp_position.assert_awaited_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
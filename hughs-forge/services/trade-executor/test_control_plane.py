@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from control_plane import ControlPlane, get_control_plane
+from main import RiskManager
+from testutil import ORCHESTRATOR_SRC, REPO_ROOT, code_without_docstring
+
+
+def wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.001)
+    return predicate()
+
+
+def child_reads_flags(path: str, stop_file: str, results):
+    plane = ControlPlane(stop_file=stop_file, path=path)
+    results.put((plane.is_halted(), plane.circuit_breaker_active()))
+    results.put(wait_for(lambda: not plane.is_halted()))
+
+
+class TestControlPlane(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "control")
+        self.stop_file = os.path.join(self.tmp, "trade_stop.lock")
+        self.planes = []
+
+    def tearDown(self):
+        for plane in self.planes:
+            plane.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def plane(self, **kwargs) -> ControlPlane:
+        plane = ControlPlane(stop_file=self.stop_file, path=self.path, **kwargs)
+        self.planes.append(plane)
+        return plane
+
+    def test_inotify_publishes_halt_within_milliseconds(self):
+        plane = self.plane(poll_interval_s=5.0)
+        plane.start()
+        self.assertEqual(plane.mode, "inotify")
+        self.assertFalse(plane.is_halted())
+        start = time.monotonic()
+        open(self.stop_file, "w").close()
+        self.assertTrue(wait_for(plane.is_halted, timeout=1.0))
+        self.assertLess(time.monotonic() - start, 0.5)  # well under the 5s resync
+        os.remove(self.stop_file)
+        self.assertTrue(wait_for(lambda: not plane.is_halted(), timeout=1.0))
+
+    def test_polling_fallback(self):
+        plane = self.plane(poll_interval_s=0.01, use_inotify=False)
+        plane.start()
+        self.assertEqual(plane.mode, "poll")
+        open(self.stop_file, "w").close()
+        self.assertTrue(wait_for(plane.is_halted))
+
+    def test_dead_watcher_falls_back_to_stop_file(self):
+        plane = self.plane(poll_interval_s=0.01, use_inotify=False)
+        plane.set_halted(True)  # stale byte: the stop file does not exist
+        with patch.object(plane, "sync", side_effect=[None, OSError("map gone")]):  # dies on its first resync
+            plane.start()
+            plane._thread.join(timeout=1.0)
+        self.assertFalse(plane.is_halted())
+        open(self.stop_file, "w").close()
+        self.assertTrue(plane.is_halted())
+
+    def test_state_visible_to_other_processes(self):
+        writer = self.plane()
+        writer.set_halted(True)
+        writer.set_circuit_breaker(True)
+        self.assertEqual(writer.sequence(), 2)
+        results = multiprocessing.get_context("spawn").Queue()
+        child = multiprocessing.get_context("spawn").Process(
+            target=child_reads_flags, args=(self.path, self.stop_file, results))
+        child.start()
+        self.assertEqual(results.get(timeout=30), (True, True))
+        writer.set_halted(False)
+        self.assertTrue(results.get(timeout=5))
+        child.join(timeout=5)
+
+    def test_risk_manager_reads_shared_flags(self):
+        plane = self.plane()
+        rm = RiskManager(control_plane=plane)
+        other = RiskManager(control_plane=self.plane())
+        self.assertTrue(rm.check_trade(10.0))
+        open(self.stop_file, "w").close()
+        self.assertTrue(wait_for(plane.is_halted))
+        self.assertFalse(other.check_trade(10.0))
+        os.remove(self.stop_file)
+        self.assertTrue(wait_for(lambda: not plane.is_halted()))
+        rm.activate_circuit_breaker()
+        self.assertTrue(other.circuit_breaker_active)
+        self.assertFalse(other.check_trade(10.0))
+        rm.deactivate_circuit_breaker()
+
+    def test_shared_plane_created_on_first_use(self):
+        self.assertFalse(os.path.exists(self.path))
+        plane = get_control_plane(path=self.path, stop_file=self.stop_file)
+        self.planes.append(plane)
+        self.assertTrue(os.path.exists(self.path))
+        self.assertIs(get_control_plane(path=self.path, stop_file=self.stop_file), plane)
+
+    def test_second_plane_startup_keeps_first_planes_trip(self):
+        first = self.plane()
+        self.assertTrue(first.created)
+        RiskManager(control_plane=first).activate_circuit_breaker()
+        second = self.plane()
+        self.assertFalse(second.created)
+        RiskManager(control_plane=second)
+        self.assertTrue(first.circuit_breaker_active())
+        self.assertTrue(second.circuit_breaker_active())
+
+    def test_copies_match(self):
+        copies = [os.path.join(ORCHESTRATOR_SRC, "core", "control_plane.py"),
+                  os.path.join(REPO_ROOT, "src", "executor", "control_plane.py")]
+        ours = code_without_docstring(os.path.join(os.path.dirname(os.path.abspath(__file__)), "control_plane.py"))
+        for copy in copies:
+            if os.path.exists(copy):
+                self.assertEqual(code_without_docstring(copy), ours, copy)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import threading
+import unittest
+import urllib.request
+from http.server import HTTPServer
+
+import metrics
+from health_server import HealthHandler
+from metrics import observe_upstream
+from testutil import ORCHESTRATOR_SRC, code_without_docstring
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), HealthHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_metrics_exposes_upstream_latency(self):
+        observe_upstream("https://hermes.pyth.network/v2/updates/price/latest", 0.0, 200)
+        with urllib.request.urlopen(self.url + "/metrics") as resp:
+            self.assertTrue(resp.headers["Content-Type"].startswith("text/plain; version=0.0.4"))
+            text = resp.read().decode()
+        self.assertIn('upstream_requests_total{host="hermes.pyth.network",outcome="ok"}', text)
+        self.assertIn('upstream_request_duration_seconds_count{host="hermes.pyth.network"}', text)
+
+    def test_health_still_served(self):
+        with urllib.request.urlopen(self.url + "/health") as resp:
+            self.assertEqual(resp.status, 200)
+
+
+class TestMetricsModule(unittest.TestCase):
+    @unittest.skipUnless(os.path.isdir(ORCHESTRATOR_SRC), "trade-orchestrator not checked out")
+    def test_matches_orchestrator_copy(self):
+        self.assertEqual(code_without_docstring(metrics.__file__),
+                         code_without_docstring(os.path.join(ORCHESTRATOR_SRC, "telemetry", "metrics.py")))
+
+
+if __name__ == "__main__":
+    unittest.main()
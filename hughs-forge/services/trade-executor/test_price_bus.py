@@ -0,0 +1,147 @@
+import asyncio
+import json
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import main
+from main import TradeExecutor, RPC_ENDPOINT, SOL_USD_FEED_ID
+from price_bus import PythPriceBus, normalize_feed_id
+from testutil import private_control_plane
+
+SOL = SOL_USD_FEED_ID
+USDC = "0xeaa020c61cc479712813461ce153894a96a6c00b21ed0cfc2798d1f9a9e9c94a"
+
+
+def parsed(feed_id: str, price: int, publish_time: int, expo: int = -8) -> dict:
+    return {
+        "id": normalize_feed_id(feed_id),
+        "price": {"price": str(price), "conf": "1000", "expo": expo, "publish_time": publish_time},
+        "ema_price": {"price": str(price), "conf": "1000", "expo": expo, "publish_time": publish_time},
+    }
+
+
+class TestPythPriceBus(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.bus = PythPriceBus([SOL], max_age_s=30)
+        self.now = int(time.time())
+
+    def test_sse_payload_updates_table(self):
+        payload = json.dumps({"parsed": [parsed(SOL, 15000000000, self.now), parsed(USDC, 100000000, self.now)]})
+        self.assertEqual(self.bus._handle_payload(payload), 2)
+        self.assertAlmostEqual(PythPriceBus.to_float(self.bus.latest(SOL)), 150.0)
+        # 0x-prefixed and bare ids hit the same entry
+        self.assertIs(self.bus.latest(SOL), self.bus.latest(normalize_feed_id(SOL)))
+
+    def test_out_of_order_and_stale_prices(self):
+        self.assertTrue(self.bus.publish(parsed(SOL, 15000000000, self.now)))
+        self.assertFalse(self.bus.publish(parsed(SOL, 14000000000, self.now - 5)))
+        self.assertAlmostEqual(PythPriceBus.to_float(self.bus.latest(SOL)), 150.0)
+        self.assertIsNone(self.bus.latest(SOL, max_age_s=-1))
+
+    async def test_subscribers_receive_filtered_ticks(self):
+        seen, async_seen = [], []
+
+        async def async_cb(feed_id, entry):
+            async_seen.append(feed_id)
+
+        unsubscribe = self.bus.subscribe(lambda f, e: seen.append((f, e["publish_time"])), feed_ids=[USDC])
+        self.bus.subscribe(async_cb)
+        self.bus.publish(parsed(SOL, 15000000000, self.now))
+        self.bus.publish(parsed(USDC, 100000000, self.now))
+        await asyncio.sleep(0)
+
+        self.assertEqual(seen, [(normalize_feed_id(USDC), self.now)])
+        self.assertEqual(len(async_seen), 2)
+        # Subscribing to a feed adds it to the stream
+        self.assertIn(normalize_feed_id(USDC), self.bus._feed_ids)
+
+        unsubscribe()
+        self.bus.publish(parsed(USDC, 100000000, self.now + 1))
+        self.assertEqual(len(seen), 1)
+
+    async def test_http_fallback_only_when_stream_has_nothing_fresh(self):
+        async def fake_fetch(feed_ids, max_retries=3):
+            return sum(self.bus.publish(parsed(f, 15000000000, self.now)) for f in feed_ids)
+
+        self.bus.fetch_latest = AsyncMock(side_effect=fake_fetch)
+        first = await self.bus.get_price(SOL)
+        second = await self.bus.get_price(SOL)
+        self.assertIs(first, second)
+        self.bus.fetch_latest.assert_awaited_once()
+
+    async def test_unseen_feed_joins_the_stream_on_first_miss(self):
+        self.bus.fetch_latest = AsyncMock(return_value=0)
+        self.assertIsNone(await self.bus.get_price(USDC))
+        self.assertIn(normalize_feed_id(USDC), self.bus._feed_ids)
+        # Once the stream delivers it, reads stay off HTTP
+        self.bus.publish(parsed(USDC, 100000000, self.now))
+        await self.bus.get_price(USDC)
+        self.bus.fetch_latest.assert_awaited_once()
+
+    async def test_coroutine_callbacks_are_kept_until_done(self):
+        release = asyncio.Event()
+
+        async def slow_cb(feed_id, entry):
+            await release.wait()
+
+        self.bus.subscribe(slow_cb)
+        self.bus.publish(parsed(SOL, 15000000000, self.now))
+        self.assertEqual(len(self.bus._callback_tasks), 1)
+        release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        self.assertEqual(len(self.bus._callback_tasks), 0)
+
+    async def test_adding_feeds_reconnects_stream(self):
+        connects = []
+
+        async def fake_stream():
+            connects.append(list(self.bus._feed_ids))
+            await asyncio.sleep(3600)
+
+        self.bus._stream_once = fake_stream
+        self.bus.start()
+        await asyncio.sleep(0.01)
+        self.bus.add_feeds([USDC])
+        await asyncio.sleep(0.01)
+        await self.bus.stop()
+
+        self.assertEqual(len(connects), 2)
+        self.assertEqual(connects[1], [normalize_feed_id(SOL), normalize_feed_id(USDC)])
+
+
+class TestExecutorPriceBus(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        with patch.object(main, "TradeLedger", MagicMock()), patch.object(main, "KeyManager", MagicMock()):
+            self.executor = TradeExecutor(RPC_ENDPOINT, control_plane=private_control_plane(self))
+        self.now = int(time.time())
+
+    async def test_ticks_feed_volatility_scryer(self):
+        for i, price in enumerate([15000000000, 15100000000, 14900000000]):
+            self.executor.price_bus.publish(parsed(SOL, price, self.now - 120 + i * 60))
+        self.assertEqual(self.executor.volatility_scryer.snapshot(normalize_feed_id(SOL))["samples"], 2)
+        self.assertIn(self.executor.current_volatility(), ("LOW", "NORMAL", "HIGH"))
+
+    async def test_get_pyth_price_and_pnl_read_from_bus(self):
+        self.executor.price_bus.fetch_latest = AsyncMock(return_value=0)
+        self.executor.price_bus.publish(parsed(SOL, 15000000000, self.now))
+        self.executor.price_bus.publish(parsed(USDC, 100000000, self.now))
+
+        price_data = await self.executor.get_pyth_price(SOL, radar_price=150.0)
+        self.assertEqual(price_data["price"], "15000000000")
+
+        position = {"pubkey": "pos", "liquidity": 10, "totalFeeX": 1, "totalFeeY": 2}
+        pnl = await self.executor.calculate_unrealized_pnl(position, price_feed_ids=(SOL, USDC))
+        self.assertAlmostEqual(pnl["total_value"], 10 * 150.0 + 10)
+        self.executor.price_bus.fetch_latest.assert_not_awaited()
+
+    async def test_failed_fallback_marks_pyth_unhealthy(self):
+        self.executor.price_bus.fetch_latest = AsyncMock(return_value=0)
+        main.health_server.HealthHandler.pyth_healthy = True
+        self.assertIsNone(await self.executor.get_pyth_price(USDC))
+        self.assertFalse(main.health_server.HealthHandler.pyth_healthy)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,12 @@
 import unittest
 from main import RiskManager
+from testutil import private_control_plane
 
 class TestRiskManager(unittest.TestCase):
     def setUp(self):
-        self.rm = RiskManager(daily_loss_limit=-500.0, max_trade_size=50.0)
+        # A private control plane: the host's shared map must not leak into (or out of) these tests
+        self.plane = private_control_plane(self)
+        self.rm = RiskManager(daily_loss_limit=-500.0, max_trade_size=50.0, control_plane=self.plane)
 
     def test_initialization(self):
         self.assertEqual(self.rm.daily_loss_limit, -500.0)
@@ -13,7 +16,7 @@ class TestRiskManager(unittest.TestCase):
 
     def test_default_safe_mode(self):
         """Test that RiskManager initializes with 'SAFE' mode by default."""
-        default_rm = RiskManager()
+        default_rm = RiskManager(control_plane=self.plane)
         self.assertEqual(default_rm.mode, "SAFE")
         self.assertEqual(default_rm.daily_loss_limit, -1000.0)
         self.assertEqual(default_rm.max_trade_size, 100.0)
@@ -45,5 +48,12 @@ class TestRiskManager(unittest.TestCase):
         self.assertFalse(self.rm.circuit_breaker_active)
         self.assertTrue(self.rm.check_trade(25.0)) # Works again
 
+    def test_startup_keeps_breaker_tripped_by_another_process(self):
+        self.rm.activate_circuit_breaker()
+        restarted = RiskManager(control_plane=self.plane)
+        self.assertTrue(restarted.circuit_breaker_active)
+        self.assertFalse(restarted.check_trade(25.0))
+
+
 if __name__ == '__main__':
     unittest.main()
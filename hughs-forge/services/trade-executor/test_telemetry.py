@@ -0,0 +1,81 @@
+import glob
+import gzip
+import json
+import logging
+import os
+import queue
+import tempfile
+import unittest
+
+import telemetry
+from testutil import ORCHESTRATOR_SRC, code_without_docstring
+from telemetry import (EventFormatter, TelemetryQueueHandler, parse_sample_policy, setup_telemetry_logger,
+                       shutdown_telemetry)
+
+
+class TestTelemetry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "trade_telemetry.jsonl")
+
+    def tearDown(self):
+        shutdown_telemetry("TelemetryTest")
+        self.tmp.cleanup()
+
+    def _logger(self, **kwargs):
+        return setup_telemetry_logger("TelemetryTest", self.path, console=False, formatter=EventFormatter(),
+                                      **kwargs)
+
+    def _read(self):
+        with open(self.path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_events_written_as_json_lines(self):
+        logger = self._logger()
+        data = {"reason": "CIRCUIT_BREAKER_ACTIVE"}
+        payload = {"data": data}
+        logger.info("RISK_BLOCK", extra={"payload": payload})
+        payload["data"] = {"reason": "mutated after logging"}
+        shutdown_telemetry("TelemetryTest")
+        entry = self._read()[0]
+        self.assertEqual(entry["event_type"], "RISK_BLOCK")
+        self.assertEqual(entry["data"], {"reason": "CIRCUIT_BREAKER_ACTIVE"})
+        self.assertTrue(entry["timestamp"].endswith("Z"))
+
+    def test_rotates_into_gzip_backups(self):
+        logger = self._logger(max_bytes=2000, rotate_seconds=0, backup_count=3)
+        for i in range(100):
+            logger.info("STRATEGY_SIGNAL", extra={"payload": {"data": {"i": i, "pad": "x" * 60}}})
+        shutdown_telemetry("TelemetryTest")
+        backups = glob.glob(self.path + ".*")
+        self.assertEqual(len(backups), 3)
+        self.assertTrue(all(path.endswith(".gz") for path in backups))
+        with gzip.open(backups[0], "rt") as f:
+            self.assertTrue(all(json.loads(line)["event_type"] == "STRATEGY_SIGNAL" for line in f))
+        self.assertLessEqual(os.path.getsize(self.path), 2000)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = TelemetryQueueHandler(queue.Queue(maxsize=1))
+        record = logging.LogRecord("t", logging.INFO, __file__, 1, "E", None, None)
+        handler.handle(record)
+        handler.handle(record)
+        self.assertEqual(handler.dropped, 1)
+
+    def test_sampling_policy(self):
+        logger = self._logger(sample_every=parse_sample_policy("STRATEGY_SIGNAL=4, bogus"))
+        for i in range(8):
+            logger.info("STRATEGY_SIGNAL", extra={"payload": {"data": {"i": i}}})
+        logger.info("LIVE_TRADE_EXECUTED", extra={"payload": {"data": {}}})
+        shutdown_telemetry("TelemetryTest")
+        entries = self._read()
+        self.assertEqual([e["data"].get("i") for e in entries], [0, 4, None])
+        self.assertEqual([e.get("sample_rate") for e in entries], [4, 4, None])
+
+    @unittest.skipUnless(os.path.isdir(ORCHESTRATOR_SRC), "trade-orchestrator not checked out")
+    def test_matches_orchestrator_copy(self):
+        self.assertEqual(code_without_docstring(telemetry.__file__),
+                         code_without_docstring(os.path.join(ORCHESTRATOR_SRC, "telemetry", "logger.py")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import math
+import random
+import unittest
+
+from volatility import VolatilityScryer
+
+THRESHOLDS = {"LOW": 0.02, "NORMAL": 0.05, "HIGH": 0.10}
+SOL = "sol"
+
+
+def feed_gbm(scryer, feed_id, daily_sigma, interval_s, n, seed=7, start_ts=1_700_000_000):
+    """Feeds a driftless geometric random walk with the given daily volatility."""
+    rng = random.Random(seed)
+    step_sigma = daily_sigma * math.sqrt(interval_s / 86400.0)
+    price = 150.0
+    scryer.update(feed_id, price, start_ts)
+    for i in range(1, n + 1):
+        price *= math.exp(rng.gauss(0.0, step_sigma))
+        scryer.update(feed_id, price, start_ts + i * interval_s)
+
+
+class TestVolatilityScryer(unittest.TestCase):
+    def test_defaults_to_normal_until_warm(self):
+        scryer = VolatilityScryer(THRESHOLDS)
+        self.assertEqual(scryer.regime(SOL), "NORMAL")
+        scryer.update(SOL, 150.0, 0)
+        self.assertEqual(scryer.regime(SOL), "NORMAL")
+        self.assertIsNone(scryer.daily_volatility(SOL))
+
+    def test_estimate_tracks_true_volatility(self):
+        scryer = VolatilityScryer(THRESHOLDS)
+        feed_gbm(scryer, SOL, daily_sigma=0.04, interval_s=60, n=5000)
+        self.assertAlmostEqual(scryer.daily_volatility(SOL, "24h"), 0.04, delta=0.006)
+        self.assertEqual(scryer.regime(SOL), "NORMAL")
+
+    def test_scales_by_real_timestamps(self):
+        # Same daily sigma sampled every 10s or every 15min must land in the same place
+        fast = VolatilityScryer(THRESHOLDS)
+        slow = VolatilityScryer(THRESHOLDS)
+        feed_gbm(fast, SOL, daily_sigma=0.08, interval_s=10, n=20000, seed=1)
+        feed_gbm(slow, SOL, daily_sigma=0.08, interval_s=900, n=2000, seed=2)
+        self.assertAlmostEqual(fast.daily_volatility(SOL, "24h"), 0.08, delta=0.015)
+        self.assertAlmostEqual(slow.daily_volatility(SOL, "24h"), 0.08, delta=0.015)
+        self.assertEqual(fast.regime(SOL), "HIGH")
+
+    def test_feeds_and_horizons_are_independent(self):
+        scryer = VolatilityScryer(THRESHOLDS)
+        feed_gbm(scryer, "calm", daily_sigma=0.005, interval_s=60, n=600, seed=3)
+        feed_gbm(scryer, "wild", daily_sigma=0.2, interval_s=60, n=600, seed=4)
+        self.assertEqual(scryer.regime("calm"), "LOW")
+        self.assertEqual(scryer.regime("wild"), "HIGH")
+        self.assertEqual(set(scryer.snapshot("calm")["volatility"]), {"5m", "1h", "24h"})
+
+    def test_duplicate_and_bad_ticks_are_ignored(self):
+        scryer = VolatilityScryer(THRESHOLDS)
+        self.assertTrue(scryer.update(SOL, 150.0, 100))
+        self.assertFalse(scryer.update(SOL, 151.0, 100))  # same publish time
+        self.assertFalse(scryer.update(SOL, 0.0, 200))
+        self.assertTrue(scryer.update(SOL, 151.0, 200))
+        self.assertEqual(scryer.snapshot(SOL)["samples"], 1)
+
+    def test_short_horizon_reacts_first(self):
+        scryer = VolatilityScryer(THRESHOLDS)
+        feed_gbm(scryer, SOL, daily_sigma=0.01, interval_s=60, n=3000, seed=5)
+        feed_gbm(scryer, SOL, daily_sigma=0.3, interval_s=60, n=15, seed=6, start_ts=1_700_000_000 + 3001 * 60)
+        vols = scryer.snapshot(SOL)["volatility"]
+        self.assertGreater(vols["5m"], vols["1h"])
+        self.assertGreater(vols["1h"], vols["24h"])
+
+
+if __name__ == '__main__':
+    unittest.main()
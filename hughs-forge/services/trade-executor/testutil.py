@@ -0,0 +1,31 @@
+# testutil.py for the Trade Executor tests
+#
+# Helpers shared by the test_*.py modules (not a test module itself).
+import ast
+import os
+import tempfile
+import unittest
+
+from control_plane import ControlPlane
+
+ORCHESTRATOR_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "trade-orchestrator", "src")
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..")
+
+
+def code_without_docstring(path: str) -> str:
+    """AST dump of a module minus its docstring, to check that two copies of a module only differ there."""
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    body = tree.body
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+        body = body[1:]
+    return ast.dump(ast.Module(body=body, type_ignores=[]))
+
+
+def private_control_plane(test: unittest.TestCase) -> ControlPlane:
+    """A ControlPlane in a temp dir, so the test never touches (or resets) the host's shared flags."""
+    tmp = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp.cleanup)
+    plane = ControlPlane(stop_file=os.path.join(tmp.name, "trade_stop.lock"), path=os.path.join(tmp.name, "control"))
+    test.addCleanup(plane.close)
+    return plane
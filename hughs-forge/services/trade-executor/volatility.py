@@ -0,0 +1,143 @@
+# volatility.py for the Trade Executor service
+#
+# Streaming volatility scryer. Every price tick updates a time-scaled EWMA of
+# squared log returns for several horizons at once in O(1), using the real
+# time between ticks instead of assuming a fixed sampling interval. Regimes
+# are published as an immutable snapshot so readers never take a lock.
+import math
+import threading
+import time
+from typing import Dict, Optional
+
+SECONDS_PER_DAY = 86400.0
+
+DEFAULT_HORIZONS = {
+    "5m": 300.0,
+    "1h": 3600.0,
+    "24h": 86400.0,
+}
+
+
+class HorizonEstimator:
+    """
+    EWMA of the variance rate (variance of log returns per second) with a
+    time constant of `horizon_s` seconds. Irregular tick spacing is handled by
+    weighting each return by alpha = 1 - exp(-dt / horizon).
+    """
+
+    __slots__ = ("horizon_s", "variance_rate", "weight")
+
+    def __init__(self, horizon_s: float):
+        self.horizon_s = horizon_s
+        self.variance_rate = 0.0
+        self.weight = 0.0  # Accumulated alpha mass; ~1.0 once the horizon is covered
+
+    def update(self, log_return: float, dt: float):
+        alpha = 1.0 - math.exp(-dt / self.horizon_s)
+        self.variance_rate += alpha * (log_return * log_return / dt - self.variance_rate)
+        self.weight += alpha * (1.0 - self.weight)
+
+    def daily_volatility(self) -> Optional[float]:
+        if self.weight <= 0.0:
+            return None
+        # Debias the warm-up period (estimator starts from zero)
+        return math.sqrt(self.variance_rate / self.weight * SECONDS_PER_DAY)
+
+
+class FeedVolatility:
+    """Per-feed state: last observation plus one estimator per horizon."""
+
+    def __init__(self, horizons: Dict[str, float]):
+        self.estimators = {name: HorizonEstimator(seconds) for name, seconds in horizons.items()}
+        self.last_price: Optional[float] = None
+        self.last_ts: Optional[float] = None
+        self.samples = 0
+
+    def update(self, price: float, ts: float) -> bool:
+        """Returns False for ticks that carry no new information (bad price, stale or duplicate time)."""
+        if price <= 0:
+            return False
+        if self.last_price is None:
+            self.last_price, self.last_ts = price, ts
+            return True
+        dt = ts - self.last_ts
+        if dt <= 0:
+            return False
+        log_return = math.log(price / self.last_price)
+        for estimator in self.estimators.values():
+            estimator.update(log_return, dt)
+        self.last_price, self.last_ts = price, ts
+        self.samples += 1
+        return True
+
+
+class VolatilityScryer:
+    """
+    Multi-feed, multi-horizon volatility tracker.
+
+    Writers (price ticks) serialize per scryer; readers go through `snapshot`/`regime`,
+    which only dereference the latest published dict and never block.
+    """
+
+    def __init__(
+        self,
+        thresholds: Dict[str, float],
+        horizons: Optional[Dict[str, float]] = None,
+        regime_horizon: str = "1h",
+        min_samples: int = 2,
+    ):
+        self.thresholds = thresholds
+        self.horizons = dict(horizons or DEFAULT_HORIZONS)
+        if regime_horizon not in self.horizons:
+            raise ValueError(f"Unknown regime horizon {regime_horizon!r}; expected one of {list(self.horizons)}")
+        self.regime_horizon = regime_horizon
+        self.min_samples = min_samples
+        self._feeds: Dict[str, FeedVolatility] = {}
+        self._write_lock = threading.Lock()
+        # feed_id -> {"volatility": {horizon: daily vol}, "regime": str, "samples": int, "updated_at": ts}
+        self._snapshot: Dict[str, Dict] = {}
+
+    def update(self, feed_id: str, price: float, ts: Optional[float] = None) -> bool:
+        """Feeds one price observation. `ts` is the publish time in seconds (defaults to now)."""
+        ts = time.time() if ts is None else float(ts)
+        with self._write_lock:
+            feed = self._feeds.get(feed_id)
+            if feed is None:
+                feed = self._feeds[feed_id] = FeedVolatility(self.horizons)
+            if not feed.update(price, ts):
+                return False
+            vols = {name: est.daily_volatility() for name, est in feed.estimators.items()}
+            entry = {
+                "volatility": vols,
+                "regime": self._classify(vols.get(self.regime_horizon), feed.samples),
+                "samples": feed.samples,
+                "updated_at": ts,
+            }
+            # Copy-on-write publish: readers see either the old or the new dict, never a partial one
+            snapshot = dict(self._snapshot)
+            snapshot[feed_id] = entry
+            self._snapshot = snapshot
+        return True
+
+    def _classify(self, daily_vol: Optional[float], samples: int) -> str:
+        if daily_vol is None or samples < self.min_samples:
+            return "NORMAL"
+        if daily_vol < self.thresholds["LOW"]:
+            return "LOW"
+        if daily_vol < self.thresholds["NORMAL"]:
+            return "NORMAL"
+        return "HIGH"
+
+    def snapshot(self, feed_id: str) -> Optional[Dict]:
+        return self._snapshot.get(feed_id)
+
+    def regime(self, feed_id: str) -> str:
+        """Latest LOW/NORMAL/HIGH regime for a feed; NORMAL until enough samples exist."""
+        entry = self._snapshot.get(feed_id)
+        return entry["regime"] if entry else "NORMAL"
+
+    def daily_volatility(self, feed_id: str, horizon: Optional[str] = None) -> Optional[float]:
+        entry = self._snapshot.get(feed_id)
+        if not entry:
+            return None
+        return entry["volatility"].get(horizon or self.regime_horizon)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark: trade state transitions per second.
+
+Replays the save_trade pattern of a single process_signal (SIGNAL_RECEIVED ->
+VALIDATING -> ROUTING -> EXECUTING -> EXECUTED) for N trades and reports
+transitions/second and the median save_trade latency of intermediate and
+terminal states, bytes written per transition (Linux: wchar from /proc/self/io,
+i.e. database + WAL/rollback journal + TradeJournal file) and final database
+size for:
+
+- legacy:  one sqlite3.connect + rollback journal + commit per save_trade
+           (the pre-WAL TradeStateManager behaviour, reproduced inline)
+- current: TradeStateManager (per-thread persistent WAL connection,
+           synchronous=NORMAL, cached statements)
+- durable: TradeStateManager with EXECUTED committed durable=True (same
+           guarantee as the journal, every transition on the critical path)
+- journal: TradeJournal in front of TradeStateManager (intermediate states
+           group-committed by the flusher, EXECUTED fsynced inline)
+
+Usage:
+    PYTHONPATH=src python bench_state_manager.py [--trades 2000] [--dir /tmp] [--blob-bytes 0]
+
+--blob-bytes pads the signal blob (e.g. with a route quote) to show how the
+per-transition cost scales with the size of the data column.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from state.journal import TradeJournal
+from state.state_manager import TradeStateManager
+
+SIGNAL = {"source": "pumpfun", "symbol": "BENCH", "confidence": 0.9, "liquidity_usd": 12000,
+          "pool": "7xKXtg2CW87d97TXJSDpbD5jBkheTqA83TZRuJosgAsU", "reason": "volume breakout " * 8}
+
+
+def legacy_save_trade(db_path, trade_id, state, token_address, amount, data, **enriched):
+    with sqlite3.connect(db_path) as conn:
+        columns = ["trade_id", "state", "token_address", "amount", "data"]
+        values = [trade_id, state, token_address, amount, json.dumps(data)]
+        for key, value in enriched.items():
+            if value is not None:
+                columns.append(key)
+                values.append(value)
+        set_clause = ", ".join([f"{col} = excluded.{col}" for col in columns if col != "trade_id"])
+        conn.execute(f"""
+            INSERT INTO trades ({", ".join(columns)})
+            VALUES ({", ".join(["?"] * len(values))})
+            ON CONFLICT(trade_id) DO UPDATE SET {set_clause}, updated_at=CURRENT_TIMESTAMP
+        """, values)
+        conn.commit()
+
+
+def run_pipeline(save, trades: int, latencies=None) -> int:
+    """latencies: optional {"intermediate": [], "terminal": []} filled with per-call seconds."""
+    transitions = 0
+    clock = time.perf_counter
+
+    def timed(kind, *args, **kwargs):
+        started = clock()
+        save(*args, **kwargs)
+        if latencies is not None:
+            latencies[kind].append(clock() - started)
+
+    for i in range(trades):
+        trade_id = f"bench-{i}"
+        token = f"Token{i:040d}"
+        timed("intermediate", trade_id, "SIGNAL_RECEIVED", token, 1.0, SIGNAL)
+        timed("intermediate", trade_id, "VALIDATING", token, 1.0, SIGNAL)
+        timed("intermediate", trade_id, "ROUTING", token, 1.0, SIGNAL, route="JUPITER")
+        timed("intermediate", trade_id, "EXECUTING", token, 1.0, SIGNAL)
+        timed("terminal", trade_id, "EXECUTED", token, 1.0, {**SIGNAL, "signature": "sig"},
+              tx_signature="sig", entry_price=0.001, executed_at=datetime.utcnow().isoformat())
+        transitions += 5
+    return transitions
+
+
+def bytes_written() -> int:
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def db_size_kib(db_path: str) -> float:
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return os.path.getsize(db_path) / 1024
+
+
+def bench(label, db_path, save, trades):
+    latencies = {"intermediate": [], "terminal": []}
+    written = bytes_written()
+    started = time.perf_counter()
+    transitions = run_pipeline(save, trades, latencies)
+    elapsed = time.perf_counter() - started
+    written = (bytes_written() - written) / transitions
+    rate = transitions / elapsed
+    p50 = {kind: statistics.median(values) * 1e6 for kind, values in latencies.items()}
+    print(f"{label:<8} {transitions:>7} transitions in {elapsed:7.3f}s -> {rate:10.0f} transitions/s"
+          f"  (p50 intermediate {p50['intermediate']:6.1f}us, terminal {p50['terminal']:6.1f}us,"
+          f" {written / 1024:5.1f} KiB written/transition, db {db_size_kib(db_path):8.0f} KiB)")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trades", type=int, default=2000)
+    parser.add_argument("--dir", default=None, help="Directory for the scratch databases (default: system temp)")
+    parser.add_argument("--blob-bytes", type=int, default=0, help="Extra bytes of signal data per trade")
+    args = parser.parse_args()
+    if args.blob_bytes:
+        SIGNAL["quote"] = "q" * args.blob_bytes
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        legacy_db = os.path.join(tmp, "legacy.db")
+        current_db = os.path.join(tmp, "current.db")
+        durable_db = os.path.join(tmp, "durable.db")
+        journal_db = os.path.join(tmp, "journal.db")
+
+        # Same schema for both; the legacy run then drops back to the default rollback journal
+        TradeStateManager(legacy_db).close()
+        with sqlite3.connect(legacy_db) as conn:
+            conn.execute("PRAGMA journal_mode=DELETE")
+
+        legacy_rate = bench("legacy", legacy_db, lambda *a, **k: legacy_save_trade(legacy_db, *a, **k), args.trades)
+
+        manager = TradeStateManager(current_db)
+        current_rate = bench("current", current_db, manager.save_trade, args.trades)
+        manager.close()
+
+        manager = TradeStateManager(durable_db)
+        durable_rate = bench("durable", durable_db,
+                             lambda *a, **k: manager.save_trade(*a, durable=a[1] == "EXECUTED", **k), args.trades)
+        manager.close()
+
+        manager = TradeStateManager(journal_db)
+        journal = TradeJournal(manager, journal_path=journal_db + ".journal")
+        journal_rate = bench("journal", journal_db, journal.save_trade, args.trades)
+        journal.close()
+        manager.close()
+
+        print(f"speedup  {current_rate / legacy_rate:.1f}x (current), {journal_rate / legacy_rate:.1f}x (journal), "
+              f"journal vs durable {journal_rate / durable_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: stats and dashboard queries over a large synthetic trades.db.
+
+Builds a trades table with N rows (default one million) spread over 30 days
+-- mostly rejected/in-flight trades, ~30% EXECUTED with an executed_at, ~10%
+FAILED -- then times, with and without TRADE_INDEXES:
+
+- stats:   StatsTracker._compute_stats (last hour, executed_at range)
+- state:   TradeStateManager.find_trades(state="FAILED")
+- token:   TradeStateManager.find_trades(token_address=...)
+
+Usage:
+    PYTHONPATH=src python bench_trades_queries.py [--rows 1000000] [--db /tmp/bench_trades.db] [--repeat 5]
+
+An existing --db is reused as-is, so the one-off build cost is only paid once.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from feed.stats_tracker import StatsTracker
+from state.state_manager import TRADE_INDEXES, TradeStateManager, create_trade_indexes
+
+ROUTES = ["JUPITER", "METEORA"]
+TOKENS = [f"Token{i:039d}" for i in range(5000)]
+
+
+def build(conn, rows: int, batch: int = 50_000):
+    now = datetime.utcnow()
+    rng = random.Random(42)
+    started = time.perf_counter()
+    for offset in range(0, rows, batch):
+        chunk = []
+        for i in range(offset, min(rows, offset + batch)):
+            updated = now - timedelta(seconds=rng.randint(0, 30 * 86400))
+            roll = rng.random()
+            if roll < 0.3:
+                state, executed_at, fee, slippage = "EXECUTED", updated.isoformat(), rng.randint(5000, 20000), rng.randint(5, 100)
+            elif roll < 0.4:
+                state, executed_at, fee, slippage = "FAILED", None, None, None
+            else:
+                state, executed_at, fee, slippage = rng.choice(["AWAITING_APPROVAL", "VALIDATING"]), None, None, None
+            chunk.append((f"bench-{i}", state, rng.choice(TOKENS), round(rng.uniform(5, 250), 2), "{}",
+                          updated.strftime("%Y-%m-%d %H:%M:%S"), rng.choice(ROUTES), fee, slippage, executed_at))
+        with conn:
+            conn.executemany('''
+                INSERT INTO trades (trade_id, state, token_address, amount, data, updated_at,
+                                    route, fee_lamports, slippage_bps, executed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', chunk)
+    print(f"built {rows} rows in {time.perf_counter() - started:.1f}s")
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def run(label: str, manager: TradeStateManager, repeat: int):
+    tracker = StatsTracker(db_path=manager.db_path)
+    token = TOKENS[0]
+    results = {
+        "stats": timed(tracker._compute_stats, repeat),
+        "state": timed(lambda: manager.find_trades(state="FAILED"), repeat),
+        "token": timed(lambda: manager.find_trades(token_address=token), repeat),
+    }
+    print(f"{label:<10} " + "  ".join(f"{name} {ms:9.2f}ms" for name, ms in results.items()))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", default=None, help="Path of the synthetic database (default: temp file, deleted after)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = None
+    db_path = args.db
+    if db_path is None:
+        tmp = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp.name, "bench_trades.db")
+    is_new = not os.path.exists(db_path)
+
+    # The manager creates TRADE_INDEXES on open; drop them for the baseline (and for a faster bulk load)
+    manager = TradeStateManager(db_path)
+    conn = manager._connect()
+    with conn:
+        for name, _ in TRADE_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+    if is_new:
+        build(conn, args.rows)
+    baseline = run("no-index", manager, args.repeat)
+
+    started = time.perf_counter()
+    with conn:
+        create_trade_indexes(conn)
+    print(f"indexed in {time.perf_counter() - started:.1f}s")
+    indexed = run("indexed", manager, args.repeat)
+
+    print("speedup    " + "  ".join(f"{name} {baseline[name] / indexed[name]:9.1f}x  " for name in baseline))
+    manager.close()
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -32,7 +32,7 @@ if not JUPITER_API_KEY:
     except Exception as e:
         print(f"Failed to read JUPITER_API_KEY: {e}")
 
-JUPITER_ENDPOINTS = ["https://api.jup.ag/swap/v1"]
+JUPITER_ENDPOINTS = [f"{os.getenv('JUPITER_BASE_URL', 'https://api.jup.ag')}/swap/v1"]
 
 def fetch_quote(user_pubkey: str):
     params = {
@@ -45,7 +45,7 @@ def fetch_quote(user_pubkey: str):
     headers = {}
     if JUPITER_API_KEY:
         headers['x-api-key'] = JUPITER_API_KEY
-    resp = httpx.get('https://api.jup.ag/swap/v1/quote', params=params, headers=headers, timeout=10)
+    resp = httpx.get(f'{JUPITER_ENDPOINTS[0]}/quote', params=params, headers=headers, timeout=10)
     resp.raise_for_status()
     return resp.json()
 
@@ -60,7 +60,7 @@ def fetch_swap_transaction(quote: dict, user_pubkey: str):
     headers = {}
     if JUPITER_API_KEY:
         headers['x-api-key'] = JUPITER_API_KEY
-    resp = httpx.post('https://api.jup.ag/swap/v1/swap', json=payload, headers=headers, timeout=10)
+    resp = httpx.post(f'{JUPITER_ENDPOINTS[0]}/swap', json=payload, headers=headers, timeout=10)
     resp.raise_for_status()
     data = resp.json()
     return data.get('swapTransaction')
@@ -14,6 +14,15 @@ New fields:
 
 Backfill: If existing trades have execution data in the JSON `data` field, extract and populate new columns.
 
+Migration 2 (migrate_trade_events): split the JSON blob out of `trades`.
+- trade_signals(trade_id, data): the signal blob, written once per trade
+- trade_events(trade_id, ts, state, payload): append-only transitions, clustered by trade
+Existing blobs move to trade_signals, each trade gets one event for its current
+state, trades.data is reset to '{}' and the file is vacuumed.
+
+Migration 3 (migrate_indexes): secondary indexes for the stats and dashboard
+queries (see TRADE_INDEXES in src/state/state_manager.py).
+
 Usage:
     python migrate_trades_schema.py /path/to/trades.db
 """
@@ -24,6 +33,9 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+from state.state_manager import EMPTY_DATA, TRADE_INDEXES, create_event_tables, create_trade_indexes
+
 def migrate(db_path: str):
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
@@ -96,6 +108,51 @@ def migrate(db_path: str):
 
     print(f"\nMigration complete. Added columns. Backfilled {updated} trades.")
 
+def migrate_trade_events(db_path: str):
+    conn = sqlite3.connect(db_path)
+    size_before = Path(db_path).stat().st_size
+
+    with conn:
+        create_event_tables(conn)
+
+        # 1. Move the blob of every not-yet-split trade into trade_signals
+        cursor = conn.execute('''
+            INSERT OR IGNORE INTO trade_signals (trade_id, data)
+            SELECT trade_id, data FROM trades WHERE data != ?
+        ''', (EMPTY_DATA,))
+        print(f"Moved {cursor.rowcount} signal blobs to trade_signals")
+
+        # 2. One event for the current state of every trade without history
+        cursor = conn.execute('''
+            INSERT INTO trade_events (trade_id, state, ts, payload)
+            SELECT t.trade_id, t.state, COALESCE(CAST(strftime('%s', t.updated_at) AS REAL), 0), NULL
+            FROM trades t
+            WHERE NOT EXISTS (SELECT 1 FROM trade_events e WHERE e.trade_id = t.trade_id)
+        ''')
+        print(f"Backfilled {cursor.rowcount} trade events")
+
+        # 3. trades keeps only the latest state
+        conn.execute("UPDATE trades SET data = ? WHERE data != ?", (EMPTY_DATA, EMPTY_DATA))
+
+    conn.execute("VACUUM")
+    conn.close()
+
+    size_after = Path(db_path).stat().st_size
+    print(f"\nEvent migration complete. Database size {size_before} -> {size_after} bytes.")
+
+def migrate_indexes(db_path: str):
+    conn = sqlite3.connect(db_path)
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    for name, _ in TRADE_INDEXES:
+        if name in existing:
+            print(f"Index {name} already exists, skipping")
+        else:
+            print(f"Creating index: {name}")
+    with conn:
+        create_trade_indexes(conn)
+    conn.close()
+    print("\nIndex migration complete.")
+
 if __name__ == "__main__":
     if len(sys.argv) != 2:
         print("Usage: python migrate_trades_schema.py /path/to/trades.db")
@@ -105,3 +162,5 @@ if __name__ == "__main__":
         print(f"Error: database not found at {db_path}")
         sys.exit(1)
     migrate(db_path)
+    migrate_trade_events(db_path)
+    migrate_indexes(db_path)
@@ -0,0 +1,57 @@
+"""
+Cross-source signal deduplication.
+
+The same mint can arrive from the pump stream, a retry-queue promotion and
+the Meteora scanner, each under its own trade_id scheme. SignalDedupIndex
+keys on the token address instead: the first signal claims the mint for
+`ttl_s` seconds and later ones are collapsed into it. Entries expire in
+insertion order (the TTL is fixed), so purging is a pop from the front.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+DEFAULT_TTL_SECONDS = 300.0
+
+
+class Claim(NamedTuple):
+    trade_id: str
+    source: str
+    claimed_at: float  # time.monotonic()
+
+
+class SignalDedupIndex:
+    def __init__(self, ttl_s: float = DEFAULT_TTL_SECONDS):
+        self.ttl_s = ttl_s
+        self._claims: "OrderedDict[str, Claim]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, token_address: str, trade_id: str, source: str) -> Optional[Claim]:
+        """Claims the mint for this signal; returns None if it won, else the claim it duplicates."""
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            existing = self._claims.get(token_address)
+            if existing is not None:
+                return existing
+            self._claims[token_address] = Claim(trade_id, source, now)
+            return None
+
+    def release(self, token_address: str, trade_id: str):
+        """Drops the claim if `trade_id` still holds it (e.g. its trade failed, so a later signal may retry)."""
+        with self._lock:
+            existing = self._claims.get(token_address)
+            if existing is not None and existing.trade_id == trade_id:
+                del self._claims[token_address]
+
+    def _purge(self, now: float):
+        cutoff = now - self.ttl_s
+        while self._claims:
+            if next(iter(self._claims.values())).claimed_at > cutoff:
+                break
+            self._claims.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._claims)
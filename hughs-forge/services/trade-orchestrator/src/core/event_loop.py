@@ -1,37 +1,126 @@
 import logging
+import os
 import time
 import queue
-from typing import Dict, Any
+from collections import Counter
+from typing import Callable, Dict, Any, Optional, Sequence, Tuple
 from .orchestrator import TradeOrchestrator
+from .signal_queue import DEFAULT_LANES, LaneQueue, classify, parse_lanes
+from telemetry.metrics import REGISTRY
+from telemetry.tracing import current_context, record_span, span, use_context
+
+QUEUE_DEPTH = REGISTRY.gauge("eventloop_queue_depth", "Signals waiting in the EventLoop queue")
+QUEUE_WAIT_SECONDS = REGISTRY.histogram("eventloop_queue_wait_seconds", "Time a signal spent queued before processing",
+                                        ["lane"])
+SIGNALS = REGISTRY.counter("eventloop_signals", "Signals processed by final state", ["state"])
+ADMISSION = REGISTRY.counter("eventloop_admission", "Signals admitted or shed before processing, by reason",
+                             ["decision", "reason"])
+
+# Queue wait above which time-sensitive signals are shed (the loop is behind)
+MAX_QUEUE_WAIT_SECONDS = 5.0
+
+# Admission reasons
+ADMIT_FRESH = "fresh"              # has a deadline and is within it
+ADMIT_NO_DEADLINE = "no_deadline"  # manual/API signals are never shed
+SHED_EXPIRED = "expired"           # past its deadline
+SHED_QUEUE_WAIT = "queue_wait"     # still within its deadline, but queued longer than the target
+
 
 class EventLoop:
-    def __init__(self, orchestrator: TradeOrchestrator):
+    """
+    Single consumer of trade signals, dequeued by priority lane (exits, fresh
+    snipes, high-confidence Meteora, retries; see signal_queue). `lanes`
+    defaults to $EVENTLOOP_LANES, e.g. "exit=0,snipe=8,meteora=3,retry=1".
+
+    Signals may carry `discovered_at` and `deadline` (epoch seconds); past
+    the deadline, or after queueing longer than `max_queue_wait_s`, they are
+    shed before any SQLite or Jupiter work. `on_shed(signal, reason)` lets the
+    producer demote a shed signal (e.g. back to its retry queue) instead of
+    dropping it.
+    """
+    def __init__(self, orchestrator: TradeOrchestrator, max_queue_wait_s: Optional[float] = None,
+                 on_shed: Optional[Callable[[Dict[str, Any], str], None]] = None,
+                 lanes: Optional[Sequence[Tuple[str, int]]] = None):
         self.logger = logging.getLogger("EventLoop")
         self.orchestrator = orchestrator
-        self.signal_queue = queue.Queue()
+        if lanes is None:
+            lanes = parse_lanes(os.environ["EVENTLOOP_LANES"]) if os.getenv("EVENTLOOP_LANES") else DEFAULT_LANES
+        self.signal_queue = LaneQueue(lanes)
         self.is_running = False
+        if max_queue_wait_s is None:
+            max_queue_wait_s = float(os.getenv("EVENTLOOP_MAX_QUEUE_WAIT_S", MAX_QUEUE_WAIT_SECONDS))
+        self.max_queue_wait_s = max_queue_wait_s
+        self.on_shed = on_shed
+        # (decision, reason) -> count; only the loop thread writes it
+        self._admission: Counter = Counter()
+        QUEUE_DEPTH.set_function(self.signal_queue.qsize)
 
     def enqueue_signal(self, signal_data: Dict[str, Any]):
-        """Puts a new signal onto the queue for processing."""
-        self.signal_queue.put(signal_data)
-        self.logger.info(f"Enqueued signal for {signal_data.get('token_address')}")
+        """Puts a new signal into its priority lane for processing."""
+        lane = classify(signal_data)
+        # Stamped so the consumer can report queue wait; the trace context crosses the thread hop with it
+        self.signal_queue.put((time.perf_counter(), signal_data, current_context()), lane)
+        self.logger.info(f"Enqueued signal for {signal_data.get('token_address')} ({lane} lane)")
+
+    def admit(self, signal: Dict[str, Any], waited: float) -> Tuple[bool, str]:
+        """Decides whether a dequeued signal is still worth processing: (admitted, reason)."""
+        deadline = signal.get("deadline")
+        if deadline is None:
+            return True, ADMIT_NO_DEADLINE
+        if time.time() >= deadline:
+            return False, SHED_EXPIRED
+        if self.max_queue_wait_s > 0 and waited > self.max_queue_wait_s:
+            return False, SHED_QUEUE_WAIT
+        return True, ADMIT_FRESH
+
+    def admission_counts(self) -> Dict[str, Dict[str, int]]:
+        """Admitted and shed signals by reason, e.g. {"admitted": {"fresh": 12}, "shed": {"expired": 3}}."""
+        counts: Dict[str, Dict[str, int]] = {"admitted": {}, "shed": {}}
+        for (decision, reason), n in list(self._admission.items()):
+            counts[decision][reason] = n
+        return counts
+
+    def _shed(self, signal: Dict[str, Any], reason: str, waited: float):
+        discovered_at = signal.get("discovered_at")
+        age = f", {time.time() - discovered_at:.1f}s since discovery" if discovered_at else ""
+        self.logger.warning(f"Shed signal for {signal.get('token_address')} ({reason}: queued {waited:.2f}s{age})")
+        if self.on_shed is not None:
+            try:
+                self.on_shed(signal, reason)
+            except Exception as e:
+                self.logger.error(f"on_shed callback failed for {signal.get('token_address')}: {e}")
 
     def run(self):
         """Starts the event loop to process signals continuously."""
         self.logger.info("Starting Trade Orchestrator Event Loop...")
         self.is_running = True
-        
+
         while self.is_running:
             try:
                 # Block for up to 1 second waiting for a signal
-                signal = self.signal_queue.get(timeout=1.0)
-                self.logger.info(f"Dequeued signal. Processing...")
-                
-                final_state = self.orchestrator.process_signal(signal)
+                lane, (enqueued_at, signal, trace_context) = self.signal_queue.get(timeout=1.0)
+                waited = time.perf_counter() - enqueued_at
+                QUEUE_WAIT_SECONDS.labels(lane).observe(waited)
+
+                # Admission control runs before the orchestrator touches SQLite or Jupiter
+                admitted, reason = self.admit(signal, waited)
+                decision = "admitted" if admitted else "shed"
+                self._admission[(decision, reason)] += 1
+                ADMISSION.labels(decision, reason).inc()
+
+                with use_context(trace_context):
+                    record_span("queue_wait", waited, {"lane": lane, "admission": reason})
+                    if not admitted:
+                        self._shed(signal, reason, waited)
+                        continue
+
+                    self.logger.info(f"Dequeued {lane} signal. Processing...")
+                    with span("process_signal", {"trade_id": str(signal.get("trade_id"))}) as process_span:
+                        final_state = self.orchestrator.process_signal(signal)
+                        process_span.set_attribute("state", final_state)
+                SIGNALS.labels(final_state).inc()
                 self.logger.info(f"Finished processing signal. Final State: {final_state}")
-                
-                self.signal_queue.task_done()
-                
+
             except queue.Empty:
                 # No signals in the queue, just loop again
                 pass
@@ -1,34 +1,140 @@
 import logging
+import os
+import threading
 import uuid
 import time
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
 from .state_machine import TradeState
 from state.state_manager import TradeStateManager
+from state.journal import TradeJournal
 from .rpc_integration import RpcIntegrator
+from .dedup import DEFAULT_TTL_SECONDS, SignalDedupIndex
+from .control_plane import ControlPlane, get_control_plane
+from telemetry.metrics import REGISTRY
+from telemetry.tracing import record_span, span
+
+STAGE_SECONDS = REGISTRY.histogram("orchestrator_stage_duration_seconds",
+                                   "Time spent in each process_signal stage", ["stage"])
+DUPLICATES = REGISTRY.counter("orchestrator_duplicate_signals",
+                              "Signals collapsed into an earlier one for the same mint", ["winner", "source"])
+HALTED_SIGNALS = REGISTRY.counter("orchestrator_halted_signals",
+                                  "Signals refused while trading was halted host-wide", ["reason"])
+
+# Seconds a trade may sit at AWAITING_APPROVAL (holding its mint) before it is failed
+DEFAULT_APPROVAL_TTL_SECONDS = 120.0
 
 class TradeOrchestrator:
-    def __init__(self, db_path: str = "trades.db", dry_run: bool = False):
+    def __init__(self, db_path: str = "trades.db", dry_run: bool = False, journal_path: str = None,
+                 dedup_ttl_s: float = None, approval_ttl_s: float = None,
+                 control_plane: Optional[ControlPlane] = None):
         self.logger = logging.getLogger("TradeOrchestrator")
         self.state_manager = TradeStateManager(db_path)
+        # Intermediate transitions are group-committed off the hot path; EXECUTED/FAILED commit synchronously
+        self.journal = TradeJournal(self.state_manager, journal_path=journal_path or f"{db_path}.journal")
         self.dry_run = dry_run
         self.rpc_integrator = RpcIntegrator(dry_run=dry_run)
         self.MAX_AUTO_TRADE_USD = 250.0
         self.discord_broadcaster = None  # Injected by main.py
+        # One trade per mint per TTL across pump, retry and Meteora signals
+        if dedup_ttl_s is None:
+            dedup_ttl_s = float(os.getenv("ORCHESTRATOR_DEDUP_TTL_S", DEFAULT_TTL_SECONDS))
+        self.dedup = SignalDedupIndex(dedup_ttl_s)
+        # trade_id -> (token_address, amount, deadline) for trades held at AWAITING_APPROVAL, oldest first
+        if approval_ttl_s is None:
+            approval_ttl_s = float(os.getenv("ORCHESTRATOR_APPROVAL_TTL_S", DEFAULT_APPROVAL_TTL_SECONDS))
+        self.approval_ttl_s = approval_ttl_s
+        self._pending_approvals: "OrderedDict[str, Tuple[str, float, float]]" = OrderedDict()
+        self._approvals_lock = threading.Lock()
+        # Host-wide halt / circuit-breaker flags, shared with the trade executor
+        self.control_plane = get_control_plane() if control_plane is None else control_plane
+        self.control_plane.start()
 
     def process_signal(self, signal_data: Dict[str, Any]) -> str:
         trade_id = signal_data.get("trade_id", str(uuid.uuid4()))
         token_address = signal_data.get("token_address")
         amount = signal_data.get("amount", 0.0)
+        source = signal_data.get("source", "unknown")
+
+        # Nothing is admitted while the force-stop file is present or an executor tripped its breaker
+        halt_reason = self._halt_reason()
+        if halt_reason is not None:
+            self.logger.warning(f"[{trade_id}] Signal for {token_address} refused: {halt_reason}")
+            HALTED_SIGNALS.labels(halt_reason).inc()
+            return TradeState.HALTED.value
+
+        # Unanswered approvals give their mints back before this signal is checked against them
+        self.expire_approvals()
+
+        # Collapse duplicates before any state is written
+        winner = self.dedup.claim(token_address, trade_id, source)
+        if winner is not None:
+            self.logger.info(f"[{trade_id}] Duplicate signal for {token_address} from {source}; "
+                             f"{winner.trade_id} ({winner.source}) already claimed it")
+            DUPLICATES.labels(winner.source, source).inc()
+            record_span("dedup", 0.0, {"winner": winner.source, "winner_trade_id": winner.trade_id})
+            return TradeState.DUPLICATE.value
+
+        current_state = None
+        try:
+            current_state = self._run_signal(trade_id, token_address, amount, signal_data)
+            return current_state
+        finally:
+            # Nothing was bought (failed, or raised), so a later signal for this mint may try again.
+            # A trade awaiting approval keeps the mint until reject_approval() or its approval expires.
+            if current_state == TradeState.AWAITING_APPROVAL.value:
+                with self._approvals_lock:
+                    self._pending_approvals[trade_id] = (token_address, amount,
+                                                         time.monotonic() + self.approval_ttl_s)
+            elif current_state != TradeState.EXECUTED.value:
+                self.dedup.release(token_address, trade_id)
 
+    def _halt_reason(self) -> Optional[str]:
+        if self.control_plane.is_halted():
+            return "FORCE_STOP"
+        if self.control_plane.circuit_breaker_active():
+            return "CIRCUIT_BREAKER_ACTIVE"
+        return None
+
+    def expire_approvals(self):
+        """Fails every AWAITING_APPROVAL trade older than approval_ttl_s, releasing its mint."""
+        now = time.monotonic()
+        expired = []
+        with self._approvals_lock:
+            while self._pending_approvals:
+                trade_id, (token_address, amount, deadline) = next(iter(self._pending_approvals.items()))
+                if deadline > now:
+                    break
+                self._pending_approvals.popitem(last=False)
+                expired.append((trade_id, token_address, amount))
+        for trade_id, token_address, amount in expired:
+            self.reject_approval(trade_id, token_address, amount,
+                                 reason=f"No approval within {self.approval_ttl_s:g}s")
+
+    def reject_approval(self, trade_id: str, token_address: str, amount: float, reason: str = "Rejected by operator"):
+        """Fails a trade held at AWAITING_APPROVAL and frees its mint for later signals."""
+        with self._approvals_lock:
+            self._pending_approvals.pop(trade_id, None)
+        self.logger.info(f"[{trade_id}] Approval rejected: {reason}")
+        self.journal.save_trade(trade_id, TradeState.FAILED.value, token_address, amount,
+                                data={"rejection_reason": reason}, rejection_reason=reason)
+        self._broadcast_failed(trade_id, token_address, amount, {"error": reason})
+        self.dedup.release(token_address, trade_id)
+
+    def _run_signal(self, trade_id: str, token_address: str, amount: float, signal_data: Dict[str, Any]) -> str:
+        """process_signal once the mint is claimed; returns the state the trade ended in."""
         self.logger.info(f"[{trade_id}] Processing signal for {token_address}, amount: ${amount}")
+        started = time.perf_counter()
 
         # Initial State
         current_state = TradeState.SIGNAL_RECEIVED.value
-        self.state_manager.save_trade(trade_id, current_state, token_address, amount, signal_data)
+        self.journal.save_trade(trade_id, current_state, token_address, amount, signal_data)
 
         # Validating Phase
         current_state = TradeState.VALIDATING.value
-        self.state_manager.save_trade(trade_id, current_state, token_address, amount, signal_data)
+        self.journal.save_trade(trade_id, current_state, token_address, amount, signal_data)
+
+        self._stage_done("validate", started)
 
         # Failsafe check
         if amount > self.MAX_AUTO_TRADE_USD:
@@ -36,7 +142,7 @@ class TradeOrchestrator:
             current_state = TradeState.AWAITING_APPROVAL.value
             # Capture rejection reason
             rejection_data = {"rejection_reason": f"Amount exceeds auto-trade limit ${self.MAX_AUTO_TRADE_USD}"}
-            self.state_manager.save_trade(
+            self.journal.save_trade(
                 trade_id, current_state, token_address, amount,
                 data={**signal_data, **rejection_data},
                 rejection_reason=rejection_data["rejection_reason"]
@@ -48,39 +154,46 @@ class TradeOrchestrator:
         # Routing Phase
         self.logger.info(f"[{trade_id}] Proceeding to ROUTING phase.")
         current_state = TradeState.ROUTING.value
-        self.state_manager.save_trade(trade_id, current_state, token_address, amount, signal_data)
+        self.journal.save_trade(trade_id, current_state, token_address, amount, signal_data)
 
         # Determine Route
+        stage_started = time.perf_counter()
         route = self.rpc_integrator.route_trade(token_address, amount)
+        self._stage_done("route", stage_started)
         self.logger.info(f"[{trade_id}] Selected Route: {route}")
 
         # Execution Phase
         self.logger.info(f"[{trade_id}] Transitioning to EXECUTING phase.")
         current_state = TradeState.EXECUTING.value
-        self.state_manager.save_trade(trade_id, current_state, token_address, amount, signal_data, route=route)
+        self.journal.save_trade(trade_id, current_state, token_address, amount, signal_data, route=route)
 
         success = False
         execution_result = {}
-        if route == "JUPITER":
-            execution_result = self.rpc_integrator.execute_jupiter_trade(token_address, amount)
-            success = execution_result.get("success", False)
-        elif route == "METEORA":
-            try:
-                execution_result = self.rpc_integrator.execute_meteora_trade(token_address, amount)
+        stage_started = time.perf_counter()
+        # A live span (not recorded afterwards) so the quote/swap/send spans nest under it
+        with span("execute", {"route": route}):
+            if route == "JUPITER":
+                execution_result = self.rpc_integrator.execute_jupiter_trade(token_address, amount)
                 success = execution_result.get("success", False)
-            except NotImplementedError as e:
-                self.logger.warning(f"[{trade_id}] Meteora execution not available: {e}")
-                success = False
-                execution_result = {"error": str(e)}
+            elif route == "METEORA":
+                try:
+                    execution_result = self.rpc_integrator.execute_meteora_trade(token_address, amount)
+                    success = execution_result.get("success", False)
+                except NotImplementedError as e:
+                    self.logger.warning(f"[{trade_id}] Meteora execution not available: {e}")
+                    success = False
+                    execution_result = {"error": str(e)}
+        STAGE_SECONDS.labels("execute").observe_since(stage_started)
 
         # Post-Execution Phase
+        stage_started = time.perf_counter()
         if success:
             # Double-check: require tx_signature for real execution
             tx_sig = execution_result.get("tx_signature")
             if not tx_sig or tx_sig == "dry_run_mock_signature":
                 self.logger.warning(f"[{trade_id}] Trade marked successful but no valid tx_signature. Marking as FAILED.")
                 current_state = TradeState.FAILED.value
-                self.state_manager.save_trade(
+                self.journal.save_trade(
                     trade_id, current_state, token_address, amount,
                     data={**signal_data, **execution_result},
                     rejection_reason="No valid tx_signature - trade may not have executed on-chain",
@@ -90,11 +203,12 @@ class TradeOrchestrator:
                     "route": route,
                     "error": "No valid tx_signature"
                 })
+                self._stage_done("persist", stage_started)
                 return current_state
                 
             self.logger.info(f"[{trade_id}] Trade execution successful. Transitioning to EXECUTED.")
             current_state = TradeState.EXECUTED.value
-            self.state_manager.save_trade(
+            self.journal.save_trade(
                 trade_id, current_state, token_address, amount,
                 data={**signal_data, **execution_result},
                 entry_price=execution_result.get("entry_price"),
@@ -115,7 +229,7 @@ class TradeOrchestrator:
             self.logger.error(f"[{trade_id}] Trade execution failed.")
             current_state = TradeState.FAILED.value
             error_msg = execution_result.get("error", "Unknown error")
-            self.state_manager.save_trade(
+            self.journal.save_trade(
                 trade_id, current_state, token_address, amount,
                 data={**signal_data, **execution_result},
                 rejection_reason=error_msg,
@@ -126,9 +240,16 @@ class TradeOrchestrator:
                 "route": route,
                 "error": error_msg
             })
+        self._stage_done("persist", stage_started)
 
         return current_state
 
+    def _stage_done(self, stage: str, started: float):
+        """Records a finished process_signal stage in the stage histogram and as a span."""
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.labels(stage).observe(elapsed)
+        record_span(stage, elapsed)
+
     def _broadcast_executed(self, trade_id: str, token_address: str, amount: float, extra: Dict[str, Any]):
         if self.discord_broadcaster:
             trade_data = {"trade_id": trade_id, "token_address": token_address, "amount": amount, **extra}
@@ -143,3 +264,8 @@ class TradeOrchestrator:
         if self.discord_broadcaster:
             trade_data = {"trade_id": trade_id, "token_address": token_address, "amount": amount, "rejection_reason": reason}
             self.discord_broadcaster.broadcast_trade_rejected(trade_data)
+
+    def stop(self):
+        """Commits any journaled transitions and releases the database connections."""
+        self.journal.close()
+        self.state_manager.close()
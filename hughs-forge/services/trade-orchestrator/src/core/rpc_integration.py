@@ -8,7 +8,10 @@ from solana.rpc.api import Client
 from solana.rpc.types import TxOpts
 from solders.transaction import Transaction, VersionedTransaction
 import base64
+import time
 from datetime import datetime
+from telemetry.metrics import observe_upstream
+from telemetry.tracing import span
 
 logger = logging.getLogger("RpcIntegrator")
 
@@ -16,7 +19,7 @@ class RpcIntegrator:
     def __init__(self, dry_run: bool = False):
         self.logger = logging.getLogger("RpcIntegrator")
         self.dry_run = dry_run
-        self.jupiter_endpoints = ["https://api.jup.ag/swap/v1"]
+        self.jupiter_endpoints = [f"{os.getenv('JUPITER_BASE_URL', 'https://api.jup.ag')}/swap/v1"]
         self.jupiter_api_key = os.getenv("JUPITER_API_KEY")
         if not self.jupiter_api_key:
             env_path = "/data/openclaw/keys/jupiter.env"
@@ -71,17 +74,19 @@ class RpcIntegrator:
             decimals = 9
             amount_lamports = int(amount * (10 ** decimals))
 
-            quote = self._fetch_quote(
-                input_mint=token_address,
-                output_mint="So11111111111111111111111111111111111111112",
-                amount=amount_lamports,
-                user_pubkey=str(self.wallet.pubkey())
-            )
+            with span("jupiter.quote"):
+                quote = self._fetch_quote(
+                    input_mint=token_address,
+                    output_mint="So11111111111111111111111111111111111111112",
+                    amount=amount_lamports,
+                    user_pubkey=str(self.wallet.pubkey())
+                )
             if not quote:
                 self.logger.error("Failed to fetch Jupiter quote")
                 return {"success": False, "error": "Failed to fetch Jupiter quote"}
 
-            swap_tx_b64, address_lookup_table_addresses = self._fetch_swap_transaction(quote, str(self.wallet.pubkey()))
+            with span("jupiter.swap"):
+                swap_tx_b64, address_lookup_table_addresses = self._fetch_swap_transaction(quote, str(self.wallet.pubkey()))
             if not swap_tx_b64:
                 self.logger.error("Failed to fetch swap transaction from Jupiter")
                 return {"success": False, "error": "Failed to fetch swap transaction from Jupiter"}
@@ -114,7 +119,8 @@ class RpcIntegrator:
                 signed_tx = VersionedTransaction.populate(msg, sigs)
                 self.logger.info("Sending versioned transaction via send_raw_transaction")
                 opts = TxOpts(skip_preflight=True, max_retries=3, address_lookup_table_addresses=address_lookup_table_addresses)
-                result = self.client.send_raw_transaction(bytes(signed_tx), opts=opts)
+                with span("send_transaction", {"tx_format": "versioned"}):
+                    result = self.client.send_raw_transaction(bytes(signed_tx), opts=opts)
                 self.logger.info(f"Transaction send result: {result}")
 
                 tx_signature = str(result.value) if hasattr(result, 'value') else str(result)
@@ -142,7 +148,8 @@ class RpcIntegrator:
                         return {"success": False, "error": f"Failed to fetch recent blockhash: {e}"}
                     tx.sign([self.wallet], recent_blockhash)
                     self.logger.info("Sending legacy transaction via send_transaction")
-                    result = self.client.send_transaction(tx, opts=TxOpts(skip_preflight=True, max_retries=3))
+                    with span("send_transaction", {"tx_format": "legacy"}):
+                        result = self.client.send_transaction(tx, opts=TxOpts(skip_preflight=True, max_retries=3))
                     self.logger.info(f"Transaction send result: {result}")
                     tx_signature = str(result.value) if hasattr(result, 'value') else str(result)
                     self.logger.info(f"Transaction signature: https://solscan.io/tx/{tx_signature}")
@@ -217,12 +224,15 @@ class RpcIntegrator:
             url = f"{endpoint}/quote"
             try:
                 self.logger.info(f"Fetching quote from: {url}")
+                started = time.perf_counter()
                 resp = httpx.get(url, params=params, headers=headers, timeout=10.0)
+                observe_upstream(url, started, resp.status_code)
                 if resp.status_code == 200:
                     return resp.json()
                 else:
                     self.logger.warning(f"Quote endpoint {url} returned {resp.status_code}: {resp.text[:200]}")
             except httpx.HTTPError as e:
+                observe_upstream(url, started, error=True)
                 self.logger.warning(f"Quote request {url} failed: {e}")
         return None
 
@@ -242,7 +252,9 @@ class RpcIntegrator:
             url = f"{endpoint}/swap"
             try:
                 self.logger.info(f"Requesting swap transaction from: {url}")
+                started = time.perf_counter()
                 resp = httpx.post(url, json=payload, headers=headers, timeout=10.0)
+                observe_upstream(url, started, resp.status_code)
                 if resp.status_code == 200:
                     data = resp.json()
                     swap_tx_b64 = data.get("swapTransaction")
@@ -255,5 +267,6 @@ class RpcIntegrator:
                 else:
                     self.logger.warning(f"Swap endpoint {url} returned {resp.status_code}: {resp.text[:200]}")
             except httpx.HTTPError as e:
+                observe_upstream(url, started, error=True)
                 self.logger.warning(f"Swap request {url} failed: {e}")
         return None, []
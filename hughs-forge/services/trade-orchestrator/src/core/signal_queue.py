@@ -0,0 +1,99 @@
+"""
+Priority lanes for the EventLoop's signals.
+
+Each signal goes into one lane by its source and confidence (see classify).
+get() serves strict lanes (weight 0, by default exits) first, in order, then
+picks among the other non-empty lanes by smooth weighted round robin (the way
+nginx spreads requests over weighted upstreams). With snipe=8, meteora=3 and
+retry=1, a backlog of snipes still lets three Meteora signals and one retry
+through every twelve dequeues, so the low lanes never starve.
+"""
+
+import queue
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Sequence, Tuple
+
+LANE_EXIT = "exit"
+LANE_SNIPE = "snipe"
+LANE_METEORA = "meteora"
+LANE_RETRY = "retry"
+
+# (lane, weight) in priority order; weight 0 = strict priority over the weighted lanes
+DEFAULT_LANES: Tuple[Tuple[str, int], ...] = ((LANE_EXIT, 0), (LANE_SNIPE, 8), (LANE_METEORA, 3), (LANE_RETRY, 1))
+
+# Meteora signals below this confidence share the retry lane
+METEORA_HIGH_CONFIDENCE = 0.8
+
+
+def classify(signal: Dict[str, Any]) -> str:
+    """The lane for a signal: an explicit "lane" key wins, else by side, source and confidence."""
+    lane = signal.get("lane")
+    if lane:
+        return lane
+    if signal.get("side") == "sell" or signal.get("signal_type") == "exit":
+        return LANE_EXIT
+    if signal.get("source") == "meteora_dlmm":
+        return LANE_METEORA if signal.get("confidence", 0.0) >= METEORA_HIGH_CONFIDENCE else LANE_RETRY
+    return LANE_SNIPE
+
+
+def parse_lanes(spec: str) -> Tuple[Tuple[str, int], ...]:
+    """Parses "exit=0,snipe=8,meteora=3,retry=1" (priority order) into (lane, weight) pairs."""
+    lanes = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, weight = part.partition("=")
+        lanes.append((name.strip(), int(weight or 1)))
+    if not lanes:
+        raise ValueError(f"no lanes in {spec!r}")
+    return tuple(lanes)
+
+
+class LaneQueue:
+    """Thread-safe multi-lane queue: put(item, lane), get(timeout) -> (lane, item)."""
+    def __init__(self, lanes: Sequence[Tuple[str, int]] = DEFAULT_LANES):
+        self.lanes = tuple(name for name, _ in lanes)
+        self.weights = dict(lanes)
+        self._queues: Dict[str, Deque[Any]] = {name: deque() for name in self.lanes}
+        self._credit = {name: 0 for name in self.lanes}
+        self._size = 0
+        self._not_empty = threading.Condition()
+
+    def put(self, item: Any, lane: str):
+        if lane not in self._queues:
+            raise ValueError(f"unknown lane {lane!r} (expected one of {', '.join(self.lanes)})")
+        with self._not_empty:
+            self._queues[lane].append(item)
+            self._size += 1
+            self._not_empty.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Tuple[str, Any]:
+        """Removes the next item by lane priority; raises queue.Empty after `timeout` seconds."""
+        with self._not_empty:
+            if not self._not_empty.wait_for(lambda: self._size, timeout):
+                raise queue.Empty
+            lane = self._pick()
+            self._size -= 1
+            return lane, self._queues[lane].popleft()
+
+    def _pick(self) -> str:
+        ready = [name for name in self.lanes if self._queues[name]]
+        for name in ready:
+            if not self.weights[name]:
+                return name
+        # Smooth weighted round robin: every ready lane earns its weight, the richest is served
+        # and pays back the round's total, so picks interleave in proportion to the weights
+        total = 0
+        for name in ready:
+            self._credit[name] += self.weights[name]
+            total += self.weights[name]
+        chosen = max(ready, key=self._credit.__getitem__)
+        self._credit[chosen] -= total
+        return chosen
+
+    def qsize(self) -> int:
+        return self._size
+
+    def lane_sizes(self) -> Dict[str, int]:
+        with self._not_empty:
+            return {name: len(items) for name, items in self._queues.items()}
@@ -11,6 +11,8 @@ class TradeState(Enum):
     MONITORING = "MONITORING"
     CLOSED = "CLOSED"
     FAILED = "FAILED"
+    DUPLICATE = "DUPLICATE"  # collapsed into an earlier signal for the same mint; never persisted
+    HALTED = "HALTED"  # refused at admission while trading is halted host-wide; never persisted
 
 class TradeOrchestrator:
     def __init__(self):
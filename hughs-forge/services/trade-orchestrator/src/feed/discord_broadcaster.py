@@ -4,16 +4,27 @@ Discord Webhook Broadcaster for The Assassins Ledger.
 Rate limited to max 5 messages per minute (token bucket).
 Sends embed messages for trade events: executed, failed, rejected.
 Scanner rejections and balance alerts use a separate rate limiter.
+
+Broadcast calls never touch the network: embeds are handed to a
+WebhookDispatcher (feed/webhook_dispatcher.py) that batches and delivers
+them from its own thread.
+
+Scanner rejections and retry-queue events are summarised by a
+RejectionDigest (feed/rejection_digest.py): one embed per
+DISCORD_SCANNER_DIGEST_SECONDS window (default 60). Set it to 0 for the
+old per-token embeds under the scanner rate limit.
 """
 
 import os
 import time
 import threading
-import requests
 import logging
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+from feed.rejection_digest import RejectionDigest
+from feed.webhook_dispatcher import PRIORITY_REJECTED, PRIORITY_SCANNER, PRIORITY_TRADE, WebhookDispatcher
+
 logger = logging.getLogger("discord_broadcaster")
 
 # Rate limiting: 5 messages per minute (12 seconds between tokens)
@@ -25,9 +36,12 @@ TOKEN_REFRESH_RATE = RATE_LIMIT_INTERVAL / RATE_LIMIT_TOKENS  # ~12s
 SCANNER_RATE_LIMIT_TOKENS = 10
 SCANNER_TOKEN_REFRESH_RATE = RATE_LIMIT_INTERVAL / SCANNER_RATE_LIMIT_TOKENS  # 6s
 
+# Scanner digest window (0 = per-token embeds)
+SCANNER_DIGEST_SECONDS = 60.0
+
 
 class DiscordBroadcaster:
-    def __init__(self, webhook_url: Optional[str] = None):
+    def __init__(self, webhook_url: Optional[str] = None, digest_seconds: Optional[float] = None):
         self.webhook_url = webhook_url or os.getenv("DISCORD_TRADE_ALERTS_WEBHOOK")
         self.logger = logging.getLogger("DiscordBroadcaster")
         self._tokens = RATE_LIMIT_TOKENS
@@ -40,6 +54,12 @@ class DiscordBroadcaster:
         # Scanner rejection counter (for batching info)
         self._scanner_rejected_count = 0
         self._scanner_rejected_since = time.time()
+        self.dispatcher = WebhookDispatcher(self.webhook_url) if self.webhook_url else None
+        if digest_seconds is None:
+            digest_seconds = float(os.getenv("DISCORD_SCANNER_DIGEST_SECONDS", SCANNER_DIGEST_SECONDS))
+        self.digest = None
+        if digest_seconds > 0 and self.webhook_url:
+            self.digest = RejectionDigest(lambda embed: self._send(embed, PRIORITY_SCANNER), window_seconds=digest_seconds)
 
     def _refill_tokens(self):
         now = time.time()
@@ -110,13 +130,17 @@ class DiscordBroadcaster:
             return
 
         embed = self._build_rejected_embed(trade_data)
-        self._send(embed)
+        self._send(embed, PRIORITY_REJECTED)
 
     def broadcast_scanner_rejected(self, token_data: Dict[str, Any]):
-        """Send an embed for scanner-level rejection (momentum check)."""
+        """Adds a scanner-level rejection (momentum check) to the digest, or sends it as its own embed."""
         if not self.webhook_url:
             return
 
+        if self.digest:
+            self.digest.add_rejected(token_data)
+            return
+
         self._scanner_rejected_count += 1
 
         if not self._consume_scanner_token():
@@ -128,12 +152,15 @@ class DiscordBroadcaster:
         self._scanner_rejected_count = 0
 
         embed = self._build_scanner_rejected_embed(token_data, skipped)
-        self._send(embed)
+        self._send(embed, PRIORITY_SCANNER)
 
     def broadcast_queued_for_retry(self, token_data: Dict[str, Any]):
-        """Send an embed when a token is queued for retry (no DEX data yet)."""
+        """Reports a token queued for retry (no DEX data yet) via the digest, or as its own embed."""
         if not self.webhook_url:
             return
+        if self.digest:
+            self.digest.add_queued(token_data)
+            return
         if not self._consume_scanner_token():
             return
         mint = token_data.get("mint", "")
@@ -150,7 +177,7 @@ class DiscordBroadcaster:
                 {"name": "Queue Size", "value": str(queue_size), "inline": True},
             ]
         }
-        self._send(embed)
+        self._send(embed, PRIORITY_SCANNER)
 
     def broadcast_balance_alert(self, balance_sol: float, alert_type: str, threshold: float):
         """Send balance alert (low or high)."""
@@ -312,11 +339,17 @@ class DiscordBroadcaster:
                 ]
             }
 
-    def _send(self, embed: Dict[str, Any]):
-        payload = {"embeds": [embed]}
-        try:
-            resp = requests.post(self.webhook_url, json=payload, timeout=10)
-            if resp.status_code >= 400:
-                self.logger.warning(f"Discord webhook returned {resp.status_code}: {resp.text[:200]}")
-        except Exception as e:
-            self.logger.error(f"Failed to send Discord webhook: {e}")
+    def _send(self, embed: Dict[str, Any], priority: int = PRIORITY_TRADE):
+        """Queues the embed for the dispatcher thread; returns immediately."""
+        if self.dispatcher is None or not self.dispatcher.submit(embed, priority):
+            self.logger.warning("Discord queue full; dropping embed")
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Waits until every queued embed has been delivered (the open digest window is not closed)."""
+        return self.dispatcher.flush(timeout) if self.dispatcher else True
+
+    def close(self, timeout: float = 10.0):
+        if self.digest:
+            self.digest.close()
+        if self.dispatcher:
+            self.dispatcher.close(timeout)
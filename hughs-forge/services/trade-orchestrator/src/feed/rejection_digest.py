@@ -0,0 +1,226 @@
+"""
+Windowed digest of scanner rejections for the Discord feed.
+
+Instead of one embed per rejected token, rejections are grouped by reason
+(numbers stripped, so "Liquidity too thin ($812 < $5000)" and
+"Liquidity too thin ($40 < $5000)" land in the same group) and summarised
+once per window: a count per group plus the top-N tokens of each group by
+liquidity. Tokens queued for retry (no DEX data yet) get their own group.
+Memory per window is bounded by the number of groups times top-N, so the
+Discord traffic is one embed per window whatever the discovery rate.
+"""
+
+import heapq
+import itertools
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from feed.webhook_dispatcher import MAX_EMBED_CHARS_PER_MESSAGE
+
+QUEUED_GROUP = "Queued - waiting for DEX data"
+OTHER_GROUP = "Other"
+
+# Discord embed limits
+MAX_FIELDS = 25
+MAX_FIELD_VALUE = 1024
+
+_PARENTHESISED = re.compile(r"\s*\([^)]*\)")
+_NUMBER = re.compile(r"\$?-?\d[\d,]*(\.\d+)?%?")
+
+
+def reason_key(reason: str) -> str:
+    """Groups reasons that only differ in their numbers."""
+    key = _PARENTHESISED.sub("", reason or "")
+    key = _NUMBER.sub("#", key)
+    return " ".join(key.split())[:200] or "Unknown"
+
+
+class _Group:
+    __slots__ = ("count", "top", "last_example")
+
+    def __init__(self):
+        self.count = 0
+        # Min-heap of (liquidity, seq, token) holding the top-N by liquidity
+        self.top: List[Tuple[float, int, Dict[str, Any]]] = []
+        self.last_example = ""
+
+
+class RejectionDigest:
+    def __init__(self, emit: Callable[[Dict[str, Any]], None], window_seconds: float = 60.0, top_n: int = 3,
+                 max_groups: int = MAX_FIELDS - 1):
+        self.emit = emit
+        self.window_seconds = window_seconds
+        self.top_n = top_n
+        self.max_groups = max_groups
+        self._lock = threading.Condition()
+        self._seq = itertools.count()
+        self._reset(time.time())
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def _reset(self, now: float):
+        self._groups: Dict[str, _Group] = {}
+        self._rejected = 0
+        self._queued = 0
+        self._queue_size: Any = None
+        self._recent_queued: Deque[Dict[str, Any]] = deque(maxlen=self.top_n)
+        self._window_start = now
+
+    # --- Producers ------------------------------------------------------------------
+
+    def add_rejected(self, token_data: Dict[str, Any]):
+        reasons = token_data.get("reasons") or [token_data.get("reason", "Unknown")]
+        metrics = token_data.get("metrics") or {}
+        token = {
+            "mint": token_data.get("mint", "N/A"),
+            "symbol": token_data.get("symbol", "???"),
+            "liquidity": float(metrics.get("liquidity") or 0),
+            "fdv": float(metrics.get("fdv") or 0),
+            "volume_1h": float(metrics.get("volume_1h") or 0),
+            "url": metrics.get("url", ""),
+        }
+        with self._lock:
+            self._start_window_if_idle()
+            self._rejected += 1
+            # A token failing several checks counts once in each of their groups
+            for reason in dict.fromkeys(reasons):
+                key = reason_key(reason)
+                group = self._groups.get(key)
+                if group is None:
+                    if len(self._groups) >= self.max_groups:
+                        key = OTHER_GROUP
+                        group = self._groups.get(key)
+                    if group is None:
+                        group = self._groups[key] = _Group()
+                group.count += 1
+                group.last_example = reason
+                entry = (float(token["liquidity"]), next(self._seq), token)
+                if len(group.top) < self.top_n:
+                    heapq.heappush(group.top, entry)
+                elif entry[0] > group.top[0][0]:
+                    heapq.heapreplace(group.top, entry)
+        self._ensure_thread()
+
+    def add_queued(self, token_data: Dict[str, Any]):
+        with self._lock:
+            self._start_window_if_idle()
+            self._queued += 1
+            self._queue_size = token_data.get("queue_size", self._queue_size)
+            self._recent_queued.append({"mint": token_data.get("mint", "N/A"),
+                                        "symbol": token_data.get("symbol", "UNKNOWN")})
+        self._ensure_thread()
+
+    def _start_window_if_idle(self):
+        # The window opens with its first event, not when the previous (empty) one closed
+        if not self._rejected and not self._queued:
+            self._window_start = time.time()
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None and not self._stopped:
+                    self._thread = threading.Thread(target=self._run, daemon=True, name="Rejection-Digest")
+                    self._thread.start()
+
+    # --- Window -----------------------------------------------------------------------
+
+    def flush(self, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Closes the current window; emits and returns its summary embed (None if it was empty)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            if not self._rejected and not self._queued:
+                self._window_start = now
+                return None
+            embed = self._build_embed(now)
+            self._reset(now)
+        self.emit(embed)
+        return embed
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._stopped:
+                    self._lock.wait(max(0.0, self._window_start + self.window_seconds - time.time()))
+                stopped = self._stopped
+                due = time.time() >= self._window_start + self.window_seconds
+            if due or stopped:
+                self.flush()
+            if stopped:
+                return
+
+    def close(self):
+        """Emits the partial window and stops the timer thread."""
+        with self._lock:
+            self._stopped = True
+            self._lock.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        else:
+            self.flush()
+
+    # --- Embed ------------------------------------------------------------------------
+
+    def _build_embed(self, now: float) -> Dict[str, Any]:
+        span = max(1, int(round(now - self._window_start)))
+        parts = [f"**{self._rejected}** rejected"]
+        if self._queued:
+            parts.append(f"**{self._queued}** queued for DEX data")
+        fields = []
+        # Everything in one embed must stay under Discord's per-message character limit
+        budget = MAX_EMBED_CHARS_PER_MESSAGE - 200
+        for key, group in sorted(self._groups.items(), key=lambda kv: -kv[1].count):
+            top = sorted(group.top, reverse=True)
+            lines = [_token_line(token) for _, _, token in top]
+            if group.count > len(top):
+                lines.append(f"+{group.count - len(top)} more")
+            name = group.last_example if group.count == 1 else key
+            fields.append({"name": f"{name[:230]} - {group.count}", "lines": lines})
+        if self._queued:
+            lines = [f"**{t['symbol']}** `{t['mint']}`" for t in reversed(self._recent_queued)]
+            if self._queue_size is not None:
+                lines.append(f"Queue size: {self._queue_size}")
+            # Listed first so it survives truncation; it is a different kind of event
+            fields.insert(0, {"name": f"{QUEUED_GROUP} - {self._queued}", "lines": lines})
+        embed_fields = []
+        for field in fields[:MAX_FIELDS]:
+            if budget - len(field["name"]) < 100:
+                break
+            value = _clip(field["lines"], min(MAX_FIELD_VALUE, budget - len(field["name"])))
+            embed_fields.append({"name": field["name"], "value": value, "inline": False})
+            budget -= len(field["name"]) + len(value)
+        return {
+            "title": f"Scanner Digest - last {_duration(span)}",
+            "description": ", ".join(parts),
+            "color": 16744448,  # orange
+            "timestamp": datetime.utcfromtimestamp(now).isoformat(),
+            "fields": embed_fields,
+        }
+
+
+def _token_line(token: Dict[str, Any]) -> str:
+    line = (f"**{token['symbol']}** `{token['mint']}` liq ${token['liquidity']:,.0f} | "
+            f"FDV ${token['fdv']:,.0f} | vol 1h ${token['volume_1h']:,.0f}")
+    if token["url"]:
+        line += f" [Chart]({token['url']})"
+    return line
+
+
+def _clip(lines: List[str], limit: int = MAX_FIELD_VALUE) -> str:
+    value = ""
+    for line in lines:
+        if len(value) + len(line) + 1 > limit:
+            break
+        value += line + "\n"
+    return value.rstrip() or "-"
+
+
+def _duration(seconds: int) -> str:
+    if seconds < 120:
+        return f"{seconds}s"
+    if seconds < 7200:
+        return f"{seconds // 60}m"
+    return f"{seconds // 3600}h"
@@ -0,0 +1,151 @@
+"""
+Bucketed rolling aggregates for the Assassins Ledger stats.
+
+A RollingWindow splits its span into fixed buckets (a ring indexed by
+ts // bucket_seconds). Adding a trade touches one bucket and the running
+totals; a bucket that falls out of the window is subtracted from the totals
+when its slot is reused, so both add and expiry are O(1) per trade.
+Top tokens come from a small Space-Saving heavy-hitter summary per bucket,
+merged on read.
+"""
+
+import heapq
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter summary (Metwally et al.) with at most `capacity` counters.
+
+    Any key with true frequency above n / capacity is guaranteed to be present;
+    counts are upper bounds, overestimating by at most the evicted minimum.
+    """
+    def __init__(self, capacity: int = 32):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+
+    def add(self, key: str, n: int = 1):
+        if key in self.counts or len(self.counts) < self.capacity:
+            self.counts[key] = self.counts.get(key, 0) + n
+            return
+        # Replace the smallest counter; the newcomer inherits its count
+        victim = min(self.counts, key=self.counts.__getitem__)
+        floor = self.counts.pop(victim)
+        self.counts[key] = floor + n
+
+    def clear(self):
+        self.counts.clear()
+
+
+class _Bucket:
+    __slots__ = ("epoch", "count", "success", "volume", "fees", "routes", "tokens")
+
+    def __init__(self, heavy_hitters: int):
+        self.epoch = -1
+        self.count = 0
+        self.success = 0
+        self.volume = 0.0
+        self.fees = 0
+        self.routes: Dict[str, int] = {}
+        self.tokens = SpaceSaving(heavy_hitters)
+
+    def reset(self, epoch: int):
+        self.epoch = epoch
+        self.count = 0
+        self.success = 0
+        self.volume = 0.0
+        self.fees = 0
+        self.routes.clear()
+        self.tokens.clear()
+
+
+class RollingWindow:
+    def __init__(self, window_seconds: float, bucket_seconds: float, heavy_hitters: int = 32):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.size = max(1, int(round(window_seconds / bucket_seconds)))
+        self._buckets = [_Bucket(heavy_hitters) for _ in range(self.size)]
+        # Running totals over every live bucket
+        self.count = 0
+        self.success = 0
+        self.volume = 0.0
+        self.fees = 0
+        self.routes: Dict[str, int] = {}
+        self._head = -1  # newest epoch seen
+
+    def _expire(self, bucket: _Bucket):
+        self.count -= bucket.count
+        self.success -= bucket.success
+        self.volume -= bucket.volume
+        self.fees -= bucket.fees
+        for route, n in bucket.routes.items():
+            left = self.routes[route] - n
+            if left:
+                self.routes[route] = left
+            else:
+                del self.routes[route]
+        if not self.count:
+            # Drop accumulated float error once the window is empty
+            self.volume = 0.0
+
+    def advance(self, ts: float):
+        """Expires every bucket older than the window ending at `ts`."""
+        epoch = int(ts // self.bucket_seconds)
+        if epoch <= self._head:
+            return
+        # At most `size` slots can need clearing, however far time jumped
+        start = max(self._head + 1, epoch - self.size + 1)
+        for e in range(start, epoch + 1):
+            bucket = self._buckets[e % self.size]
+            if bucket.epoch != e:
+                self._expire(bucket)
+                bucket.reset(e)
+        self._head = epoch
+
+    def add(self, ts: float, token: str, amount: float, route: Optional[str], fee_lamports: Optional[int],
+            success: bool) -> bool:
+        """Counts one finished trade. Returns False if `ts` is already outside the window."""
+        epoch = int(ts // self.bucket_seconds)
+        self.advance(ts)
+        if epoch <= self._head - self.size:
+            return False
+        bucket = self._buckets[epoch % self.size]
+        route = route or "UNKNOWN"
+        amount = amount or 0.0
+        fee_lamports = fee_lamports or 0
+
+        bucket.count += 1
+        bucket.success += int(success)
+        bucket.volume += amount
+        bucket.fees += fee_lamports
+        bucket.routes[route] = bucket.routes.get(route, 0) + 1
+        bucket.tokens.add(token or "unknown")
+
+        self.count += 1
+        self.success += int(success)
+        self.volume += amount
+        self.fees += fee_lamports
+        self.routes[route] = self.routes.get(route, 0) + 1
+        return True
+
+    def top_tokens(self, n: int = 5) -> List[Tuple[str, int]]:
+        merged: Dict[str, int] = {}
+        for bucket in self._buckets:
+            if bucket.epoch > self._head - self.size:
+                for token, count in bucket.tokens.counts.items():
+                    merged[token] = merged.get(token, 0) + count
+        return heapq.nlargest(n, merged.items(), key=lambda kv: kv[1])
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        self.advance(now)
+        count = self.count
+        return {
+            "period_seconds": self.window_seconds,
+            "trades_count": count,
+            "total_volume_usd": round(self.volume, 2),
+            "avg_trade_size_usd": round(self.volume / count, 2) if count else 0,
+            "success_rate": round(self.success / count, 4) if count else 0.0,
+            "total_fees_lamports": self.fees,
+            "route_distribution": dict(self.routes),
+            "top_tokens": [{"mint": mint, "count": c} for mint, c in self.top_tokens()],
+        }
@@ -1,8 +1,11 @@
 """
-Hourly Statistics Tracker for The Assassins Ledger.
+Rolling Statistics Tracker for The Assassins Ledger.
 
-Runs in a background thread, aggregates trades from the last hour,
-and writes to feed_stats.json.
+Subscribes to committed trade-state events (TradeStateManager.subscribe) and
+keeps bucketed rolling aggregates for several windows (5m, 1h, 24h), so
+get_current_stats() is always fresh and costs nothing per event beyond a few
+counter updates. A background thread writes feed_stats.json atomically
+whenever the numbers change (and when buckets roll out of a window).
 """
 
 import os
@@ -10,44 +13,145 @@ import time
 import threading
 import json
 import logging
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional
 import sqlite3
 
+from feed.rolling_stats import RollingWindow
+
 logger = logging.getLogger("stats_tracker")
 
+# window name -> (span seconds, bucket seconds)
+DEFAULT_WINDOWS = {
+    "5m": (300, 5),
+    "1h": (3600, 60),
+    "24h": (86400, 1440),
+}
+
+# A trade counts (once) from the transition that stamps executed_at, like _compute_stats;
+# trades rejected before execution never get one and stay out of success_rate
+
 class StatsTracker:
-    def __init__(self, db_path: str, output_path: str = "feed_stats.json", interval_seconds: int = 3600):
+    def __init__(self, db_path: str, output_path: str = "feed_stats.json", interval_seconds: int = 3600,
+                 windows: Optional[Dict[str, tuple]] = None, min_write_interval: float = 1.0):
         self.db_path = db_path
         self.output_path = output_path
+        # Upper bound between file refreshes when nothing happens (buckets still roll over)
         self.interval = interval_seconds
+        self.min_write_interval = min_write_interval
+        self.windows = {name: RollingWindow(span, bucket)
+                        for name, (span, bucket) in (windows or DEFAULT_WINDOWS).items()}
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
         self._stop_event = threading.Event()
         self._thread = threading.Thread(target=self._run, daemon=True)
+        # trade_ids already counted (bounded), so a seed overlapping live events never double counts
+        self._counted: "OrderedDict[str, None]" = OrderedDict()
         self._last_stats: Optional[Dict[str, Any]] = None
+        self._last_written: Optional[Dict[str, Any]] = None
 
     def start(self):
+        self.seed()
         self._thread.start()
         logger.info("StatsTracker started")
 
     def stop(self):
         self._stop_event.set()
+        self._changed.set()
         self._thread.join(timeout=5)
         logger.info("StatsTracker stopped")
 
+    # --- Event path -----------------------------------------------------------
+
+    def on_trade_event(self, event: Dict[str, Any]):
+        """TradeStateManager listener: counts transitions that carry executed_at into every window."""
+        if not event.get("executed_at"):
+            return
+        self._count(event["trade_id"], event.get("ts") or time.time(), event.get("token_address"),
+                    event.get("amount"), event.get("route"), event.get("fee_lamports"),
+                    event["state"] == "EXECUTED")
+
+    def _count(self, trade_id: str, ts: float, token: Optional[str], amount: Optional[float],
+               route: Optional[str], fee_lamports: Optional[int], success: bool):
+        with self._lock:
+            if trade_id in self._counted:
+                return
+            self._counted[trade_id] = None
+            if len(self._counted) > 100_000:
+                self._counted.popitem(last=False)
+            for window in self.windows.values():
+                window.add(ts, token, amount, route, fee_lamports, success)
+        self._changed.set()
+
+    def seed(self):
+        """Loads finished trades inside the longest window from SQLite (start-up / restart)."""
+        span = max(window.window_seconds for window in self.windows.values())
+        since = datetime.utcnow() - timedelta(seconds=span)
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                # executed_at range -> idx_trades_stats
+                rows = conn.execute('''
+                    SELECT trade_id, state, token_address, amount, route, fee_lamports, executed_at
+                    FROM trades WHERE executed_at IS NOT NULL AND executed_at >= ?
+                ''', (since.isoformat(),)).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not seed stats from {self.db_path}: {e}")
+            return
+        for trade_id, state, token, amount, route, fee, at in sorted(rows, key=lambda r: r[6]):
+            self._count(trade_id, _epoch(at), token, amount, route, fee, state == "EXECUTED")
+        logger.info(f"Seeded stats with {len(rows)} trade(s) since {since.isoformat()}")
+
+    # --- Reads ------------------------------------------------------------------
+
+    def get_current_stats(self) -> Dict[str, Any]:
+        """Fresh stats: every window under "windows", with the 1h window also at the top level."""
+        now = time.time()
+        with self._lock:
+            windows = {name: window.snapshot(now) for name, window in self.windows.items()}
+        hourly = windows.get("1h") or next(iter(windows.values()))
+        stats = {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "period_hours": hourly["period_seconds"] / 3600,
+            **{k: v for k, v in hourly.items() if k != "period_seconds"},
+            "windows": windows,
+        }
+        self._last_stats = stats
+        return stats
+
+    # --- File output ------------------------------------------------------------
+
+    def _next_rollover(self) -> float:
+        """Seconds until the smallest bucket boundary, when a window may drop old trades."""
+        now = time.time()
+        bucket = min(window.bucket_seconds for window in self.windows.values())
+        return min(self.interval, bucket - (now % bucket))
+
     def _run(self):
-        # Run once at startup after a short delay
-        time.sleep(10)
-        while not self._stop_event.wait(self.interval):
+        while not self._stop_event.is_set():
+            self._changed.wait(self._next_rollover())
+            self._changed.clear()
+            if self._stop_event.is_set():
+                break
             try:
-                stats = self._compute_stats()
-                self._write_stats(stats)
-                self._last_stats = stats
-                logger.info(f"Updated stats: {stats['timestamp']}")
+                self._write_if_changed()
             except Exception as e:
                 logger.error(f"Stats computation failed: {e}", exc_info=True)
+            # Debounce bursts of events into one write
+            self._stop_event.wait(self.min_write_interval)
+
+    def _write_if_changed(self) -> bool:
+        stats = self.get_current_stats()
+        comparable = {k: v for k, v in stats.items() if k != "timestamp"}
+        if comparable == self._last_written:
+            return False
+        self._write_stats(stats)
+        self._last_written = comparable
+        logger.info(f"Updated stats: {stats['timestamp']}")
+        return True
 
     def _compute_stats(self) -> Dict[str, Any]:
-        """Aggregate trade stats from the last hour."""
+        """Aggregate trade stats from the last hour straight from SQLite (reference for the rolling windows)."""
         now = datetime.utcnow()
         one_hour_ago = now - timedelta(hours=1)
 
@@ -98,13 +202,19 @@ class StatsTracker:
         }
 
     def _write_stats(self, stats: Dict[str, Any]):
-        """Write stats to JSON file."""
+        """Write stats to JSON file atomically (readers never see a partial file)."""
+        tmp_path = f"{self.output_path}.tmp"
         try:
-            with open(self.output_path, 'w') as f:
+            with open(tmp_path, 'w') as f:
                 json.dump(stats, f, indent=2)
+            os.replace(tmp_path, self.output_path)
         except Exception as e:
             logger.error(f"Failed to write stats file: {e}")
 
-    def get_current_stats(self) -> Optional[Dict[str, Any]]:
-        """Return the most recently computed stats."""
-        return self._last_stats
+
+def _epoch(value: str) -> float:
+    """executed_at (UTC isoformat, with or without a trailing Z) to unix time."""
+    parsed = datetime.fromisoformat(value.replace("Z", ""))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
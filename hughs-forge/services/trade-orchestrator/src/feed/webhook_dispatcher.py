@@ -0,0 +1,248 @@
+"""
+Background Discord webhook dispatcher.
+
+Broadcast calls only enqueue an embed (a deque append under a lock); a daemon
+thread packs up to 10 queued embeds into one webhook message, honours
+Discord's Retry-After / X-RateLimit-* headers, and retries transient
+failures. The queue is bounded: when it is full, the oldest embed of the
+lowest priority below the incoming one is dropped (or the incoming embed, if
+nothing less important is queued).
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple
+
+import requests
+
+from telemetry.metrics import REGISTRY, observe_upstream
+
+logger = logging.getLogger("webhook_dispatcher")
+
+# Lower value = more important
+PRIORITY_TRADE = 0      # executed / failed trades, balance alerts
+PRIORITY_REJECTED = 1   # orchestrator-level rejections
+PRIORITY_SCANNER = 2    # scanner rejections / retry queue
+
+# Discord webhook limits
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+BACKLOG = REGISTRY.gauge("discord_webhook_backlog", "Embeds queued or in flight in the webhook dispatcher")
+DROPPED = REGISTRY.counter("discord_embeds_dropped", "Embeds dropped because the dispatcher queue was full",
+                           ["priority"])
+
+
+def embed_chars(embed: Dict[str, Any]) -> int:
+    """Characters Discord counts towards the 6000-per-message embed limit."""
+    total = len(embed.get("title", "")) + len(embed.get("description", ""))
+    total += len((embed.get("footer") or {}).get("text", "")) + len((embed.get("author") or {}).get("name", ""))
+    for field in embed.get("fields", ()):
+        total += len(str(field.get("name", ""))) + len(str(field.get("value", "")))
+    return total
+
+
+class WebhookDispatcher:
+    def __init__(self, webhook_url: str, capacity: int = 256, timeout: float = 10.0, max_attempts: int = 3,
+                 priorities: int = 3):
+        self.webhook_url = webhook_url
+        self.capacity = capacity
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        # One FIFO lane per priority; items are (embed, attempts)
+        self._lanes: List[Deque[Tuple[Dict[str, Any], int]]] = [deque() for _ in range(priorities)]
+        self._size = 0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._not_before = 0.0  # rate-limit gate (monotonic)
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"queued": 0, "sent_embeds": 0, "messages": 0, "dropped": [0] * priorities,
+                      "rate_limited": 0, "failed": 0}
+        BACKLOG.set_function(self.pending)
+
+    # --- Producer side (any thread, never blocks on I/O) ---------------------------
+
+    def submit(self, embed: Dict[str, Any], priority: int = PRIORITY_TRADE) -> bool:
+        """Queues an embed. Returns False if it was dropped because the queue is full."""
+        priority = min(max(priority, 0), len(self._lanes) - 1)
+        with self._cond:
+            if self._stopped:
+                return False
+            if self._size >= self.capacity and not self._evict_below(priority):
+                self.stats["dropped"][priority] += 1
+                DROPPED.labels(priority).inc()
+                return False
+            self._lanes[priority].append((embed, 0))
+            self._size += 1
+            self.stats["queued"] += 1
+            # notify_all: flush() callers wait on the same condition
+            self._cond.notify_all()
+        self._ensure_thread()
+        return True
+
+    def _evict_below(self, priority: int) -> bool:
+        for lane_priority in range(len(self._lanes) - 1, priority, -1):
+            lane = self._lanes[lane_priority]
+            if lane:
+                lane.popleft()
+                self._size -= 1
+                self.stats["dropped"][lane_priority] += 1
+                DROPPED.labels(lane_priority).inc()
+                return True
+        return False
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._cond:
+                if self._thread is None and not self._stopped:
+                    self._thread = threading.Thread(target=self._run, daemon=True, name="Discord-Dispatcher")
+                    self._thread.start()
+
+    # --- Consumer side ------------------------------------------------------------
+
+    def _take_batch(self) -> List[Tuple[int, Dict[str, Any], int]]:
+        """Most important embeds first, up to 10 per message and 6000 embed characters."""
+        batch, chars = [], 0
+        for priority, lane in enumerate(self._lanes):
+            while lane and len(batch) < MAX_EMBEDS_PER_MESSAGE:
+                embed, attempts = lane[0]
+                size = embed_chars(embed)
+                if batch and chars + size > MAX_EMBED_CHARS_PER_MESSAGE:
+                    return batch
+                lane.popleft()
+                self._size -= 1
+                batch.append((priority, embed, attempts))
+                chars += size
+        return batch
+
+    def _requeue(self, batch: List[Tuple[int, Dict[str, Any], int]], count_attempt: bool):
+        with self._cond:
+            for priority, embed, attempts in reversed(batch):
+                attempts += int(count_attempt)
+                if attempts >= self.max_attempts:
+                    self.stats["failed"] += 1
+                    continue
+                self._lanes[priority].appendleft((embed, attempts))
+                self._size += 1
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._size and not self._stopped:
+                    self._cond.wait()
+                if not self._size and self._stopped:
+                    return
+                delay = self._not_before - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                batch = self._take_batch()
+                self._in_flight = len(batch)
+            try:
+                self._deliver(batch)
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+
+    def _deliver(self, batch: List[Tuple[int, Dict[str, Any], int]]):
+        payload = {"embeds": [embed for _, embed, _ in batch]}
+        started = time.perf_counter()
+        try:
+            resp = requests.post(self.webhook_url, json=payload, timeout=self.timeout)
+        except Exception as e:
+            observe_upstream(self.webhook_url, started, error=True)
+            logger.error(f"Failed to send Discord webhook: {e}")
+            self._backoff(1.0)
+            self._requeue(batch, count_attempt=True)
+            return
+
+        status = resp.status_code
+        observe_upstream(self.webhook_url, started, status)
+        headers = resp.headers
+        if status == 429:
+            self.stats["rate_limited"] += 1
+            retry_after = _retry_after(resp, headers)
+            logger.warning(f"Discord rate limited; retrying {len(batch)} embed(s) in {retry_after:.2f}s")
+            self._backoff(retry_after)
+            self._requeue(batch, count_attempt=False)
+            return
+        if status >= 500:
+            logger.warning(f"Discord webhook returned {status}; will retry")
+            self._backoff(1.0)
+            self._requeue(batch, count_attempt=True)
+            return
+        if status == 400 and len(batch) > 1:
+            # One malformed embed rejects the whole message: resend them one by one to isolate it
+            logger.warning(f"Discord webhook returned 400 for {len(batch)} embeds; resending them individually")
+            self._deliver_individually(batch)
+            return
+        if status >= 400:
+            logger.warning(f"Discord webhook returned {status}: {resp.text[:200]}")
+            self.stats["failed"] += len(batch)
+            return
+
+        self.stats["messages"] += 1
+        self.stats["sent_embeds"] += len(batch)
+        # Bucket exhausted: wait for it to reset before the next message instead of eating a 429
+        if str(headers.get("X-RateLimit-Remaining", "")) == "0":
+            self._backoff(_float(headers.get("X-RateLimit-Reset-After"), 1.0))
+
+    def _deliver_individually(self, batch: List[Tuple[int, Dict[str, Any], int]]):
+        for i, item in enumerate(batch):
+            if self._not_before > time.monotonic():
+                # Rate limited or backing off part-way through: the rest goes back to the queue
+                self._requeue(batch[i:], count_attempt=False)
+                return
+            self._deliver([item])
+
+    def _backoff(self, seconds: float):
+        with self._cond:
+            self._not_before = max(self._not_before, time.monotonic() + seconds)
+
+    # --- Lifecycle ------------------------------------------------------------------
+
+    def pending(self) -> int:
+        with self._cond:
+            return self._size + self._in_flight
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Blocks until everything queued has been delivered (or given up on)."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._size or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """Delivers what is queued (within `timeout`) and stops the dispatcher thread."""
+        self.flush(timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+
+def _float(value: Any, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _retry_after(resp: requests.Response, headers: Mapping[str, str]) -> float:
+    """Discord sends retry_after (seconds) in the JSON body and Retry-After in the headers."""
+    try:
+        body = resp.json()
+        if isinstance(body, dict) and "retry_after" in body:
+            return float(body["retry_after"])
+    except Exception:
+        pass
+    return _float(headers.get("Retry-After"), 1.0)
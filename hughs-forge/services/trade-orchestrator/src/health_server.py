@@ -1,7 +1,9 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 import datetime
 import logging
 
+from telemetry.metrics import CONTENT_TYPE, REGISTRY
+
 logger = logging.getLogger(__name__)
 
 # Standard version for the fleet
@@ -19,6 +21,11 @@ def health_check():
         "service": "TradeOrchestrator"
     }
 
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint (see telemetry/metrics.py)."""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
 def start_orchestrator_health_server(port=8002):
     """Starts the health server using uvicorn."""
     import uvicorn
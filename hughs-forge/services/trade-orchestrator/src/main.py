@@ -13,6 +13,7 @@ if RISK_MANAGER_SRC not in sys.path:
 from core.orchestrator import TradeOrchestrator
 from core.event_loop import EventLoop
 from telemetry.logger import setup_telemetry_logger
+from telemetry.tracing import configure_tracing
 from health_server import start_orchestrator_health_server
 from feed.discord_broadcaster import DiscordBroadcaster
 from feed.stats_tracker import StatsTracker
@@ -21,6 +22,7 @@ def main(dry_run=False):
     parser = argparse.ArgumentParser(description="Hugh's Trade Orchestrator Engine")
     parser.add_argument('--db', type=str, default="trades.db", help="Path to SQLite persistence database")
     parser.add_argument('--log', type=str, default="logs/orchestrator.jsonl", help="Path to JSONL telemetry log")
+    parser.add_argument('--traces', type=str, default="logs/traces.jsonl", help="Path of the OTLP/JSON span export ('' disables tracing)")
     parser.add_argument('--health-port', type=int, default=8002, help="Port for the /health endpoint")
     parser.add_argument('--dry-run', action='store_true', help="Run without loading wallet keys")
     args = parser.parse_args()
@@ -28,6 +30,7 @@ def main(dry_run=False):
     # Initialize Telemetry
     logger = setup_telemetry_logger(log_file=args.log)
     logger.info("Initializing the Trade Orchestrator", extra={"payload": {"db_path": args.db, "version": "0.1.0"}})
+    configure_tracing(args.traces)
 
     # Start the health server in a daemon thread
     health_thread = threading.Thread(
@@ -47,6 +50,8 @@ def main(dry_run=False):
     orchestrator = TradeOrchestrator(db_path=args.db, dry_run=args.dry_run)
     # Inject broadcaster into orchestrator (or broadcast via event hooks)
     orchestrator.discord_broadcaster = discord_broadcaster  # type: ignore
+    # Rolling stats are fed by committed trade transitions instead of re-reading the DB
+    orchestrator.state_manager.subscribe(stats_tracker.on_trade_event)
     event_loop = EventLoop(orchestrator)
 
     # Start the event loop in a daemon thread
@@ -59,10 +64,13 @@ def main(dry_run=False):
         # Main thread simply sleeps and watches the world burn (or listens to Hugh's signals)
         while True:
             time.sleep(30)
+            # Quiet periods still fail approvals nobody answered
+            orchestrator.expire_approvals()
     except KeyboardInterrupt:
         logger.info("Shutting down...")
         stats_tracker.stop()
         orchestrator.stop()
+        discord_broadcaster.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
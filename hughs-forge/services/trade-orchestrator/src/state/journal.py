@@ -0,0 +1,228 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .state_manager import TradeStateManager
+from telemetry.metrics import REGISTRY
+
+PENDING = REGISTRY.gauge("trade_journal_pending", "Journaled transitions waiting for a group commit")
+
+# States that must be on disk before process_signal returns
+DEFAULT_SYNC_STATES = frozenset({"EXECUTED", "FAILED"})
+# A replayed intermediate state must never overwrite one of these
+FINAL_STATES = frozenset({"EXECUTED", "FAILED", "CLOSED"})
+
+
+class TradeJournal:
+    """
+    Write-behind front for TradeStateManager.
+
+    Intermediate transitions (SIGNAL_RECEIVED, VALIDATING, ROUTING, ...) are
+    appended to an in-memory ring and to an append-only journal file (written
+    to the OS, not fsynced), then group-committed to SQLite by a flusher thread
+    every `flush_interval_s` or as soon as `batch_size` entries are pending.
+    States in `sync_states` drain the ring and commit synchronously with
+    synchronous=FULL before save_trade returns.
+
+    On start-up any entries left in the journal file by a crash are replayed
+    into SQLite, so a transition acknowledged by save_trade survives a process
+    crash even if it never reached a group commit.
+    """
+    def __init__(self, state_manager: TradeStateManager,
+                 journal_path: Optional[str] = None,
+                 flush_interval_s: float = 0.05,
+                 batch_size: int = 64,
+                 capacity: int = 4096,
+                 sync_states: Iterable[str] = DEFAULT_SYNC_STATES):
+        self.state_manager = state_manager
+        self.journal_path = journal_path
+        self.flush_interval_s = flush_interval_s
+        self.batch_size = batch_size
+        self.capacity = capacity
+        self.sync_states = frozenset(sync_states)
+        self.logger = logging.getLogger("TradeJournal")
+
+        self._ring: Deque[Dict[str, Any]] = deque()
+        self._cond = threading.Condition()
+        # Serialises commits so the flusher and a sync caller never reorder a trade's transitions
+        self._commit_lock = threading.Lock()
+        self._journal_file = None
+        self._stopped = False
+        # trade_id -> (data dict, shallow snapshot of it) last written to the journal file; a repeat of
+        # the same object with unchanged contents is not re-serialised
+        self._journaled_data: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+
+        self.stats = {"enqueued": 0, "group_commits": 0, "sync_commits": 0, "replayed": 0}
+
+        if journal_path:
+            self.stats["replayed"] = self.recover()
+            self._journal_file = open(journal_path, "a", encoding="utf-8")
+
+        PENDING.set_function(self.pending)
+
+        self._flusher = threading.Thread(target=self._run, daemon=True, name="TradeJournal-Flusher")
+        self._flusher.start()
+
+    # --- Hot path ---------------------------------------------------------------
+
+    def save_trade(self, trade_id: str, state: str, token_address: str, amount: float, data: Dict[str, Any],
+                   sync: Optional[bool] = None, **enriched):
+        """
+        Same arguments as TradeStateManager.save_trade. Returns once the transition is
+        journaled; pass sync=True (or use a state in sync_states) to wait for the commit.
+        """
+        # ts is the transition time, not the commit time, and doubles as the replay idempotency key
+        entry = {"trade_id": trade_id, "state": state, "token_address": token_address,
+                 "amount": amount, "data": data, "ts": time.time()}
+        entry.update({k: v for k, v in enriched.items() if v is not None})
+
+        if sync is None:
+            sync = state in self.sync_states
+        if sync:
+            with self._commit_lock:
+                self._journaled_data.pop(trade_id, None)
+                # Pending transitions ride along in the same fsynced transaction
+                self._commit(self._drain() + [entry], durable=True)
+                self.stats["sync_commits"] += 1
+                self._truncate_if_idle()
+            return
+
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("TradeJournal is closed")
+            if self._journal_file is not None:
+                record = entry
+                last = self._journaled_data.get(trade_id)
+                if last is not None and last[0] is data and last[1] == data:
+                    # Unchanged blob (the orchestrator passes the same signal dict per transition)
+                    record = {k: v for k, v in entry.items() if k != "data"}
+                else:
+                    # The snapshot catches callers that mutate the dict in place between transitions
+                    self._journaled_data[trade_id] = (data, dict(data))
+                self._journal_file.write(json.dumps(record, default=str) + "\n")
+                self._journal_file.flush()
+            self._ring.append(entry)
+            self.stats["enqueued"] += 1
+            pending = len(self._ring)
+            if pending >= self.batch_size:
+                self._cond.notify()
+        if pending >= self.capacity:
+            # Backpressure: the flusher is behind, so commit inline rather than grow without bound
+            self.flush()
+
+    def pending(self) -> int:
+        return len(self._ring)
+
+    def get_trade(self, trade_id: str) -> Optional[Dict[str, Any]]:
+        """Read-your-writes: commits anything pending before reading."""
+        self.flush()
+        return self.state_manager.get_trade(trade_id)
+
+    # --- Group commit -------------------------------------------------------------
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            entries = list(self._ring)
+            self._ring.clear()
+        return entries
+
+    def _commit(self, entries: List[Dict[str, Any]], durable: bool = False):
+        if not entries:
+            return
+        try:
+            self.state_manager.save_trades(entries, durable=durable)
+            if not durable:
+                self.stats["group_commits"] += 1
+        except Exception:
+            # Put the journaled ones back in front so the next flush retries them in order
+            requeue = entries[:-1] if durable else entries
+            with self._cond:
+                self._ring.extendleft(reversed(requeue))
+            raise
+
+    def _truncate_if_idle(self):
+        """Everything journaled is now in SQLite; start the journal file over."""
+        with self._cond:
+            if self._journal_file is not None and not self._ring and self._journal_file.tell():
+                self._journal_file.seek(0)
+                self._journal_file.truncate()
+                self._journaled_data.clear()
+
+    def flush(self):
+        """Synchronously commits every pending transition."""
+        with self._commit_lock:
+            self._commit(self._drain())
+            self._truncate_if_idle()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopped and len(self._ring) < self.batch_size:
+                    self._cond.wait(self.flush_interval_s)
+                stopped = self._stopped
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.error(f"Group commit failed, will retry: {e}")
+            if stopped:
+                return
+
+    def close(self):
+        """Stops the flusher, commits what is pending and closes the journal file."""
+        with self._cond:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._cond.notify()
+        self._flusher.join()
+        self.flush()
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+    # --- Crash recovery -----------------------------------------------------------
+
+    def recover(self) -> int:
+        """Replays a journal file left behind by a crash. Returns the number of entries applied."""
+        if not self.journal_path or not os.path.exists(self.journal_path):
+            return 0
+        entries = []
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Torn final write from the crash; nothing after it was acknowledged
+                    self.logger.warning("Dropping truncated journal tail")
+                    break
+
+        replay = []
+        final = {}
+        last_data: Dict[str, Dict[str, Any]] = {}
+        for entry in entries:
+            trade_id = entry["trade_id"]
+            if "data" in entry:
+                last_data[trade_id] = entry["data"]
+            else:
+                # Written without its blob: same data as the trade's previous journal record
+                entry["data"] = last_data.get(trade_id, {})
+            if trade_id not in final:
+                row = self.state_manager.get_trade(trade_id)
+                final[trade_id] = bool(row and row["state"] in FINAL_STATES)
+            # The sync path already wrote a later, final state for this trade
+            if final[trade_id] and entry["state"] not in FINAL_STATES:
+                continue
+            # Committed before the crash but the journal had not been truncated yet
+            if "ts" in entry and self.state_manager.has_event(trade_id, entry["state"], entry["ts"]):
+                continue
+            replay.append(entry)
+
+        self.state_manager.save_trades(replay)
+        os.truncate(self.journal_path, 0)
+        if replay:
+            self.logger.info(f"Replayed {len(replay)} journaled transition(s) from {self.journal_path}")
+        return len(replay)
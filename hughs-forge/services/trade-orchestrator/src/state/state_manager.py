@@ -1,19 +1,110 @@
 import sqlite3
 import json
 import logging
-from typing import Dict, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from telemetry.metrics import REGISTRY
+
+COMMIT_SECONDS = REGISTRY.histogram("sqlite_commit_duration_seconds",
+                                    "save_trades transaction latency by synchronous mode", ["synchronous"])
+COMMITTED_ENTRIES = REGISTRY.counter("sqlite_committed_transitions", "Trade transitions committed to SQLite")
+
+# Assassins Ledger columns (see migrate_trades_schema.py); created up front for new databases
+ENRICHED_COLUMNS = [
+    ("entry_price", "REAL"),
+    ("exit_price", "REAL"),
+    ("rejection_reason", "TEXT"),
+    ("route", "TEXT"),
+    ("tx_signature", "TEXT"),
+    ("slippage_bps", "INTEGER"),
+    ("fee_lamports", "INTEGER"),
+    ("executed_at", "TIMESTAMP"),
+]
+
+# Secondary indexes on trades (shared with migrate_trades_schema.py)
+TRADE_INDEXES = [
+    # StatsTracker._compute_stats: range on executed_at, every selected column in the index (covering);
+    # partial, since rejected/in-flight trades never get an executed_at
+    ("idx_trades_stats",
+     "trades (executed_at, state, token_address, amount, route, fee_lamports, slippage_bps) "
+     "WHERE executed_at IS NOT NULL"),
+    # find_trades(state=...): newest first within a state, trade_id included so the listing is covering
+    ("idx_trades_state_updated", "trades (state, updated_at, trade_id, token_address, amount)"),
+    # token_address is immutable per trade (never in the upsert SET clause), so this one is write-once
+    ("idx_trades_token", "trades (token_address)"),
+]
+
+# trades.data for rows written since the trade_signals/trade_events split; the real blob lives in trade_signals
+EMPTY_DATA = "{}"
 
 class TradeStateManager:
-    def __init__(self, db_path: str = "trades.db"):
+    """
+    SQLite-backed trade state.
+
+    Each thread keeps one long-lived connection in WAL mode with
+    synchronous=NORMAL, so a state transition is a single cached-statement
+    execute plus a WAL append instead of connect + schema parse + fsync.
+
+    Storage is split three ways: `trade_signals` holds the signal blob, written
+    once per trade; `trade_events` gets one compact row per transition whose
+    payload only carries the keys that differ from the signal; `trades` keeps
+    just the latest state and enriched columns for each trade.
+    """
+    def __init__(self, db_path: str = "trades.db", statement_cache_size: int = 128, signal_cache_size: int = 4096):
         self.db_path = db_path
+        self.statement_cache_size = statement_cache_size
+        self.signal_cache_size = signal_cache_size
         self.logger = logging.getLogger("TradeStateManager")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        # (column names...) -> upsert SQL; sqlite3 caches the prepared statement per SQL string
+        self._upsert_sql: Dict[Tuple[str, ...], str] = {}
+        # trade_id -> signal data, so event payloads can be diffed without a read
+        self._signals: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._signals_lock = threading.Lock()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
         self._init_db()
 
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]):
+        """
+        Registers a callback fired once per transition after it is committed, with the
+        save_trade fields (trade_id, state, token_address, amount, ts, enriched columns, data).
+        Runs on the committing thread, so it must be cheap.
+        """
+        self._listeners.append(callback)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, cached_statements=self.statement_cache_size, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Closes every per-thread connection opened by this manager."""
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            # Base schema - migration will add enriched columns
-            cursor.execute('''
+        conn = self._connect()
+        with conn:
+            # Base schema; enriched columns are added below (migrate_trades_schema.py does the same for old DBs)
+            conn.execute('''
                 CREATE TABLE IF NOT EXISTS trades (
                     trade_id TEXT PRIMARY KEY,
                     state TEXT NOT NULL,
@@ -24,7 +115,104 @@ class TradeStateManager:
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
-            conn.commit()
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(trades)")}
+            for col_name, col_type in ENRICHED_COLUMNS:
+                if col_name not in existing:
+                    conn.execute(f"ALTER TABLE trades ADD COLUMN {col_name} {col_type}")
+            create_event_tables(conn)
+            create_trade_indexes(conn)
+
+    def _upsert_statement(self, columns: Tuple[str, ...]) -> str:
+        query = self._upsert_sql.get(columns)
+        if query is None:
+            placeholders = ", ".join(["?"] * len(columns))
+            column_names = ", ".join(columns)
+            # For UPDATE, set all columns except trade_id and token_address (fixed per trade, keeps
+            # idx_trades_token out of every transition); data is never rewritten
+            set_clause = ", ".join([f"{col} = excluded.{col}" for col in columns if col not in ("trade_id", "token_address")])
+            query = f"""
+                INSERT INTO trades ({column_names}, data)
+                VALUES ({placeholders}, '{EMPTY_DATA}')
+                ON CONFLICT(trade_id) DO UPDATE SET
+                    {set_clause},
+                    updated_at=CURRENT_TIMESTAMP
+            """
+            self._upsert_sql[columns] = query
+        return query
+
+    def _upsert_params(self, trade_id: str, state: str, token_address: str, amount: float,
+                       entry_price: Optional[float] = None,
+                       exit_price: Optional[float] = None,
+                       rejection_reason: Optional[str] = None,
+                       route: Optional[str] = None,
+                       tx_signature: Optional[str] = None,
+                       slippage_bps: Optional[int] = None,
+                       fee_lamports: Optional[int] = None,
+                       executed_at: Optional[str] = None) -> Tuple[str, List[Any]]:
+        columns = ["trade_id", "state", "token_address", "amount"]
+        values = [trade_id, state, token_address, amount]
+
+        # Optional enriched columns
+        enriched = (
+            ("entry_price", entry_price),
+            ("exit_price", exit_price),
+            ("rejection_reason", rejection_reason),
+            ("route", route),
+            ("tx_signature", tx_signature),
+            ("slippage_bps", slippage_bps),
+            ("fee_lamports", fee_lamports),
+            ("executed_at", executed_at),
+        )
+        for column, value in enriched:
+            if value is not None:
+                columns.append(column)
+                values.append(value)
+        return self._upsert_statement(tuple(columns)), values
+
+    def _signal_data(self, conn: sqlite3.Connection, trade_id: str, data: Dict[str, Any],
+                     pending: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Signal data for the trade, writing `data` as the signal if this is the trade's first transition.
+        Signals read or written inside the open transaction go to `pending`, not the cache, until it commits.
+        """
+        with self._signals_lock:
+            signal = self._signals.get(trade_id)
+            if signal is not None:
+                self._signals.move_to_end(trade_id)
+                return signal
+        if trade_id in pending:
+            return pending[trade_id]
+        cursor = conn.execute("INSERT OR IGNORE INTO trade_signals (trade_id, data) VALUES (?, ?)",
+                              (trade_id, json.dumps(data)))
+        if cursor.rowcount:
+            signal = data
+        else:
+            row = conn.execute("SELECT data FROM trade_signals WHERE trade_id = ?", (trade_id,)).fetchone()
+            signal = json.loads(row[0])
+        pending[trade_id] = signal
+        return signal
+
+    def _cache_signals(self, signals: Dict[str, Dict[str, Any]]):
+        with self._signals_lock:
+            for trade_id, signal in signals.items():
+                self._signals[trade_id] = signal
+                self._signals.move_to_end(trade_id)
+            while len(self._signals) > self.signal_cache_size:
+                self._signals.popitem(last=False)
+
+    def _write(self, conn: sqlite3.Connection, entry: Dict[str, Any], pending: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        fields = dict(entry)
+        data = fields.pop("data") or {}
+        ts = fields.pop("ts", None) or time.time()
+        trade_id = fields["trade_id"]
+        event = {**fields, "ts": ts, "data": data}
+
+        signal = self._signal_data(conn, trade_id, data, pending)
+        delta = {k: v for k, v in data.items() if k not in signal or signal[k] != v}
+        conn.execute("INSERT OR IGNORE INTO trade_events (trade_id, ts, state, payload) VALUES (?, ?, ?, ?)",
+                     (trade_id, ts, fields["state"], json.dumps(delta) if delta else None))
+        conn.execute(*self._upsert_params(**fields))
+        return event
 
     def save_trade(self, trade_id: str, state: str, token_address: str, amount: float, data: Dict[str, Any],
                    entry_price: Optional[float] = None,
@@ -34,82 +222,140 @@ class TradeStateManager:
                    tx_signature: Optional[str] = None,
                    slippage_bps: Optional[int] = None,
                    fee_lamports: Optional[int] = None,
-                   executed_at: Optional[str] = None):
-        """Save trade with optional enriched fields."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            # Build dynamic INSERT/UPDATE based on provided enriched fields
-            columns = ["trade_id", "state", "token_address", "amount", "data"]
-            values = [trade_id, state, token_address, amount, json.dumps(data)]
-
-            # Optional enriched columns
-            if entry_price is not None:
-                columns.append("entry_price")
-                values.append(entry_price)
-            if exit_price is not None:
-                columns.append("exit_price")
-                values.append(exit_price)
-            if rejection_reason is not None:
-                columns.append("rejection_reason")
-                values.append(rejection_reason)
-            if route is not None:
-                columns.append("route")
-                values.append(route)
-            if tx_signature is not None:
-                columns.append("tx_signature")
-                values.append(tx_signature)
-            if slippage_bps is not None:
-                columns.append("slippage_bps")
-                values.append(slippage_bps)
-            if fee_lamports is not None:
-                columns.append("fee_lamports")
-                values.append(fee_lamports)
-            if executed_at is not None:
-                columns.append("executed_at")
-                values.append(executed_at)
-
-            placeholders = ", ".join(["?"] * len(values))
-            column_names = ", ".join(columns)
+                   executed_at: Optional[str] = None,
+                   ts: Optional[float] = None,
+                   durable: bool = False):
+        """
+        Save trade with optional enriched fields.
+        ts stamps the transition event (defaults to now).
+        durable=True fsyncs this commit (synchronous=FULL) instead of relying on WAL + NORMAL.
+        """
+        self.save_trades([{
+            "trade_id": trade_id, "state": state, "token_address": token_address, "amount": amount,
+            "data": data, "entry_price": entry_price, "exit_price": exit_price,
+            "rejection_reason": rejection_reason, "route": route, "tx_signature": tx_signature,
+            "slippage_bps": slippage_bps, "fee_lamports": fee_lamports, "executed_at": executed_at, "ts": ts,
+        }], durable=durable)
 
-            # For UPDATE, set all columns except trade_id
-            set_clause = ", ".join([f"{col} = excluded.{col}" for col in columns if col != "trade_id"])
+    def save_trades(self, entries: List[Dict[str, Any]], durable: bool = False):
+        """Applies many save_trade calls (as kwargs dicts, in order) in a single transaction."""
+        if not entries:
+            return
+        conn = self._connect()
+        if durable:
+            conn.execute("PRAGMA synchronous=FULL")
+        started = time.perf_counter()
+        pending: Dict[str, Dict[str, Any]] = {}
+        try:
+            with conn:
+                events = [self._write(conn, entry, pending) for entry in entries]
+        finally:
+            if durable:
+                conn.execute("PRAGMA synchronous=NORMAL")
+        # Only signals whose rows are committed may serve as the base for later deltas
+        self._cache_signals(pending)
+        COMMIT_SECONDS.labels("full" if durable else "normal").observe_since(started)
+        COMMITTED_ENTRIES.inc(len(entries))
+        for event in events if self._listeners else ():
+            for callback in self._listeners:
+                try:
+                    callback(event)
+                except Exception as e:
+                    self.logger.error(f"Trade event listener failed for {event['trade_id']}: {e}")
+
+    def has_event(self, trade_id: str, state: str, ts: float) -> bool:
+        """True if this exact transition is already recorded (used to make journal replay idempotent)."""
+        row = self._connect().execute(
+            "SELECT 1 FROM trade_events WHERE trade_id = ? AND ts = ? AND state = ?",
+            (trade_id, ts, state)).fetchone()
+        return row is not None
+
+    def get_trade_events(self, trade_id: str) -> List[Dict[str, Any]]:
+        """Every recorded transition for the trade, oldest first."""
+        rows = self._connect().execute(
+            "SELECT state, ts, payload FROM trade_events WHERE trade_id = ? ORDER BY ts",
+            (trade_id,)).fetchall()
+        return [{"state": state, "ts": ts, "payload": json.loads(payload) if payload else {}}
+                for state, ts, payload in rows]
+
+    def find_trades(self, state: Optional[str] = None, token_address: Optional[str] = None,
+                    limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recently updated trades, optionally filtered by state and/or token (dashboard listing)."""
+        clauses, params = [], []
+        if state is not None:
+            clauses.append("state = ?")
+            params.append(state)
+        if token_address is not None:
+            clauses.append("token_address = ?")
+            params.append(token_address)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(f'''
+            SELECT trade_id, state, token_address, amount, updated_at
+            FROM trades {where}
+            ORDER BY updated_at DESC
+            LIMIT ?
+        ''', (*params, limit)).fetchall()
+        return [{"trade_id": r[0], "state": r[1], "token_address": r[2], "amount": r[3], "updated_at": r[4]}
+                for r in rows]
 
-            query = f"""
-                INSERT INTO trades ({column_names})
-                VALUES ({placeholders})
-                ON CONFLICT(trade_id) DO UPDATE SET
-                    {set_clause},
-                    updated_at=CURRENT_TIMESTAMP
-            """
-            cursor.execute(query, values)
-            conn.commit()
-            
     def get_trade(self, trade_id: str) -> Optional[Dict[str, Any]]:
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            # Select all columns including enriched ones
-            cursor.execute('''
-                SELECT trade_id, state, token_address, amount, data, created_at, updated_at,
-                       entry_price, exit_price, rejection_reason, route, tx_signature, slippage_bps, fee_lamports, executed_at
-                FROM trades WHERE trade_id = ?
-            ''', (trade_id,))
-            row = cursor.fetchone()
-            if row:
-                return {
-                    "trade_id": row[0],
-                    "state": row[1],
-                    "token_address": row[2],
-                    "amount": row[3],
-                    "data": json.loads(row[4]),
-                    "created_at": row[5],
-                    "updated_at": row[6],
-                    "entry_price": row[7],
-                    "exit_price": row[8],
-                    "rejection_reason": row[9],
-                    "route": row[10],
-                    "tx_signature": row[11],
-                    "slippage_bps": row[12],
-                    "fee_lamports": row[13],
-                    "executed_at": row[14]
-                }
-            return None
+        conn = self._connect()
+        # Select all columns including enriched ones; pre-split rows still carry their blob in trades.data
+        row = conn.execute('''
+            SELECT t.trade_id, t.state, t.token_address, t.amount, COALESCE(s.data, t.data), t.created_at, t.updated_at,
+                   t.entry_price, t.exit_price, t.rejection_reason, t.route, t.tx_signature, t.slippage_bps,
+                   t.fee_lamports, t.executed_at
+            FROM trades t LEFT JOIN trade_signals s ON s.trade_id = t.trade_id
+            WHERE t.trade_id = ?
+        ''', (trade_id,)).fetchone()
+        if row:
+            data = json.loads(row[4])
+            for (payload,) in conn.execute(
+                    "SELECT payload FROM trade_events WHERE trade_id = ? AND payload IS NOT NULL ORDER BY ts",
+                    (trade_id,)):
+                data.update(json.loads(payload))
+            return {
+                "trade_id": row[0],
+                "state": row[1],
+                "token_address": row[2],
+                "amount": row[3],
+                "data": data,
+                "created_at": row[5],
+                "updated_at": row[6],
+                "entry_price": row[7],
+                "exit_price": row[8],
+                "rejection_reason": row[9],
+                "route": row[10],
+                "tx_signature": row[11],
+                "slippage_bps": row[12],
+                "fee_lamports": row[13],
+                "executed_at": row[14]
+            }
+        return None
+
+
+def create_event_tables(conn: sqlite3.Connection):
+    """Creates trade_signals / trade_events (shared with migrate_trades_schema.py)."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS trade_signals (
+            trade_id TEXT PRIMARY KEY,
+            data JSON NOT NULL
+        )
+    ''')
+    # Clustered on (trade_id, ts): one b-tree page touched per transition and no secondary index
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS trade_events (
+            trade_id TEXT NOT NULL,
+            ts REAL NOT NULL,
+            state TEXT NOT NULL,
+            payload JSON,
+            PRIMARY KEY (trade_id, ts, state)
+        ) WITHOUT ROWID
+    ''')
+
+
+def create_trade_indexes(conn: sqlite3.Connection):
+    """Creates TRADE_INDEXES and refreshes planner statistics."""
+    for name, definition in TRADE_INDEXES:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+    conn.execute("PRAGMA optimize")
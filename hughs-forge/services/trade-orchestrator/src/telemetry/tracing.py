@@ -0,0 +1,250 @@
+"""
+Lightweight per-signal tracing.
+
+One trace follows a token from the pump.fun frame to the transaction
+signature. The current span lives in a ContextVar, so it follows asyncio
+tasks on its own. Across the EventLoop thread hop the SpanContext travels
+explicitly: EventLoop.enqueue_signal captures it and the worker resumes it.
+
+Finished spans go into an in-memory ring and a flusher thread writes them
+as OTLP/JSON lines (one ExportTraceServiceRequest per line, the format the
+OpenTelemetry Collector's file exporter writes and otlpjsonfile reads).
+Tracing is off until configure_tracing() is called; until then spans are
+no-ops. trace_summary.py prints per-stage p50/p95/p99 from the files.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, NamedTuple, Optional
+
+logger = logging.getLogger("tracing")
+
+SERVICE_NAME = "trade-orchestrator"
+SCOPE_NAME = "pryan-fire.tracing"
+
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+class SpanContext(NamedTuple):
+    trace_id: str  # 32 hex chars
+    span_id: str   # 16 hex chars
+
+
+class Span:
+    __slots__ = ("name", "context", "parent_id", "start_ns", "end_ns", "attributes", "status", "status_message")
+
+    def __init__(self, name: str, context: SpanContext, parent_id: str, start_ns: int,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.start_ns = start_ns
+        self.end_ns = 0
+        self.attributes = dict(attributes) if attributes else {}
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_error(self, message: str):
+        self.status = STATUS_ERROR
+        self.status_message = message[:500]
+
+    def end(self, end_ns: Optional[int] = None):
+        if self.end_ns:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        if _exporter is not None:
+            _exporter.export(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": self.status, **({"message": self.status_message} if self.status_message else {})},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    context = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_error(self, message):
+        pass
+
+    def end(self, end_ns=None):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current: contextvars.ContextVar[Optional[SpanContext]] = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_id(bits: int) -> str:
+    # All-zero ids are invalid in OTLP
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+def current_context() -> Optional[SpanContext]:
+    """The active span's context, to hand to another thread (see use_context)."""
+    return _current.get()
+
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None, start_ns: Optional[int] = None,
+               parent: Optional[SpanContext] = None):
+    """
+    Starts a span under `parent` (default: the current span) without making it current.
+    Call end() on it; prefer the span() context manager unless the span outlives a block.
+    """
+    if _exporter is None:
+        return NOOP_SPAN
+    parent = parent or _current.get()
+    trace_id = parent.trace_id if parent else _new_id(128)
+    return Span(name, SpanContext(trace_id, _new_id(64)), parent.span_id if parent else "",
+                start_ns or time.time_ns(), attributes)
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, start_ns: Optional[int] = None,
+         parent: Optional[SpanContext] = None) -> Iterator[Any]:
+    """Runs the block inside a new child span; exceptions mark it as an error and propagate."""
+    s = start_span(name, attributes, start_ns, parent)
+    if s is NOOP_SPAN:
+        yield s
+        return
+    token = _current.set(s.context)
+    try:
+        yield s
+    except BaseException as e:
+        s.set_error(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current.reset(token)
+        s.end()
+
+
+@contextmanager
+def use_context(context: Optional[SpanContext]) -> Iterator[None]:
+    """Makes a context captured elsewhere (another thread) the parent of spans in this block."""
+    token = _current.set(context)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def record_span(name: str, duration_s: float, attributes: Optional[Dict[str, Any]] = None,
+                end_ns: Optional[int] = None, parent: Optional[SpanContext] = None):
+    """Records an already-finished child span of `duration_s` ending now (or at `end_ns`)."""
+    if _exporter is None:
+        return
+    end_ns = end_ns or time.time_ns()
+    s = start_span(name, attributes, end_ns - int(duration_s * 1e9), parent)
+    s.end(end_ns)
+
+
+class JsonlSpanExporter:
+    """
+    Buffers finished spans (bounded ring; the oldest are dropped if the flusher
+    falls behind) and appends them to `path` as OTLP/JSON every `flush_interval_s`.
+    """
+    def __init__(self, path: str, flush_interval_s: float = 1.0, max_buffer: int = 20000,
+                 service_name: str = SERVICE_NAME):
+        self.path = path
+        self.flush_interval_s = flush_interval_s
+        self.resource = {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]}
+        self._buffer: Deque[Span] = deque(maxlen=max_buffer)
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, daemon=True, name="Span-Exporter")
+        self._thread.start()
+
+    def export(self, span: Span):
+        self._buffer.append(span)
+
+    def flush(self):
+        with self._write_lock:
+            spans = []
+            while self._buffer:
+                spans.append(self._buffer.popleft())
+            if not spans:
+                return
+            request = {"resourceSpans": [{"resource": self.resource,
+                                          "scopeSpans": [{"scope": {"name": SCOPE_NAME},
+                                                          "spans": [s.to_otlp() for s in spans]}]}]}
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(request, separators=(",", ":"), default=str) + "\n")
+            except OSError as e:
+                logger.error(f"Failed to write {len(spans)} span(s) to {self.path}: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval_s):
+            self.flush()
+
+    def shutdown(self):
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+        self.flush()
+
+
+_exporter: Optional[JsonlSpanExporter] = None
+
+
+def configure_tracing(path: Optional[str] = None, **kwargs) -> Optional[JsonlSpanExporter]:
+    """
+    Enables tracing, exporting to `path` (default $TRACE_EXPORT_PATH). With neither
+    set, tracing stays disabled. Returns the exporter.
+    """
+    global _exporter
+    path = path or os.getenv("TRACE_EXPORT_PATH")
+    if not path:
+        return None
+    shutdown_tracing()
+    _exporter = JsonlSpanExporter(path, **kwargs)
+    return _exporter
+
+
+def shutdown_tracing():
+    global _exporter
+    exporter, _exporter = _exporter, None
+    if exporter is not None:
+        exporter.shutdown()
+
+
+atexit.register(shutdown_tracing)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
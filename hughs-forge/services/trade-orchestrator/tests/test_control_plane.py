@@ -0,0 +1,53 @@
+"""
+Unit tests for signal admission against the host-wide control plane.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from core.control_plane import ControlPlane
+from core.orchestrator import TradeOrchestrator
+from core.state_machine import TradeState
+
+MINT = "So11111111111111111111111111111111111111112"
+
+
+class TestOrchestratorAdmission(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp, "trades.db")
+        self.stop_file = os.path.join(self.tmp, "trade_stop.lock")
+        self.plane = ControlPlane(stop_file=self.stop_file, path=os.path.join(self.tmp, "control"))
+        self.orchestrator = TradeOrchestrator(db_path=self.db_path, dry_run=True, control_plane=self.plane)
+
+    def tearDown(self):
+        self.orchestrator.stop()
+        self.plane.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _signal(self, trade_id: str) -> str:
+        return self.orchestrator.process_signal(
+            {"token_address": MINT, "amount": 500.0, "trade_id": trade_id, "source": "pump.fun"})
+
+    def test_breaker_tripped_by_another_process_refuses_signals(self):
+        # What a trade executor's RiskManager.activate_circuit_breaker() publishes
+        ControlPlane(stop_file=self.stop_file, path=self.plane.path).set_circuit_breaker(True)
+        self.assertEqual(self._signal("snipe-1"), TradeState.HALTED.value)
+        self.assertEqual(len(self.orchestrator.dedup), 0)
+        self.orchestrator.journal.flush()
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0], 0)
+
+        self.plane.set_circuit_breaker(False)
+        self.assertEqual(self._signal("snipe-2"), TradeState.AWAITING_APPROVAL.value)
+
+    def test_force_stop_file_refuses_signals(self):
+        open(self.stop_file, "w").close()
+        self.plane.sync()
+        self.assertEqual(self._signal("snipe-1"), TradeState.HALTED.value)
+
+
+if __name__ == "__main__":
+    unittest.main()
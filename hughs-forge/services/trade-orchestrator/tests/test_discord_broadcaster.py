@@ -1,37 +1,58 @@
 """
-Unit tests for discord_broadcaster rate limiting.
+Unit tests for discord_broadcaster rate limiting and the webhook dispatcher.
 """
 
+import json
 import unittest
+import threading
 import time
 import os
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
+
+import requests
+
 from feed.discord_broadcaster import DiscordBroadcaster
+from feed.webhook_dispatcher import PRIORITY_SCANNER, PRIORITY_TRADE, WebhookDispatcher
+
+
+def embeds_sent(mock_post):
+    return sum(len(call.kwargs["json"]["embeds"]) for call in mock_post.call_args_list)
+
+
+def response(status=204, headers=None, body=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers or {})
+    resp._content = json.dumps(body).encode() if body is not None else b""
+    return resp
 
 class TestDiscordBroadcaster(unittest.TestCase):
     @patch.dict(os.environ, {"DISCORD_TRADE_ALERTS_WEBHOOK": "https://discord.com/api/webhooks/test"})
     def test_rate_limit_blocks_excess_messages(self):
         broadcaster = DiscordBroadcaster()
         # Mock the actual POST
-        with patch('requests.post') as mock_post:
+        with patch('requests.post', return_value=response()) as mock_post:
             # First 5 messages should be sent immediately (tokens available)
             for i in range(5):
                 broadcaster.broadcast_trade_executed({"trade_id": f"t{i}"})
-            self.assertEqual(mock_post.call_count, 5)
+            self.assertTrue(broadcaster.flush())
+            self.assertEqual(embeds_sent(mock_post), 5)
 
             # 6th message should be dropped due to rate limit
             mock_post.reset_mock()
             broadcaster.broadcast_trade_executed({"trade_id": "t6"})
+            self.assertTrue(broadcaster.flush())
             mock_post.assert_not_called()
 
     @patch.dict(os.environ, {"DISCORD_TRADE_ALERTS_WEBHOOK": "https://discord.com/api/webhooks/test"})
     def test_rate_limit_refills_over_time(self):
         broadcaster = DiscordBroadcaster()
-        with patch('requests.post') as mock_post:
+        with patch('requests.post', return_value=response()) as mock_post:
             # Send 5 messages to exhaust tokens
             for i in range(5):
                 broadcaster.broadcast_trade_executed({"trade_id": f"t{i}"})
-            self.assertEqual(mock_post.call_count, 5)
+            self.assertTrue(broadcaster.flush())
+            self.assertEqual(embeds_sent(mock_post), 5)
 
             # Wait for token refill (~12 seconds for 1 token)
             time.sleep(12.1)
@@ -39,7 +60,110 @@ class TestDiscordBroadcaster(unittest.TestCase):
             # Should be able to send 1 more
             mock_post.reset_mock()
             broadcaster.broadcast_trade_executed({"trade_id": "t6"})
-            self.assertEqual(mock_post.call_count, 1)
+            self.assertTrue(broadcaster.flush())
+            self.assertEqual(embeds_sent(mock_post), 1)
+
+    @patch.dict(os.environ, {"DISCORD_TRADE_ALERTS_WEBHOOK": "https://discord.com/api/webhooks/test"})
+    def test_broadcast_does_not_wait_for_slow_webhook(self):
+        broadcaster = DiscordBroadcaster()
+        release = threading.Event()
+        with patch('requests.post', side_effect=lambda *a, **k: release.wait(5) and response()):
+            started = time.perf_counter()
+            broadcaster.broadcast_trade_failed({"trade_id": "slow", "token_address": "abc", "error": "x"})
+            self.assertLess(time.perf_counter() - started, 0.05)
+            release.set()
+            self.assertTrue(broadcaster.flush())
+        broadcaster.close()
+
+    @patch.dict(os.environ, {"DISCORD_TRADE_ALERTS_WEBHOOK": "https://discord.com/api/webhooks/test"})
+    def test_scanner_rejections_are_digested(self):
+        broadcaster = DiscordBroadcaster(digest_seconds=3600)
+        with patch('requests.post', return_value=response()) as mock_post:
+            for i in range(30):
+                broadcaster.broadcast_scanner_rejected({"mint": f"m{i}", "symbol": f"S{i}", "reason": "Unknown"})
+            broadcaster.broadcast_queued_for_retry({"mint": "q", "symbol": "Q", "queue_size": 1})
+            self.assertTrue(broadcaster.flush())
+            mock_post.assert_not_called()
+            broadcaster.close()
+        self.assertEqual(embeds_sent(mock_post), 1)
+        self.assertIn("**30** rejected", mock_post.call_args.kwargs["json"]["embeds"][0]["description"])
+
+
+class TestWebhookDispatcher(unittest.TestCase):
+    URL = "https://discord.com/api/webhooks/test"
+
+    def _embed(self, i, chars=10):
+        return {"title": f"e{i}", "description": "x" * chars}
+
+    def _paused(self, dispatcher):
+        # Hold the dispatcher thread back so submits pile up in the queue
+        dispatcher._not_before = time.monotonic() + 0.2
+
+    def test_packs_up_to_ten_embeds_per_message(self):
+        dispatcher = WebhookDispatcher(self.URL)
+        self._paused(dispatcher)
+        with patch('requests.post', return_value=response()) as mock_post:
+            for i in range(23):
+                dispatcher.submit(self._embed(i))
+            self.assertTrue(dispatcher.flush())
+        self.assertEqual([len(c.kwargs["json"]["embeds"]) for c in mock_post.call_args_list], [10, 10, 3])
+        dispatcher.close()
+
+    def test_respects_embed_character_limit(self):
+        dispatcher = WebhookDispatcher(self.URL)
+        self._paused(dispatcher)
+        with patch('requests.post', return_value=response()) as mock_post:
+            for i in range(4):
+                dispatcher.submit(self._embed(i, chars=2500))
+            self.assertTrue(dispatcher.flush())
+        self.assertEqual([len(c.kwargs["json"]["embeds"]) for c in mock_post.call_args_list], [2, 2])
+        dispatcher.close()
+
+    def test_honours_retry_after(self):
+        dispatcher = WebhookDispatcher(self.URL)
+        replies = [response(429, {"Retry-After": "5"}, {"retry_after": 0.3}), response()]
+        with patch('requests.post', side_effect=replies) as mock_post:
+            started = time.monotonic()
+            dispatcher.submit(self._embed(0))
+            self.assertTrue(dispatcher.flush())
+            elapsed = time.monotonic() - started
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertGreaterEqual(elapsed, 0.3)
+        self.assertEqual(dispatcher.stats["rate_limited"], 1)
+        self.assertEqual(dispatcher.stats["sent_embeds"], 1)
+        dispatcher.close()
+
+    def test_bad_request_isolates_the_rejected_embed(self):
+        dispatcher = WebhookDispatcher(self.URL)
+        self._paused(dispatcher)
+
+        def post(url, json, timeout):
+            bad = any(e["title"] == "ebad" for e in json["embeds"])
+            return response(400, body={"embeds": ["0"]}) if bad else response()
+
+        with patch('requests.post', side_effect=post) as mock_post:
+            for i in ("a", "bad", "c"):
+                dispatcher.submit(self._embed(i))
+            self.assertTrue(dispatcher.flush())
+        self.assertEqual([len(c.kwargs["json"]["embeds"]) for c in mock_post.call_args_list], [3, 1, 1, 1])
+        self.assertEqual(dispatcher.stats["sent_embeds"], 2)
+        self.assertEqual(dispatcher.stats["failed"], 1)
+        dispatcher.close()
+
+    def test_full_queue_drops_lowest_priority_first(self):
+        dispatcher = WebhookDispatcher(self.URL, capacity=3)
+        self._paused(dispatcher)
+        with patch('requests.post', return_value=response()) as mock_post:
+            for i in range(3):
+                self.assertTrue(dispatcher.submit(self._embed(f"scan{i}"), PRIORITY_SCANNER))
+            self.assertTrue(dispatcher.submit(self._embed("trade"), PRIORITY_TRADE))
+            # Nothing less important than a scanner embed is queued: the newcomer is dropped
+            self.assertFalse(dispatcher.submit(self._embed("scan3"), PRIORITY_SCANNER))
+            self.assertTrue(dispatcher.flush())
+        titles = [e["title"] for c in mock_post.call_args_list for e in c.kwargs["json"]["embeds"]]
+        self.assertEqual(titles, ["etrade", "escan1", "escan2"])
+        self.assertEqual(dispatcher.stats["dropped"][PRIORITY_SCANNER], 2)
+        dispatcher.close()
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,69 @@
+"""
+Unit tests for EventLoop admission control.
+"""
+
+import threading
+import time
+import unittest
+from core.event_loop import ADMIT_FRESH, ADMIT_NO_DEADLINE, SHED_EXPIRED, SHED_QUEUE_WAIT, EventLoop
+
+
+class RecordingOrchestrator:
+    """Stands in for TradeOrchestrator; records which signals reached process_signal."""
+    def __init__(self):
+        self.processed = []
+        self.done = threading.Event()
+
+    def process_signal(self, signal):
+        self.processed.append(signal["token_address"])
+        if signal.get("last"):
+            self.done.set()
+        return "EXECUTED"
+
+
+class TestAdmission(unittest.TestCase):
+    def setUp(self):
+        self.loop = EventLoop(RecordingOrchestrator(), max_queue_wait_s=2.0)
+
+    def test_signal_without_deadline_is_never_shed(self):
+        self.assertEqual(self.loop.admit({"token_address": "A"}, waited=60.0), (True, ADMIT_NO_DEADLINE))
+
+    def test_fresh_signal_admitted(self):
+        signal = {"token_address": "A", "discovered_at": time.time() - 1, "deadline": time.time() + 10}
+        self.assertEqual(self.loop.admit(signal, waited=0.5), (True, ADMIT_FRESH))
+
+    def test_expired_signal_shed(self):
+        signal = {"token_address": "A", "discovered_at": time.time() - 40, "deadline": time.time() - 20}
+        self.assertEqual(self.loop.admit(signal, waited=0.1), (False, SHED_EXPIRED))
+
+    def test_long_queue_wait_sheds_in_date_signal(self):
+        signal = {"token_address": "A", "deadline": time.time() + 10}
+        self.assertEqual(self.loop.admit(signal, waited=3.0), (False, SHED_QUEUE_WAIT))
+        self.loop.max_queue_wait_s = 0  # disabled
+        self.assertEqual(self.loop.admit(signal, waited=3.0), (True, ADMIT_FRESH))
+
+
+class TestRunSheds(unittest.TestCase):
+    def test_shed_before_processing_and_counted(self):
+        orchestrator = RecordingOrchestrator()
+        shed = []
+        loop = EventLoop(orchestrator, max_queue_wait_s=5.0, on_shed=lambda s, r: shed.append((s["token_address"], r)))
+        now = time.time()
+        loop.enqueue_signal({"token_address": "STALE", "discovered_at": now - 40, "deadline": now - 20})
+        loop.enqueue_signal({"token_address": "FRESH", "discovered_at": now, "deadline": now + 20})
+        loop.enqueue_signal({"token_address": "MANUAL", "last": True})
+
+        worker = threading.Thread(target=loop.run, daemon=True)
+        worker.start()
+        self.assertTrue(orchestrator.done.wait(5.0))
+        loop.stop()
+        worker.join(timeout=3.0)
+
+        self.assertEqual(orchestrator.processed, ["FRESH", "MANUAL"])
+        self.assertEqual(shed, [("STALE", SHED_EXPIRED)])
+        self.assertEqual(loop.admission_counts(), {"admitted": {ADMIT_FRESH: 1, ADMIT_NO_DEADLINE: 1},
+                                                   "shed": {SHED_EXPIRED: 1}})
+
+
+if __name__ == "__main__":
+    unittest.main()
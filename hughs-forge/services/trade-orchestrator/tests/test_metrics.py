@@ -0,0 +1,73 @@
+"""
+Unit tests for the in-process metrics registry.
+"""
+
+import threading
+import unittest
+from telemetry.metrics import MetricsRegistry
+
+
+class Queue:
+    def __init__(self, depth):
+        self.depth = depth
+
+    def qsize(self):
+        return self.depth
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_sums_across_threads(self):
+        counter = self.registry.counter("signals", "Signals", ["state"])
+
+        def work():
+            for _ in range(10000):
+                counter.labels("EXECUTED").inc()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(counter.labels("EXECUTED").value, 40000)
+        self.assertIn('signals_total{state="EXECUTED"} 40000', self.registry.render())
+
+    def test_histogram_exposition(self):
+        hist = self.registry.histogram("commit_seconds", "Commit latency", buckets=(0.01, 0.1))
+        for value in (0.005, 0.05, 0.05, 3.0):
+            hist.observe(value)
+        text = self.registry.render()
+        self.assertIn("# TYPE commit_seconds histogram", text)
+        self.assertIn('commit_seconds_bucket{le="0.01"} 1', text)
+        self.assertIn('commit_seconds_bucket{le="0.1"} 3', text)
+        self.assertIn('commit_seconds_bucket{le="+Inf"} 4', text)
+        self.assertIn("commit_seconds_count 4", text)
+        self.assertIn("commit_seconds_sum 3.105", text)
+
+    def test_non_finite_values(self):
+        for name, value in (("nan_gauge", float("nan")), ("pos_gauge", float("inf")), ("neg_gauge", float("-inf"))):
+            self.registry.gauge(name, "Non-finite").set(value)
+        text = self.registry.render()
+        self.assertIn("nan_gauge NaN", text)
+        self.assertIn("pos_gauge +Inf", text)
+        self.assertIn("neg_gauge -Inf", text)
+
+    def test_gauge_callback_is_weak(self):
+        gauge = self.registry.gauge("queue_depth", "Depth")
+        q = Queue(7)
+        gauge.set_function(q.qsize)
+        self.assertIn("queue_depth 7", self.registry.render())
+        del q
+        self.assertNotIn("queue_depth 7", self.registry.render())
+
+    def test_reregistering_returns_same_metric(self):
+        a = self.registry.counter("x", "X", ["host"])
+        self.assertIs(a, self.registry.counter("x", "X", ["host"]))
+        with self.assertRaises(ValueError):
+            self.registry.gauge("x", "X")
+
+
+if __name__ == '__main__':
+    unittest.main()
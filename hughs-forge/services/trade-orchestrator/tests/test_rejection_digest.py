@@ -0,0 +1,81 @@
+"""
+Unit tests for the scanner RejectionDigest.
+"""
+
+import time
+import unittest
+from feed.rejection_digest import QUEUED_GROUP, RejectionDigest, reason_key
+
+
+def rejected(symbol, reasons, liquidity=0.0):
+    return {"mint": f"{symbol}mint", "symbol": symbol, "reasons": reasons,
+            "metrics": {"liquidity": liquidity, "fdv": 1000, "volume_1h": 50, "url": ""}}
+
+
+class TestRejectionDigest(unittest.TestCase):
+    def setUp(self):
+        self.emitted = []
+        self.digest = RejectionDigest(self.emitted.append, window_seconds=3600, top_n=2)
+
+    def tearDown(self):
+        self.digest.close()
+
+    def test_reason_key_ignores_numbers(self):
+        self.assertEqual(reason_key("Liquidity too thin ($812 < $5000)"), reason_key("Liquidity too thin ($40 < $5000)"))
+        self.assertEqual(reason_key("1h buyers too low (3 < 20)"), reason_key("1h buyers too low (7 < 20)"))
+        self.assertNotEqual(reason_key("Liquidity too thin ($40 < $5000)"), reason_key("Market Cap too low ($1 < $2)"))
+
+    def test_one_embed_per_window_grouped_by_reason(self):
+        for i in range(50):
+            self.digest.add_rejected(rejected(f"T{i}", [f"Liquidity too thin (${i} < $5000)"], liquidity=i))
+        self.digest.add_rejected(rejected("MC", ["Market Cap too low ($10 < $5000)"]))
+        self.digest.add_queued({"mint": "Qmint", "symbol": "Q", "queue_size": 7})
+        self.assertEqual(self.emitted, [])
+
+        embed = self.digest.flush()
+        self.assertEqual(self.emitted, [embed])
+        self.assertIn("**51** rejected", embed["description"])
+        names = [f["name"] for f in embed["fields"]]
+        self.assertEqual(names[0], f"{QUEUED_GROUP} - 1")
+        self.assertEqual(names[1], "Liquidity too thin - 50")
+        self.assertEqual(names[2], "Market Cap too low ($10 < $5000) - 1")
+
+        # Top-N by liquidity, the rest summarised
+        lines = embed["fields"][1]["value"].splitlines()
+        self.assertTrue(lines[0].startswith("**T49**"))
+        self.assertTrue(lines[1].startswith("**T48**"))
+        self.assertEqual(lines[2], "+48 more")
+
+        # Window reset
+        self.assertIsNone(self.digest.flush())
+        self.assertEqual(len(self.emitted), 1)
+
+    def test_embed_stays_within_discord_limits(self):
+        digest = RejectionDigest(self.emitted.append, window_seconds=3600, top_n=10)
+        for i in range(400):
+            digest.add_rejected(rejected(f"T{i}", [f"check {chr(65 + i % 40)} failed" + "x" * 150], liquidity=i))
+        embed = digest.flush()
+        digest.close()
+        self.assertLessEqual(len(embed["fields"]), 25)
+        total = len(embed["title"]) + len(embed["description"])
+        total += sum(len(f["name"]) + len(f["value"]) for f in embed["fields"])
+        self.assertLessEqual(total, 6000)
+        self.assertTrue(all(len(f["value"]) <= 1024 for f in embed["fields"]))
+
+    def test_timer_emits_after_window(self):
+        digest = RejectionDigest(self.emitted.append, window_seconds=0.2)
+        digest.add_rejected(rejected("A", ["Suspect volume distribution (Buy Ratio: 0.10)"]))
+        deadline = time.time() + 2.0
+        while not self.emitted and time.time() < deadline:
+            time.sleep(0.02)
+        digest.close()
+        self.assertEqual(len(self.emitted), 1)
+
+    def test_close_emits_partial_window(self):
+        self.digest.add_queued({"mint": "Qmint", "symbol": "Q", "queue_size": 1})
+        self.digest.close()
+        self.assertEqual(len(self.emitted), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
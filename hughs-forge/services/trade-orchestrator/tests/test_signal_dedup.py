@@ -0,0 +1,99 @@
+"""
+Unit tests for cross-source signal deduplication.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from core.dedup import SignalDedupIndex
+from core.orchestrator import TradeOrchestrator
+from core.state_machine import TradeState
+
+MINT = "So11111111111111111111111111111111111111112"
+
+
+class TestSignalDedupIndex(unittest.TestCase):
+    def test_first_claim_wins(self):
+        index = SignalDedupIndex(ttl_s=60)
+        self.assertIsNone(index.claim(MINT, "snipe-So111111", "pump.fun"))
+        winner = index.claim(MINT, "meteora-abcdefgh", "meteora_dlmm")
+        self.assertEqual((winner.trade_id, winner.source), ("snipe-So111111", "pump.fun"))
+        self.assertIsNone(index.claim("other", "snipe-other", "pump.fun"))
+
+    def test_claims_expire(self):
+        index = SignalDedupIndex(ttl_s=0.05)
+        index.claim(MINT, "a", "pump.fun")
+        time.sleep(0.06)
+        self.assertIsNone(index.claim(MINT, "b", "retry_queue"))
+        self.assertEqual(len(index), 1)
+
+    def test_release_only_by_holder(self):
+        index = SignalDedupIndex(ttl_s=60)
+        index.claim(MINT, "a", "pump.fun")
+        index.release(MINT, "b")
+        self.assertIsNotNone(index.claim(MINT, "b", "retry_queue"))
+        index.release(MINT, "a")
+        self.assertIsNone(index.claim(MINT, "b", "retry_queue"))
+
+
+class TestOrchestratorDedup(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp, "trades.db")
+        self.orchestrator = TradeOrchestrator(db_path=self.db_path, dry_run=True, dedup_ttl_s=60)
+
+    def tearDown(self):
+        self.orchestrator.stop()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_duplicate_collapsed_before_any_write(self):
+        # Over the auto-trade limit, so the first signal stops at AWAITING_APPROVAL without touching RPC
+        first = self.orchestrator.process_signal(
+            {"token_address": MINT, "amount": 500.0, "trade_id": "snipe-So111111", "source": "pump.fun"})
+        second = self.orchestrator.process_signal(
+            {"token_address": MINT, "amount": 500.0, "trade_id": "meteora-abcdefgh", "source": "meteora_dlmm"})
+        self.assertEqual(first, TradeState.AWAITING_APPROVAL.value)
+        self.assertEqual(second, TradeState.DUPLICATE.value)
+
+        self.orchestrator.journal.flush()
+        with sqlite3.connect(self.db_path) as conn:
+            trade_ids = [row[0] for row in conn.execute("SELECT trade_id FROM trades")]
+        self.assertEqual(trade_ids, ["snipe-So111111"])
+
+    def test_claim_released_when_processing_raises(self):
+        with patch.object(self.orchestrator.rpc_integrator, "route_trade", side_effect=RuntimeError("rpc down")):
+            with self.assertRaises(RuntimeError):
+                self.orchestrator.process_signal(
+                    {"token_address": MINT, "amount": 10.0, "trade_id": "snipe-So111111", "source": "pump.fun"})
+        self.assertEqual(len(self.orchestrator.dedup), 0)
+
+    def test_claim_released_on_approval_rejection(self):
+        self.orchestrator.process_signal(
+            {"token_address": MINT, "amount": 500.0, "trade_id": "snipe-So111111", "source": "pump.fun"})
+        self.assertEqual(len(self.orchestrator.dedup), 1)
+        self.orchestrator.reject_approval("snipe-So111111", MINT, 500.0)
+        self.assertEqual(self.orchestrator.state_manager.get_trade("snipe-So111111")["state"],
+                         TradeState.FAILED.value)
+        retry = self.orchestrator.process_signal(
+            {"token_address": MINT, "amount": 500.0, "trade_id": "retry-So111111", "source": "retry_queue"})
+        self.assertEqual(retry, TradeState.AWAITING_APPROVAL.value)
+
+    def test_unanswered_approval_expires_and_releases_mint(self):
+        self.orchestrator.approval_ttl_s = 0.05
+        self.orchestrator.process_signal(
+            {"token_address": MINT, "amount": 500.0, "trade_id": "snipe-So111111", "source": "pump.fun"})
+        time.sleep(0.06)
+        retry = self.orchestrator.process_signal(
+            {"token_address": MINT, "amount": 10.0, "trade_id": "retry-So111111", "source": "retry_queue"})
+        self.assertNotEqual(retry, TradeState.DUPLICATE.value)
+        expired = self.orchestrator.state_manager.get_trade("snipe-So111111")
+        self.assertEqual(expired["state"], TradeState.FAILED.value)
+        self.assertEqual(expired["rejection_reason"], "No approval within 0.05s")
+
+
+if __name__ == "__main__":
+    unittest.main()
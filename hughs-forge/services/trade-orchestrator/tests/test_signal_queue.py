@@ -0,0 +1,70 @@
+"""
+Unit tests for the EventLoop's priority lanes.
+"""
+
+import queue
+import threading
+import time
+import unittest
+from collections import Counter
+from core.signal_queue import (LANE_EXIT, LANE_METEORA, LANE_RETRY, LANE_SNIPE, LaneQueue, classify,
+                               parse_lanes)
+
+
+class TestClassify(unittest.TestCase):
+    def test_lanes_by_source_and_confidence(self):
+        self.assertEqual(classify({"token_address": "A", "side": "sell"}), LANE_EXIT)
+        self.assertEqual(classify({"token_address": "A"}), LANE_SNIPE)
+        self.assertEqual(classify({"source": "meteora_dlmm", "signal_type": "new_pool", "confidence": 0.9}),
+                         LANE_METEORA)
+        self.assertEqual(classify({"source": "meteora_dlmm", "signal_type": "fee_arbitrage", "confidence": 0.6}),
+                         LANE_RETRY)
+        self.assertEqual(classify({"token_address": "A", "lane": LANE_RETRY}), LANE_RETRY)
+
+    def test_parse_lanes(self):
+        self.assertEqual(parse_lanes("exit=0, snipe=8,retry=1"), (("exit", 0), ("snipe", 8), ("retry", 1)))
+        with self.assertRaises(ValueError):
+            parse_lanes(" , ")
+
+
+class TestLaneQueue(unittest.TestCase):
+    def setUp(self):
+        self.q = LaneQueue()
+
+    def test_strict_lane_served_first(self):
+        self.q.put("retry", LANE_RETRY)
+        self.q.put("snipe", LANE_SNIPE)
+        self.q.put("exit", LANE_EXIT)
+        self.assertEqual([self.q.get(timeout=0)[1] for _ in range(3)], ["exit", "snipe", "retry"])
+
+    def test_weighted_fair_share_without_starvation(self):
+        for i in range(100):
+            for lane in (LANE_SNIPE, LANE_METEORA, LANE_RETRY):
+                self.q.put(i, lane)
+        first = [self.q.get(timeout=0)[0] for _ in range(24)]
+        self.assertEqual(Counter(first), {LANE_SNIPE: 16, LANE_METEORA: 6, LANE_RETRY: 2})
+        # Interleaved, not batched: the retry lane is served within every round of 12
+        self.assertIn(LANE_RETRY, first[:12])
+        self.assertIn(LANE_RETRY, first[12:])
+
+    def test_fifo_within_lane(self):
+        for i in range(5):
+            self.q.put(i, LANE_SNIPE)
+        self.assertEqual([self.q.get(timeout=0)[1] for _ in range(5)], [0, 1, 2, 3, 4])
+
+    def test_get_blocks_until_put_or_timeout(self):
+        with self.assertRaises(queue.Empty):
+            self.q.get(timeout=0.05)
+        threading.Timer(0.05, self.q.put, args=("late", LANE_METEORA)).start()
+        started = time.monotonic()
+        self.assertEqual(self.q.get(timeout=2.0), (LANE_METEORA, "late"))
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(self.q.qsize(), 0)
+
+    def test_unknown_lane_rejected(self):
+        with self.assertRaises(ValueError):
+            self.q.put("x", "vip")
+
+
+if __name__ == "__main__":
+    unittest.main()
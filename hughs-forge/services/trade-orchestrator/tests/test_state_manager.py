@@ -6,6 +6,7 @@ import unittest
 import tempfile
 import os
 import json
+import threading
 from datetime import datetime
 from state.state_manager import TradeStateManager
 
@@ -17,7 +18,10 @@ class TestTradeStateManager(unittest.TestCase):
         self.manager = TradeStateManager(db_path=self.db_path)
 
     def tearDown(self):
-        os.unlink(self.db_path)
+        self.manager.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.db_path + suffix):
+                os.unlink(self.db_path + suffix)
 
     def test_save_and_get_trade_with_enriched_fields(self):
         trade_id = "test123"
@@ -97,6 +101,114 @@ class TestTradeStateManager(unittest.TestCase):
         self.assertEqual(trade["tx_signature"], "sig123")
         # route should still be present from previous save
         self.assertEqual(trade["route"], "JUPITER")
+    def test_connection_is_reused_in_wal_mode(self):
+        conn = self.manager._connect()
+        self.assertIs(conn, self.manager._connect())
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        # synchronous=NORMAL is 1
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+
+    def test_each_thread_gets_its_own_connection(self):
+        seen = []
+
+        def worker(i):
+            seen.append(self.manager._connect())
+            self.manager.save_trade(f"t{i}", "SIGNAL_RECEIVED", "token", 1.0, {"i": i})
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len({id(c) for c in seen}), 4)
+        for i in range(4):
+            self.assertEqual(self.manager.get_trade(f"t{i}")["data"], {"i": i})
+
+    def test_upsert_sql_cached_per_column_combination(self):
+        self.manager.save_trade("a", "ROUTING", "token", 1.0, {}, route="JUPITER")
+        self.manager.save_trade("b", "ROUTING", "token", 1.0, {}, route="METEORA")
+        self.manager.save_trade("a", "EXECUTED", "token", 1.0, {}, tx_signature="sig")
+        self.assertEqual(len(self.manager._upsert_sql), 2)
+
+    def test_signal_written_once_and_transitions_appended(self):
+        signal = {"source": "pumpfun", "symbol": "ABC", "confidence": 0.9}
+        self.manager.save_trade("ev", "SIGNAL_RECEIVED", "token", 5.0, signal)
+        self.manager.save_trade("ev", "ROUTING", "token", 5.0, signal, route="JUPITER")
+        self.manager.save_trade("ev", "EXECUTED", "token", 5.0, {**signal, "tx_signature": "sig"}, tx_signature="sig")
+
+        conn = self.manager._connect()
+        self.assertEqual(conn.execute("SELECT data FROM trades WHERE trade_id = 'ev'").fetchone()[0], "{}")
+        self.assertEqual(json.loads(conn.execute("SELECT data FROM trade_signals WHERE trade_id = 'ev'").fetchone()[0]),
+                         signal)
+
+        events = self.manager.get_trade_events("ev")
+        self.assertEqual([e["state"] for e in events], ["SIGNAL_RECEIVED", "ROUTING", "EXECUTED"])
+        # Only the keys that differ from the signal are stored per transition
+        self.assertEqual([e["payload"] for e in events], [{}, {}, {"tx_signature": "sig"}])
+
+        trade = self.manager.get_trade("ev")
+        self.assertEqual(trade["state"], "EXECUTED")
+        self.assertEqual(trade["data"], {**signal, "tx_signature": "sig"})
+
+    def test_signal_reloaded_after_restart(self):
+        self.manager.save_trade("rs", "VALIDATING", "token", 1.0, {"a": 1})
+        self.manager.close()
+        self.manager = TradeStateManager(db_path=self.db_path)
+        self.manager.save_trade("rs", "EXECUTED", "token", 1.0, {"a": 1, "b": 2})
+        self.assertEqual(self.manager.get_trade_events("rs")[-1]["payload"], {"b": 2})
+        self.assertEqual(self.manager.get_trade("rs")["data"], {"a": 1, "b": 2})
+
+    def test_rolled_back_signal_not_cached(self):
+        good = {"trade_id": "rb", "state": "SIGNAL_RECEIVED", "token_address": "token", "amount": 1.0,
+                "data": {"a": 1}}
+        with self.assertRaises(TypeError):
+            self.manager.save_trades([good, {"trade_id": "rb", "state": "ROUTING", "data": {}}])
+        self.assertNotIn("rb", self.manager._signals)
+
+        self.manager.save_trade("rb", "SIGNAL_RECEIVED", "token", 1.0, {"a": 2})
+        self.assertEqual(self.manager.get_trade_events("rb")[-1]["payload"], {})
+        self.assertEqual(self.manager.get_trade("rb")["data"], {"a": 2})
+
+    def test_migrate_trade_events_moves_legacy_blobs(self):
+        from migrate_trades_schema import migrate_trade_events
+        conn = self.manager._connect()
+        with conn:
+            conn.execute("INSERT INTO trades (trade_id, state, token_address, amount, data) VALUES (?, ?, ?, ?, ?)",
+                         ("legacy", "EXECUTED", "token", 1.0, json.dumps({"route": "JUPITER", "big": "x" * 100})))
+        self.assertEqual(self.manager.get_trade("legacy")["data"]["route"], "JUPITER")
+
+        migrate_trade_events(self.db_path)
+        migrate_trade_events(self.db_path)  # idempotent
+
+        self.assertEqual(conn.execute("SELECT data FROM trades WHERE trade_id = 'legacy'").fetchone()[0], "{}")
+        self.assertEqual([e["state"] for e in self.manager.get_trade_events("legacy")], ["EXECUTED"])
+        self.assertEqual(self.manager.get_trade("legacy")["data"]["big"], "x" * 100)
+
+    def test_indexes_serve_stats_and_dashboard_queries(self):
+        conn = self.manager._connect()
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertTrue({"idx_trades_stats", "idx_trades_state_updated", "idx_trades_token"} <= indexes)
+
+        def plan(sql, params):
+            return " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+        stats_plan = plan('''
+            SELECT state, token_address, amount, route, fee_lamports, slippage_bps, executed_at
+            FROM trades WHERE executed_at IS NOT NULL AND executed_at >= ?
+        ''', ("2026-01-01",))
+        self.assertIn("COVERING INDEX idx_trades_stats", stats_plan)
+        state_plan = plan("SELECT trade_id, state, token_address, amount, updated_at FROM trades "
+                          "WHERE state = ? ORDER BY updated_at DESC LIMIT ?", ("FAILED", 10))
+        self.assertIn("COVERING INDEX idx_trades_state_updated", state_plan)
+
+    def test_find_trades_filters_by_state_and_token(self):
+        self.manager.save_trade("f1", "FAILED", "tokA", 1.0, {})
+        self.manager.save_trade("f2", "EXECUTED", "tokA", 2.0, {})
+        self.manager.save_trade("f3", "FAILED", "tokB", 3.0, {})
+        self.assertEqual({t["trade_id"] for t in self.manager.find_trades(state="FAILED")}, {"f1", "f3"})
+        self.assertEqual({t["trade_id"] for t in self.manager.find_trades(token_address="tokA")}, {"f1", "f2"})
+        self.assertEqual([t["trade_id"] for t in self.manager.find_trades(state="FAILED", token_address="tokB")], ["f3"])
 
 if __name__ == "__main__":
     unittest.main()
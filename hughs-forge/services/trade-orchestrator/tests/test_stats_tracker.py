@@ -7,7 +7,10 @@ import json
 import tempfile
 import os
 from datetime import datetime, timedelta
+import time
+from feed.rolling_stats import RollingWindow, SpaceSaving
 from feed.stats_tracker import StatsTracker
+from state.state_manager import TradeStateManager
 import sqlite3
 
 class TestStatsTracker(unittest.TestCase):
@@ -54,14 +57,16 @@ class TestStatsTracker(unittest.TestCase):
                 )
             ''')
             conn.commit()
+        self._next_id = 0
 
     def _insert_trade(self, state, token, amount, route, fee, slippage, executed_at):
+        self._next_id += 1
         with sqlite3.connect(self.db_path) as conn:
             conn.execute('''
                 INSERT INTO trades (trade_id, state, token_address, amount, data, route, fee_lamports, slippage_bps, executed_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
-                f"trade_{hash(token)}",
+                f"trade_{self._next_id}",
                 state,
                 token,
                 amount,
@@ -97,5 +102,92 @@ class TestStatsTracker(unittest.TestCase):
         self.assertEqual(top_mints["ABC"], 2)
         self.assertEqual(top_mints["XYZ"], 1)
 
+    def test_seed_matches_sql_stats(self):
+        tracker = StatsTracker(db_path=self.db_path, output_path=self.stats_path)
+        tracker.seed()
+        stats = tracker.get_current_stats()
+        reference = tracker._compute_stats()
+        for key in ("trades_count", "total_volume_usd", "success_rate", "total_fees_lamports", "route_distribution"):
+            self.assertEqual(stats[key], reference[key])
+        self.assertEqual(stats["windows"]["24h"]["trades_count"], 3)
+        self.assertEqual(stats["top_tokens"][0], {"mint": "ABC", "count": 2})
+
+    def test_trade_events_update_every_window_once(self):
+        tracker = StatsTracker(db_path=self.db_path, output_path=self.stats_path)
+        now = time.time()
+        event = {"trade_id": "live-1", "state": "EXECUTED", "token_address": "NEW", "amount": 10.0,
+                 "route": "METEORA", "fee_lamports": 100, "ts": now,
+                 "executed_at": datetime.utcnow().isoformat() + "Z"}
+        tracker.on_trade_event({**event, "state": "ROUTING", "executed_at": None})  # not executed yet
+        tracker.on_trade_event(event)
+        tracker.on_trade_event(event)  # duplicate delivery
+        tracker.on_trade_event({**event, "trade_id": "old", "ts": now - 2 * 3600})
+
+        windows = tracker.get_current_stats()["windows"]
+        self.assertEqual(windows["5m"]["trades_count"], 1)
+        self.assertEqual(windows["1h"]["trades_count"], 1)
+        self.assertEqual(windows["24h"]["trades_count"], 2)
+        self.assertEqual(windows["5m"]["route_distribution"], {"METEORA": 1})
+
+    def test_state_manager_feeds_tracker_and_file_written_on_change(self):
+        tracker = StatsTracker(db_path=self.db_path, output_path=self.stats_path)
+        manager = TradeStateManager(db_path=self.db_path)
+        manager.subscribe(tracker.on_trade_event)
+        manager.save_trade("m1", "ROUTING", "MNT", 25.0, {}, route="JUPITER")
+        manager.save_trade("m1", "EXECUTED", "MNT", 25.0, {}, fee_lamports=7,
+                           executed_at=datetime.utcnow().isoformat() + "Z")
+        manager.close()
+
+        self.assertTrue(tracker._write_if_changed())
+        self.assertFalse(tracker._write_if_changed())
+        with open(self.stats_path) as f:
+            written = json.load(f)
+        self.assertEqual(written["windows"]["5m"]["trades_count"], 1)
+        self.assertEqual(written["windows"]["5m"]["total_fees_lamports"], 7)
+        self.assertFalse(os.path.exists(self.stats_path + ".tmp"))
+
+    def test_rejected_trades_stay_out_of_success_rate(self):
+        tracker = StatsTracker(db_path=self.db_path, output_path=self.stats_path)
+        manager = TradeStateManager(db_path=self.db_path)
+        manager.subscribe(tracker.on_trade_event)
+        tracker.seed()
+        manager.save_trade("r1", "FAILED", "MNT", 5.0, {}, rejection_reason="risk")
+        manager.close()
+
+        stats = tracker.get_current_stats()
+        reference = tracker._compute_stats()
+        self.assertEqual(stats["trades_count"], 3)
+        self.assertEqual(stats["success_rate"], reference["success_rate"])
+
+        reseeded = StatsTracker(db_path=self.db_path, output_path=self.stats_path)
+        reseeded.seed()
+        self.assertEqual(reseeded.get_current_stats()["trades_count"], 3)
+
+
+class TestRollingWindow(unittest.TestCase):
+    def test_buckets_expire_out_of_window(self):
+        window = RollingWindow(window_seconds=60, bucket_seconds=10)
+        window.add(1000.0, "A", 1.0, "JUPITER", 5, True)
+        window.add(1035.0, "B", 2.0, "METEORA", 5, False)
+        self.assertEqual(window.snapshot(1040.0)["trades_count"], 2)
+
+        snap = window.snapshot(1065.0)  # first bucket (1000-1010) has left the window
+        self.assertEqual(snap["trades_count"], 1)
+        self.assertEqual(snap["route_distribution"], {"METEORA": 1})
+        self.assertEqual(snap["success_rate"], 0.0)
+
+        self.assertEqual(window.snapshot(5000.0)["trades_count"], 0)
+        self.assertEqual(window.snapshot(5000.0)["total_volume_usd"], 0.0)
+        self.assertFalse(window.add(1000.0, "A", 1.0, None, None, True))
+
+    def test_space_saving_keeps_heavy_hitters(self):
+        summary = SpaceSaving(capacity=4)
+        for i in range(200):
+            summary.add("HOT")
+            summary.add(f"cold-{i}")
+        self.assertIn("HOT", summary.counts)
+        self.assertLessEqual(len(summary.counts), 4)
+        self.assertGreaterEqual(summary.counts["HOT"], 200)
+
 if __name__ == "__main__":
     unittest.main()
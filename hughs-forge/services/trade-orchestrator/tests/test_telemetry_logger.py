@@ -0,0 +1,86 @@
+"""
+Unit tests for the queued JSONL telemetry logger.
+"""
+
+import glob
+import gzip
+import json
+import logging
+import os
+import queue
+import tempfile
+import unittest
+from telemetry.logger import (RotatingJsonlHandler, TelemetryQueueHandler, setup_telemetry_logger,
+                              shutdown_telemetry)
+
+
+class TestTelemetryLogger(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.tmp.name, "logs", "orchestrator.jsonl")
+
+    def tearDown(self):
+        shutdown_telemetry("TelemetryTest")
+        self.tmp.cleanup()
+
+    def _read(self):
+        with open(self.log_file) as f:
+            return [json.loads(line) for line in f]
+
+    def test_writes_json_lines_off_thread(self):
+        logger = setup_telemetry_logger("TelemetryTest", self.log_file, console=False)
+        self.assertEqual([type(h) for h in logger.handlers], [TelemetryQueueHandler])
+        logger.info("Trade %s routed", "t1", extra={"payload": {"route": "JUPITER"}})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Execution failed")
+        shutdown_telemetry("TelemetryTest")
+
+        records = self._read()
+        self.assertEqual(records[0]["message"], "Trade t1 routed")
+        self.assertEqual(records[0]["route"], "JUPITER")
+        self.assertIn("ValueError: boom", records[1]["exception"])
+
+    def test_sampling_keeps_one_in_n_and_all_warnings(self):
+        logger = setup_telemetry_logger("TelemetryTest", self.log_file, console=False,
+                                        sample_every={"Quote refreshed": 10})
+        for _ in range(100):
+            logger.info("Quote refreshed")
+        logger.warning("Quote refreshed")
+        logger.info("Trade executed")
+        shutdown_telemetry("TelemetryTest")
+
+        records = self._read()
+        quotes = [r for r in records if r["message"] == "Quote refreshed"]
+        self.assertEqual(len(quotes), 11)
+        self.assertEqual(quotes[0]["sample_rate"], 10)
+        self.assertEqual(quotes[-1]["level"], "WARNING")
+        self.assertEqual(records[-1]["message"], "Trade executed")
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = TelemetryQueueHandler(queue.Queue(maxsize=2))
+        record = logging.LogRecord("t", logging.INFO, __file__, 1, "event", None, None)
+        for _ in range(5):
+            handler.handle(record)
+        self.assertEqual(handler.queue.qsize(), 2)
+        self.assertEqual(handler.dropped, 3)
+
+    def test_rotates_by_size_and_compresses(self):
+        os.makedirs(os.path.dirname(self.log_file))
+        handler = RotatingJsonlHandler(self.log_file, max_bytes=1000, rotate_seconds=0, backup_count=2)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        for i in range(100):
+            handler.handle(logging.LogRecord("t", logging.INFO, __file__, 1, "x" * 99, None, None))
+        handler.close()
+
+        rotated = glob.glob(self.log_file + ".*")
+        self.assertEqual(len(rotated), 2)
+        self.assertTrue(all(path.endswith(".gz") for path in rotated))
+        with gzip.open(rotated[0], "rt") as f:
+            self.assertEqual(len(f.read().splitlines()), 10)
+        self.assertLessEqual(os.path.getsize(self.log_file), 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit tests for per-signal tracing and the trace_summary tool.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from telemetry import tracing
+from telemetry.tracing import configure_tracing, current_context, record_span, shutdown_tracing, span, use_context
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from trace_summary import iter_spans, percentile, summarize  # noqa: E402
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "traces.jsonl")
+        configure_tracing(self.path, flush_interval_s=60.0)
+
+    def tearDown(self):
+        shutdown_tracing()
+        self.tmp.cleanup()
+
+    def _spans(self):
+        tracing._exporter.flush()
+        return {s["name"]: s for s in iter_spans([self.path])}
+
+    def test_context_crosses_thread_hop(self):
+        with span("signal", {"mint": "abc"}, start_ns=1):
+            with span("momentum"):
+                pass
+            carried = current_context()
+
+        def worker():
+            with use_context(carried):
+                record_span("queue_wait", 0.01)
+                with span("process_signal"):
+                    record_span("route", 0.002)
+
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+
+        spans = self._spans()
+        trace_ids = {s["traceId"] for s in spans.values()}
+        self.assertEqual(len(trace_ids), 1)
+        root = spans["signal"]
+        self.assertNotIn("parentSpanId", root)
+        self.assertEqual(root["startTimeUnixNano"], "1")
+        self.assertEqual(spans["momentum"]["parentSpanId"], root["spanId"])
+        self.assertEqual(spans["queue_wait"]["parentSpanId"], root["spanId"])
+        self.assertEqual(spans["route"]["parentSpanId"], spans["process_signal"]["spanId"])
+        self.assertEqual(root["attributes"], [{"key": "mint", "value": {"stringValue": "abc"}}])
+
+    def test_exception_marks_span_error(self):
+        with self.assertRaises(ValueError):
+            with span("jupiter.quote"):
+                raise ValueError("429")
+        status = self._spans()["jupiter.quote"]["status"]
+        self.assertEqual(status["code"], tracing.STATUS_ERROR)
+        self.assertIn("429", status["message"])
+
+    def test_disabled_tracing_is_noop(self):
+        shutdown_tracing()
+        with span("signal") as s:
+            s.set_attribute("x", 1)
+            self.assertIsNone(current_context())
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_summary_percentiles(self):
+        for ms in range(1, 101):
+            record_span("execute", ms / 1000.0)
+        by_name, end_to_end = summarize(iter_spans([self._flush_path()]))
+        values = sorted(by_name["execute"])
+        self.assertAlmostEqual(percentile(values, 50), 50.0, places=1)
+        self.assertAlmostEqual(percentile(values, 99), 99.0, places=1)
+        self.assertEqual(len(end_to_end), 100)
+
+    def _flush_path(self):
+        tracing._exporter.flush()
+        with open(self.path) as f:
+            self.assertTrue(all("resourceSpans" in json.loads(line) for line in f))
+        return self.path
+
+
+if __name__ == '__main__':
+    unittest.main()
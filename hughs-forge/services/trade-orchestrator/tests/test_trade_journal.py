@@ -0,0 +1,146 @@
+"""
+Unit tests for the write-behind TradeJournal.
+"""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from state.journal import TradeJournal
+from state.state_manager import TradeStateManager
+
+TOKEN = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+
+
+class TestTradeJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "trades.db")
+        self.journal_path = self.db_path + ".journal"
+        self.manager = TradeStateManager(db_path=self.db_path)
+        self.journal = None
+
+    def tearDown(self):
+        if self.journal:
+            self.journal.close()
+        self.manager.close()
+        self.tmp.cleanup()
+
+    def _journal(self, **kwargs):
+        kwargs.setdefault("flush_interval_s", 60.0)
+        self.journal = TradeJournal(self.manager, journal_path=self.journal_path, **kwargs)
+        return self.journal
+
+    def test_intermediate_states_are_deferred(self):
+        journal = self._journal()
+        journal.save_trade("t1", "SIGNAL_RECEIVED", TOKEN, 10.0, {"a": 1})
+        journal.save_trade("t1", "ROUTING", TOKEN, 10.0, {"a": 1}, route="JUPITER")
+
+        self.assertIsNone(self.manager.get_trade("t1"))
+        with open(self.journal_path) as f:
+            self.assertEqual([json.loads(line)["state"] for line in f], ["SIGNAL_RECEIVED", "ROUTING"])
+
+        journal.flush()
+        trade = self.manager.get_trade("t1")
+        self.assertEqual(trade["state"], "ROUTING")
+        self.assertEqual(trade["route"], "JUPITER")
+        self.assertEqual(os.path.getsize(self.journal_path), 0)
+
+    def test_terminal_state_commits_synchronously_after_pending(self):
+        journal = self._journal()
+        journal.save_trade("t1", "ROUTING", TOKEN, 10.0, {}, route="METEORA")
+        journal.save_trade("t1", "EXECUTED", TOKEN, 10.0, {}, tx_signature="sig")
+
+        trade = self.manager.get_trade("t1")
+        self.assertEqual(trade["state"], "EXECUTED")
+        self.assertEqual(trade["route"], "METEORA")
+        self.assertEqual(trade["tx_signature"], "sig")
+        self.assertEqual(journal.stats["sync_commits"], 1)
+
+    def test_batch_size_wakes_flusher(self):
+        journal = self._journal(batch_size=3)
+        for state in ("SIGNAL_RECEIVED", "VALIDATING", "ROUTING"):
+            journal.save_trade("t1", state, TOKEN, 1.0, {})
+
+        deadline = time.time() + 2.0
+        while self.manager.get_trade("t1") is None and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.manager.get_trade("t1")["state"], "ROUTING")
+
+    def test_recover_replays_crashed_journal(self):
+        # Simulate a crash: entries journaled but never committed
+        with open(self.journal_path, "w") as f:
+            f.write(json.dumps({"trade_id": "t1", "state": "VALIDATING", "token_address": TOKEN,
+                                "amount": 1.0, "data": {}}) + "\n")
+            f.write(json.dumps({"trade_id": "t2", "state": "ROUTING", "token_address": TOKEN,
+                                "amount": 2.0, "data": {}, "route": "JUPITER"}) + "\n")
+            f.write('{"trade_id": "t3", "sta')  # torn tail
+
+        journal = self._journal()
+        self.assertEqual(journal.stats["replayed"], 2)
+        self.assertEqual(self.manager.get_trade("t1")["state"], "VALIDATING")
+        self.assertEqual(self.manager.get_trade("t2")["route"], "JUPITER")
+        self.assertIsNone(self.manager.get_trade("t3"))
+        self.assertEqual(os.path.getsize(self.journal_path), 0)
+
+    def test_recover_never_regresses_final_state(self):
+        self.manager.save_trade("t1", "EXECUTED", TOKEN, 1.0, {}, tx_signature="sig")
+        with open(self.journal_path, "w") as f:
+            f.write(json.dumps({"trade_id": "t1", "state": "ROUTING", "token_address": TOKEN,
+                                "amount": 1.0, "data": {}}) + "\n")
+
+        journal = self._journal()
+        self.assertEqual(journal.stats["replayed"], 0)
+        self.assertEqual(self.manager.get_trade("t1")["state"], "EXECUTED")
+
+    def test_recover_skips_already_committed_entries(self):
+        self.manager.save_trade("t1", "VALIDATING", TOKEN, 1.0, {}, ts=1000.5)
+        with open(self.journal_path, "w") as f:
+            for state, ts in (("VALIDATING", 1000.5), ("ROUTING", 1001.0)):
+                f.write(json.dumps({"trade_id": "t1", "state": state, "token_address": TOKEN,
+                                    "amount": 1.0, "data": {}, "ts": ts}) + "\n")
+
+        journal = self._journal()
+        self.assertEqual(journal.stats["replayed"], 1)
+        self.assertEqual([e["state"] for e in self.manager.get_trade_events("t1")], ["VALIDATING", "ROUTING"])
+
+    def test_unchanged_blob_is_journaled_once(self):
+        journal = self._journal()
+        signal = {"quote": "q" * 500}
+        journal.save_trade("t1", "SIGNAL_RECEIVED", TOKEN, 1.0, signal)
+        journal.save_trade("t1", "VALIDATING", TOKEN, 1.0, signal)
+        with open(self.journal_path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[0]["data"], signal)
+        self.assertNotIn("data", records[1])
+
+        # A crash here replays both with the blob restored
+        journal._journal_file.close()
+        journal._journal_file = None
+        journal._ring.clear()
+        replayed = TradeJournal(self.manager, journal_path=self.journal_path, flush_interval_s=60.0)
+        replayed.close()
+        self.assertEqual(replayed.stats["replayed"], 2)
+        self.assertEqual(self.manager.get_trade("t1")["data"], signal)
+
+    def test_blob_mutated_in_place_is_journaled_again(self):
+        journal = self._journal()
+        signal = {"quote": "q"}
+        journal.save_trade("t1", "SIGNAL_RECEIVED", TOKEN, 1.0, signal)
+        signal["route_plan"] = "jupiter"
+        journal.save_trade("t1", "ROUTING", TOKEN, 1.0, signal)
+        with open(self.journal_path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[1]["data"], {"quote": "q", "route_plan": "jupiter"})
+
+    def test_close_commits_pending(self):
+        journal = self._journal()
+        journal.save_trade("t1", "VALIDATING", TOKEN, 1.0, {})
+        journal.close()
+        self.journal = None
+        self.assertEqual(self.manager.get_trade("t1")["state"], "VALIDATING")
+
+
+if __name__ == '__main__':
+    unittest.main()
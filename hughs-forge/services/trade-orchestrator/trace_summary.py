@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Per-stage latency summary of exported traces.
+
+Reads the OTLP/JSON lines written by telemetry/tracing.py (or by an
+OpenTelemetry Collector file exporter) and prints, per span name, the
+count and p50/p95/p99/max duration, plus the end-to-end duration of each
+trace (first span start to last span end: pump.fun frame to tx signature
+when the trace is complete).
+
+Usage:
+    python trace_summary.py logs/traces.jsonl [more.jsonl ...] [--since-minutes 60] [--name-filter execute]
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+
+def iter_spans(paths: Iterable[str]):
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line of a live file
+                for resource_spans in request.get("resourceSpans", ()):
+                    for scope_spans in resource_spans.get("scopeSpans", ()):
+                        yield from scope_spans.get("spans", ())
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(spans: Iterable[dict], since_ns: int = 0) -> Tuple[Dict[str, List[float]], List[float]]:
+    """Returns ({span name: durations in ms}, [end-to-end trace durations in ms])."""
+    by_name: Dict[str, List[float]] = defaultdict(list)
+    traces: Dict[str, List[int]] = {}
+    for span in spans:
+        start, end = int(span["startTimeUnixNano"]), int(span["endTimeUnixNano"])
+        if start < since_ns:
+            continue
+        by_name[span["name"]].append((end - start) / 1e6)
+        bounds = traces.setdefault(span["traceId"], [start, end])
+        bounds[0] = min(bounds[0], start)
+        bounds[1] = max(bounds[1], end)
+    end_to_end = [(end - start) / 1e6 for start, end in traces.values()]
+    return by_name, end_to_end
+
+
+def format_row(name: str, values: List[float]) -> str:
+    values = sorted(values)
+    return (f"{name:<22} {len(values):>7} {percentile(values, 50):>10.2f} {percentile(values, 95):>10.2f} "
+            f"{percentile(values, 99):>10.2f} {values[-1]:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--since-minutes", type=float, default=None, help="Only spans that started in this window")
+    parser.add_argument("--name-filter", default=None, help="Only span names containing this string")
+    args = parser.parse_args()
+
+    since_ns = int((time.time() - args.since_minutes * 60) * 1e9) if args.since_minutes else 0
+    by_name, end_to_end = summarize(iter_spans(args.paths), since_ns)
+    if not by_name:
+        print("no spans found", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"{'span (ms)':<22} {'count':>7} {'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}")
+    # Slowest median first: that is where the time goes
+    for name, values in sorted(by_name.items(), key=lambda kv: -percentile(sorted(kv[1]), 50)):
+        if args.name_filter and args.name_filter not in name:
+            continue
+        print(format_row(name, values))
+    print(format_row("end-to-end (trace)", end_to_end))
+
+
+if __name__ == "__main__":
+    main()
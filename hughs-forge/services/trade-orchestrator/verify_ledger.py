@@ -146,9 +146,11 @@ def verify_discord_rate_limit():
         # Send 6 messages
         for i in range(6):
             broadcaster.broadcast_trade_executed({"trade_id": f"t{i}"})
-        # Only first 5 should have been sent
-        if len(calls) != 5:
-            print(f"Expected 5 sent, got {len(calls)}")
+        broadcaster.flush()
+        # Only first 5 should have been sent (batched into webhook messages)
+        sent = sum(len(payload["embeds"]) for payload in calls)
+        if sent != 5:
+            print(f"Expected 5 sent, got {sent}")
             return False
         print("✓ Rate limit blocks excess messages")
         return True
@@ -2,7 +2,7 @@ import sqlite3
 import os
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 
 class LedgerDB:
     """
@@ -11,8 +11,16 @@ class LedgerDB:
     """
     def __init__(self, db_path: str = "src/data/ledger.db"):
         self.db_path = db_path
+        self._listeners: List[Callable[[str, Optional[Dict[str, Any]]], None]] = []
         self._init_db()
 
+    def subscribe(self, callback: Callable[[str, Optional[Dict[str, Any]]], None]):
+        """
+        Registers a callback fired after every committed position change with
+        (mint, position_row) — position_row is None once the position is closed.
+        """
+        self._listeners.append(callback)
+
     def _get_connection(self):
         # Using check_same_thread=False because the state machine is async
         return sqlite3.connect(self.db_path, check_same_thread=False)
@@ -82,6 +90,18 @@ class LedgerDB:
                 self._update_position_on_sell(cursor, trade_data, timestamp)
             
             conn.commit()
+            position = self._fetch_position(conn, trade_data['mint']) if self._listeners else None
+
+        for listener in self._listeners:
+            try:
+                listener(trade_data['mint'], position)
+            except Exception as e:
+                print(f"[LEDGER] Listener failed for {trade_data['mint']}: {e}")
+
+    def _fetch_position(self, conn, mint: str) -> Optional[Dict[str, Any]]:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute("SELECT * FROM positions WHERE mint = ?", (mint,)).fetchone()
+        return dict(row) if row else None
 
     def _update_position_on_buy(self, cursor, trade_data, timestamp):
         # Simple average entry price calculation
@@ -0,0 +1,227 @@
+# Host-wide trading flags behind KillSwitch.is_halted().
+#
+# Shared halt / circuit-breaker flags for every service process on the host.
+# The state lives in a small memory-mapped file (under /dev/shm by default),
+# so a halt check is one byte read from the page cache instead of a stat()
+# of the force-stop lock file on every trade. A watcher thread follows the
+# lock file's directory with inotify and republishes the halt byte as soon
+# as the file appears or disappears; where inotify is unavailable it polls.
+# If that thread dies, the halt byte can no longer be trusted, so this
+# process falls back to stat()ing the lock file on every check.
+#
+# Layout: byte 0 halt (force-stop file present), byte 1 circuit breaker,
+# bytes 8..16 a little-endian sequence number bumped on every change.
+# The flags outlive any one process (until the file is removed or the host
+# reboots): starting a service never clears a breaker another one tripped.
+# Operators inspect and reset them with `python -m src.executor.control_plane`.
+#
+# A copy of hughs-forge/services/trade-executor/control_plane.py (only this
+# header comment differs); change the two together.
+import argparse
+import ctypes
+import ctypes.util
+import logging
+import mmap
+import os
+import select
+import struct
+import tempfile
+import threading
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FORCE_STOP_FILE = "/data/openclaw/trade_stop.lock"
+_SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+CONTROL_PLANE_PATH = os.environ.get("CONTROL_PLANE_PATH", os.path.join(_SHM_DIR, "openclaw_control_plane"))
+CONTROL_PLANE_POLL_S = float(os.environ.get("CONTROL_PLANE_POLL_S", "0.25"))
+
+HALT_OFFSET = 0
+CIRCUIT_BREAKER_OFFSET = 1
+SEQUENCE_OFFSET = 8
+MAP_SIZE = 64
+
+# inotify(7) constants
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = os.O_CLOEXEC
+_IN_WATCH_MASK = (0x00000008 | 0x00000040 | 0x00000080 | 0x00000100 | 0x00000200
+                  | 0x00000400 | 0x00000800)  # CLOSE_WRITE, MOVED_FROM/TO, CREATE, DELETE, DELETE_SELF, MOVE_SELF
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    name = ctypes.util.find_library("c")
+    try:
+        libc = ctypes.CDLL(name or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch  # noqa: B018 - raises AttributeError off Linux
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class ControlPlane:
+    """
+    Host-wide trading control flags. is_halted() and circuit_breaker_active()
+    read the shared map and take no lock or syscall; writes take effect in
+    every process that maps the same `path`. start() launches the stop-file
+    watcher (idempotent); any number of processes may run one, they publish
+    the same value. Should this process's watcher die, is_halted() stats the
+    stop file itself until start() is called again.
+    """
+    def __init__(self, stop_file: str = FORCE_STOP_FILE, path: str = CONTROL_PLANE_PATH,
+                 poll_interval_s: float = CONTROL_PLANE_POLL_S, use_inotify: bool = True):
+        self.stop_file = stop_file
+        self.path = path
+        self.poll_interval_s = poll_interval_s
+        self.use_inotify = use_inotify
+        self.mode: Optional[str] = None  # "inotify" or "poll" once started
+        # created: this instance made the map file, so nothing else has published into it yet
+        self._map, self.created = self._open_map(path)
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._watcher_failed = False
+
+    @staticmethod
+    def _open_map(path: str) -> Tuple[mmap.mmap, bool]:
+        """The shared map (zero-filled when new), and whether this call created the file."""
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o660)
+            created = True
+        except FileExistsError:
+            fd, created = None, False
+        except OSError as e:
+            fd, created = None, True
+            logger.warning(f"Control plane file {path} unavailable ({e}); flags are local to this process")
+            return mmap.mmap(-1, MAP_SIZE), created
+        try:
+            if fd is None:
+                fd = os.open(path, os.O_RDWR)
+            if os.fstat(fd).st_size < MAP_SIZE:
+                os.ftruncate(fd, MAP_SIZE)
+            return mmap.mmap(fd, MAP_SIZE), created
+        except OSError as e:
+            logger.warning(f"Control plane file {path} unavailable ({e}); flags are local to this process")
+            return mmap.mmap(-1, MAP_SIZE), True
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def is_halted(self) -> bool:
+        """True while the force-stop lock file is present (as last published by a watcher)."""
+        if self._watcher_failed:
+            return os.path.exists(self.stop_file)
+        return self._map[HALT_OFFSET] != 0
+
+    def circuit_breaker_active(self) -> bool:
+        return self._map[CIRCUIT_BREAKER_OFFSET] != 0
+
+    def sequence(self) -> int:
+        """Bumped on every published change; lets readers notice a flip they did not poll for."""
+        return struct.unpack_from("<Q", self._map, SEQUENCE_OFFSET)[0]
+
+    def _publish(self, offset: int, value: bool) -> bool:
+        with self._write_lock:
+            if (self._map[offset] != 0) == value:
+                return False
+            self._map[offset] = 1 if value else 0
+            struct.pack_into("<Q", self._map, SEQUENCE_OFFSET, self.sequence() + 1)
+        return True
+
+    def set_halted(self, halted: bool):
+        if self._publish(HALT_OFFSET, halted):
+            log = logger.critical if halted else logger.info
+            log(f"Control plane: halt {'set' if halted else 'cleared'} ({self.stop_file})")
+
+    def set_circuit_breaker(self, active: bool):
+        self._publish(CIRCUIT_BREAKER_OFFSET, active)
+
+    def sync(self):
+        """Publishes the stop file's current presence."""
+        self.set_halted(os.path.exists(self.stop_file))
+
+    def start(self):
+        """Syncs once, then follows the stop file in a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.sync()
+        self._stop.clear()
+        self._watcher_failed = False
+        inotify_fd = self._inotify_watch() if self.use_inotify else None
+        self.mode = "poll" if inotify_fd is None else "inotify"
+        self._thread = threading.Thread(target=self._watch, args=(inotify_fd,), name="control-plane", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None:
+            thread.join(timeout=max(1.0, 2 * self.poll_interval_s))
+
+    def _inotify_watch(self) -> Optional[int]:
+        """An inotify fd watching the stop file's directory, or None to fall back to polling."""
+        libc = _load_libc()
+        directory = os.path.dirname(os.path.abspath(self.stop_file))
+        if libc is None or not os.path.isdir(directory):
+            return None
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            logger.warning(f"inotify_init1 failed ({os.strerror(ctypes.get_errno())}); polling {self.stop_file}")
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(directory), _IN_WATCH_MASK) < 0:
+            logger.warning(f"inotify_add_watch({directory}) failed ({os.strerror(ctypes.get_errno())}); polling")
+            os.close(fd)
+            return None
+        return fd
+
+    def _watch(self, inotify_fd: Optional[int]):
+        try:
+            while not self._stop.is_set():
+                if inotify_fd is None:
+                    self._stop.wait(self.poll_interval_s)
+                else:
+                    # Events only say "something in the directory changed"; the poll
+                    # timeout doubles as a resync and as the stop() check interval.
+                    readable, _, _ = select.select([inotify_fd], [], [], self.poll_interval_s)
+                    if readable:
+                        try:
+                            os.read(inotify_fd, 64 * 1024)
+                        except BlockingIOError:
+                            pass
+                self.sync()
+        except Exception as e:
+            logger.error(f"Control plane watcher failed: {e}; checking {self.stop_file} directly")
+        finally:
+            if not self._stop.is_set():
+                self._watcher_failed = True
+            if inotify_fd is not None:
+                os.close(inotify_fd)
+
+    def close(self):
+        self.stop()
+        self._map.close()
+
+
+_planes: Dict[Tuple[str, str], ControlPlane] = {}
+_planes_lock = threading.Lock()
+
+
+def get_control_plane(path: str = CONTROL_PLANE_PATH, stop_file: str = FORCE_STOP_FILE) -> ControlPlane:
+    """The process-wide ControlPlane for `path`, created (and its map file opened) on first use."""
+    with _planes_lock:
+        plane = _planes.get((path, stop_file))
+        if plane is None:
+            plane = _planes[(path, stop_file)] = ControlPlane(stop_file=stop_file, path=path)
+        return plane
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or reset the host-wide trading flags")
+    parser.add_argument("--path", default=CONTROL_PLANE_PATH)
+    parser.add_argument("--reset-circuit-breaker", action="store_true",
+                        help="Clear a tripped circuit breaker for every process on the host")
+    args = parser.parse_args()
+    plane = ControlPlane(path=args.path)
+    if args.reset_circuit_breaker:
+        plane.set_circuit_breaker(False)
+    print(f"halted={plane.is_halted()} circuit_breaker={plane.circuit_breaker_active()} sequence={plane.sequence()}")
+    plane.close()
@@ -0,0 +1,67 @@
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Tuple, Union
+from solders.instruction import Instruction
+from solders.message import Message, MessageV0
+from solders.pubkey import Pubkey
+
+COMPUTE_BUDGET_PROGRAM = Pubkey.from_string("ComputeBudget111111111111111111111111111111")
+MAX_COMPUTE_UNITS = 1_400_000
+
+# (sorted program ids, instruction count), compute-budget instructions excluded
+RouteShape = Tuple[Tuple[str, ...], int]
+
+
+def route_shape(tx_or_instructions: Union[Message, MessageV0, Iterable[Instruction]]) -> RouteShape:
+    """The cache key for a compiled message or an instruction list: which programs it calls, and how often."""
+    if isinstance(tx_or_instructions, (Message, MessageV0)):
+        keys = tx_or_instructions.account_keys
+        programs = [keys[ix.program_id_index] for ix in tx_or_instructions.instructions]
+    else:
+        programs = [ix.program_id for ix in tx_or_instructions]
+    programs = [p for p in programs if p != COMPUTE_BUDGET_PROGRAM]
+    return tuple(sorted({str(p) for p in programs})), len(programs)
+
+
+class CUProfileCache:
+    """
+    Compute units consumed per route shape, learned from simulations and
+    landed transactions. predict() sizes set_compute_unit_limit as the
+    highest of the last `window` observations times `margin`, instead of the
+    flat 200k default, so the priority fee is paid on units actually used.
+
+    Once a shape has `min_samples` observations whose spread is within
+    `max_spread` of the highest, it is stable: callers may trust the
+    prediction and skip the simulation round-trip.
+    """
+    def __init__(self, window: int = 32, margin: float = 1.15, min_samples: int = 3, max_spread: float = 0.25):
+        self.window = window
+        self.margin = margin
+        self.min_samples = min_samples
+        self.max_spread = max_spread
+        self._units: Dict[RouteShape, Deque[int]] = {}
+
+    def observe(self, shape: RouteShape, units: Optional[int]):
+        """Records units consumed by a successful simulation or a landed transaction."""
+        if not units or units <= 0:
+            return
+        samples = self._units.get(shape)
+        if samples is None:
+            samples = self._units[shape] = deque(maxlen=self.window)
+        samples.append(int(units))
+
+    def predict(self, shape: RouteShape) -> Optional[int]:
+        """Compute-unit limit for the shape, or None if it has never been observed."""
+        samples = self._units.get(shape)
+        if not samples:
+            return None
+        return min(int(max(samples) * self.margin), MAX_COMPUTE_UNITS)
+
+    def is_stable(self, shape: RouteShape) -> bool:
+        samples = self._units.get(shape)
+        if not samples or len(samples) < self.min_samples:
+            return False
+        high = max(samples)
+        return (high - min(samples)) <= high * self.max_spread
+
+    def __len__(self) -> int:
+        return len(self._units)
@@ -1,60 +1,61 @@
 import asyncio
-from typing import List, Dict, Any, Optional
+import inspect
+from typing import Awaitable, Callable, List, Dict, Any, Optional, Union
 from datetime import datetime
 from src.data.ledger import LedgerDB
+from src.executor.position_book import PositionBook
+from src.services.price_fetcher import PriceFetcher
 
 class ExitStrategist:
     """
     Monitors open positions and executes automatic sell signals 
     based on Take-Profit (TP) and Stop-Loss (SL) thresholds.
+
+    Positions live in an in-memory PositionBook that is loaded once from the
+    ledger and then kept in sync through ledger change notifications, so a
+    tick never touches SQLite.
+
+    Signals go to `dispatch(signal)`, which returns True once the exit is
+    under way. A level whose exit was not dispatched (no dispatcher, False,
+    or an exception) is re-armed and fires again on the next check.
     """
-    def __init__(self, ledger: LedgerDB, tp_percent: float = 20.0, sl_percent: float = -10.0):
+    def __init__(self, ledger: LedgerDB, tp_percent: float = 20.0, sl_percent: float = -10.0,
+                 dispatch: Optional[Callable[[Dict[str, Any]], Union[bool, Awaitable[bool]]]] = None):
         self.ledger = ledger
         self.tp_percent = tp_percent
         self.sl_percent = sl_percent
+        self.dispatch = dispatch
+        self.book = PositionBook(tp_percent, sl_percent)
+        self.book.load(ledger.get_active_positions())
+        ledger.subscribe(self._on_ledger_change)
+
+    def _on_ledger_change(self, mint: str, position: Optional[Dict[str, Any]]):
+        if position is None:
+            self.book.remove(mint)
+        else:
+            self.book.upsert(position)
+
+    def on_price(self, mint: str, price: float) -> List[Dict[str, Any]]:
+        """Event-driven entry point: returns the TP/SL signals this single tick crossed."""
+        return self.book.on_price(mint, price)
 
     async def check_all_positions(self, current_prices: Dict[str, float]) -> List[Dict[str, Any]]:
         """
-        Compares ledger positions against current market prices.
-        Returns a list of signal triggers.
+        Compares book positions against current market prices.
+        Returns a list of signal triggers. Each level fires once per arm;
+        dispatch_signals() re-arms the ones whose exit did not go through.
         """
-        positions = self.ledger.get_active_positions()
         signals = []
-
-        for pos in positions:
-            mint = pos['mint']
-            if mint not in current_prices:
-                continue
-
-            current_price = current_prices[mint]
-            avg_entry = pos['avg_entry_price']
-            
-            # Calculate % change
-            change = ((current_price - avg_entry) / avg_entry) * 100
-            
-            trigger = None
-            if change >= self.tp_percent:
-                trigger = "TAKE_PROFIT"
-            elif change <= self.sl_percent:
-                trigger = "STOP_LOSS"
-
-            if trigger:
-                signals.append({
-                    "trigger": trigger,
-                    "mint": mint,
-                    "symbol": pos.get('symbol', 'UNKNOWN'),
-                    "amount_atoms": pos['amount_atoms'],
-                    "entry_price": avg_entry,
-                    "current_price": current_price,
-                    "pnl_percent": change
-                })
-        
+        for mint, current_price in current_prices.items():
+            signals.extend(self.book.on_price(mint, current_price))
         return signals
 
     async def exit_monitor_loop(self, price_fetcher_func, interval_sec: int = 60):
         """
         Heartbeat loop that periodically checks for exit conditions.
-        Price_fetcher_func must return a map of {mint: price_usd}
+        Price_fetcher_func must return a map of {mint: price_usd}.
+        If it exposes next_delay() (see PriceFetcher), the loop wakes up as soon as
+        the next mint is due instead of waiting a full interval.
         """
         print(f"[EXIT] Starting exit monitor (TP: {self.tp_percent}%, SL: {self.sl_percent}%)")
         while True:
@@ -64,11 +65,34 @@ class ExitStrategist:
                 # Check for triggers
                 signals = await self.check_all_positions(prices)
                 
-                for signal in signals:
-                    print(f"[REAPER] Signal Triggered: {signal['trigger']} for {signal['symbol']} ({signal['pnl_percent']:.2f}%)")
-                    # TODO: Dispatch to execution state machine
-                
-                await asyncio.sleep(interval_sec)
+                await self.dispatch_signals(signals)
+
+                await asyncio.sleep(self._next_sleep(price_fetcher_func, interval_sec))
             except Exception as e:
                 print(f"[EXIT ERROR] Loop failed: {e}")
                 await asyncio.sleep(interval_sec)
+
+    async def dispatch_signals(self, signals: List[Dict[str, Any]]):
+        """Hands each signal to the dispatcher; re-arms the position when its exit was not dispatched."""
+        for signal in signals:
+            print(f"[REAPER] Signal Triggered: {signal['trigger']} for {signal['symbol']} ({signal['pnl_percent']:.2f}%)")
+            dispatched = False
+            if self.dispatch is not None:
+                try:
+                    result = self.dispatch(signal)
+                    dispatched = bool(await result if inspect.isawaitable(result) else result)
+                except Exception as e:
+                    print(f"[EXIT ERROR] Dispatch failed for {signal['symbol']}: {e}")
+            if not dispatched:
+                self.book.rearm(signal['mint'])
+
+    @staticmethod
+    def _next_sleep(price_fetcher_func, interval_sec: float) -> float:
+        next_delay = getattr(price_fetcher_func, "next_delay", None)
+        if next_delay is None:
+            return interval_sec
+        return min(interval_sec, max(0.5, next_delay()))
+
+    def build_price_fetcher(self, **kwargs) -> PriceFetcher:
+        """PriceFetcher wired to this strategist's book: held mints plus TP/SL proximity cadence."""
+        return PriceFetcher(self.book.mints, distance_fn=self.book.distance_to_trigger, **kwargs)
@@ -1,58 +1,232 @@
-from typing import Dict, Any, Optional
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Any, Iterable, Optional, Tuple
+import httpx
 from solana.rpc.async_api import AsyncClient
 from solders.instruction import Instruction
 from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
 from solders.transaction import VersionedTransaction
+from .cu_profile import CUProfileCache, route_shape
+
+logger = logging.getLogger("GasManager")
+
+TRADING_PROFILES_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "config", "trading_profiles.json")
+
+
+def load_trading_profile(path: str = TRADING_PROFILES_PATH, name: Optional[str] = None) -> Dict[str, Any]:
+    """The named (default: active) profile from trading_profiles.json, or {} if it cannot be read."""
+    try:
+        with open(path, "r") as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Trading profiles unavailable ({e}); using default fee settings")
+        return {}
+    return config.get("profiles", {}).get(name or config.get("active_profile"), {})
+
+
+class FeeHistogram:
+    """
+    Sliding window of per-slot priority fees (micro-lamports) over the last
+    `window_slots` slots, counted in log-spaced buckets: a zero bucket, then
+    16 per decade up to 1e10. add() and eviction are O(1); percentile() walks
+    the fixed bucket array, so its cost does not grow with the window. Values
+    come back as the bucket's upper bound (at most ~15% high, never low).
+    """
+    BUCKETS_PER_DECADE = 16
+    DECADES = 10
+
+    def __init__(self, window_slots: int = 150):
+        self.window_slots = window_slots
+        self.counts = [0] * (self.BUCKETS_PER_DECADE * self.DECADES + 2)
+        self._samples: Deque[Tuple[int, int]] = deque()  # (slot, bucket)
+        self.latest_slot = 0
+
+    @classmethod
+    def bucket(cls, fee: int) -> int:
+        if fee <= 0:
+            return 0
+        return min(1 + int(math.log10(fee) * cls.BUCKETS_PER_DECADE), cls.BUCKETS_PER_DECADE * cls.DECADES + 1)
+
+    @classmethod
+    def upper_bound(cls, bucket: int) -> int:
+        return 0 if bucket == 0 else math.ceil(10 ** (bucket / cls.BUCKETS_PER_DECADE))
+
+    def add(self, slot: int, fee: int):
+        """Adds one slot's fee; slots at or before the newest one already seen are ignored."""
+        if slot <= self.latest_slot:
+            return
+        self.latest_slot = slot
+        bucket = self.bucket(fee)
+        self._samples.append((slot, bucket))
+        self.counts[bucket] += 1
+        cutoff = slot - self.window_slots
+        while self._samples[0][0] <= cutoff:
+            self.counts[self._samples.popleft()[1]] -= 1
+
+    def extend(self, entries: Iterable[Dict[str, int]]):
+        """Adds getRecentPrioritizationFees entries ({"slot", "prioritizationFee"}), oldest first."""
+        for entry in sorted(entries, key=lambda e: e["slot"]):
+            self.add(entry["slot"], entry["prioritizationFee"])
+
+    def percentile(self, p: float) -> Optional[int]:
+        """Nearest-rank percentile of the window, or None if it is empty."""
+        total = len(self._samples)
+        if not total:
+            return None
+        rank = max(1, math.ceil(total * p / 100))
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.upper_bound(bucket)
+        return self.upper_bound(len(self.counts) - 1)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
 
 class GasManager:
     """
     Handles dynamic prioritization fees and compute budget management for Solana transactions.
     Ensures transactions land in congested markets.
+
+    A background estimator (start()/stop()) polls getRecentPrioritizationFees
+    every `poll_interval_s` for the whole cluster and for each tracked writable
+    account, in one batched request, and keeps a FeeHistogram per series.
+    At most `max_tracked_accounts` accounts are tracked; the least recently
+    priced one is dropped to make room for a new one.
+    priority_fee() then answers from memory at the active profile's
+    `priority_fee_percentile`, capped at its `max_priority_fee_cap`.
+
+    Compute-unit limits come from `cu_profiles` (share it with TransactionCore,
+    which feeds it) once a route shape has been observed.
     """
-    def __init__(self, rpc_url: str = "https://api.mainnet-beta.solana.com"):
+    def __init__(self, rpc_url: str = "https://api.mainnet-beta.solana.com", profile: Optional[Dict[str, Any]] = None,
+                 window_slots: int = 150, poll_interval_s: float = 2.0, stale_after_s: float = 10.0,
+                 cu_profiles: Optional[CUProfileCache] = None, max_tracked_accounts: int = 64):
         self.rpc_url = rpc_url
         self.client = AsyncClient(rpc_url)
         # Default safety fallback values
         self.default_cu_limit = 200_000
         self.default_micro_lamports = 10_000
+        self.window_slots = window_slots
+        self.poll_interval_s = poll_interval_s
+        self.stale_after_s = stale_after_s
+        self.global_fees = FeeHistogram(window_slots)
+        self.max_tracked_accounts = max_tracked_accounts
+        self.account_fees: "OrderedDict[str, FeeHistogram]" = OrderedDict()
+        self.last_refresh = 0.0
+        self._run_task: Optional[asyncio.Task] = None
+        self.cu_profiles = CUProfileCache() if cu_profiles is None else cu_profiles
+        self.set_profile(load_trading_profile() if profile is None else profile)
 
-    async def get_competitive_fee(self, account_keys: Optional[list] = None) -> int:
+    def set_profile(self, profile: Dict[str, Any]):
+        """Applies a trading profile's `execution` settings (percentile and cap)."""
+        execution = profile.get("execution", {})
+        self.fee_percentile = execution.get("priority_fee_percentile", 75)
+        self.max_fee_cap = execution.get("max_priority_fee_cap", 10_000_000)
+
+    def track_accounts(self, account_keys: Iterable[str]):
+        """Adds writable accounts to the estimator (or marks them recently used); the next poll starts filling their windows."""
+        for key in map(str, account_keys):
+            if key in self.account_fees:
+                self.account_fees.move_to_end(key)
+            else:
+                self.account_fees[key] = FeeHistogram(self.window_slots)
+        while len(self.account_fees) > self.max_tracked_accounts:
+            self.account_fees.popitem(last=False)
+
+    def priority_fee(self, account_keys: Optional[Iterable[str]] = None, percentile: Optional[float] = None) -> int:
         """
-        Queries the RPC for recent prioritization fees via raw request.
+        Compute-unit price (micro-lamports) from the in-memory windows, no RPC: the
+        highest of the global and per-account percentiles, floored at the default
+        and capped at the profile's cap. Untracked accounts start being tracked.
         """
-        try:
-            # We use the raw request method on the client
-            # The account_keys must be a list of strings (Pubkeys)
-            params = [account_keys] if account_keys else []
-            
-            # Use raw call to bypass potential client versioning issues
-            import httpx
-            async with httpx.AsyncClient() as client:
-                payload = {
-                    "jsonrpc": "2.0",
-                    "id": 1,
-                    "method": "getRecentPrioritizationFees",
-                    "params": params
-                }
-                response = await client.post(self.rpc_url, json=payload)
-                data = response.json()
-            
-            if 'result' not in data:
-                return self.default_micro_lamports
-            
-            fees = [f['prioritizationFee'] for f in data['result']]
-            if not fees:
-                return self.default_micro_lamports
-            
-            # Sort and take high percentile for priority
-            fees.sort()
-            high_priority_fee = fees[int(len(fees) * 0.75)]
-            
-            # Additional safety cap (e.g., max 10,000,000 micro-lamports = ~0.01 SOL/CU)
-            return min(max(high_priority_fee, self.default_micro_lamports), 10_000_000)
-        except Exception as e:
-            print(f"[GAS ERROR] Failed to fetch recent fees: {e}")
+        percentile = self.fee_percentile if percentile is None else percentile
+        estimates = [self.global_fees.percentile(percentile)]
+        if account_keys:
+            account_keys = [str(k) for k in account_keys]
+            self.track_accounts(account_keys)
+            estimates.extend(self.account_fees[k].percentile(percentile) for k in account_keys if k in self.account_fees)
+        estimates = [e for e in estimates if e is not None]
+        if not estimates:
             return self.default_micro_lamports
+        return min(max(max(estimates), self.default_micro_lamports), self.max_fee_cap)
+
+    async def refresh(self):
+        """One batched getRecentPrioritizationFees poll: global plus one call per tracked account."""
+        keys = list(self.account_fees)
+        payload = [{"jsonrpc": "2.0", "id": 0, "method": "getRecentPrioritizationFees", "params": []}]
+        payload += [{"jsonrpc": "2.0", "id": i + 1, "method": "getRecentPrioritizationFees", "params": [[key]]}
+                    for i, key in enumerate(keys)]
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.post(self.rpc_url, json=payload)
+            response.raise_for_status()
+            replies = response.json()
+        if isinstance(replies, dict):
+            raise RuntimeError(f"RPC rejected batch: {replies.get('error')}")
+        for reply in replies:
+            if "result" not in reply:
+                continue
+            series = self.global_fees if reply["id"] == 0 else self.account_fees.get(keys[reply["id"] - 1])
+            if series is not None:
+                series.extend(reply["result"])
+        self.last_refresh = time.monotonic()
+
+    async def get_competitive_fee(self, account_keys: Optional[list] = None) -> int:
+        """
+        Priority fee at the profile percentile. Served from the estimator when it is
+        fresh; otherwise refreshes once (e.g. before start() or after an outage).
+        """
+        if account_keys:
+            self.track_accounts(account_keys)
+        fresh = bool(self.last_refresh) and time.monotonic() - self.last_refresh < self.stale_after_s
+        if not fresh or (account_keys and any(not self.account_fees.get(str(k)) for k in account_keys)):
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"[GAS ERROR] Failed to fetch recent fees: {e}")
+                if not fresh:
+                    return self.default_micro_lamports
+        return self.priority_fee(account_keys)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Priority fee poll failed: {e}")
+            await asyncio.sleep(self.poll_interval_s)
+
+    def start(self):
+        """Starts the background estimator on the running loop (idempotent)."""
+        if self._run_task is None or self._run_task.done():
+            self._run_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        task, self._run_task = self._run_task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def compute_unit_limit(self, instructions: Iterable[Instruction]) -> int:
+        """Profiled limit for this route shape, or the default before it has been observed."""
+        return self.cu_profiles.predict(route_shape(instructions)) or self.default_cu_limit
+
+    def budget_instructions_for(self, instructions: Iterable[Instruction],
+                                writable_accounts: Optional[Iterable[str]] = None) -> list[Instruction]:
+        """Compute-budget instructions for a transaction about to be built from `instructions`, with no RPC."""
+        instructions = list(instructions)
+        return self.create_budget_instructions(self.compute_unit_limit(instructions),
+                                               self.priority_fee(writable_accounts))
 
     def create_budget_instructions(self, cu_limit: int = 200_000, micro_lamports: int = 10_000) -> list[Instruction]:
         """
@@ -66,7 +240,7 @@ class GasManager:
     async def inject_priority_fee(self, tx: VersionedTransaction) -> VersionedTransaction:
         """
         TODO: Implement VersionedTransaction modification.
-        Note: VersionedTransactions have locked messages; modification usually happens 
+        Note: VersionedTransactions have locked messages; modification usually happens
         at the message construction phase or via re-serialization.
         """
         print("[GAS] Warning: Direct injection into signed VersionedTransaction is restricted.")
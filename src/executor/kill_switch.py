@@ -1,16 +1,19 @@
 import os
 import signal
 import sys
-from typing import Callable
+from typing import Callable, Optional
+from .control_plane import ControlPlane, get_control_plane
 
 class KillSwitch:
     """
     The Infallible Kill-Switch.
     Designed to monitor global health and emergency signals to halt trading.
+    Also halted while the host-wide control plane is (force-stop lock file present).
     """
-    def __init__(self):
+    def __init__(self, control_plane: Optional[ControlPlane] = None):
         self._emergency_halt = False
         self._callbacks: list[Callable] = []
+        self._control_plane = control_plane
 
     def trigger(self, reason: str):
         """Activates the kill-switch and halts all execution."""
@@ -26,7 +29,15 @@ class KillSwitch:
         # sys.exit(1) # We might want a graceful halt first, but this is the ultimate safeguard.
 
     def is_halted(self) -> bool:
-        return self._emergency_halt
+        return self._emergency_halt or self.control_plane.is_halted()
+
+    @property
+    def control_plane(self) -> ControlPlane:
+        """The shared flags, opened (and their watcher started) on the first check."""
+        if self._control_plane is None:
+            self._control_plane = get_control_plane()
+            self._control_plane.start()
+        return self._control_plane
 
     def register_callback(self, callback: Callable):
         """Register logic to run when the switch is flipped (e.g., closing connections)."""
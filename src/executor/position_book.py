@@ -0,0 +1,113 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class PositionBook:
+    """
+    In-memory mirror of the ledger's open positions with precomputed exit levels.
+
+    There is one position per mint, so each mint holds just its armed
+    take-profit and stop-loss prices (None once that level has fired). A
+    price tick compares against those two numbers, so the cost per tick does
+    not depend on how many positions are open, and re-arming replaces the
+    pair instead of piling up superseded levels.
+    """
+    def __init__(self, tp_percent: float = 20.0, sl_percent: float = -10.0):
+        self.tp_percent = tp_percent
+        self.sl_percent = sl_percent
+        self._positions: Dict[str, Dict[str, Any]] = {}
+        self._armed: Dict[str, Tuple[Optional[float], Optional[float]]] = {}  # mint -> (tp, sl)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, mint: str) -> bool:
+        return mint in self._positions
+
+    def get(self, mint: str) -> Optional[Dict[str, Any]]:
+        return self._positions.get(mint)
+
+    def mints(self) -> List[str]:
+        return list(self._positions)
+
+    def load(self, positions: List[Dict[str, Any]]):
+        """Replaces the book with a fresh snapshot (e.g. ledger.get_active_positions())."""
+        with self._lock:
+            self._positions.clear()
+            self._armed.clear()
+            for pos in positions:
+                self._arm(pos)
+
+    def upsert(self, position: Dict[str, Any]):
+        """Adds or replaces a position and re-arms both of its exit levels."""
+        with self._lock:
+            self._arm(position)
+
+    def remove(self, mint: str):
+        with self._lock:
+            self._positions.pop(mint, None)
+            self._armed.pop(mint, None)
+
+    def rearm(self, mint: str):
+        """Re-arms a position whose exit fired but was not executed (e.g. failed sell)."""
+        with self._lock:
+            pos = self._positions.get(mint)
+            if pos:
+                self._arm(pos)
+
+    def _arm(self, pos: Dict[str, Any]):
+        mint = pos['mint']
+        entry = float(pos['avg_entry_price'])
+        if entry <= 0:
+            self._positions.pop(mint, None)
+            self._armed.pop(mint, None)
+            return
+
+        tp_price = entry * (1 + self.tp_percent / 100)
+        sl_price = entry * (1 + self.sl_percent / 100)
+        self._positions[mint] = {**pos, "tp_price": tp_price, "sl_price": sl_price}
+        self._armed[mint] = (tp_price, sl_price)
+
+    def distance_to_trigger(self, mint: str, price: float) -> Optional[float]:
+        """Smallest relative move (0.05 = 5%) needed to hit this mint's TP or SL, or None if not held."""
+        pos = self._positions.get(mint)
+        if not pos or price <= 0:
+            return None
+        return max(0.0, min(pos["tp_price"] - price, price - pos["sl_price"]) / price)
+
+    def on_price(self, mint: str, price: float) -> List[Dict[str, Any]]:
+        """Disarms every TP/SL level crossed by `price` and returns the resulting signals."""
+        armed = self._armed.get(mint)
+        # Fast path without the lock: nothing armed, or nothing crossed
+        if armed is None:
+            return []
+        tp_price, sl_price = armed
+        if (tp_price is None or tp_price > price) and (sl_price is None or sl_price < price):
+            return []
+
+        signals = []
+        with self._lock:
+            tp_price, sl_price = self._armed.get(mint, (None, None))
+            if tp_price is not None and tp_price <= price:
+                tp_price = None
+                signals.append(self._signal("TAKE_PROFIT", mint, price))
+            if sl_price is not None and sl_price >= price:
+                sl_price = None
+                signals.append(self._signal("STOP_LOSS", mint, price))
+            if mint in self._armed:
+                self._armed[mint] = (tp_price, sl_price)
+        return signals
+
+    def _signal(self, trigger: str, mint: str, current_price: float) -> Dict[str, Any]:
+        pos = self._positions[mint]
+        avg_entry = pos['avg_entry_price']
+        return {
+            "trigger": trigger,
+            "mint": mint,
+            "symbol": pos.get('symbol', 'UNKNOWN'),
+            "amount_atoms": pos['amount_atoms'],
+            "entry_price": avg_entry,
+            "current_price": current_price,
+            "pnl_percent": ((current_price - avg_entry) / avg_entry) * 100
+        }
@@ -6,6 +6,7 @@ from .kill_switch import KILL_SWITCH
 from .guards import TradingGuards
 from ..services.jupiter_service import JupiterService
 from .transaction_core import TransactionCore
+from .fee_manager import GasManager
 
 class ExecutorState(Enum):
     IDLE = auto()
@@ -23,8 +24,20 @@ class TradeStateMachine:
         self.is_authorized = False # Final Law 3 flag
         self.jupiter = JupiterService()
         self.tx_core = TransactionCore(rpc_url)
+        # Simulations learned by tx_core size the compute limits gas hands out
+        self.gas = GasManager(rpc_url, cu_profiles=self.tx_core.cu_profiles)
         self.user_pubkey = "74QXtqTiM9w1D9WM8ArPEggHPRVUWggeQn3KxvR4ku5x" # Default bot wallet
 
+    def start(self):
+        """
+        Starts the priority-fee estimator on the running loop (idempotent), so fees are priced
+        from memory. Called once by whatever runs the machine, paired with stop() on shutdown.
+        """
+        self.gas.start()
+
+    async def stop(self):
+        await self.gas.stop()
+
     def transition(self, to_state: ExecutorState):
         if KILL_SWITCH.is_halted():
             self.state = ExecutorState.HALTED
@@ -93,10 +106,15 @@ class TradeStateMachine:
         self.transition(ExecutorState.EXECUTING)
         try:
             # 1. Fetch the swap transaction
-            print("[TX] Requesting swap transaction from Jupiter...")
+            # Priced for the pools the route write-locks, at the active profile's percentile
+            pools = [step["swapInfo"]["ammKey"] for step in self.current_trade["quote"].get("routePlan", [])
+                     if step.get("swapInfo", {}).get("ammKey")]
+            cu_price = await self.gas.get_competitive_fee(pools)
+            print(f"[TX] Requesting swap transaction from Jupiter (priority fee {cu_price} micro-lamports/CU)...")
             swap_b64 = await self.jupiter.get_swap_transaction(
-                self.current_trade["quote"], 
-                self.user_pubkey
+                self.current_trade["quote"],
+                self.user_pubkey,
+                compute_unit_price=cu_price
             )
             
             if not swap_b64:
@@ -110,12 +128,17 @@ class TradeStateMachine:
                 self.transition(ExecutorState.IDLE)
                 return
 
-            # 3. Simulate (The Ultimate Truth)
-            sim_result = await self.tx_core.simulate(tx)
+            # 3. Simulate (The Ultimate Truth). Unauthorized dry runs of a route shape with a stable
+            # CU profile reuse it; an authorized trade is always simulated.
+            sim_result = await self.tx_core.simulate(tx, allow_cached=not self.is_authorized)
             
             # Final Law 3: Live Authorization check
             TradingGuards.verify_live_execution_status(self.is_authorized)
             
+            if sim_result["success"]:
+                # Jupiter's budget covers any route; trim it to what this route shape consumes
+                tx = self.tx_core.with_cu_limit(tx, sim_result.get("cu_limit"))
+
             if sim_result["success"] and self.is_authorized:
                 print("[LIVE] Simulation succeeded and authorized. Manual signing required.")
                 # await self.tx_core.sign_and_broadcast(...)
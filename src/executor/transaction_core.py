@@ -1,19 +1,27 @@
 import base64
 from typing import Dict, Any, Optional
 from solana.rpc.async_api import AsyncClient
+from solders.compute_budget import set_compute_unit_limit
+from solders.instruction import CompiledInstruction
+from solders.message import MessageV0
 from solders.transaction import VersionedTransaction
 from solders.keypair import Keypair
+from solders.signature import Signature
 from .kill_switch import KILL_SWITCH
 from .guards import TradingGuards
+from .cu_profile import COMPUTE_BUDGET_PROGRAM, CUProfileCache, route_shape
 
 class TransactionCore:
     """
     Handles the final construction, simulation, and signing of Solana transactions.
     Supports VersionedTransactions and Address Lookup Tables (ALTs).
+    Successful simulations and landed transactions feed `cu_profiles`.
     """
-    def __init__(self, rpc_url: str = "https://api.mainnet-beta.solana.com"):
+    def __init__(self, rpc_url: str = "https://api.mainnet-beta.solana.com",
+                 cu_profiles: Optional[CUProfileCache] = None):
         self.rpc_url = rpc_url
         self.client = AsyncClient(rpc_url)
+        self.cu_profiles = CUProfileCache() if cu_profiles is None else cu_profiles
 
     async def build_from_jupiter(self, swap_transaction_b64: str) -> Optional[VersionedTransaction]:
         """
@@ -30,11 +38,20 @@ class TransactionCore:
             print(f"[TX ERROR] Deserialization failed: {e}")
             return None
 
-    async def simulate(self, tx: VersionedTransaction) -> Dict[str, Any]:
+    async def simulate(self, tx: VersionedTransaction, allow_cached: bool = False) -> Dict[str, Any]:
         """
         Performs a pre-flight simulation against the RPC.
         This is the ultimate truth-teller for routing/ALT validity.
+        With allow_cached, a route shape with a stable CU profile skips the
+        round-trip and returns the cached prediction ("cached": True).
+        The result's "cu_limit" is the profiled compute-unit limit for the shape.
         """
+        shape = route_shape(tx.message)
+        if allow_cached and self.cu_profiles.is_stable(shape):
+            cu_limit = self.cu_profiles.predict(shape)
+            print(f"[TX] Simulation skipped: stable CU profile for this route (limit {cu_limit}).")
+            return {"success": True, "error": None, "units": None, "logs": [], "cached": True, "cu_limit": cu_limit}
+
         print("[TX] Initiating RPC simulation...")
         try:
             response = await self.client.simulate_transaction(tx)
@@ -47,21 +64,61 @@ class TransactionCore:
             else:
                 units = res.units_consumed or 0
                 print(f"[TX simulation SUCCESS] Compute Units: {units}")
+                self.cu_profiles.observe(shape, units)
             
             return {
                 "success": res.err is None,
                 "error": res.err,
                 "units": res.units_consumed,
-                "logs": res.logs
+                "logs": res.logs,
+                "cached": False,
+                "cu_limit": self.cu_profiles.predict(shape)
             }
         except Exception as e:
             print(f"[TX simulation EXCEPTION] {e}")
             return {"success": False, "error": str(e)}
 
+    def with_cu_limit(self, tx: VersionedTransaction, cu_limit: Optional[int]) -> VersionedTransaction:
+        """
+        Rewrites the transaction's SetComputeUnitLimit to `cu_limit` (e.g. the profiled limit from
+        simulate()), so the priority fee is paid on the units the route uses rather than the budget
+        the builder picked. Unchanged if there is no limit or no such instruction; signatures are kept,
+        so call this before signing.
+        """
+        message = tx.message
+        if not cu_limit or not isinstance(message, MessageV0):
+            return tx
+        keys = message.account_keys
+        limit_data = bytes(set_compute_unit_limit(cu_limit).data)
+        instructions = []
+        for ix in message.instructions:
+            if keys[ix.program_id_index] == COMPUTE_BUDGET_PROGRAM and bytes(ix.data)[:1] == limit_data[:1]:
+                if bytes(ix.data) == limit_data:
+                    return tx
+                print(f"[TX] Compute unit limit -> {cu_limit} (profiled).")
+                ix = CompiledInstruction(ix.program_id_index, limit_data, bytes(ix.accounts))
+            instructions.append(ix)
+        rebuilt = MessageV0(message.header, keys, message.recent_blockhash, instructions,
+                            message.address_table_lookups)
+        return VersionedTransaction.populate(rebuilt, list(tx.signatures))
+
+    async def record_landed(self, signature: Signature, tx: VersionedTransaction) -> Optional[int]:
+        """Learns the units a landed transaction consumed (from its confirmed meta) for its route shape."""
+        try:
+            response = await self.client.get_transaction(signature, max_supported_transaction_version=0)
+            meta = response.value.transaction.meta if response.value else None
+            units = meta.compute_units_consumed if meta else None
+        except Exception as e:
+            print(f"[TX] Could not fetch landed transaction {signature}: {e}")
+            return None
+        self.cu_profiles.observe(route_shape(tx.message), units)
+        return units
+
     async def sign_and_broadcast(self, tx: VersionedTransaction, keypair: Keypair, is_authorized: bool):
         """
         The Final Gate. Signs and broadcasts to the network.
         Subject to Law 3 (Zero Live Capital without auth) and Kill-Switch.
+        Whichever path ends up broadcasting should pass the confirmed signature to record_landed().
         """
         # 1. Final Law 3 Check
         TradingGuards.verify_live_execution_status(is_authorized)
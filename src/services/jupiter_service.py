@@ -71,17 +71,22 @@ class JupiterService:
             
         return None
 
-    async def get_swap_transaction(self, quote: Dict[str, Any], user_public_key: str) -> Optional[str]:
+    async def get_swap_transaction(self, quote: Dict[str, Any], user_public_key: str,
+                                   compute_unit_price: Optional[int] = None) -> Optional[str]:
         """
         Retrieves the base64 encoded swap transaction from Jupiter.
+        compute_unit_price (micro-lamports, e.g. GasManager.priority_fee()) replaces Jupiter's "auto" fee.
         """
         payload = {
             "quoteResponse": quote,
             "userPublicKey": user_public_key,
             "wrapAndUnwrapSol": True,
             "useSharedAccounts": True,
-            "prioritizationFeeLamports": "auto"
         }
+        if compute_unit_price is not None:
+            payload["computeUnitPriceMicroLamports"] = compute_unit_price
+        else:
+            payload["prioritizationFeeLamports"] = "auto"
         
         headers = {
             "Content-Type": "application/json",
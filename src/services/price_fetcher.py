@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import os
+import time
+from statistics import median
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import aiohttp
+
+logger = logging.getLogger("PriceFetcher")
+
+# Pyth feeds for the majors; everything else is priced from DEX Screener / Jupiter
+PYTH_MAJOR_FEEDS = {
+    "So11111111111111111111111111111111111111112": "e62df6c8b4a85fe1a67db44dc12de5db330f7ac66b72dc658afedf0f4a415b43",  # SOL/USD
+    "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v": "eaa020c61cc479712813461ce153894a96a6c00b21ed0cfc2798d1f9a9e9c94a",  # USDC/USD
+}
+
+# Lower number wins when sources disagree beyond tolerance
+SOURCE_PRIORITY = {"pyth": 0, "jupiter": 1, "dexscreener": 2}
+
+
+class PriceFetcher:
+    """
+    Batched price source for open positions.
+
+    Every refresh groups the due mints into as few upstream calls as the APIs
+    allow (DEX Screener: 30 tokens per call, Jupiter: 100 ids per call, Pyth
+    Hermes: all majors in one call), reconciles the answers and tags each
+    price with its source and age. Mints close to their TP/SL are refreshed
+    more often than ones sitting comfortably inside the band.
+
+    Awaiting the fetcher returns {mint: price_usd}, which is what
+    ExitStrategist.exit_monitor_loop expects.
+    """
+    DEXSCREENER_URL = f"{os.getenv('DEXSCREENER_BASE_URL', 'https://api.dexscreener.com')}/tokens/v1/solana/"
+    JUPITER_PRICE_URL = f"{os.getenv('JUPITER_BASE_URL', 'https://api.jup.ag')}/price/v2"
+    PYTH_LATEST_URL = f"{os.getenv('PYTH_HERMES_BASE_URL', 'https://hermes.pyth.network')}/v2/updates/price/latest"
+    DEXSCREENER_BATCH = 30
+    JUPITER_BATCH = 100
+
+    def __init__(
+        self,
+        mints_provider: Callable[[], Iterable[str]],
+        distance_fn: Optional[Callable[[str, float], Optional[float]]] = None,
+        min_interval_s: float = 2.0,
+        max_interval_s: float = 60.0,
+        near_distance: float = 0.01,
+        far_distance: float = 0.10,
+        divergence_tolerance: float = 0.03,
+        pyth_feeds: Optional[Dict[str, str]] = None,
+        timeout: int = 10,
+    ):
+        self.mints_provider = mints_provider
+        self.distance_fn = distance_fn
+        self.min_interval_s = min_interval_s
+        self.max_interval_s = max_interval_s
+        self.near_distance = near_distance
+        self.far_distance = far_distance
+        self.divergence_tolerance = divergence_tolerance
+        self.pyth_feeds = dict(PYTH_MAJOR_FEEDS if pyth_feeds is None else pyth_feeds)
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.jupiter_api_key = os.getenv("JUPITER_API_KEY")
+        self.session: Optional[aiohttp.ClientSession] = None
+        # mint -> {"price", "source", "sources", "observed_at", "fetched_at", "divergence", "divergent"}
+        self.quotes: Dict[str, Dict[str, Any]] = {}
+        self._next_due: Dict[str, float] = {}
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(timeout=self.timeout)
+        return self.session
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+    async def _get_json(self, url: str, params: Optional[List[tuple]] = None, headers: Optional[Dict[str, str]] = None) -> Any:
+        session = await self._get_session()
+        async with session.get(url, params=params, headers=headers) as response:
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status} from {url}")
+            return await response.json()
+
+    # --- Sources: each returns {mint: (price_usd, observed_at)} ------------------
+
+    async def _fetch_dexscreener(self, mints: List[str]) -> Dict[str, tuple]:
+        results: Dict[str, tuple] = {}
+        best_liquidity: Dict[str, float] = {}
+        now = time.time()
+        for i in range(0, len(mints), self.DEXSCREENER_BATCH):
+            chunk = mints[i:i + self.DEXSCREENER_BATCH]
+            pairs = await self._get_json(self.DEXSCREENER_URL + ",".join(chunk)) or []
+            for pair in pairs:
+                mint = pair.get("baseToken", {}).get("address")
+                price = float(pair.get("priceUsd") or 0)
+                liquidity = float((pair.get("liquidity") or {}).get("usd") or 0)
+                # Several pairs per token: keep the deepest pool's price
+                if mint in chunk and price > 0 and liquidity >= best_liquidity.get(mint, -1):
+                    best_liquidity[mint] = liquidity
+                    results[mint] = (price, now)
+        return results
+
+    async def _fetch_jupiter(self, mints: List[str]) -> Dict[str, tuple]:
+        results: Dict[str, tuple] = {}
+        headers = {"x-api-key": self.jupiter_api_key} if self.jupiter_api_key else None
+        now = time.time()
+        for i in range(0, len(mints), self.JUPITER_BATCH):
+            chunk = mints[i:i + self.JUPITER_BATCH]
+            data = await self._get_json(self.JUPITER_PRICE_URL, params=[("ids", ",".join(chunk))], headers=headers)
+            for mint, entry in (data or {}).get("data", {}).items():
+                if entry and float(entry.get("price") or 0) > 0:
+                    results[mint] = (float(entry["price"]), now)
+        return results
+
+    async def _fetch_pyth(self, mints: List[str]) -> Dict[str, tuple]:
+        feed_to_mint = {self.pyth_feeds[m]: m for m in mints if m in self.pyth_feeds}
+        if not feed_to_mint:
+            return {}
+        params = [("ids[]", f"0x{feed}") for feed in feed_to_mint] + [("parsed", "true")]
+        data = await self._get_json(self.PYTH_LATEST_URL, params=params)
+        results: Dict[str, tuple] = {}
+        for item in (data or {}).get("parsed", []):
+            mint = feed_to_mint.get(item.get("id", "").lower().removeprefix("0x"))
+            price = item.get("price", {})
+            if mint and "price" in price:
+                value = float(price["price"]) * (10 ** price.get("expo", 0))
+                results[mint] = (value, float(price.get("publish_time", time.time())))
+        return results
+
+    # --- Reconciliation ----------------------------------------------------------
+
+    def _reconcile(self, mint: str, sources: Dict[str, tuple], fetched_at: float) -> Optional[Dict[str, Any]]:
+        if not sources:
+            return None
+        prices = {name: price for name, (price, _) in sources.items()}
+        mid = median(prices.values())
+        divergence = (max(prices.values()) - min(prices.values())) / mid if mid > 0 else 0.0
+        divergent = divergence > self.divergence_tolerance
+        if divergent:
+            # Sources disagree: trust the highest-priority one rather than a blend
+            source = min(prices, key=lambda name: SOURCE_PRIORITY.get(name, 99))
+            logger.warning(f"Price sources diverge {divergence*100:.1f}% for {mint}: {prices}. Using {source}.")
+            price, observed_at = sources[source]
+        else:
+            source = "+".join(sorted(prices, key=lambda name: SOURCE_PRIORITY.get(name, 99)))
+            price = mid
+            observed_at = min(obs for _, obs in sources.values())
+        return {
+            "price": price,
+            "source": source,
+            "sources": prices,
+            "observed_at": observed_at,
+            "fetched_at": fetched_at,
+            "divergence": divergence,
+            "divergent": divergent,
+        }
+
+    def age(self, mint: str) -> Optional[float]:
+        """Seconds since the cached price for `mint` was observed upstream."""
+        quote = self.quotes.get(mint)
+        return None if quote is None else max(0.0, time.time() - quote["observed_at"])
+
+    # --- Cadence -------------------------------------------------------------------
+
+    def interval_for(self, mint: str, price: float) -> float:
+        """Refresh interval shrinks linearly as the price approaches its nearest TP/SL level."""
+        distance = self.distance_fn(mint, price) if self.distance_fn else None
+        if distance is None:
+            return self.max_interval_s
+        if distance <= self.near_distance:
+            return self.min_interval_s
+        if distance >= self.far_distance:
+            return self.max_interval_s
+        span = (distance - self.near_distance) / (self.far_distance - self.near_distance)
+        return self.min_interval_s + span * (self.max_interval_s - self.min_interval_s)
+
+    def due_mints(self, now: Optional[float] = None) -> List[str]:
+        now = time.time() if now is None else now
+        return [m for m in self.mints_provider() if self._next_due.get(m, 0.0) <= now]
+
+    def next_delay(self, now: Optional[float] = None) -> float:
+        """Seconds until the next mint is due (used by the exit monitor to pace itself)."""
+        now = time.time() if now is None else now
+        mints = list(self.mints_provider())
+        if not mints:
+            return self.max_interval_s
+        return max(0.0, min(self._next_due.get(m, 0.0) for m in mints) - now)
+
+    # --- Entry point -----------------------------------------------------------------
+
+    async def refresh(self, mints: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Fetches all given (default: due) mints from every source concurrently and reconciles them."""
+        mints = self.due_mints() if mints is None else list(mints)
+        if not mints:
+            return {}
+
+        fetched_at = time.time()
+        names = ["dexscreener", "jupiter", "pyth"]
+        results = await asyncio.gather(
+            self._fetch_dexscreener(mints),
+            self._fetch_jupiter(mints),
+            self._fetch_pyth(mints),
+            return_exceptions=True,
+        )
+        by_source = {}
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.warning(f"{name} price fetch failed: {result}")
+                continue
+            by_source[name] = result
+
+        updated = {}
+        for mint in mints:
+            sources = {name: res[mint] for name, res in by_source.items() if mint in res}
+            quote = self._reconcile(mint, sources, fetched_at)
+            if quote is None:
+                # Nothing came back: retry soon rather than waiting a full slow interval
+                self._next_due[mint] = fetched_at + self.min_interval_s
+                continue
+            self.quotes[mint] = quote
+            self._next_due[mint] = fetched_at + self.interval_for(mint, quote["price"])
+            updated[mint] = quote
+
+        # Forget mints that are no longer held
+        held = set(self.mints_provider())
+        for mint in list(self.quotes):
+            if mint not in held:
+                self.quotes.pop(mint, None)
+                self._next_due.pop(mint, None)
+        return updated
+
+    async def __call__(self) -> Dict[str, float]:
+        updated = await self.refresh()
+        return {mint: quote["price"] for mint, quote in updated.items()}
@@ -13,7 +13,7 @@ class MomentumScanner:
     Queries DEX Screener to validate momentum, volume, and paid boosts.
     """
     def __init__(self):
-        self.base_url = "https://api.dexscreener.com/latest/dex/pairs/solana/"
+        self.base_url = f"{os.getenv('DEXSCREENER_BASE_URL', 'https://api.dexscreener.com')}/latest/dex/pairs/solana/"
         self.session: Optional[aiohttp.ClientSession] = None
 
     async def _get_session(self) -> aiohttp.ClientSession:
@@ -27,13 +27,16 @@ class MeteoraDLMMScanner:
     The Meteora Watcher — detects DLMM pool opportunities on Solana.
     Polls Meteora's GraphQL API, applies filters, and sends signals to the TradeOrchestrator.
     """
-    def __init__(self, orchestrator=None, devnet: bool = True):
+    def __init__(self, orchestrator=None, devnet: bool = True, event_loop=None):
         """
         Args:
             orchestrator: TradeOrchestrator instance to receive signals (can be None for standalone)
             devnet: if True, query devnet pools; else mainnet
+            event_loop: EventLoop to enqueue signals on (priority lanes by confidence);
+                        when set, signals go through it instead of orchestrator.process_signal
         """
         self.orchestrator = orchestrator
+        self.event_loop = event_loop
         self.devnet = devnet
         self.running = False
         self.poll_interval = int(os.getenv("METEORA_POLL_INTERVAL", "30"))
@@ -46,10 +49,11 @@ class MeteoraDLMMScanner:
         # Trade amount in token native units (e.g., SOL). Not USD.
         self.trade_amount = float(os.getenv("METEORA_TRADE_AMOUNT", "0.1"))
 
-        # Meteora public GraphQL endpoint
+        # Meteora public GraphQL endpoint (METEORA_GRAPHQL_URL overrides both)
         self.graphql_url = "https://api.meteora.ag/v1/graphql"
         if devnet:
             self.graphql_url = "https://api.devnet.meteora.ag/v1/graphql"
+        self.graphql_url = os.getenv("METEORA_GRAPHQL_URL", self.graphql_url)
 
         # Known DLMM program IDs (same for devnet and mainnet currently)
         self.dlmm_program_id = "DLMMxxGJZRBXixYk9Kf8J38XaJrZtgZ4GdZYrMVPmRX"
@@ -280,7 +284,14 @@ class MeteoraDLMMScanner:
             logger.info(f"Meteora signal: {signal_type} (conf={confidence:.2f}) token={signal['token_address']} amount=${signal['amount']}")
             
             # Send to orchestrator if available
-            if self.orchestrator:
+            if self.event_loop:
+                try:
+                    self.event_loop.enqueue_signal(signal)
+                    self._stats["signals_sent"] += 1
+                    signals_sent_this_cycle += 1
+                except Exception as e:
+                    logger.error(f"Failed to enqueue signal: {e}", exc_info=True)
+            elif self.orchestrator:
                 try:
                     # orchestrator.process_signal expects dict and returns final state
                     final_state = self.orchestrator.process_signal(signal)
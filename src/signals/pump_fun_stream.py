@@ -1,5 +1,6 @@
 import json
 import asyncio
+import time
 import websockets
 from typing import Callable, Dict, Any
 from src.services.security_scanner import AntiRugScanner
@@ -29,7 +30,11 @@ class PumpFunSignal:
                     print("[SIGNAL] Connection Established. Subscribing to New Token Stream.")
 
                     async for message in websocket:
+                        # Frame arrival time: the start of the signal's trace (see telemetry/tracing.py)
+                        received_at_ns = time.time_ns()
                         data = json.loads(message)
+                        if isinstance(data, dict):
+                            data["received_at_ns"] = received_at_ns
                         await self._process_message(data)
                         
             except asyncio.CancelledError:
@@ -0,0 +1,133 @@
+"""
+Unit tests for the compute-unit profile cache.
+
+Run: python -m pytest test_cu_profile.py (or python test_cu_profile.py)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from aiohttp.test_utils import TestClient, TestServer
+from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.keypair import Keypair
+from solders.message import MessageV0
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.transaction import VersionedTransaction
+
+from src.executor.cu_profile import CUProfileCache, route_shape
+from src.executor.fee_manager import GasManager
+from src.executor.transaction_core import TransactionCore
+from tests.standins import Scenario, build_app
+from tests.standins.upstreams import MEMO_PROGRAM
+
+PROGRAM_A = Pubkey.new_unique()
+
+
+def instructions(payer: Pubkey, count: int):
+    return [Instruction(MEMO_PROGRAM, f"ix {i}".encode(), [AccountMeta(payer, True, True)]) for i in range(count)]
+
+
+def signed_tx(payer: Keypair, ixs) -> VersionedTransaction:
+    message = MessageV0.try_compile(payer.pubkey(), ixs, [], Hash.default())
+    return VersionedTransaction(message, [payer])
+
+
+class TestRouteShape(unittest.TestCase):
+    def test_instructions_and_compiled_message_agree(self):
+        payer = Keypair()
+        ixs = instructions(payer.pubkey(), 2) + [Instruction(PROGRAM_A, b"", [])]
+        budgeted = [set_compute_unit_limit(300_000)] + ixs
+        shape = route_shape(ixs)
+        self.assertEqual(shape, (tuple(sorted([str(MEMO_PROGRAM), str(PROGRAM_A)])), 3))
+        self.assertEqual(route_shape(budgeted), shape)
+        self.assertEqual(route_shape(signed_tx(payer, budgeted).message), shape)
+
+
+class TestCUProfileCache(unittest.TestCase):
+    def test_prediction_and_stability(self):
+        cache = CUProfileCache(margin=1.1, min_samples=3, max_spread=0.25)
+        shape = ((str(PROGRAM_A),), 1)
+        self.assertIsNone(cache.predict(shape))
+        for units in (40_000, 42_000):
+            cache.observe(shape, units)
+        self.assertEqual(cache.predict(shape), 46_200)
+        self.assertFalse(cache.is_stable(shape))
+        cache.observe(shape, 41_000)
+        self.assertTrue(cache.is_stable(shape))
+        cache.observe(shape, 90_000)  # route got heavier: unstable again, limit follows the max
+        self.assertFalse(cache.is_stable(shape))
+        self.assertEqual(cache.predict(shape), 99_000)
+        cache.observe(shape, 0)
+        self.assertEqual(len(cache._units[shape]), 4)
+
+    def test_gas_manager_uses_profiled_limit(self):
+        payer = Pubkey.new_unique()
+        ixs = instructions(payer, 2)
+        manager = GasManager("http://127.0.0.1:1", profile={})
+        self.assertEqual(manager.compute_unit_limit(ixs), manager.default_cu_limit)
+        manager.cu_profiles.observe(route_shape(ixs), 52_000)
+        budget = manager.budget_instructions_for(ixs)
+        self.assertEqual(budget[0], set_compute_unit_limit(int(52_000 * manager.cu_profiles.margin)))
+
+
+class TestTransactionCoreLearning(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.scenario = Scenario(latency_ms={"rpc": 0})
+        self.client = TestClient(TestServer(build_app(self.scenario)))
+        await self.client.start_server()
+        self.core = TransactionCore(str(self.client.server.make_url("/")), cu_profiles=CUProfileCache(min_samples=2))
+
+    async def asyncTearDown(self):
+        await self.core.client.close()
+        await self.client.close()
+
+    async def test_simulations_learned_then_skipped(self):
+        payer = Keypair()
+        tx = signed_tx(payer, instructions(payer.pubkey(), 2))
+        expected_units = self.scenario.cu_base + 2 * self.scenario.cu_per_instruction
+        for _ in range(2):
+            result = await self.core.simulate(tx, allow_cached=True)
+            self.assertFalse(result["cached"])
+            self.assertEqual(result["units"], expected_units)
+        result = await self.core.simulate(tx, allow_cached=True)
+        self.assertTrue(result["cached"])
+        self.assertEqual(result["cu_limit"], int(expected_units * self.core.cu_profiles.margin))
+        stats = await (await self.client.get("/_standins/stats")).json()
+        self.assertEqual(stats["requests"]["rpc.simulateTransaction"], 2)
+        # Without allow_cached the round-trip still happens
+        self.assertFalse((await self.core.simulate(tx))["cached"])
+
+    async def test_landed_transaction_is_learned(self):
+        payer = Keypair()
+        tx = signed_tx(payer, instructions(payer.pubkey(), 2))
+        landed = SimpleNamespace(value=SimpleNamespace(transaction=SimpleNamespace(
+            meta=SimpleNamespace(compute_units_consumed=61_000))))
+        with patch.object(self.core.client, "get_transaction", return_value=landed) as get_transaction:
+            units = await self.core.record_landed(tx.signatures[0], tx)
+        self.assertEqual(units, 61_000)
+        get_transaction.assert_awaited_once()
+        self.assertEqual(self.core.cu_profiles.predict(route_shape(tx.message)),
+                         int(61_000 * self.core.cu_profiles.margin))
+
+    async def test_profiled_limit_replaces_builder_budget(self):
+        payer = Keypair()
+        ixs = [set_compute_unit_limit(1_400_000), set_compute_unit_price(5_000)] + instructions(payer.pubkey(), 2)
+        message = MessageV0.try_compile(payer.pubkey(), ixs, [], Hash.default())
+        tx = VersionedTransaction.populate(message, [Signature.default()])
+        trimmed = self.core.with_cu_limit(tx, 48_000)
+        compiled = trimmed.message.instructions
+        self.assertEqual(bytes(compiled[0].data), bytes(set_compute_unit_limit(48_000).data))
+        self.assertEqual(bytes(compiled[1].data), bytes(set_compute_unit_price(5_000).data))
+        self.assertEqual(route_shape(trimmed.message), route_shape(tx.message))
+        self.assertIs(self.core.with_cu_limit(tx, None), tx)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+Unit tests for the rolling priority-fee estimator in GasManager.
+
+Run: python -m pytest test_fee_manager.py (or python test_fee_manager.py)
+"""
+import asyncio
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import random
+import unittest
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.executor.fee_manager import FeeHistogram, GasManager, load_trading_profile
+from src.executor.state_machine import TradeStateMachine
+from tests.standins import Scenario, build_app
+
+SNIPER = {"execution": {"priority_fee_percentile": 99, "max_priority_fee_cap": 100_000_000}}
+
+
+def exact_percentile(values, p):
+    values = sorted(values)
+    return values[max(1, -(-len(values) * p // 100)) - 1]
+
+
+class TestFeeHistogram(unittest.TestCase):
+    def test_percentiles_close_to_exact(self):
+        rng = random.Random(3)
+        fees = [0 if rng.random() < 0.3 else int(rng.lognormvariate(10, 1.5)) for _ in range(150)]
+        hist = FeeHistogram(window_slots=150)
+        for slot, fee in enumerate(fees, start=1):
+            hist.add(slot, fee)
+        for p in (50, 75, 90, 99):
+            exact = exact_percentile(fees, p)
+            estimate = hist.percentile(p)
+            self.assertGreaterEqual(estimate, exact)
+            self.assertLessEqual(estimate, max(exact * 1.16, 2))
+
+    def test_window_slides_and_old_slots_ignored(self):
+        hist = FeeHistogram(window_slots=10)
+        for slot in range(1, 11):
+            hist.add(slot, 1_000_000)
+        for slot in range(11, 16):
+            hist.add(slot, 100)
+        self.assertEqual(len(hist), 10)
+        self.assertLess(hist.percentile(50), 1_000_000)
+        hist.add(3, 5)  # already past
+        self.assertEqual(len(hist), 10)
+        self.assertIsNone(FeeHistogram().percentile(75))
+
+    def test_extend_sorts_rpc_entries(self):
+        hist = FeeHistogram(window_slots=150)
+        hist.extend([{"slot": 12, "prioritizationFee": 500}, {"slot": 10, "prioritizationFee": 0},
+                     {"slot": 11, "prioritizationFee": 200}])
+        self.assertEqual((len(hist), hist.latest_slot), (3, 12))
+
+
+class TestGasManagerProfile(unittest.TestCase):
+    def test_active_profile_wired(self):
+        profile = load_trading_profile()
+        manager = GasManager("http://127.0.0.1:1", profile=profile)
+        self.assertEqual(manager.fee_percentile, profile["execution"]["priority_fee_percentile"])
+        self.assertEqual(manager.max_fee_cap, profile["execution"]["max_priority_fee_cap"])
+
+    def test_floor_and_cap(self):
+        manager = GasManager("http://127.0.0.1:1", profile={"execution": {"priority_fee_percentile": 50,
+                                                                          "max_priority_fee_cap": 50_000}})
+        self.assertEqual(manager.priority_fee(), manager.default_micro_lamports)  # no data yet
+        for slot in range(1, 11):
+            manager.global_fees.add(slot, 10_000_000)
+        self.assertEqual(manager.priority_fee(), 50_000)
+
+    def test_account_window_raises_fee(self):
+        manager = GasManager("http://127.0.0.1:1", profile=SNIPER)
+        for slot in range(1, 11):
+            manager.global_fees.add(slot, 20_000)
+        manager.track_accounts(["Pool111"])
+        for slot in range(1, 11):
+            manager.account_fees["Pool111"].add(slot, 2_000_000)
+        self.assertLess(manager.priority_fee(), 30_000)
+        self.assertGreaterEqual(manager.priority_fee(["Pool111"]), 2_000_000)
+
+    def test_tracked_accounts_are_lru_bounded(self):
+        manager = GasManager("http://127.0.0.1:1", profile=SNIPER, max_tracked_accounts=2)
+        manager.track_accounts(["Pool111", "Pool222"])
+        manager.priority_fee(["Pool111"])  # touch: Pool222 is now least recently used
+        manager.track_accounts(["Pool333"])
+        self.assertEqual(list(manager.account_fees), ["Pool111", "Pool333"])
+        manager.priority_fee(["Pool444", "Pool555", "Pool666"])  # more than fit at once
+        self.assertEqual(len(manager.account_fees), 2)
+
+
+class TestGasManagerEstimator(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = TestClient(TestServer(build_app(Scenario(latency_ms={"rpc": 0}))))
+        await self.client.start_server()
+        self.manager = GasManager(str(self.client.server.make_url("/")), profile=SNIPER)
+
+    async def asyncTearDown(self):
+        await self.manager.stop()
+        await self.manager.client.close()
+        await self.client.close()
+
+    async def test_refresh_fills_global_and_account_windows_in_one_batch(self):
+        self.manager.track_accounts(["Pool111", "Pool222"])
+        await self.manager.refresh()
+        self.assertEqual(len(self.manager.global_fees), 150)
+        self.assertEqual(len(self.manager.account_fees["Pool222"]), 150)
+        stats = await (await self.client.get("/_standins/stats")).json()
+        self.assertEqual(stats["requests"]["rpc"], 1)
+        self.assertEqual(stats["requests"]["rpc.getRecentPrioritizationFees"], 3)
+
+    async def test_competitive_fee_served_from_memory_when_fresh(self):
+        first = await self.manager.get_competitive_fee()
+        self.assertGreater(first, self.manager.default_micro_lamports)
+        second = await self.manager.get_competitive_fee()
+        stats = await (await self.client.get("/_standins/stats")).json()
+        self.assertEqual(stats["requests"]["rpc"], 1)
+        self.assertLessEqual(second, self.manager.max_fee_cap)
+
+    async def test_estimator_follows_state_machine_lifecycle(self):
+        machine = TradeStateMachine(str(self.client.server.make_url("/")))
+        try:
+            await machine.process_opportunity({})  # no mints: stops at routing
+            self.assertIsNone(machine.gas._run_task)  # per-trade paths never start it
+            machine.start()
+            for _ in range(100):
+                if machine.gas.last_refresh:
+                    break
+                await asyncio.sleep(0.01)
+            self.assertTrue(machine.gas.last_refresh)
+            self.assertFalse(machine.gas._run_task.done())
+            await machine.stop()
+            self.assertIsNone(machine.gas._run_task)
+        finally:
+            await machine.stop()
+            await machine.gas.client.close()
+            await machine.tx_core.client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,16 @@
 import asyncio
+import os
 from src.executor.fee_manager import GasManager
 
 async def test_gas():
-    # Use public RPC for fee check
-    rpc = "https://api.mainnet-beta.solana.com"
+    # Public RPC for the fee check unless SOLANA_RPC_URL points elsewhere (e.g. python -m tests.standins)
+    rpc = os.getenv("SOLANA_RPC_URL", "https://api.mainnet-beta.solana.com")
     manager = GasManager(rpc)
     
     print("[TEST] Fetching competitive priority fee...")
     # Optional: Pass USDC/SOL pool account to see specific congestion
     fee = await manager.get_competitive_fee()
-    print(f"[TEST] 75th Percentile Fee: {fee} micro-lamports")
+    print(f"[TEST] p{manager.fee_percentile} Fee (cap {manager.max_fee_cap}): {fee} micro-lamports")
     
     instructions = manager.create_budget_instructions(cu_limit=300000, micro_lamports=fee)
     print(f"[TEST] Created instructions: {instructions}")
@@ -0,0 +1,45 @@
+"""
+Unit tests for the KillSwitch's host-wide halt.
+
+Run: python -m pytest test_kill_switch.py (or python test_kill_switch.py)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import tempfile
+import time
+import unittest
+
+from src.executor.control_plane import ControlPlane
+from src.executor.kill_switch import KillSwitch
+
+
+class TestKillSwitch(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.stop_file = os.path.join(tmp.name, "trade_stop.lock")
+        self.plane = ControlPlane(stop_file=self.stop_file, path=os.path.join(tmp.name, "control"),
+                                  poll_interval_s=0.01)
+        self.addCleanup(self.plane.close)
+        self.plane.start()
+
+    def test_follows_host_wide_halt(self):
+        switch = KillSwitch(control_plane=self.plane)
+        self.assertFalse(switch.is_halted())
+        open(self.stop_file, "w").close()
+        deadline = time.monotonic() + 2.0
+        while not switch.is_halted() and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.assertTrue(switch.is_halted())
+
+    def test_local_trigger_still_halts(self):
+        switch = KillSwitch(control_plane=self.plane)
+        switch.trigger("test")
+        self.assertTrue(switch.is_halted())
+        self.assertFalse(self.plane.is_halted())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Unit tests for the ExitStrategist position book.
+
+Run: python -m pytest test_position_book.py (or python test_position_book.py)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import asyncio
+import tempfile
+import unittest
+from src.data.ledger import LedgerDB
+from src.executor.exit_strategy import ExitStrategist
+from src.executor.position_book import PositionBook
+
+JUP = "JUPyiwrYJFv1mHvxHecCzpM2reSMMJCrMdh5okWFPdH"
+BONK = "DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263"
+
+
+def buy(mint, price, atoms=1_000_000, symbol="TKN"):
+    return {'action': 'BUY', 'mint': mint, 'symbol': symbol, 'amount_atoms': atoms,
+            'price_usd': price, 'total_usd': price * atoms, 'status': 'SUCCESS'}
+
+
+class TestPositionBook(unittest.TestCase):
+    def setUp(self):
+        self.book = PositionBook(tp_percent=20.0, sl_percent=-10.0)
+        self.book.load([
+            {'mint': JUP, 'symbol': 'JUP', 'amount_atoms': 10, 'avg_entry_price': 1.0},
+            {'mint': BONK, 'symbol': 'BONK', 'amount_atoms': 10, 'avg_entry_price': 2.0},
+        ])
+
+    def test_no_signal_inside_band(self):
+        self.assertEqual(self.book.on_price(JUP, 1.1), [])
+        self.assertEqual(self.book.on_price(JUP, 0.95), [])
+
+    def test_take_profit_fires_once(self):
+        signals = self.book.on_price(JUP, 1.25)
+        self.assertEqual([s['trigger'] for s in signals], ["TAKE_PROFIT"])
+        self.assertAlmostEqual(signals[0]['pnl_percent'], 25.0)
+        self.assertEqual(self.book.on_price(JUP, 1.3), [])
+        # Other mints are untouched by this mint's ticks
+        self.assertEqual(self.book.on_price(BONK, 2.1), [])
+
+    def test_stop_loss_and_rearm(self):
+        self.assertEqual(self.book.on_price(BONK, 1.7)[0]['trigger'], "STOP_LOSS")
+        self.assertEqual(self.book.on_price(BONK, 1.6), [])
+        self.book.rearm(BONK)
+        self.assertEqual(self.book.on_price(BONK, 1.6)[0]['trigger'], "STOP_LOSS")
+
+    def test_upsert_supersedes_old_levels(self):
+        # Averaging up moves both levels; the old TP at 1.2 must not fire
+        self.book.upsert({'mint': JUP, 'symbol': 'JUP', 'amount_atoms': 20, 'avg_entry_price': 1.5})
+        self.assertEqual(self.book.on_price(JUP, 1.4), [])
+        self.assertEqual(self.book.on_price(JUP, 1.8)[0]['trigger'], "TAKE_PROFIT")
+
+    def test_repeated_upserts_keep_one_pair_of_levels(self):
+        for i in range(100):
+            self.book.upsert({'mint': JUP, 'symbol': 'JUP', 'amount_atoms': 10 + i, 'avg_entry_price': 1.0 + i / 1000})
+        self.assertEqual(len(self.book._armed), 2)
+        self.assertEqual(len(self.book.on_price(JUP, 2.0)), 1)
+        self.assertEqual(self.book.on_price(JUP, 2.0), [])
+
+    def test_distance_to_trigger(self):
+        self.assertAlmostEqual(self.book.distance_to_trigger(JUP, 1.0), 0.1)
+        self.assertAlmostEqual(self.book.distance_to_trigger(JUP, 1.15), 0.05 / 1.15)
+        self.assertIsNone(self.book.distance_to_trigger("unknown", 1.0))
+
+
+class TestExitStrategistLedgerSync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ledger = LedgerDB(os.path.join(self.tmp.name, "ledger.db"))
+        self.ledger.record_trade(buy(JUP, 1.0))
+        self.strategist = ExitStrategist(self.ledger, tp_percent=20.0, sl_percent=-10.0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_book_loaded_and_kept_in_sync(self):
+        self.assertIn(JUP, self.strategist.book)
+        self.ledger.record_trade(buy(BONK, 2.0))
+        self.assertIn(BONK, self.strategist.book)
+
+        sell = dict(buy(BONK, 2.0), action='SELL')
+        self.ledger.record_trade(sell)
+        self.assertNotIn(BONK, self.strategist.book)
+        self.assertEqual(self.strategist.on_price(BONK, 0.1), [])
+
+    def test_check_all_positions_uses_book(self):
+        signals = asyncio.run(self.strategist.check_all_positions({JUP: 1.25, BONK: 5.0}))
+        self.assertEqual([(s['mint'], s['trigger']) for s in signals], [(JUP, "TAKE_PROFIT")])
+
+    def test_undispatched_exits_fire_again(self):
+        outcomes = {"ok": False}
+
+        def dispatch(signal):
+            if outcomes.get("raise"):
+                raise RuntimeError("sell failed")
+            return outcomes["ok"]
+
+        async def tick():
+            signals = await self.strategist.check_all_positions({JUP: 0.85})
+            await self.strategist.dispatch_signals(signals)
+            return [s['trigger'] for s in signals]
+
+        # No dispatcher yet: the stop-loss stays armed for as long as it holds
+        self.assertEqual(asyncio.run(tick()), ["STOP_LOSS"])
+        self.assertEqual(asyncio.run(tick()), ["STOP_LOSS"])
+        self.strategist.dispatch = dispatch
+        self.assertEqual(asyncio.run(tick()), ["STOP_LOSS"])  # returned False
+        outcomes["raise"] = True
+        self.assertEqual(asyncio.run(tick()), ["STOP_LOSS"])
+        outcomes.update(ok=True, **{"raise": False})
+        self.assertEqual(asyncio.run(tick()), ["STOP_LOSS"])  # dispatched: fired once
+        self.assertEqual(asyncio.run(tick()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
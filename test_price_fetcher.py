@@ -0,0 +1,122 @@
+"""
+Unit tests for the batched open-position price fetcher.
+
+Run: python -m pytest test_price_fetcher.py (or python test_price_fetcher.py)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import asyncio
+import time
+import unittest
+from src.executor.position_book import PositionBook
+from src.services.price_fetcher import PriceFetcher, PYTH_MAJOR_FEEDS
+
+SOL = "So11111111111111111111111111111111111111112"
+
+
+def fake_mint(i: int) -> str:
+    return f"Mint{i:040d}"
+
+
+class FakeUpstream:
+    """Stands in for DEX Screener / Jupiter / Hermes and records every call."""
+    def __init__(self, prices, jupiter_skew=1.0):
+        self.prices = prices
+        self.jupiter_skew = jupiter_skew
+        self.calls = []
+
+    async def __call__(self, url, params=None, headers=None):
+        self.calls.append(url)
+        if url.startswith(PriceFetcher.DEXSCREENER_URL):
+            mints = url[len(PriceFetcher.DEXSCREENER_URL):].split(",")
+            pairs = []
+            for m in mints:
+                if m in self.prices:
+                    pairs.append({"baseToken": {"address": m}, "priceUsd": str(self.prices[m] * 0.5), "liquidity": {"usd": 10}})
+                    pairs.append({"baseToken": {"address": m}, "priceUsd": str(self.prices[m]), "liquidity": {"usd": 5000}})
+            return pairs
+        if url == PriceFetcher.JUPITER_PRICE_URL:
+            ids = dict(params)["ids"].split(",")
+            return {"data": {m: {"id": m, "price": str(self.prices[m] * self.jupiter_skew)} for m in ids if m in self.prices}}
+        if url == PriceFetcher.PYTH_LATEST_URL:
+            feeds = [v.removeprefix("0x") for k, v in params if k == "ids[]"]
+            mint_by_feed = {f: m for m, f in PYTH_MAJOR_FEEDS.items()}
+            return {"parsed": [
+                {"id": f, "price": {"price": str(int(self.prices[mint_by_feed[f]] * 1e8)), "expo": -8, "publish_time": int(time.time()) - 3}}
+                for f in feeds
+            ]}
+        raise AssertionError(url)
+
+
+class TestPriceFetcher(unittest.TestCase):
+    def setUp(self):
+        self.book = PositionBook(tp_percent=20.0, sl_percent=-10.0)
+
+    def make(self, prices, **kwargs):
+        fetcher = PriceFetcher(self.book.mints, distance_fn=self.book.distance_to_trigger, **kwargs)
+        upstream = FakeUpstream(prices)
+        fetcher._get_json = upstream
+        return fetcher, upstream
+
+    def test_batches_mints_into_few_calls(self):
+        mints = [fake_mint(i) for i in range(75)]
+        self.book.load([{'mint': m, 'amount_atoms': 1, 'avg_entry_price': 1.0} for m in mints])
+        fetcher, upstream = self.make({m: 1.0 for m in mints})
+
+        prices = asyncio.run(fetcher())
+
+        self.assertEqual(len(prices), 75)
+        dex_calls = [c for c in upstream.calls if c.startswith(PriceFetcher.DEXSCREENER_URL)]
+        jup_calls = [c for c in upstream.calls if c == PriceFetcher.JUPITER_PRICE_URL]
+        self.assertEqual(len(dex_calls), 3)   # 30 + 30 + 15
+        self.assertEqual(len(jup_calls), 1)
+        # No majors held, so Hermes is never called
+        self.assertNotIn(PriceFetcher.PYTH_LATEST_URL, upstream.calls)
+
+    def test_reconciles_and_tags_age(self):
+        self.book.load([{'mint': SOL, 'amount_atoms': 1, 'avg_entry_price': 150.0}])
+        fetcher, _ = self.make({SOL: 150.0})
+
+        asyncio.run(fetcher())
+        quote = fetcher.quotes[SOL]
+
+        self.assertAlmostEqual(quote["price"], 150.0)
+        self.assertEqual(set(quote["sources"]), {"pyth", "jupiter", "dexscreener"})
+        self.assertFalse(quote["divergent"])
+        # Pyth publish_time is 3s old, so the blended quote is at least that old
+        self.assertGreaterEqual(fetcher.age(SOL), 3.0)
+
+    def test_divergent_sources_prefer_priority(self):
+        mint = fake_mint(1)
+        self.book.load([{'mint': mint, 'amount_atoms': 1, 'avg_entry_price': 1.0}])
+        fetcher = PriceFetcher(self.book.mints, distance_fn=self.book.distance_to_trigger)
+        fetcher._get_json = FakeUpstream({mint: 1.0}, jupiter_skew=1.2)
+
+        asyncio.run(fetcher())
+        quote = fetcher.quotes[mint]
+
+        self.assertTrue(quote["divergent"])
+        self.assertEqual(quote["source"], "jupiter")
+        self.assertAlmostEqual(quote["price"], 1.2)
+
+    def test_cadence_follows_trigger_proximity(self):
+        near, far = fake_mint(1), fake_mint(2)
+        self.book.load([
+            {'mint': near, 'amount_atoms': 1, 'avg_entry_price': 1.0},
+            {'mint': far, 'amount_atoms': 1, 'avg_entry_price': 1.0},
+        ])
+        # near sits 0.5% under its TP, far sits right at entry (10% from SL)
+        fetcher, _ = self.make({near: 1.194, far: 1.0}, min_interval_s=2.0, max_interval_s=60.0)
+
+        asyncio.run(fetcher())
+        self.assertLessEqual(fetcher.next_delay(), 2.0)
+        self.assertAlmostEqual(fetcher.interval_for(far, 1.0), 60.0)
+
+        later = time.time() + 5
+        self.assertEqual(fetcher.due_mints(now=later), [near])
+
+
+if __name__ == '__main__':
+    unittest.main()
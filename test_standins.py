@@ -0,0 +1,167 @@
+"""
+Tests for the local upstream stand-ins (tests/standins).
+
+Run: python -m pytest test_standins.py (or python test_standins.py)
+"""
+import sys
+import os
+# Add repo root to path to allow src.* and tests.standins imports
+sys.path.insert(0, os.path.dirname(__file__))
+
+import asyncio
+import base64
+import time
+import unittest
+
+from aiohttp.test_utils import TestClient, TestServer
+from solders.hash import Hash
+from solders.instruction import Instruction
+from solders.keypair import Keypair
+from solders.message import MessageV0
+from solders.pubkey import Pubkey
+from solders.transaction import VersionedTransaction
+
+from src.executor.fee_manager import GasManager
+from src.signals.dex_screener import MomentumScanner
+from src.signals.meteora_dlmm_scanner import MeteoraDLMMScanner
+from tests.standins import Scenario, build_app, parse_per_upstream
+from tests.standins.upstreams import MEMO_PROGRAM, OUTCOME_PASS, OUTCOME_REJECT
+
+QUIET = dict(latency_ms={name: 0 for name in ("dexscreener", "jupiter", "rpc", "meteora", "hermes", "discord")})
+
+
+def _signed_tx(payer: Keypair, instructions: int) -> str:
+    ixs = [Instruction(MEMO_PROGRAM, f"ix {i}".encode(), []) for i in range(instructions)]
+    message = MessageV0.try_compile(payer.pubkey(), ixs, [], Hash.default())
+    return base64.b64encode(bytes(VersionedTransaction(message, [payer]))).decode()
+
+
+class StandinTestCase(unittest.IsolatedAsyncioTestCase):
+    scenario_kwargs = {}
+
+    async def asyncSetUp(self):
+        self.scenario = Scenario(seed=7, **{**QUIET, **self.scenario_kwargs})
+        self.server = TestServer(build_app(self.scenario))
+        self.client = TestClient(self.server)
+        await self.client.start_server()
+        self.base_url = str(self.server.make_url("")).rstrip("/")
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def rpc(self, method, params=None):
+        resp = await self.client.post("/", json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params or []})
+        return (await resp.json())["result"]
+
+
+class TestRpcStandin(StandinTestCase):
+    async def test_gas_manager_reads_prioritization_fees(self):
+        manager = GasManager(self.base_url)
+        fee = await manager.get_competitive_fee()
+        await manager.client.close()
+        self.assertGreaterEqual(fee, manager.default_micro_lamports)
+        self.assertLessEqual(fee, 10_000_000)
+
+    async def test_send_then_confirm(self):
+        self.scenario.confirm_seconds = 0.2
+        signature = await self.rpc("sendTransaction", [_signed_tx(Keypair(), 1), {"encoding": "base64"}])
+        statuses = await self.rpc("getSignatureStatuses", [[signature, "1" * 64]])
+        self.assertEqual(statuses["value"][0]["confirmationStatus"], "processed")
+        self.assertIsNone(statuses["value"][1])
+        await asyncio.sleep(0.25)
+        statuses = await self.rpc("getSignatureStatuses", [[signature]])
+        self.assertEqual(statuses["value"][0]["confirmationStatus"], "confirmed")
+
+    async def test_simulation_units_scale_with_instructions(self):
+        payer = Keypair()
+        one = await self.rpc("simulateTransaction", [_signed_tx(payer, 1), {"encoding": "base64"}])
+        three = await self.rpc("simulateTransaction", [_signed_tx(payer, 3), {"encoding": "base64"}])
+        self.assertEqual(three["value"]["unitsConsumed"] - one["value"]["unitsConsumed"],
+                         2 * self.scenario.cu_per_instruction)
+
+    async def test_program_accounts_filters(self):
+        owner = str(Pubkey.new_unique())
+        a, b, c = (str(Pubkey.new_unique()) for _ in range(3))
+        self.scenario.accounts.update({
+            a: {"owner": owner, "data": b"\x01" + bytes(15)},
+            b: {"owner": owner, "data": b"\x02" + bytes(15)},
+            c: {"owner": owner, "data": bytes(8)},
+        })
+        sized = await self.rpc("getProgramAccounts", [owner, {"filters": [{"dataSize": 16}]}])
+        self.assertEqual({item["pubkey"] for item in sized}, {a, b})
+        memcmp = {"memcmp": {"offset": 0, "bytes": base64.b64encode(b"\x02").decode(), "encoding": "base64"}}
+        matched = await self.rpc("getProgramAccounts", [owner, {"filters": [memcmp], "withContext": True}])
+        self.assertEqual([item["pubkey"] for item in matched["value"]], [b])
+        many = await self.rpc("getMultipleAccounts", [[c, str(Pubkey.new_unique())]])
+        self.assertEqual(many["value"][0]["space"], 8)
+        self.assertIsNone(many["value"][1])
+
+
+class TestHttpStandins(StandinTestCase):
+    async def test_momentum_scanner_follows_scenario(self):
+        scanner = MomentumScanner()
+        scanner.base_url = f"{self.base_url}/latest/dex/pairs/solana/"
+        mints = [str(Pubkey.new_unique()) for _ in range(40)]
+        try:
+            for mint in mints:
+                outcome = self.scenario.outcome(mint)
+                if outcome not in (OUTCOME_PASS, OUTCOME_REJECT):
+                    continue
+                result = await scanner.validate_momentum(mint)
+                self.assertEqual(result["passed"], outcome == OUTCOME_PASS, result)
+        finally:
+            await scanner.session.close()
+
+    async def test_meteora_pools(self):
+        scanner = MeteoraDLMMScanner(orchestrator=None, devnet=True)
+        scanner.graphql_url = f"{self.base_url}/v1/graphql"
+        try:
+            pools = await scanner.fetch_dlmm_pools()
+        finally:
+            await scanner.session.close()
+        self.assertEqual(len(pools), self.scenario.meteora_pools)
+        self.assertTrue(all(pool["liquidityUsd"] > 0 for pool in pools))
+
+    async def test_hermes_latest_and_stream(self):
+        feed = "ef0d8b6fda2ceba41da15d4095d1da392a0d2f8ed0c6c7bc0f4cfac8c280b56d"
+        resp = await self.client.get("/v2/updates/price/latest", params={"ids[]": feed})
+        item = (await resp.json())["parsed"][0]
+        self.assertAlmostEqual(int(item["price"]["price"]) * 10 ** item["price"]["expo"], 150.0, delta=1.0)
+        self.scenario.hermes_interval_s = 0.01
+        resp = await self.client.get("/v2/updates/price/stream", params={"ids[]": feed})
+        events = 0
+        async for line in resp.content:
+            if line.startswith(b"data:"):
+                events += 1
+                if events == 3:
+                    break
+        resp.close()
+        self.assertEqual(events, 3)
+
+
+class TestFaultInjection(StandinTestCase):
+    scenario_kwargs = dict(throttle_rate={"dexscreener": 1.0}, error_rate={"jupiter": 1.0})
+
+    async def test_throttle_and_errors(self):
+        resp = await self.client.get(f"/latest/dex/pairs/solana/{Pubkey.new_unique()}")
+        self.assertEqual(resp.status, 429)
+        self.assertEqual(resp.headers["Retry-After"], "1")
+        resp = await self.client.get("/swap/v1/quote", params={"amount": "1000"})
+        self.assertEqual(resp.status, 503)
+        resp = await self.client.get("/_standins/stats")
+        self.assertEqual((await resp.json())["faults"], {"dexscreener.429": 1, "jupiter.503": 1})
+
+    async def test_latency(self):
+        self.scenario.latency_ms["rpc"] = 100
+        started = time.monotonic()
+        await self.rpc("getSlot")
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+
+    def test_parse_per_upstream(self):
+        self.assertEqual(parse_per_upstream("rpc=20, jupiter=0.5"), {"rpc": 20.0, "jupiter": 0.5})
+        with self.assertRaises(ValueError):
+            parse_per_upstream("binance=1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,13 @@
+"""
+Local stand-ins for the pipeline's upstreams (pumpportal, DEX Screener,
+Jupiter, Solana RPC, Meteora, Pyth Hermes, Discord), so the real code can be
+load- and latency-tested without network. bench_pipeline.py drives them from
+a child process; `python -m tests.standins` serves them standalone.
+"""
+
+from .pumpportal import PumpPortalReplay, load_frames, synthetic_frames
+from .upstreams import UPSTREAMS, Scenario, build_app, parse_per_upstream
+from .process import StandinProcess, serve, standin_env
+
+__all__ = ["PumpPortalReplay", "Scenario", "StandinProcess", "UPSTREAMS", "build_app", "load_frames",
+           "parse_per_upstream", "serve", "standin_env", "synthetic_frames"]
@@ -0,0 +1,54 @@
+"""
+Serves the stand-ins standalone, for benchmarks and scripts run by hand.
+
+Usage:
+    python -m tests.standins [--port 8899] [--ws-port 8900] [--latency dexscreener=80,rpc=20]
+                             [--jitter rpc=30] [--errors jupiter=0.02] [--throttle dexscreener=0.1]
+                             [--replay stream.jsonl | --tokens 200 --rate 5] [--speed 1|10|max]
+
+Prints the environment variables to export, then serves until interrupted.
+The pumpportal replay starts when the first client subscribes.
+"""
+
+import argparse
+import asyncio
+
+from . import Scenario, load_frames, parse_per_upstream, serve, standin_env, synthetic_frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--ws-port", type=int, default=8900)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=parse_per_upstream, default={}, help="Fixed latency (ms) per upstream")
+    parser.add_argument("--jitter", type=parse_per_upstream, default={}, help="Mean extra latency tail (ms)")
+    parser.add_argument("--errors", type=parse_per_upstream, default={}, help="Fraction answered 503")
+    parser.add_argument("--throttle", type=parse_per_upstream, default={}, help="Fraction answered 429")
+    parser.add_argument("--replay", default=None, help="Recorded pumpportal stream (JSONL)")
+    parser.add_argument("--tokens", type=int, default=200, help="Synthetic pumpportal stream length")
+    parser.add_argument("--rate", type=float, default=5.0, help="Synthetic tokens/s at speed 1")
+    parser.add_argument("--speed", default="1", help="Replay speed: 1, 10, ... or max")
+    args = parser.parse_args()
+
+    frames = load_frames(args.replay) if args.replay else synthetic_frames(args.tokens, args.rate, args.seed)
+    scenario = Scenario(seed=args.seed, latency_ms=args.latency, jitter_ms=args.jitter, error_rate=args.errors,
+                        throttle_rate=args.throttle)
+
+    def ready(http_port: int, ws_port: int):
+        env = standin_env(f"http://{args.host}:{http_port}", f"ws://{args.host}:{ws_port}")
+        for name, value in env.items():
+            print(f"export {name}={value}")
+        print("# Serving stand-ins; Ctrl+C to stop", flush=True)
+
+    speed = 0.0 if args.speed == "max" else float(args.speed)
+    try:
+        asyncio.run(serve(frames, speed, scenario, host=args.host, http_port=args.port, ws_port=args.ws_port,
+                          on_ready=ready, autostart=True))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Serving the stand-ins: serve() runs them on the current event loop;
+StandinProcess runs them in a child process, so emulating the upstreams does
+not compete for the GIL with the code being measured.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import urllib.request
+from typing import Any, Callable, Dict, List, Optional
+
+from .pumpportal import PumpPortalReplay
+from .upstreams import Scenario, build_app
+
+HOST = "127.0.0.1"
+
+
+def standin_env(http_url: str, ws_url: Optional[str] = None) -> Dict[str, str]:
+    env = {
+        "SOLANA_RPC_URL": http_url,
+        "DEXSCREENER_BASE_URL": http_url,
+        "JUPITER_BASE_URL": http_url,
+        "PYTH_HERMES_BASE_URL": http_url,
+        "METEORA_GRAPHQL_URL": f"{http_url}/v1/graphql",
+        "DISCORD_TRADE_ALERTS_WEBHOOK": f"{http_url}/webhooks/0/standin",
+    }
+    if ws_url:
+        env["PUMPPORTAL_WS_URL"] = ws_url
+    return env
+
+
+async def serve(frames: List[Dict[str, Any]], speed: float, scenario: Scenario, host: str = HOST,
+                http_port: int = 0, ws_port: int = 0, on_ready: Optional[Callable[[int, int], None]] = None,
+                autostart: bool = False):
+    """Serves the stand-ins until cancelled; on_ready gets the bound (http, ws) ports."""
+    import websockets
+    from aiohttp import web
+
+    replay = PumpPortalReplay(frames, speed=speed)
+    if autostart:
+        replay.start()
+    runner = web.AppRunner(build_app(scenario, replay), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, http_port)
+    await site.start()
+    try:
+        async with websockets.serve(replay.handler, host, ws_port, max_size=None) as ws_server:
+            if on_ready is not None:
+                on_ready(site._server.sockets[0].getsockname()[1], ws_server.sockets[0].getsockname()[1])
+            await asyncio.Future()
+    finally:
+        await runner.cleanup()
+
+
+def _serve_in_child(frames: List[Dict[str, Any]], speed: float, scenario: Scenario, ports):
+    asyncio.run(serve(frames, speed, scenario, on_ready=lambda http, ws: ports.put((http, ws))))
+
+
+class StandinProcess:
+    """
+    Starts the HTTP stand-ins and the pumpportal replay in a child process.
+    env() points the pipeline at them; start_stream() starts the pumpportal replay.
+    """
+    def __init__(self, frames: List[Dict[str, Any]], speed: float = 1.0, scenario: Optional[Scenario] = None,
+                 timeout: float = 30.0):
+        ctx = multiprocessing.get_context("spawn")
+        ports = ctx.Queue()
+        self.process = ctx.Process(target=_serve_in_child, args=(frames, speed, scenario or Scenario(), ports),
+                                   daemon=True, name="standins")
+        self.process.start()
+        http_port, ws_port = ports.get(timeout=timeout)
+        self.http_url = f"http://{HOST}:{http_port}"
+        self.ws_url = f"ws://{HOST}:{ws_port}"
+        self.rpc_url = self.http_url
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables pointing the pipeline at the stand-ins."""
+        return standin_env(self.http_url, self.ws_url)
+
+    def _request(self, path: str, method: str = "GET") -> Dict[str, Any]:
+        request = urllib.request.Request(self.http_url + path, method=method, data=b"" if method == "POST" else None)
+        with urllib.request.urlopen(request, timeout=10) as resp:
+            return json.loads(resp.read())
+
+    def start_stream(self):
+        self._request("/_standins/start", method="POST")
+
+    def stats(self) -> Dict[str, Any]:
+        return self._request("/_standins/stats")
+
+    def close(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=5)
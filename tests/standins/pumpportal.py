@@ -0,0 +1,110 @@
+"""
+pumpportal.fun stand-in: a websocket server replaying a token-creation stream.
+
+Frames are pumpportal "create" messages carrying the received_at_ns stamp
+PumpFunSignal adds, so a recording is just the JSON lines of what a scanner
+saw (see bench_pipeline.py --record) and replay keeps its inter-arrival
+times. Each frame is sent with an extra sent_at_ns so the consumer can tell
+its own backlog (frames sitting in the socket) from processing time.
+"""
+
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+_BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def _base58(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(_BASE58) for _ in range(length))
+
+
+def synthetic_frames(count: int, rate: float, seed: int = 0) -> List[Dict[str, Any]]:
+    """`count` create frames with Poisson arrivals averaging `rate` per second."""
+    rng = random.Random(seed)
+    t_ns = 0
+    frames = []
+    for i in range(count):
+        t_ns += int(rng.expovariate(rate) * 1e9)
+        symbol = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.randint(3, 6)))
+        frames.append({
+            "signature": _base58(rng, 88),
+            "mint": _base58(rng, 40) + "pump",
+            "traderPublicKey": _base58(rng, 44),
+            "txType": "create",
+            "initialBuy": round(rng.uniform(1e6, 8e7), 2),
+            "solAmount": round(rng.uniform(0.1, 3.0), 4),
+            "bondingCurveKey": _base58(rng, 44),
+            "vTokensInBondingCurve": 1.0e9,
+            "vSolInBondingCurve": 30.0,
+            "marketCapSol": round(rng.uniform(27, 40), 3),
+            "name": f"Bench Token {i}",
+            "symbol": symbol,
+            "uri": f"https://ipfs.io/ipfs/bench{i}",
+            "pool": "pump",
+            "received_at_ns": t_ns,
+        })
+    return frames
+
+
+def load_frames(path: str) -> List[Dict[str, Any]]:
+    frames = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                frames.append(json.loads(line))
+    return frames
+
+
+class PumpPortalReplay:
+    """
+    Websocket handler streaming `frames` to the first subscriber once start() is called.
+    speed=1 keeps the recorded inter-arrival times, 10 compresses them tenfold,
+    0 sends back to back (only the socket's flow control paces it).
+    """
+    def __init__(self, frames: List[Dict[str, Any]], speed: float = 1.0):
+        self.frames = frames
+        self.speed = speed
+        self.sent = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.subscribed = asyncio.Event()
+        self._go = asyncio.Event()
+
+    def start(self):
+        self._go.set()
+
+    async def handler(self, websocket):
+        async for message in websocket:
+            if json.loads(message).get("method") == "subscribeNewToken":
+                break
+        if self.subscribed.is_set():
+            # A reconnect after the stream was handed out gets nothing new
+            await websocket.wait_closed()
+            return
+        self.subscribed.set()
+        await self._go.wait()
+        await self._stream(websocket)
+        await websocket.wait_closed()
+
+    async def _stream(self, websocket):
+        self.started_at = time.time()
+        origin = self.frames[0].get("received_at_ns", 0) if self.frames else 0
+        for frame in self.frames:
+            if self.speed:
+                due = self.started_at + (frame.get("received_at_ns", origin) - origin) / 1e9 / self.speed
+                delay = due - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            frame = {k: v for k, v in frame.items() if k != "received_at_ns"}
+            frame["sent_at_ns"] = time.time_ns()
+            await websocket.send(json.dumps(frame))
+            self.sent += 1
+        self.finished_at = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"frames": len(self.frames), "sent": self.sent, "started_at": self.started_at,
+                "finished_at": self.finished_at}
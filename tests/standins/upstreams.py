@@ -0,0 +1,460 @@
+"""
+HTTP stand-ins for DEX Screener, Jupiter, Solana JSON-RPC, Meteora, Pyth
+Hermes and Discord.
+
+build_app() serves them all from one aiohttp application, so one base URL
+replaces every upstream:
+
+    GET  /latest/dex/pairs/solana/{mint}       DEX Screener pairs   (DEXSCREENER_BASE_URL)
+    GET  /latest/dex/tokens/{mints}            DEX Screener tokens
+    GET  /tokens/v1/solana/{mints}
+    GET  /swap/v1/quote, POST /swap/v1/swap    Jupiter              (JUPITER_BASE_URL)
+    GET  /price/v2
+    POST /                                     Solana JSON-RPC      (SOLANA_RPC_URL)
+    POST /v1/graphql                           Meteora pools query  (METEORA_GRAPHQL_URL)
+    GET  /v2/updates/price/latest              Hermes               (PYTH_HERMES_BASE_URL)
+    GET  /v2/updates/price/stream              Hermes SSE
+    POST /webhooks/{id}/{token}                Discord webhook      (DISCORD_TRADE_ALERTS_WEBHOOK)
+    GET  /_standins/stats, POST /_standins/start   harness control
+
+The JSON-RPC methods are getBalance, getAccountInfo, getMultipleAccounts,
+getProgramAccounts (dataSize/memcmp filters), getLatestBlockhash,
+getRecentPrioritizationFees, sendTransaction, simulateTransaction and
+getSignatureStatuses, plus getSlot/getBlockHeight; batches are accepted.
+
+Every upstream gets its own latency (plus an exponential tail), error rate
+(503) and throttle rate (429 with Retry-After) from the Scenario. What DEX
+Screener reports for a mint is a pure function of the mint and the seed: it
+passes the momentum leash, fails it, or has no pairs until `pending_seconds`
+after its first lookup (then passes, so it goes through the retry queue).
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import random
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.message import MessageV0
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.transaction import Transaction, VersionedTransaction
+
+MEMO_PROGRAM = Pubkey.from_string("MemoSq4gqABAXKb96qnH8TysNcWxMyWCqXgDLGmfcHr")
+SOL_MINT = "So11111111111111111111111111111111111111112"
+USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+
+OUTCOME_PASS = "pass"
+OUTCOME_REJECT = "reject"
+OUTCOME_PENDING = "pending"
+
+UPSTREAMS = ("dexscreener", "jupiter", "rpc", "meteora", "hermes", "discord")
+
+# Pyth feed id (no 0x) -> starting price; other feeds start at a seeded price
+HERMES_PRICES = {
+    "ef0d8b6fda2ceba41da15d4095d1da392a0d2f8ed0c6c7bc0f4cfac8c280b56d": 150.0,  # SOL/USD
+    "e62df6c8b4a85fe1a67db44dc12de5db330f7ac66b72dc658afedf0f4a415b43": 65000.0,  # BTC/USD
+    "eaa020c61cc479712813461ce153894a96a6c00b21ed0cfc2798d1f9a9e9c94a": 1.0,  # USDC/USD
+}
+
+_BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def _b58decode(value: str) -> bytes:
+    n = 0
+    for char in value:
+        n = n * 58 + _BASE58.index(char)
+    body = n.to_bytes((n.bit_length() + 7) // 8, "big") if n else b""
+    return b"\x00" * (len(value) - len(value.lstrip("1"))) + body
+
+
+def parse_per_upstream(spec: str) -> Dict[str, float]:
+    """Parses "rpc=20,jupiter=60" into {"rpc": 20.0, "jupiter": 60.0}."""
+    values = {}
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        name, _, value = part.partition("=")
+        if name not in UPSTREAMS:
+            raise ValueError(f"unknown upstream {name!r} (expected one of {', '.join(UPSTREAMS)})")
+        values[name] = float(value)
+    return values
+
+
+class Scenario:
+    """
+    Behaviour of the stand-ins. Per-upstream settings are dicts keyed by the
+    names in UPSTREAMS: latency_ms (fixed part), jitter_ms (mean of an
+    exponential tail added on top), error_rate (fraction answered 503) and
+    throttle_rate (fraction answered 429).
+
+    accounts maps a pubkey to {"owner", "lamports", "data" (bytes)} for the
+    account and program-account RPC methods.
+    """
+    def __init__(self, seed: int = 0, pass_ratio: float = 0.2, reject_ratio: float = 0.6,
+                 pending_seconds: float = 5.0, latency_ms: Optional[Dict[str, float]] = None,
+                 jitter_ms: Optional[Dict[str, float]] = None, error_rate: Optional[Dict[str, float]] = None,
+                 throttle_rate: Optional[Dict[str, float]] = None, accounts: Optional[Dict[str, Dict]] = None,
+                 priority_fee_median: int = 20_000, cu_base: int = 5_000, cu_per_instruction: int = 25_000,
+                 confirm_seconds: float = 0.4, meteora_pools: int = 40, hermes_interval_s: float = 0.4):
+        self.seed = seed
+        self.pass_ratio = pass_ratio
+        self.reject_ratio = reject_ratio
+        self.pending_seconds = pending_seconds
+        self.latency_ms = {"dexscreener": 80.0, "jupiter": 60.0, "rpc": 20.0, "meteora": 150.0,
+                           "hermes": 30.0, "discord": 50.0}
+        self.latency_ms.update(latency_ms or {})
+        self.jitter_ms = dict(jitter_ms or {})
+        self.error_rate = dict(error_rate or {})
+        self.throttle_rate = dict(throttle_rate or {})
+        self.accounts = dict(accounts or {})
+        self.priority_fee_median = priority_fee_median
+        self.cu_base = cu_base
+        self.cu_per_instruction = cu_per_instruction
+        self.confirm_seconds = confirm_seconds
+        self.meteora_pools = meteora_pools
+        self.hermes_interval_s = hermes_interval_s
+
+    def outcome(self, mint: str) -> str:
+        digest = hashlib.blake2b(f"{self.seed}:{mint}".encode(), digest_size=8).digest()
+        u = int.from_bytes(digest, "big") / 2 ** 64
+        if u < self.pass_ratio:
+            return OUTCOME_PASS
+        if u < self.pass_ratio + self.reject_ratio:
+            return OUTCOME_REJECT
+        return OUTCOME_PENDING
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"seed": self.seed, "pass_ratio": self.pass_ratio, "reject_ratio": self.reject_ratio,
+                "pending_seconds": self.pending_seconds, "latency_ms": dict(self.latency_ms),
+                "jitter_ms": dict(self.jitter_ms), "error_rate": dict(self.error_rate),
+                "throttle_rate": dict(self.throttle_rate)}
+
+
+def _pair(mint: str, passing: bool) -> Dict[str, Any]:
+    now_ms = int(time.time() * 1000)
+    if passing:
+        liquidity, fdv, volume_5m, buys_5m, sells_5m, buys_1h = 25000, 60000, 4500, 60, 25, 180
+    else:
+        liquidity, fdv, volume_5m, buys_5m, sells_5m, buys_1h = 900, 3200, 40, 2, 1, 4
+    return {
+        "chainId": "solana",
+        "dexId": "pumpswap",
+        "url": f"https://dexscreener.com/solana/{mint.lower()}",
+        "pairAddress": mint[:32],
+        "baseToken": {"address": mint, "symbol": "BENCH"},
+        "quoteToken": {"address": SOL_MINT, "symbol": "SOL"},
+        "priceNative": "0.0000010",
+        "priceUsd": "0.00015",  # SOL at $150
+        "txns": {"m5": {"buys": buys_5m, "sells": sells_5m}, "h1": {"buys": buys_1h, "sells": buys_1h // 3}},
+        "volume": {"m5": volume_5m, "h1": volume_5m * 8, "h24": volume_5m * 40},
+        "priceChange": {"m5": 12.5, "h1": 40.1},
+        "liquidity": {"usd": liquidity},
+        "fdv": fdv,
+        "pairCreatedAt": now_ms - 5 * 60 * 1000,
+    }
+
+
+def _swap_transaction(user_public_key: str) -> str:
+    """An unsigned v0 transaction with the user as fee payer and only signer, like Jupiter's."""
+    payer = Pubkey.from_string(user_public_key)
+    ix = Instruction(MEMO_PROGRAM, b"standin swap", [AccountMeta(payer, True, True)])
+    message = MessageV0.try_compile(payer, [ix], [], Hash.default())
+    return base64.b64encode(bytes(VersionedTransaction.populate(message, [Signature.default()]))).decode()
+
+
+def _decode_transaction(wire_tx: str, config: Optional[Dict[str, Any]]):
+    raw = base64.b64decode(wire_tx) if (config or {}).get("encoding") == "base64" else _b58decode(wire_tx)
+    try:
+        return VersionedTransaction.from_bytes(raw)
+    except Exception:
+        return Transaction.from_bytes(raw)
+
+
+def _account_json(account: Dict[str, Any]) -> Dict[str, Any]:
+    data = account.get("data", b"")
+    return {"data": [base64.b64encode(data).decode(), "base64"], "executable": False,
+            "lamports": account.get("lamports", 2_039_280), "owner": account.get("owner", str(MEMO_PROGRAM)),
+            "rentEpoch": 18446744073709551615, "space": len(data)}
+
+
+def _matches(account: Dict[str, Any], filters: List[Dict[str, Any]]) -> bool:
+    data = account.get("data", b"")
+    for f in filters:
+        if "dataSize" in f and len(data) != f["dataSize"]:
+            return False
+        if "memcmp" in f:
+            memcmp = f["memcmp"]
+            expected = (base64.b64decode(memcmp["bytes"]) if memcmp.get("encoding") == "base64"
+                        else _b58decode(memcmp["bytes"]))
+            offset = memcmp.get("offset", 0)
+            if data[offset:offset + len(expected)] != expected:
+                return False
+    return True
+
+
+class _Hermes:
+    """Seeded random walk per feed, published as Hermes `parsed` items."""
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.prices: Dict[str, float] = {}
+
+    def item(self, feed_id: str) -> Dict[str, Any]:
+        feed_id = feed_id.lower().removeprefix("0x")
+        price = self.prices.get(feed_id)
+        if price is None:
+            price = HERMES_PRICES.get(feed_id) or round(self.rng.uniform(0.5, 100.0), 4)
+        price *= math.exp(self.rng.gauss(0, 0.0005))
+        self.prices[feed_id] = price
+        now = int(time.time())
+        fixed = {"price": str(int(price * 1e8)), "conf": str(int(price * 1e8 * 0.0005)), "expo": -8,
+                 "publish_time": now}
+        return {"id": feed_id, "price": fixed, "ema_price": dict(fixed),
+                "metadata": {"slot": 0, "proof_available_time": now, "prev_publish_time": now - 1}}
+
+
+def _meteora_pools(scenario: Scenario, poll: int) -> List[Dict[str, Any]]:
+    rng = random.Random(scenario.seed)
+    drift = random.Random(f"{scenario.seed}:{poll}")
+    pools = []
+    for i in range(scenario.meteora_pools):
+        liquidity = rng.uniform(1_000, 500_000)
+        pools.append({
+            "address": hashlib.sha256(f"{scenario.seed}:pool:{i}".encode()).hexdigest()[:44],
+            "baseMint": hashlib.sha256(f"{scenario.seed}:mint:{i}".encode()).hexdigest()[:44],
+            "quoteMint": SOL_MINT if i % 3 else USDC_MINT,
+            "liquidityUsd": round(liquidity, 2),
+            "volume24h": round(liquidity * rng.uniform(0.2, 4.0) * drift.uniform(0.9, 1.1), 2),
+            "feeTier": rng.choice([0.01, 0.05, 0.1, 0.25, 0.8, 2.0]),
+            "apy": round(rng.uniform(5, 400), 2),
+        })
+    return pools
+
+
+def build_app(scenario: Optional[Scenario] = None, replay=None) -> web.Application:
+    """The stand-in application; `replay` (a PumpPortalReplay) is started via POST /_standins/start."""
+    scenario = scenario or Scenario()
+    rng = random.Random(scenario.seed)
+    hermes = _Hermes(scenario.seed)
+    first_seen: Dict[str, float] = {}
+    swap_cache: Dict[str, str] = {}
+    signatures: Dict[str, float] = {}
+    requests: Counter = Counter()
+    faults: Counter = Counter()
+    slot = [250_000_000]
+    meteora_polls = [0]
+
+    @web.middleware
+    async def upstream_behaviour(request: web.Request, handler):
+        name = request.match_info.route.name
+        upstream = name.split(".", 1)[0] if name else None
+        if upstream not in UPSTREAMS:
+            return await handler(request)
+        requests[name] += 1
+        latency = scenario.latency_ms.get(upstream, 0) / 1000.0
+        jitter = scenario.jitter_ms.get(upstream, 0)
+        if jitter:
+            latency += rng.expovariate(1000.0 / jitter)
+        if latency:
+            await asyncio.sleep(latency)
+        u = rng.random()
+        if u < scenario.throttle_rate.get(upstream, 0):
+            faults[f"{upstream}.429"] += 1
+            return web.json_response({"error": "Too Many Requests"}, status=429, headers={"Retry-After": "1"})
+        if u < scenario.throttle_rate.get(upstream, 0) + scenario.error_rate.get(upstream, 0):
+            faults[f"{upstream}.503"] += 1
+            return web.json_response({"error": "Service Unavailable"}, status=503)
+        return await handler(request)
+
+    def visible_pairs(mints: List[str]) -> List[Dict[str, Any]]:
+        pairs = []
+        for mint in mints:
+            outcome = scenario.outcome(mint)
+            if outcome == OUTCOME_PENDING:
+                seen = first_seen.setdefault(mint, time.time())
+                if time.time() - seen < scenario.pending_seconds:
+                    continue
+            pairs.append(_pair(mint, outcome != OUTCOME_REJECT))
+        return pairs
+
+    # --- DEX Screener ---------------------------------------------------------------
+
+    async def dexscreener_pairs(request: web.Request):
+        pairs = visible_pairs([request.match_info["mint"]])
+        return web.json_response({"schemaVersion": "1.0.0", "pairs": pairs or None})
+
+    async def dexscreener_tokens(request: web.Request):
+        pairs = visible_pairs(request.match_info["mints"].split(",")[:30])
+        return web.json_response({"schemaVersion": "1.0.0", "pairs": pairs or None})
+
+    async def dexscreener_tokens_v1(request: web.Request):
+        return web.json_response(visible_pairs(request.match_info["mints"].split(",")[:30]))
+
+    # --- Jupiter ----------------------------------------------------------------------
+
+    async def jupiter_quote(request: web.Request):
+        amount = int(request.query.get("amount", "0"))
+        return web.json_response({
+            "inputMint": request.query.get("inputMint"),
+            "inAmount": str(amount),
+            "outputMint": request.query.get("outputMint"),
+            "outAmount": str(amount * 1000),
+            "otherAmountThreshold": str(amount * 995),
+            "swapMode": "ExactIn",
+            "slippageBps": int(request.query.get("slippageBps", "50")),
+            "priceImpactPct": "0.0012",
+            "routePlan": [],
+            "contextSlot": slot[0],
+        })
+
+    async def jupiter_swap(request: web.Request):
+        body = await request.json()
+        user = body["userPublicKey"]
+        tx = swap_cache.get(user)
+        if tx is None:
+            tx = swap_cache[user] = _swap_transaction(user)
+        return web.json_response({"swapTransaction": tx, "lastValidBlockHeight": slot[0] + 150,
+                                  "addressLookupTableAddresses": []})
+
+    async def jupiter_price(request: web.Request):
+        ids = [i for i in request.query.get("ids", "").split(",") if i]
+        data = {mint: {"id": mint, "type": "derivedPrice", "price": "1.0" if mint == USDC_MINT else "0.00015"}
+                for mint in ids}
+        return web.json_response({"data": data, "timeTaken": 0.001})
+
+    # --- Solana JSON-RPC ---------------------------------------------------------------
+
+    def rpc_call(method: str, params: List[Any]) -> Any:
+        slot[0] += 1
+        context = {"slot": slot[0], "apiVersion": "2.0.0"}
+        if method == "getBalance":
+            account = scenario.accounts.get(params[0])
+            return {"context": context, "value": account.get("lamports", 0) if account else 5_000_000_000}
+        if method == "getAccountInfo":
+            account = scenario.accounts.get(params[0])
+            return {"context": context, "value": _account_json(account) if account else None}
+        if method == "getMultipleAccounts":
+            return {"context": context, "value": [_account_json(scenario.accounts[key])
+                                                  if key in scenario.accounts else None for key in params[0]]}
+        if method == "getProgramAccounts":
+            config = params[1] if len(params) > 1 else {}
+            matches = [{"pubkey": key, "account": _account_json(account)}
+                       for key, account in scenario.accounts.items()
+                       if account.get("owner") == params[0] and _matches(account, config.get("filters", []))]
+            return {"context": context, "value": matches} if config.get("withContext") else matches
+        if method == "getLatestBlockhash":
+            return {"context": context, "value": {"blockhash": str(Hash.new_unique()),
+                                                  "lastValidBlockHeight": slot[0] + 150}}
+        if method == "getRecentPrioritizationFees":
+            fees_rng = random.Random(f"{scenario.seed}:{slot[0] // 150}")
+            return [{"slot": slot[0] - 150 + i,
+                     "prioritizationFee": 0 if fees_rng.random() < 0.3 else
+                     int(fees_rng.lognormvariate(math.log(scenario.priority_fee_median), 1.0))}
+                    for i in range(150)]
+        if method == "sendTransaction":
+            signature = str(_decode_transaction(params[0], params[1] if len(params) > 1 else None).signatures[0])
+            signatures[signature] = time.time()
+            return signature
+        if method == "simulateTransaction":
+            tx = _decode_transaction(params[0], params[1] if len(params) > 1 else None)
+            units = scenario.cu_base + scenario.cu_per_instruction * len(tx.message.instructions)
+            return {"context": context, "value": {
+                "err": None, "accounts": None, "returnData": None, "unitsConsumed": units,
+                "logs": [f"Program {MEMO_PROGRAM} invoke [1]",
+                         f"Program {MEMO_PROGRAM} consumed {units} of 1400000 compute units",
+                         f"Program {MEMO_PROGRAM} success"]}}
+        if method == "getSignatureStatuses":
+            statuses = []
+            for signature in params[0]:
+                sent = signatures.get(signature)
+                if sent is None:
+                    statuses.append(None)
+                    continue
+                confirmed = time.time() - sent >= scenario.confirm_seconds
+                statuses.append({"slot": slot[0], "confirmations": None if confirmed else 0, "err": None,
+                                 "status": {"Ok": None},
+                                 "confirmationStatus": "confirmed" if confirmed else "processed"})
+            return {"context": context, "value": statuses}
+        if method in ("getSlot", "getBlockHeight"):
+            return slot[0]
+        raise KeyError(method)
+
+    def rpc_response(body: Dict[str, Any]) -> Dict[str, Any]:
+        method = body.get("method")
+        requests[f"rpc.{method}"] += 1
+        try:
+            return {"jsonrpc": "2.0", "id": body.get("id"), "result": rpc_call(method, body.get("params") or [])}
+        except KeyError:
+            return {"jsonrpc": "2.0", "id": body.get("id"),
+                    "error": {"code": -32601, "message": f"Method not found: {method}"}}
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": body.get("id"), "error": {"code": -32602, "message": f"Invalid params: {e}"}}
+
+    async def rpc(request: web.Request):
+        body = await request.json()
+        if isinstance(body, list):
+            return web.json_response([rpc_response(item) for item in body])
+        return web.json_response(rpc_response(body))
+
+    # --- Meteora, Hermes, Discord ------------------------------------------------------
+
+    async def meteora_graphql(request: web.Request):
+        await request.json()
+        meteora_polls[0] += 1
+        return web.json_response({"data": {"pools": _meteora_pools(scenario, meteora_polls[0])}})
+
+    async def hermes_latest(request: web.Request):
+        ids = request.query.getall("ids[]", [])
+        return web.json_response({"binary": {"encoding": "hex", "data": []},
+                                  "parsed": [hermes.item(feed_id) for feed_id in ids]})
+
+    async def hermes_stream(request: web.Request):
+        ids = request.query.getall("ids[]", [])
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        try:
+            while True:
+                event = {"binary": {"encoding": "hex", "data": []}, "parsed": [hermes.item(f) for f in ids]}
+                await response.write(f"data:{json.dumps(event)}\n\n".encode())
+                await asyncio.sleep(scenario.hermes_interval_s)
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        return response
+
+    async def discord_webhook(request: web.Request):
+        await request.read()
+        return web.Response(status=204)
+
+    # --- Control ----------------------------------------------------------------------
+
+    async def start(request: web.Request):
+        if replay is None:
+            raise web.HTTPNotFound()
+        replay.start()
+        return web.json_response({"started": True})
+
+    async def stats(request: web.Request):
+        return web.json_response({"requests": dict(requests), "faults": dict(faults),
+                                  "pumpportal": replay.stats() if replay is not None else None,
+                                  "scenario": scenario.to_dict()})
+
+    app = web.Application(middlewares=[upstream_behaviour])
+    app.router.add_get("/latest/dex/pairs/solana/{mint}", dexscreener_pairs, name="dexscreener.pairs")
+    app.router.add_get("/latest/dex/tokens/{mints}", dexscreener_tokens, name="dexscreener.tokens")
+    app.router.add_get("/tokens/v1/solana/{mints}", dexscreener_tokens_v1, name="dexscreener.tokens_v1")
+    app.router.add_get("/swap/v1/quote", jupiter_quote, name="jupiter.quote")
+    app.router.add_post("/swap/v1/swap", jupiter_swap, name="jupiter.swap")
+    app.router.add_get("/price/v2", jupiter_price, name="jupiter.price")
+    app.router.add_post("/", rpc, name="rpc")
+    app.router.add_post("/v1/graphql", meteora_graphql, name="meteora.graphql")
+    app.router.add_get("/v2/updates/price/latest", hermes_latest, name="hermes.latest")
+    app.router.add_get("/v2/updates/price/stream", hermes_stream, name="hermes.stream")
+    app.router.add_post("/webhooks/{id}/{token}", discord_webhook, name="discord.webhook")
+    app.router.add_post("/_standins/start", start)
+    app.router.add_get("/_standins/stats", stats)
+    return app